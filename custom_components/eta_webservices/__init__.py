@@ -1,13 +1,13 @@
 """The ETA Sensors integration."""
 
-import asyncio
 import logging
 from typing import Any
 
 from homeassistant import config_entries, core
-from homeassistant.const import Platform
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE, Platform
 from homeassistant.helpers import entity_registry as er
 
+from .api import AdaptiveConcurrencyLimiter, EtaAPI, ETATransport
 from .config_flow import EtaFlowHandler
 from .const import (
     CHOSEN_FLOAT_SENSORS,
@@ -17,19 +17,29 @@ from .const import (
     CUSTOM_UNIT_MINUTES_SINCE_MIDNIGHT,
     CUSTOM_UNIT_TIMESLOT,
     CUSTOM_UNIT_TIMESLOT_PLUS_TEMPERATURE,
+    DEFAULT_HEDGED_REQUESTS,
     DEFAULT_MAX_PARALLEL_REQUESTS,
+    DEFAULT_MAX_READS_PER_SECOND,
+    DEFAULT_MAX_WRITES_PER_SECOND,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_VALUE_CACHE_TTL,
     DOMAIN,
     ERROR_UPDATE_COORDINATOR,
+    ETA_CLIENT,
     FLOAT_DICT,
     FORCE_LEGACY_MODE,
+    HEDGED_REQUESTS,
+    HTTP_TRANSPORT,
     MAX_PARALLEL_REQUESTS,
+    MAX_READS_PER_SECOND,
+    MAX_WRITES_PER_SECOND,
     PENDING_DICT,
     PENDING_UPDATE_COORDINATOR,
     REQUEST_SEMAPHORE,
     SENSOR_UPDATE_COORDINATOR,
     TEXT_DICT,
     UPDATE_INTERVAL,
+    VALUE_CACHE_TTL,
     WRITABLE_DICT,
     WRITABLE_UPDATE_COORDINATOR,
 )
@@ -40,6 +50,7 @@ from .coordinator import (
     ETAWritableUpdateCoordinator,
 )
 from .services import async_setup_services
+from .utils import get_eta_client
 
 PLATFORMS: list[Platform] = [
     Platform.BINARY_SENSOR,
@@ -71,9 +82,40 @@ async def async_setup_entry(
         config.get(MAX_PARALLEL_REQUESTS, DEFAULT_MAX_PARALLEL_REQUESTS)
     )
     config[UPDATE_INTERVAL] = int(config.get(UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL))
+    config[VALUE_CACHE_TTL] = int(config.get(VALUE_CACHE_TTL, DEFAULT_VALUE_CACHE_TTL))
+    config[MAX_READS_PER_SECOND] = int(
+        config.get(MAX_READS_PER_SECOND, DEFAULT_MAX_READS_PER_SECOND)
+    )
+    config[MAX_WRITES_PER_SECOND] = int(
+        config.get(MAX_WRITES_PER_SECOND, DEFAULT_MAX_WRITES_PER_SECOND)
+    )
+    config[HEDGED_REQUESTS] = bool(config.get(HEDGED_REQUESTS, DEFAULT_HEDGED_REQUESTS))
     # Share one limiter across all API users of this config entry
     # so startup and periodic updates cannot overload slower ETA units.
-    config[REQUEST_SEMAPHORE] = asyncio.Semaphore(config[MAX_PARALLEL_REQUESTS])
+    # The limiter adapts to the terminal, using the configured value as upper bound.
+    config[REQUEST_SEMAPHORE] = AdaptiveConcurrencyLimiter(
+        config[MAX_PARALLEL_REQUESTS]
+    )
+    # Dedicated keep-alive connection pool to the terminal, sized to the request limit.
+    transport = ETATransport(
+        config[MAX_PARALLEL_REQUESTS],
+        value_cache_ttl=config[VALUE_CACHE_TTL],
+        max_reads_per_second=config[MAX_READS_PER_SECOND],
+        max_writes_per_second=config[MAX_WRITES_PER_SECOND],
+        hedged_requests=config[HEDGED_REQUESTS],
+    )
+    config[HTTP_TRANSPORT] = transport
+
+    async def _async_close_transport(_event: core.Event) -> None:
+        await transport.close()
+
+    # Entries are not unloaded when Home Assistant shuts down, close the pool like
+    # Home Assistant closes the shared session used by the config flow
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_transport)
+    )
+    # One long-lived client for all coordinators, entities and services of the entry
+    eta_client = get_eta_client(hass, config)
 
     error_coordinator = ETAErrorUpdateCoordinator(hass, config)
     sensor_coordinator = ETASensorUpdateCoordinator(hass, config)
@@ -84,10 +126,15 @@ async def async_setup_entry(
     config[WRITABLE_UPDATE_COORDINATOR] = writable_coordinator
     config[PENDING_UPDATE_COORDINATOR] = pending_coordinator
 
-    # Prime coordinators once before entities are added to avoid initial update bursts.
-    await error_coordinator.async_config_entry_first_refresh()
-    await sensor_coordinator.async_config_entry_first_refresh()
-    await writable_coordinator.async_config_entry_first_refresh()
+    try:
+        # Prime coordinators once before entities are added to avoid initial update bursts.
+        await error_coordinator.async_config_entry_first_refresh()
+        await sensor_coordinator.async_config_entry_first_refresh()
+        await writable_coordinator.async_config_entry_first_refresh()
+    except BaseException:
+        # The entry is not loaded, so async_unload_entry won't release the pool
+        await eta_client.close()
+        raise
 
     hass.data[DOMAIN][entry.entry_id] = config
 
@@ -232,7 +279,13 @@ async def async_unload_entry(
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        # Remove config entry from domain.
-        hass.data[DOMAIN].pop(entry.entry_id)
+        # Remove config entry from domain and release its connection pool.
+        config = hass.data[DOMAIN].pop(entry.entry_id)
+        eta_client: EtaAPI | None = config.pop(ETA_CLIENT, None)
+        transport: ETATransport | None = config.get(HTTP_TRANSPORT)
+        if eta_client is not None:
+            await eta_client.close()
+        elif transport is not None:
+            await transport.close()
 
     return unload_ok
@@ -1,17 +1,46 @@
 """HTTP client for ETA API communication."""
 
 import asyncio
+from collections.abc import Callable
 from datetime import datetime
 import logging
-from typing import Any
+import time
+from typing import Any, NamedTuple
 
-from aiohttp import ClientSession
+from aiohttp import ClientConnectionError, ClientSession, ClientTimeout
 import xmltodict
 
-from .types import FLOAT_SENSOR_UNITS, ETAError
+from ..const import CIRCUIT_BREAKER_PROBE_TIMEOUT  # noqa: TID252
+from .circuit_breaker import CircuitBreaker
+from .coalescer import RequestCoalescer
+from .limiter import AdaptiveConcurrencyLimiter
+from .metrics import EndpointClass, RequestMetrics
+from .rate_limiter import RequestRateLimiter
+from .retry import HedgePolicy, RetryPolicy
+from .transport import ETATransport
+from .types import (
+    FLOAT_SENSOR_UNITS,
+    ETAError,
+    ETATerminalUnavailableError,
+    ETAVarsetError,
+)
+from .value_cache import ValueCache
+from .xml_parsers import MenuParser, parse_value_response
 
 _LOGGER = logging.getLogger(__name__)
 
+VAR_PREFIX = "/user/var/"
+VARSET_PREFIX = "/user/vars/"
+# Cheapest endpoint of the terminal, used to check whether it is reachable again
+PROBE_SUFFIX = "/user/api"
+
+
+class ETAResponse(NamedTuple):
+    """Status and raw body of a completed request."""
+
+    status: int
+    body: bytes
+
 
 class APIClient:
     """Handles low-level HTTP and XML operations for ETA API."""
@@ -22,77 +51,290 @@ class APIClient:
         host: str,
         port: int,
         max_concurrent_requests: int = 5,
-        request_semaphore: asyncio.Semaphore | None = None,
+        request_semaphore: asyncio.Semaphore | AdaptiveConcurrencyLimiter | None = None,
+        *,
+        transport: ETATransport | None = None,
     ) -> None:
         """Initialize HTTP client.
 
         :param session: aiohttp ClientSession for HTTP requests
         :param host: Hostname or IP address of the ETA device
         :param port: Port number of the ETA API
+        :param max_concurrent_requests: Upper bound for concurrent requests
+        :param request_semaphore: Semaphore or limiter shared with other clients, defaults to
+            a new AdaptiveConcurrencyLimiter bounded by max_concurrent_requests
+        :param transport: Transport of the config entry, shares request state between clients
         """
         self._session = session
         self._host = host
         self._port = int(port)
         self._max_concurrent_requests = max(1, int(max_concurrent_requests))
-        self._request_semaphore = request_semaphore or asyncio.Semaphore(
+        self._request_semaphore = request_semaphore or AdaptiveConcurrencyLimiter(
             self._max_concurrent_requests
         )
+        self._coalescer = (
+            transport.coalescer if transport is not None else RequestCoalescer()
+        )
+        self._value_cache: ValueCache | None = (
+            transport.value_cache if transport is not None else None
+        )
+        self._circuit_breaker: CircuitBreaker | None = (
+            transport.circuit_breaker if transport is not None else None
+        )
+        self._rate_limiter: RequestRateLimiter | None = (
+            transport.rate_limiter if transport is not None else None
+        )
+        self._retry_policy: RetryPolicy | None = (
+            transport.retry_policy if transport is not None else None
+        )
+        self._hedge_policy: HedgePolicy | None = (
+            transport.hedge_policy if transport is not None else None
+        )
+        self._metrics = transport.metrics if transport is not None else RequestMetrics()
         self._num_duplicates = 0
 
     def _build_uri(self, suffix: str) -> str:
         """Build full URI from suffix."""
         return f"http://{self._host}:{self._port}{suffix}"
 
-    async def get_request(self, suffix: str):
-        """Execute GET request."""
+    async def _request(
+        self,
+        method: Callable[..., Any],
+        suffix: str,
+        write: bool = False,
+        *,
+        write_budget: bool | None = None,
+        **kwargs,
+    ) -> ETAResponse:
+        """Execute a request and read the complete body.
+
+        The connection is released to the pool as soon as the body has been read,
+        even if reading it fails. Tokens of the rate limiter are taken before
+        waiting for a request permit, so that throttled requests don't block others.
+        Both are handed out by the priority of the request.
+
+        :param write: True if the request modifies data on the terminal
+        :param write_budget: True to take the token from the write budget, defaults to `write`
+        :raises ETATerminalUnavailableError: If the circuit breaker of the transport is open
+        """
+        endpoint_class = EndpointClass.from_request(suffix, write)
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire(
+                write if write_budget is None else write_budget
+            )
+        enqueued = time.monotonic()
         async with self._request_semaphore:
-            return await self._session.get(self._build_uri(suffix))
+            queue_wait = time.monotonic() - enqueued
+            start: float | None = None
+            try:
+                if self._circuit_breaker is not None:
+                    await self._circuit_breaker.ensure_closed(self._probe)
+                start = time.monotonic()
+                async with method(self._build_uri(suffix), **kwargs) as response:
+                    result = ETAResponse(response.status, await response.read())
+            except Exception as err:
+                # Timeouts are the slow tail, without them p95 and hedge delay are too low
+                timeout_latency = (
+                    time.monotonic() - start
+                    if start is not None and isinstance(err, TimeoutError)
+                    else None
+                )
+                self._metrics.record_error(
+                    endpoint_class, queue_wait=queue_wait, latency=timeout_latency
+                )
+                if (
+                    timeout_latency is not None
+                    and self._hedge_policy is not None
+                    and endpoint_class is EndpointClass.VAR
+                ):
+                    self._hedge_policy.record_latency(timeout_latency)
+                if self._circuit_breaker is not None and isinstance(
+                    err, (TimeoutError, ClientConnectionError)
+                ):
+                    self._circuit_breaker.record_failure()
+                raise
+            latency = time.monotonic() - start
+            if self._circuit_breaker is not None:
+                self._circuit_breaker.record_success()
+            if self._hedge_policy is not None and endpoint_class is EndpointClass.VAR:
+                self._hedge_policy.record_latency(latency)
+            self._metrics.record_request(
+                endpoint_class,
+                queue_wait=queue_wait,
+                latency=latency,
+                num_bytes=len(result.body),
+                error=result.status >= 400,
+            )
+            return result
 
-    async def post_request(self, suffix: str, data: dict):
-        """Execute POST request."""
-        async with self._request_semaphore:
-            return await self._session.post(self._build_uri(suffix), data=data)
-
-    def _evaluate_xml_dict(self, xml_dict, uri_dict: dict, prefix: str = ""):
-        """Recursively evaluate XML dictionary and extract URIs."""
-        if isinstance(xml_dict, list):
-            for child in xml_dict:
-                self._evaluate_xml_dict(child, uri_dict, prefix)
-        elif "object" in xml_dict:
-            child = xml_dict["object"]
-            new_prefix = f"{prefix}_{xml_dict['@name']}"
-            # Store multiple URIs per key
-            if new_prefix not in uri_dict:
-                uri_dict[new_prefix] = []
-            else:
-                self._num_duplicates += 1
-            # add parent to uri_dict and then evaluate the children
-            uri_dict[new_prefix].append(xml_dict["@uri"])
-            self._evaluate_xml_dict(child, uri_dict, new_prefix)
+    async def _probe(self) -> None:
+        """Send a single cheap request to check whether the terminal responds."""
+        async with self._session.get(
+            self._build_uri(PROBE_SUFFIX),
+            timeout=ClientTimeout(total=CIRCUIT_BREAKER_PROBE_TIMEOUT),
+        ) as response:
+            await response.read()
+
+    async def get_request(self, suffix: str) -> ETAResponse:
+        """Execute GET request."""
+        return await self._request(self._session.get, suffix)
+
+    async def get_body(self, suffix: str) -> bytes:
+        """Execute GET request and return the raw response body.
+
+        Identical requests which are already in flight are not sent again,
+        all concurrent callers share the response of the first one.
+        Variable responses are served from the value cache while they are fresh.
+        Timeouts and connection errors are retried according to the retry policy
+        of the transport.
+        """
+        cache_key = self._value_cache_key(suffix)
+        if cache_key is not None:
+            cached = self._value_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        return await self._coalescer.run(
+            suffix, lambda: self._fetch_body(suffix, cache_key)
+        )
+
+    async def _fetch_body(self, suffix: str, cache_key: str | None = None) -> bytes:
+        generation = self._value_cache.generation if cache_key is not None else None
+        if self._retry_policy is None:
+            body = (await self._hedged_get_request(suffix)).body
         else:
-            key = f"{prefix}_{xml_dict['@name']}"
-            if key not in uri_dict:
-                uri_dict[key] = []
-            else:
-                self._num_duplicates += 1
-            uri_dict[key].append(xml_dict["@uri"])
+            body = (
+                await self._retry_policy.run(lambda: self._hedged_get_request(suffix))
+            ).body
+        if cache_key is not None and b"<value" in body:
+            self._value_cache.put(cache_key, body, generation)
+        return body
+
+    async def _hedged_get_request(self, suffix: str) -> ETAResponse:
+        """Execute GET request, sending a duplicate if a variable read takes unusually long.
+
+        The duplicate is only sent if a request permit is free, so hedging never
+        delays other requests. The first successful response wins and the other
+        request is cancelled.
+        """
+        delay = (
+            self._hedge_policy.hedge_delay()
+            if self._hedge_policy is not None and suffix.startswith(VAR_PREFIX)
+            else None
+        )
+        if delay is None:
+            return await self.get_request(suffix)
+
+        primary = asyncio.ensure_future(self.get_request(suffix))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and not self._request_semaphore.locked():
+                _LOGGER.debug("Sending a duplicate read of %s", suffix)
+                self._hedge_policy.record_hedge()
+                tasks.append(asyncio.ensure_future(self.get_request(suffix)))
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._hedge_policy.record_win()
+                        return task.result()
+            # Both failed, report the error of the original request
+            return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _value_cache_key(self, suffix: str) -> str | None:
+        if (
+            self._value_cache is None
+            or not self._value_cache.enabled
+            or not suffix.startswith(VAR_PREFIX)
+        ):
+            return None
+        return self.normalize_uri(suffix)
+
+    def _invalidate_value(self, suffix: str) -> None:
+        """Make sure the next read of a variable is sent to the terminal."""
+        if not suffix.startswith(VAR_PREFIX):
+            return
+        self._coalescer.discard(suffix)
+        if self._value_cache is not None:
+            self._value_cache.invalidate(self.normalize_uri(suffix))
+
+    async def post_request(self, suffix: str, data: dict) -> ETAResponse:
+        """Execute POST request.
+
+        Cached and in-flight reads of the written variable are invalidated.
+        """
+        self._invalidate_value(suffix)
+        try:
+            return await self._request(
+                self._session.post, suffix, write=True, data=data
+            )
+        finally:
+            # Reads which completed while the write was in flight may be outdated
+            self._invalidate_value(suffix)
+
+    async def put_request(
+        self, suffix: str, *, write_budget: bool = True
+    ) -> ETAResponse:
+        """Execute PUT request.
+
+        :param write_budget: False to take the rate limit token from the read budget
+        """
+        return await self._request(
+            self._session.put, suffix, write=True, write_budget=write_budget
+        )
+
+    async def delete_request(
+        self, suffix: str, *, write_budget: bool = True
+    ) -> ETAResponse:
+        """Execute DELETE request.
+
+        :param write_budget: False to take the rate limit token from the read budget
+        """
+        return await self._request(
+            self._session.delete, suffix, write=True, write_budget=write_budget
+        )
 
     async def get_menu(self):
         """Request the menu from the ETA API."""
-        data = await self.get_request("/user/menu")
-        text = await data.text()
-        return xmltodict.parse(text)
-
-    async def _get_raw_sensor_dict(self):
-        """Get raw sensor dictionary from menu."""
-        data = await self.get_menu()
-        return data["eta"]["menu"]["fub"]
+        body = await self.get_body("/user/menu")
+        with self._metrics.time_parse(EndpointClass.MENU):
+            return xmltodict.parse(body)
 
     async def get_sensors_dict(self):
-        """Get flattened sensor dictionary with URIs."""
-        raw_dict = await self._get_raw_sensor_dict()
-        uri_dict = {}
-        self._evaluate_xml_dict(raw_dict, uri_dict)
+        """Get flattened sensor dictionary with URIs.
+
+        The body is read completely like every other response, so that the request
+        shares coalescing, retries and the circuit breaker. It is then flattened with
+        MenuParser, without building the nested document.
+
+        :return: Maps sensor keys to lists of URIs, in menu order
+        :raises ValueError: If the response contains no menu, e.g. an error document
+        :raises xml.parsers.expat.ExpatError: If the response is no valid XML
+        """
+        body = await self.get_body("/user/menu")
+        uri_dict: dict[str, list[str]] = {}
+        with self._metrics.time_parse(EndpointClass.MENU):
+            parser = MenuParser()
+            for key, uri in parser.parse(body):
+                # Store multiple URIs per key
+                uris = uri_dict.get(key)
+                if uris is None:
+                    uri_dict[key] = [uri]
+                else:
+                    uris.append(uri)
+                    self._num_duplicates += 1
+        if not parser.found_menu:
+            raise ValueError(
+                f"Response of /user/menu contains no menu: {body.decode(errors='replace')}"
+            )
         return uri_dict
 
     def parse_data(
@@ -131,12 +373,25 @@ class APIClient:
         :param float_sensor_units: List of units for float parsing
         :return: Tuple of (value, unit, raw_dict)
         """
-        data = await self.get_request("/user/var/" + str(uri))
-        text = await data.text()
-        data = xmltodict.parse(text)["eta"]["value"]
-        value, unit = self.parse_data(data)
+        body = await self.get_body(VAR_PREFIX + str(uri))
+        with self._metrics.time_parse(EndpointClass.VAR):
+            data = parse_value_response(body)
+            value, unit = self.parse_data(data)
         return value, unit, data
 
+    async def get_value_dict(self, uri: str) -> dict:
+        """Request the data from a API URL without interpreting its value.
+
+        Pass the result to `parse_data` to interpret it, e.g. to parse a single
+        response with different options.
+
+        :param uri: ETA API url suffix, like /120/1/123
+        :return: Attributes and text of the value element
+        """
+        body = await self.get_body(VAR_PREFIX + str(uri))
+        with self._metrics.time_parse(EndpointClass.VAR):
+            return parse_value_response(body)
+
     async def get_data(
         self, uri, force_number_handling=False, force_string_handling=False
     ) -> tuple[float | str, str]:
@@ -148,14 +403,13 @@ class APIClient:
         :return: Parsed data as a Tuple[Value, Unit]
         :rtype: Tuple[Any,str]
         """
-        data = await self.get_request("/user/var/" + str(uri))
-        text = await data.text()
-        data = xmltodict.parse(text)["eta"]["value"]
-        return self.parse_data(
-            data,
-            force_number_handling=force_number_handling,
-            force_string_handling=force_string_handling,
-        )
+        body = await self.get_body(VAR_PREFIX + str(uri))
+        with self._metrics.time_parse(EndpointClass.VAR):
+            return self.parse_data(
+                parse_value_response(body),
+                force_number_handling=force_number_handling,
+                force_string_handling=force_string_handling,
+            )
 
     async def get_all_data(self, sensor_list: dict[str, dict[str, bool]]):
         """Get all data from all endpoints.
@@ -163,6 +417,7 @@ class APIClient:
         :param sensor_list: Dict[url, Dict[str, bool]] of sensors to query the data for
         :return: List of all data
         :rtype: Dict[str, Any]
+        :raises ETATerminalUnavailableError: If the terminal became unreachable
         """
 
         tasks = [
@@ -178,6 +433,7 @@ class APIClient:
             for uri, force_handlings in sensor_list.items()
         ]
         results = await asyncio.gather(*tasks, return_exceptions=True)
+        self.raise_if_unavailable(results)
 
         data_dict: dict[str, float | str] = {}
         for uri, result in zip(sensor_list.keys(), results, strict=False):
@@ -188,6 +444,81 @@ class APIClient:
 
         return data_dict
 
+    @staticmethod
+    def raise_if_unavailable(results: list) -> None:
+        """Raise the first ETATerminalUnavailableError found in the results of a gather.
+
+        Individual failures are expected for some endpoints, but a request which was
+        rejected by the circuit breaker means that the whole update failed.
+        """
+        for result in results:
+            if isinstance(result, ETATerminalUnavailableError):
+                raise result
+
+    @staticmethod
+    def normalize_uri(uri: str) -> str:
+        """Normalize an endpoint URI to the `/<fub>/.../<node>` form used in the menu.
+
+        The terminal reports variable URIs in different forms depending on the endpoint,
+        e.g. `/user/var/120/10101/0/0/12197` or `120/10101/0/0/12197`.
+        """
+        uri = uri.removeprefix("/user/var")
+        return "/" + uri.lstrip("/")
+
+    async def get_varset(self, varset: str) -> dict[str, dict]:
+        """Read all variables of a server-side variable set with a single request.
+
+        :param varset: Name of the variable set
+        :return: Dict mapping the normalized URI of each variable to its raw XML dict
+        :raises ETAVarsetError: If the terminal rejects the request
+        """
+        body = await self.get_body(VARSET_PREFIX + varset)
+        with self._metrics.time_parse(EndpointClass.VARS):
+            parsed = xmltodict.parse(body).get("eta") or {}
+        if "error" in parsed or "vars" not in parsed:
+            raise ETAVarsetError(
+                f"Could not read variable set {varset}: {body.decode(errors='replace')}"
+            )
+
+        variables = (parsed["vars"] or {}).get("variable", [])
+        if isinstance(variables, dict):
+            variables = [variables]
+        return {self.normalize_uri(var["@uri"]): var for var in variables}
+
+    async def modify_varset(self, method: str, suffix: str) -> bool:
+        """Create, extend or delete a server-side variable set.
+
+        :param method: Either "PUT" or "DELETE"
+        :param suffix: URL suffix below /user/vars
+        The requests take their rate limit tokens from the read budget, the
+        variable set only changes how values are read and must not delay writes.
+
+        :return: True if the terminal accepted the change
+        """
+        if method == "PUT":
+            response = await self.put_request(
+                VARSET_PREFIX + suffix, write_budget=False
+            )
+        else:
+            response = await self.delete_request(
+                VARSET_PREFIX + suffix, write_budget=False
+            )
+        if response.status >= 400:
+            _LOGGER.debug(
+                "Terminal rejected %s %s (HTTP %s): %s",
+                method,
+                suffix,
+                response.status,
+                response.body,
+            )
+            return False
+        if response.body and "error" in (
+            xmltodict.parse(response.body).get("eta") or {}
+        ):
+            _LOGGER.debug("Terminal rejected %s %s: %s", method, suffix, response.body)
+            return False
+        return True
+
     def parse_errors(self, data) -> list[ETAError]:
         """Parse error data from ETA API.
 
@@ -222,6 +553,11 @@ class APIClient:
 
         return errors
 
+    @property
+    def metrics(self) -> RequestMetrics:
+        """Get the request metrics, shared with all clients of the transport."""
+        return self._metrics
+
     @property
     def host(self) -> str:
         """Get host."""
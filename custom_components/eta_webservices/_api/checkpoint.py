@@ -0,0 +1,163 @@
+"""Checkpoints which allow resuming an interrupted discovery."""
+
+from collections.abc import Callable
+import copy
+import logging
+import time
+from typing import Any
+
+from .types import ETAEndpoint
+
+_LOGGER = logging.getLogger(__name__)
+
+# Minimum seconds between two saves while a discovery is running
+CHECKPOINT_SAVE_INTERVAL = 15.0
+
+
+class DiscoveryCheckpoint:
+    """Progress of a discovery of a single terminal.
+
+    Holds the menu the discovery is based on and all varinfo and value responses
+    received so far. If the discovery is interrupted, e.g. because the config flow
+    was closed or Home Assistant restarted, the next discovery continues with the
+    same menu and only requests what is still missing. A checkpoint is only used
+    within `max_age` seconds after the discovery has been started, so that the
+    terminal doesn't change in the meantime unnoticed.
+    """
+
+    def __init__(
+        self,
+        max_age: float,
+        save: Callable[[], None] | None = None,
+        save_interval: float = CHECKPOINT_SAVE_INTERVAL,
+    ) -> None:
+        """Initialize an empty checkpoint.
+
+        :param max_age: Seconds after the start of a discovery in which it may be resumed
+        :param save: Callback which persists `as_dict`, called while the discovery makes progress
+        :param save_interval: Minimum seconds between two calls of `save`
+        """
+        self._max_age = max(0.0, float(max_age))
+        self._save = save
+        self._save_interval = max(0.0, float(save_interval))
+        self._last_save = time.monotonic()
+        self._dirty = False
+        self._api_version: str | None = None
+        self._started_at: float | None = None
+        self._menu: dict[str, list[str]] | None = None
+        self._varinfo: dict[str, ETAEndpoint] = {}
+        self._values: dict[str, dict] = {}
+        self._num_resumed = 0
+
+    @property
+    def menu(self) -> dict[str, list[str]] | None:
+        """Get the menu of an interrupted discovery, or None if there is nothing to resume."""
+        if self._menu is None or not self._is_recent():
+            return None
+        return copy.deepcopy(self._menu)
+
+    @property
+    def started_at(self) -> float | None:
+        """Get the timestamp at which the checkpointed discovery was started."""
+        return self._started_at
+
+    @property
+    def num_resumed(self) -> int:
+        """Get the number of responses which didn't have to be requested again."""
+        return self._num_resumed
+
+    def _is_recent(self) -> bool:
+        return (
+            self._started_at is not None
+            and time.time() - self._started_at < self._max_age
+        )
+
+    def set_api_version(self, api_version: str) -> None:
+        """Set the API version of the terminal, discarding the checkpoint if it changed."""
+        if api_version != self._api_version:
+            self._reset()
+            self._api_version = api_version
+
+    def start(self, menu: dict[str, list[str]]) -> None:
+        """Start checkpointing a new discovery based on `menu`."""
+        self._reset()
+        self._menu = copy.deepcopy(menu)
+        self._started_at = time.time()
+        self._changed()
+
+    def get_varinfo(self, uri: str) -> ETAEndpoint | None:
+        """Get a copy of the varinfo metadata received for a URI, if any."""
+        if (endpoint_info := self._varinfo.get(uri)) is None:
+            return None
+        self._num_resumed += 1
+        return copy.deepcopy(endpoint_info)
+
+    def add_varinfo(self, uri: str, endpoint_info: ETAEndpoint) -> None:
+        """Store a copy of freshly parsed varinfo metadata."""
+        self._varinfo[uri] = copy.deepcopy(endpoint_info)
+        self._changed()
+
+    def get_value(self, uri: str) -> dict | None:
+        """Get the unparsed value received for a URI, if any."""
+        if (value := self._values.get(uri)) is None:
+            return None
+        self._num_resumed += 1
+        return value
+
+    def add_value(self, uri: str, value: dict) -> None:
+        """Store an unparsed value, see APIClient.get_value_dict."""
+        self._values[uri] = value
+        self._changed()
+
+    def finish(self) -> None:
+        """Discard the checkpoint after the discovery has completed."""
+        self._reset()
+        self.flush()
+
+    def discard(self) -> None:
+        """Discard the checkpoint, e.g. to force a discovery from scratch."""
+        self.finish()
+
+    def flush(self) -> None:
+        """Save the checkpoint right away if it has changed since the last save."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        self._last_save = time.monotonic()
+        if self._save is not None:
+            self._save()
+
+    def _changed(self) -> None:
+        self._dirty = True
+        if time.monotonic() - self._last_save >= self._save_interval:
+            self.flush()
+
+    def _reset(self) -> None:
+        self._dirty = self._dirty or self._menu is not None
+        self._started_at = None
+        self._menu = None
+        self._varinfo = {}
+        self._values = {}
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the checkpoint in a JSON serializable form."""
+        return {
+            "api_version": self._api_version,
+            "started_at": self._started_at,
+            "menu": self._menu,
+            "varinfo": self._varinfo,
+            "values": self._values,
+        }
+
+    def restore(self, data: dict[str, Any] | None) -> None:
+        """Restore the output of `as_dict`, outdated or invalid data is ignored."""
+        if not isinstance(data, dict) or not isinstance(data.get("menu"), dict):
+            return
+        self._api_version = data.get("api_version")
+        self._started_at = data.get("started_at")
+        self._menu = data["menu"]
+        self._varinfo = data.get("varinfo") or {}
+        self._values = data.get("values") or {}
+        if not self._is_recent():
+            _LOGGER.debug("Ignoring outdated discovery checkpoint")
+            self._reset()
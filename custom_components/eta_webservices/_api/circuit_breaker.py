@@ -0,0 +1,137 @@
+"""Circuit breaker which stops sending requests to an unreachable ETA terminal."""
+
+from collections.abc import Awaitable, Callable
+from enum import StrEnum
+import logging
+import time
+from typing import Any
+
+from ..const import CIRCUIT_BREAKER_FAILURE_THRESHOLD, CIRCUIT_BREAKER_RESET_TIMEOUT  # noqa: TID252
+from .types import ETATerminalUnavailableError
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CircuitState(StrEnum):
+    """States of the circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fails requests fast while the terminal is unreachable.
+
+    The breaker opens after `failure_threshold` consecutive connection failures.
+    While it is open, every request fails immediately with an
+    ETATerminalUnavailableError instead of waiting for a connect timeout. Once
+    `reset_timeout` has passed, the next request sends a single probe to the
+    terminal (half-open state). The breaker closes again if the probe succeeds and
+    stays open for another `reset_timeout` otherwise.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_BREAKER_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize the circuit breaker.
+
+        :param failure_threshold: Number of consecutive connection failures which open the breaker
+        :param reset_timeout: Seconds to wait before probing an unreachable terminal again
+        """
+        self._failure_threshold = max(1, int(failure_threshold))
+        self._reset_timeout = max(0.0, float(reset_timeout))
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._num_rejected = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """Get the current state."""
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Return True if requests are currently not sent to the terminal."""
+        return self._state is not CircuitState.CLOSED
+
+    @property
+    def consecutive_failures(self) -> int:
+        """Get the number of connection failures since the last successful request."""
+        return self._consecutive_failures
+
+    @property
+    def num_rejected(self) -> int:
+        """Get the number of requests which failed fast."""
+        return self._num_rejected
+
+    def seconds_until_probe(self) -> float:
+        """Get the number of seconds until the next probe may be sent."""
+        if self._state is not CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self._reset_timeout - time.monotonic())
+
+    async def ensure_closed(self, probe: Callable[[], Awaitable[Any]]) -> None:
+        """Make sure a request may be sent to the terminal.
+
+        :param probe: Callable sending a cheap request to the terminal, awaited if a probe is due
+        :raises ETATerminalUnavailableError: If the breaker is open or the probe failed
+        """
+        if self._state is CircuitState.CLOSED:
+            return
+        if self._state is CircuitState.HALF_OPEN or self.seconds_until_probe() > 0:
+            self._num_rejected += 1
+            raise ETATerminalUnavailableError(
+                "ETA terminal is unreachable, not sending request"
+            )
+
+        # Only the caller which started the probe gets through, everybody else fails fast
+        self._state = CircuitState.HALF_OPEN
+        _LOGGER.debug("Probing whether the ETA terminal is reachable again")
+        try:
+            await probe()
+        except Exception as err:
+            self._open()
+            raise ETATerminalUnavailableError(
+                "ETA terminal is still unreachable"
+            ) from err
+        except BaseException:
+            # Cancelled, let the next request probe again right away
+            self._state = CircuitState.OPEN
+            raise
+        self.record_success()
+
+    def record_success(self) -> None:
+        """Record a request which reached the terminal."""
+        if self._state is not CircuitState.CLOSED:
+            _LOGGER.info("ETA terminal is reachable again")
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        """Record a request which failed with a timeout or a connection error."""
+        self._consecutive_failures += 1
+        if (
+            self._state is CircuitState.CLOSED
+            and self._consecutive_failures >= self._failure_threshold
+        ):
+            _LOGGER.warning(
+                "ETA terminal did not respond to %i requests in a row, pausing requests for %.0f seconds",
+                self._consecutive_failures,
+                self._reset_timeout,
+            )
+            self._open()
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+
+    def __repr__(self) -> str:
+        """Return a short description of the breaker state."""
+        return (
+            f"<CircuitBreaker state={self._state} "
+            f"failures={self._consecutive_failures}>"
+        )
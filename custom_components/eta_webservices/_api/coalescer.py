@@ -0,0 +1,92 @@
+"""Single-flight coalescing of identical concurrent requests."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+import logging
+from typing import Any
+
+from .scheduler import RequestPriority, current_priority
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Task
+    priority: RequestPriority
+    waiters: int = 0
+
+
+class RequestCoalescer:
+    """Lets concurrent callers of the same request share a single execution.
+
+    The first caller for a key starts the request in its own task, every caller
+    which arrives while it is still running awaits the same result instead of
+    sending another request. The request is only cancelled if all of its callers
+    have been cancelled.
+
+    The request waits for its permit at the priority of the caller which started
+    it. A caller with a higher priority (see `request_priority`) therefore doesn't
+    join it, but starts a request of its own which later callers join instead.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the coalescer."""
+        self._in_flight: dict[Hashable, _Flight] = {}
+        self._num_coalesced = 0
+
+    @property
+    def num_coalesced(self) -> int:
+        """Get the number of requests which were served by an in-flight request."""
+        return self._num_coalesced
+
+    @property
+    def num_in_flight(self) -> int:
+        """Get the number of distinct requests currently in flight."""
+        return len(self._in_flight)
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run the request identified by key, or join it if it is already running.
+
+        :param key: Identifier of the request, e.g. the URL suffix
+        :param factory: Callable returning the awaitable which executes the request
+        :return: Result of the request, shared by all concurrent callers
+        """
+        priority = current_priority()
+        flight = self._in_flight.get(key)
+        if flight is None or flight.priority > priority:
+            if flight is not None:
+                _LOGGER.debug(
+                    "Not joining in-flight request %s of lower priority %s",
+                    key,
+                    flight.priority.name,
+                )
+            flight = _Flight(asyncio.ensure_future(factory()), priority)
+            self._in_flight[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self._num_coalesced += 1
+            _LOGGER.debug("Joining in-flight request %s", key)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is interested in the result anymore
+                flight.task.cancel()
+                self._forget(key, flight)
+            raise
+
+    def discard(self, key: Hashable) -> None:
+        """Let the next caller for key start a new request.
+
+        Callers which already wait for the in-flight request still get its result.
+        """
+        self._in_flight.pop(key, None)
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
@@ -0,0 +1,239 @@
+"""Adaptive concurrency limiter for requests to the ETA terminal."""
+
+import asyncio
+import logging
+import time
+
+from aiohttp import ClientConnectionError
+
+from .scheduler import (
+    PriorityWaitQueue,
+    QueueWaitStats,
+    RequestPriority,
+    current_priority,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# A request is considered congested if its latency exceeds the baseline by this factor
+LATENCY_TOLERANCE = 2.0
+# Factor applied to the limit after a latency spike
+LATENCY_BACKOFF = 0.75
+# Factor applied to the limit after a timeout or a dropped connection
+ERROR_BACKOFF = 0.5
+# Lower bound for the baseline, guards against coarse clocks reporting zero latency
+MIN_BASELINE_LATENCY = 0.005  # seconds
+# Weight of a new sample in the smoothed latency
+LATENCY_SMOOTHING = 0.2
+# Speed at which the baseline drifts towards the smoothed latency
+BASELINE_DRIFT = 0.01
+
+
+class AdaptiveConcurrencyLimiter:
+    """Drop-in replacement for an asyncio.Semaphore with an adaptive permit count.
+
+    The limit follows an AIMD scheme: it grows by one permit per window of `limit`
+    successful requests while the latency stays close to the observed baseline and
+    the permits are actually used. It shrinks multiplicatively on latency spikes,
+    timeouts and dropped connections, but at most once per window.
+
+    The limit never exceeds `max_limit`, so the configured number of parallel
+    requests acts as an upper bound. Use it with `async with limiter:` to feed
+    latency samples back into the limit.
+
+    Waiting requests are not served in FIFO order, but by the priority class of
+    the context they were sent from (see `request_priority`), so that user writes
+    don't queue behind hundreds of polling or discovery reads.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        initial_limit: int | None = None,
+    ) -> None:
+        """Initialize the limiter.
+
+        :param max_limit: Upper bound for the number of concurrent requests
+        :param min_limit: Lower bound for the number of concurrent requests
+        :param initial_limit: Starting limit, defaults to max_limit
+        """
+        self._max_limit = max(1, int(max_limit))
+        self._min_limit = max(1, min(int(min_limit), self._max_limit))
+        if initial_limit is None:
+            initial_limit = self._max_limit
+        self._limit = max(self._min_limit, min(int(initial_limit), self._max_limit))
+        self._in_flight = 0
+        self._waiters = PriorityWaitQueue()
+        self._start_times: dict[asyncio.Task | None, list[float]] = {}
+        self._baseline_latency: float | None = None
+        self._smoothed_latency: float | None = None
+        self._completed_in_window = 0
+        self._saturated_in_window = False
+
+    @property
+    def limit(self) -> int:
+        """Get the current number of permits."""
+        return self._limit
+
+    @property
+    def max_limit(self) -> int:
+        """Get the upper bound of the limit."""
+        return self._max_limit
+
+    @property
+    def min_limit(self) -> int:
+        """Get the lower bound of the limit."""
+        return self._min_limit
+
+    @property
+    def in_flight(self) -> int:
+        """Get the number of currently held permits."""
+        return self._in_flight
+
+    @property
+    def smoothed_latency(self) -> float | None:
+        """Get the smoothed request latency in seconds."""
+        return self._smoothed_latency
+
+    @property
+    def baseline_latency(self) -> float | None:
+        """Get the baseline latency in seconds the limiter compares against."""
+        return self._baseline_latency
+
+    @property
+    def queue_wait_stats(self) -> dict[RequestPriority, QueueWaitStats]:
+        """Get the time requests waited for a permit per priority class."""
+        return self._waiters.stats
+
+    def queued(self, priority: RequestPriority) -> int:
+        """Get the number of requests of a priority class waiting for a permit."""
+        return self._waiters.queued(priority)
+
+    def locked(self) -> bool:
+        """Return True if a permit can not be acquired immediately."""
+        return self._in_flight >= self._limit or bool(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Acquire a permit, waiting by priority if none is available."""
+        priority = current_priority()
+        if not self.locked():
+            self._take_permit()
+            self._waiters.record_wait(priority, 0.0)
+            return True
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = self._waiters.push(waiter, priority)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The permit was handed over right before the cancellation
+                self._in_flight -= 1
+            else:
+                self._waiters.remove(entry)
+            self._wake_waiters()
+            raise
+        return True
+
+    def release(self) -> None:
+        """Release a permit without providing a latency sample."""
+        self._in_flight -= 1
+        self._wake_waiters()
+
+    async def __aenter__(self) -> None:
+        """Acquire a permit and start measuring the request latency."""
+        await self.acquire()
+        self._start_times.setdefault(asyncio.current_task(), []).append(
+            time.monotonic()
+        )
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Release the permit and adapt the limit to the outcome of the request."""
+        task = asyncio.current_task()
+        start_times = self._start_times[task]
+        start = start_times.pop()
+        if not start_times:
+            del self._start_times[task]
+
+        if exc_type is None:
+            self._on_success(time.monotonic() - start)
+        elif issubclass(exc_type, (TimeoutError, ClientConnectionError)):
+            self._decrease(ERROR_BACKOFF, "request failed with " + exc_type.__name__)
+        self.release()
+
+    def _take_permit(self) -> None:
+        self._in_flight += 1
+        if self._in_flight >= self._limit:
+            self._saturated_in_window = True
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self._in_flight < self._limit:
+            waiter = self._waiters.pop()
+            if waiter is not None and not waiter.done():
+                self._take_permit()
+                waiter.set_result(None)
+
+    def _on_success(self, latency: float) -> None:
+        if self._smoothed_latency is None:
+            self._smoothed_latency = latency
+            self._baseline_latency = latency
+        else:
+            self._smoothed_latency += LATENCY_SMOOTHING * (
+                latency - self._smoothed_latency
+            )
+            # Let the baseline drift upwards slowly, so that a terminal which became
+            # permanently slower isn't treated as congested forever
+            self._baseline_latency = min(
+                latency,
+                self._baseline_latency
+                + BASELINE_DRIFT * (self._smoothed_latency - self._baseline_latency),
+            )
+
+        if self._completed_in_window < 0:
+            # Still waiting for requests started before the last back-off
+            self._completed_in_window += 1
+            return
+        baseline = max(self._baseline_latency, MIN_BASELINE_LATENCY)
+        if self._smoothed_latency > baseline * LATENCY_TOLERANCE:
+            self._decrease(LATENCY_BACKOFF, "latency spike")
+            return
+
+        self._completed_in_window += 1
+        if self._completed_in_window < self._limit:
+            return
+        if self._saturated_in_window and self._limit < self._max_limit:
+            self._limit += 1
+            _LOGGER.debug("Increased concurrent request limit to %i", self._limit)
+            self._wake_waiters()
+        self._start_window()
+
+    def _decrease(self, factor: float, reason: str) -> None:
+        # Only back off once per window, the requests which are still in flight
+        # were started under the old limit and would otherwise collapse it
+        if self._completed_in_window < 0:
+            self._completed_in_window += 1
+            return
+        new_limit = max(self._min_limit, int(self._limit * factor))
+        if new_limit < self._limit:
+            _LOGGER.debug(
+                "Decreased concurrent request limit from %i to %i (%s)",
+                self._limit,
+                new_limit,
+                reason,
+            )
+            self._limit = new_limit
+        self._start_window()
+        # Wait for the other requests still in flight before backing off again
+        self._completed_in_window = 1 - self._in_flight
+
+    def _start_window(self) -> None:
+        self._completed_in_window = 0
+        self._saturated_in_window = self._in_flight >= self._limit
+
+    def __repr__(self) -> str:
+        """Return a short description of the limiter state."""
+        return (
+            f"<AdaptiveConcurrencyLimiter limit={self._limit} "
+            f"max={self._max_limit} in_flight={self._in_flight}>"
+        )
@@ -0,0 +1,224 @@
+"""In-memory request metrics per endpoint class of the ETA terminal."""
+
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import StrEnum
+import math
+import time
+from typing import Any
+
+# Upper bounds in seconds of the histogram buckets, growing by 25% from 1 ms to about a minute
+HISTOGRAM_BUCKETS = tuple(0.001 * 1.25**i for i in range(50))
+
+
+class EndpointClass(StrEnum):
+    """Classes of requests which are measured separately."""
+
+    MENU = "menu"
+    VARINFO = "varinfo"
+    VAR = "var"
+    VARS = "vars"
+    ERRORS = "errors"
+    POST_VAR = "post_var"
+    OTHER = "other"
+
+    @classmethod
+    def from_request(cls, suffix: str, write: bool = False) -> "EndpointClass":
+        """Get the class of a request.
+
+        :param suffix: URL suffix of the request, e.g. /user/var/120/10101/0/0/12197
+        :param write: True if the request modifies data on the terminal
+        """
+        if suffix.startswith("/user/varinfo/"):
+            return cls.VARINFO
+        if suffix.startswith("/user/vars"):
+            return cls.VARS
+        if suffix.startswith("/user/var/"):
+            return cls.POST_VAR if write else cls.VAR
+        if suffix == "/user/menu":
+            return cls.MENU
+        if suffix == "/user/errors":
+            return cls.ERRORS
+        return cls.OTHER
+
+
+class LatencyHistogram:
+    """Histogram of durations with logarithmic buckets.
+
+    Recording is O(log buckets) and the memory use is constant, so every request
+    can be recorded. Percentiles are reported as the upper bound of the bucket
+    they fall into, i.e. they overestimate by at most 25%.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self._counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    @property
+    def count(self) -> int:
+        """Get the number of recorded durations."""
+        return self._count
+
+    @property
+    def total(self) -> float:
+        """Get the sum of all recorded durations in seconds."""
+        return self._total
+
+    @property
+    def max(self) -> float:
+        """Get the longest recorded duration in seconds."""
+        return self._max
+
+    @property
+    def average(self) -> float:
+        """Get the average duration in seconds."""
+        return self._total / self._count if self._count else 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add a duration in seconds."""
+        self._counts[bisect_left(HISTOGRAM_BUCKETS, seconds)] += 1
+        self._count += 1
+        self._total += seconds
+        self._max = max(self._max, seconds)
+
+    def percentile(self, quantile: float) -> float | None:
+        """Get the duration below which `quantile` (0 to 1) of all durations fall.
+
+        :return: Duration in seconds, or None if nothing has been recorded
+        """
+        if not self._count:
+            return None
+        target = max(1, math.ceil(quantile * self._count))
+        cumulative = 0
+        for index, count in enumerate(self._counts):
+            cumulative += count
+            if cumulative >= target:
+                if index == len(HISTOGRAM_BUCKETS):
+                    return self._max
+                return min(HISTOGRAM_BUCKETS[index], self._max)
+        return self._max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Summarize the histogram for diagnostics."""
+        return {
+            "count": self._count,
+            "average": self.average,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self._max,
+        }
+
+
+@dataclass
+class EndpointMetrics:
+    """Accumulated metrics of an endpoint class."""
+
+    num_requests: int = 0
+    num_errors: int = 0
+    bytes_received: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    queue_wait: LatencyHistogram = field(default_factory=LatencyHistogram)
+    parse_time: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Summarize the metrics for diagnostics."""
+        return {
+            "num_requests": self.num_requests,
+            "num_errors": self.num_errors,
+            "bytes_received": self.bytes_received,
+            "latency": self.latency.as_dict(),
+            "queue_wait": self.queue_wait.as_dict(),
+            "parse_time": self.parse_time.as_dict(),
+        }
+
+
+class RequestMetrics:
+    """Request metrics of a single terminal, grouped by endpoint class.
+
+    Latency is measured from sending the request until the complete body has been
+    read, queue wait is the time a request waited for a permit of the limiter.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty metrics for all endpoint classes."""
+        self._endpoints = {
+            endpoint_class: EndpointMetrics() for endpoint_class in EndpointClass
+        }
+
+    def __getitem__(self, endpoint_class: EndpointClass) -> EndpointMetrics:
+        """Get the metrics of an endpoint class."""
+        return self._endpoints[endpoint_class]
+
+    def record_request(
+        self,
+        endpoint_class: EndpointClass,
+        *,
+        queue_wait: float,
+        latency: float,
+        num_bytes: int,
+        error: bool = False,
+    ) -> None:
+        """Record a request which received a response.
+
+        :param endpoint_class: Class of the request
+        :param queue_wait: Seconds the request waited for a permit
+        :param latency: Seconds from sending the request until the body was read
+        :param num_bytes: Size of the response body
+        :param error: True if the terminal responded with an HTTP error status
+        """
+        metrics = self._endpoints[endpoint_class]
+        metrics.num_requests += 1
+        metrics.num_errors += error
+        metrics.bytes_received += num_bytes
+        metrics.queue_wait.record(queue_wait)
+        metrics.latency.record(latency)
+
+    def record_error(
+        self,
+        endpoint_class: EndpointClass,
+        *,
+        queue_wait: float | None = None,
+        latency: float | None = None,
+    ) -> None:
+        """Record a request which failed without a response.
+
+        Timed out requests are the slow tail of the latency distribution, so their
+        duration is recorded as latency as well. Requests which failed fast, e.g.
+        because the connection was refused, are left out to not hide that tail.
+
+        :param endpoint_class: Class of the request
+        :param queue_wait: Seconds the request waited for a permit, if it got one
+        :param latency: Seconds until the request timed out
+        """
+        metrics = self._endpoints[endpoint_class]
+        metrics.num_requests += 1
+        metrics.num_errors += 1
+        if queue_wait is not None:
+            metrics.queue_wait.record(queue_wait)
+        if latency is not None:
+            metrics.latency.record(latency)
+
+    @contextmanager
+    def time_parse(self, endpoint_class: EndpointClass) -> Iterator[None]:
+        """Record the time spent parsing a response within the block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._endpoints[endpoint_class].parse_time.record(
+                time.perf_counter() - start
+            )
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Summarize the metrics of all endpoint classes which have been requested."""
+        return {
+            str(endpoint_class): metrics.as_dict()
+            for endpoint_class, metrics in self._endpoints.items()
+            if metrics.num_requests or metrics.parse_time.count
+        }
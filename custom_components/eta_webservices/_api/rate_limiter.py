@@ -0,0 +1,185 @@
+"""Token-bucket rate limiting for requests to the ETA terminal."""
+
+import asyncio
+import logging
+import time
+
+from .scheduler import PriorityWaitQueue, current_priority
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Limits the number of requests per second with a token bucket.
+
+    Every request takes one token, tokens are refilled at `rate` per second up to
+    `burst`. Callers which find the bucket empty wait until a token is available,
+    ordered by the priority class of their context (see `request_priority`) like the
+    request permits, so that writes and polling don't queue behind discovery reads.
+    A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        """Initialize the bucket.
+
+        :param rate: Sustained number of requests per second, 0 disables the limit
+        :param burst: Number of requests which may be sent at once after an idle period,
+            defaults to one second worth of requests
+        """
+        self._rate = max(0.0, float(rate))
+        self._burst = max(1.0, float(burst if burst is not None else self._rate))
+        self._tokens = self._burst
+        self._updated = time.monotonic()
+        # Set while a caller takes its token, all others wait in the queue
+        self._busy = False
+        self._waiters = PriorityWaitQueue()
+        self._num_acquired = 0
+        self._num_waited = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if requests are rate limited."""
+        return self._rate > 0
+
+    @property
+    def rate(self) -> float:
+        """Get the sustained number of requests per second."""
+        return self._rate
+
+    @property
+    def burst(self) -> float:
+        """Get the maximum number of tokens."""
+        return self._burst
+
+    @property
+    def num_acquired(self) -> int:
+        """Get the number of handed out tokens."""
+        return self._num_acquired
+
+    @property
+    def num_waited(self) -> int:
+        """Get the number of callers which had to wait for a token."""
+        return self._num_waited
+
+    @property
+    def total_wait(self) -> float:
+        """Get the accumulated time in seconds callers waited for tokens."""
+        return self._total_wait
+
+    @property
+    def max_wait(self) -> float:
+        """Get the longest time in seconds a caller waited for a token."""
+        return self._max_wait
+
+    async def acquire(self) -> float:
+        """Take a token, waiting until one is available.
+
+        :return: Seconds the caller waited for the token
+        """
+        if not self.enabled:
+            return 0.0
+
+        start = time.monotonic()
+        # Callers queue while an earlier caller waits for its token
+        waited = self._busy
+        if waited:
+            waiter = asyncio.get_running_loop().create_future()
+            entry = self._waiters.push(waiter, current_priority())
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # The turn was handed over right before the cancellation
+                    self._hand_over()
+                else:
+                    self._waiters.remove(entry)
+                raise
+        else:
+            self._busy = True
+        try:
+            self._refill()
+            if self._tokens < 1:
+                waited = True
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+                self._refill()
+            # May become slightly negative due to timer granularity, the next caller
+            # waits a bit longer to pay back the debt
+            self._tokens -= 1
+        finally:
+            self._hand_over()
+
+        self._num_acquired += 1
+        if not waited:
+            return 0.0
+        wait_time = time.monotonic() - start
+        self._num_waited += 1
+        self._total_wait += wait_time
+        self._max_wait = max(self._max_wait, wait_time)
+        return wait_time
+
+    def _hand_over(self) -> None:
+        """Let the waiting caller with the best priority take the next token."""
+        while self._waiters:
+            waiter = self._waiters.pop()
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
+                return
+        self._busy = False
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def __repr__(self) -> str:
+        """Return a short description of the bucket state."""
+        return f"<TokenBucket rate={self._rate} burst={self._burst}>"
+
+
+class RequestRateLimiter:
+    """Separate request rate budgets for reads and writes of a single terminal.
+
+    Writes have their own bucket, so that polling at a high rate never delays a
+    value the user has set.
+    """
+
+    def __init__(
+        self, max_reads_per_second: float, max_writes_per_second: float
+    ) -> None:
+        """Initialize the rate limiter.
+
+        :param max_reads_per_second: Sustained number of GET requests per second, 0 disables the limit
+        :param max_writes_per_second: Sustained number of POST, PUT and DELETE requests per second,
+            0 disables the limit
+        """
+        self._reads = TokenBucket(max_reads_per_second)
+        self._writes = TokenBucket(max_writes_per_second)
+
+    @property
+    def reads(self) -> TokenBucket:
+        """Get the bucket for read requests."""
+        return self._reads
+
+    @property
+    def writes(self) -> TokenBucket:
+        """Get the bucket for write requests."""
+        return self._writes
+
+    async def acquire(self, write: bool = False) -> float:
+        """Take a token from the read or write budget.
+
+        :param write: True if the request modifies data on the terminal
+        :return: Seconds the caller waited for the token
+        """
+        waited = await (self._writes if write else self._reads).acquire()
+        if waited > 0.5:
+            _LOGGER.debug(
+                "Waited %.2f seconds for the %s request rate limit",
+                waited,
+                "write" if write else "read",
+            )
+        return waited
@@ -0,0 +1,214 @@
+"""Retries and hedged reads for idempotent requests to the ETA terminal."""
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+import logging
+import math
+import random
+from typing import TypeVar
+
+from aiohttp import ClientConnectionError
+
+from ..const import (  # noqa: TID252
+    REQUEST_MAX_RETRIES,
+    REQUEST_RETRY_BASE_DELAY,
+    REQUEST_RETRY_MAX_DELAY,
+    REQUEST_RETRY_MAX_TOTAL_TIME,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Quantile of recent read latencies after which a duplicate read is sent
+HEDGE_QUANTILE = 0.95
+# Number of recent read latencies the hedge delay is derived from
+HEDGE_LATENCY_WINDOW = 200
+# Reads are only hedged once enough latencies have been observed
+HEDGE_MIN_SAMPLES = 20
+# Lower bound for the hedge delay, guards against duplicating every read of a fast terminal
+HEDGE_MIN_DELAY = 0.05  # seconds
+
+
+class RetryPolicy:
+    """Bounded retries with exponential backoff and full jitter.
+
+    Only timeouts and connection errors are retried, every other error is raised
+    right away. The delay before retry `n` is drawn uniformly from
+    `[0, min(max_delay, base_delay * 2**n)]`, so that requests which failed together
+    don't hit the terminal together again. All attempts and delays together are
+    cancelled after `max_total_time`, no retry is started which would only end then.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = REQUEST_MAX_RETRIES,
+        base_delay: float = REQUEST_RETRY_BASE_DELAY,
+        max_delay: float = REQUEST_RETRY_MAX_DELAY,
+        max_total_time: float | None = REQUEST_RETRY_MAX_TOTAL_TIME,
+    ) -> None:
+        """Initialize the policy.
+
+        :param max_retries: Number of retries after the first attempt, 0 disables retries
+        :param base_delay: Upper bound of the delay in seconds before the first retry
+        :param max_delay: Upper bound of the delay in seconds before any retry
+        :param max_total_time: Seconds after which a request fails with a TimeoutError
+            including all retries, None disables the limit
+        """
+        self._max_retries = max(0, int(max_retries))
+        self._base_delay = max(0.0, float(base_delay))
+        self._max_delay = max(self._base_delay, float(max_delay))
+        self._max_total_time = (
+            None if max_total_time is None else max(0.0, float(max_total_time))
+        )
+        self._num_retries = 0
+        self._num_exhausted = 0
+
+    @property
+    def max_retries(self) -> int:
+        """Get the number of retries after the first attempt."""
+        return self._max_retries
+
+    @property
+    def max_total_time(self) -> float | None:
+        """Get the seconds after which a request fails including all retries."""
+        return self._max_total_time
+
+    @property
+    def num_retries(self) -> int:
+        """Get the number of retried requests."""
+        return self._num_retries
+
+    @property
+    def num_exhausted(self) -> int:
+        """Get the number of requests which still failed after the last retry."""
+        return self._num_exhausted
+
+    def backoff(self, attempt: int) -> float:
+        """Get a randomized delay in seconds before retry number `attempt` (0-based)."""
+        return random.uniform(0, min(self._max_delay, self._base_delay * 2**attempt))
+
+    async def run(self, request: Callable[[], Awaitable[_T]]) -> _T:
+        """Await `request`, calling it again after transient failures.
+
+        :param request: Callable starting the request, must be safe to repeat
+        :return: Result of the first successful attempt
+        :raises TimeoutError | ClientConnectionError: If the last attempt failed
+        """
+        loop = asyncio.get_running_loop()
+        deadline = (
+            None if self._max_total_time is None else loop.time() + self._max_total_time
+        )
+        attempt = 0
+        while True:
+            try:
+                async with asyncio.timeout_at(deadline):
+                    return await request()
+            except (TimeoutError, ClientConnectionError) as err:
+                delay = self.backoff(attempt)
+                if attempt >= self._max_retries or (
+                    deadline is not None and loop.time() + delay >= deadline
+                ):
+                    if self._max_retries:
+                        self._num_exhausted += 1
+                    raise
+                attempt += 1
+                self._num_retries += 1
+                _LOGGER.debug(
+                    "Request failed with %s, retrying in %.2f seconds (%i/%i)",
+                    type(err).__name__,
+                    delay,
+                    attempt,
+                    self._max_retries,
+                )
+                await asyncio.sleep(delay)
+
+    def __repr__(self) -> str:
+        """Return a short description of the policy."""
+        return f"<RetryPolicy max_retries={self._max_retries}>"
+
+
+class HedgePolicy:
+    """Decides after how long a duplicate of a slow read is sent.
+
+    The delay follows a high quantile of the recently observed read latencies, so
+    only the reads which take unusually long are duplicated. Disabled policies
+    still record latencies, so hedging can start right away once it is enabled.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        quantile: float = HEDGE_QUANTILE,
+        window: int = HEDGE_LATENCY_WINDOW,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        min_delay: float = HEDGE_MIN_DELAY,
+    ) -> None:
+        """Initialize the policy.
+
+        :param enabled: True if duplicate reads may be sent
+        :param quantile: Quantile of recent latencies used as delay, between 0 and 1
+        :param window: Number of recent latencies the quantile is computed over
+        :param min_samples: Number of latencies required before reads are hedged
+        :param min_delay: Lower bound for the delay in seconds
+        """
+        self._enabled = enabled
+        self._quantile = min(1.0, max(0.0, float(quantile)))
+        self._latencies: deque[float] = deque(maxlen=max(1, int(window)))
+        self._min_samples = max(1, int(min_samples))
+        self._min_delay = max(0.0, float(min_delay))
+        self._delay: float | None = None
+        self._num_hedged = 0
+        self._num_won = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if duplicate reads may be sent."""
+        return self._enabled
+
+    @property
+    def num_hedged(self) -> int:
+        """Get the number of duplicate reads sent."""
+        return self._num_hedged
+
+    @property
+    def num_won(self) -> int:
+        """Get the number of duplicate reads which completed before the original read."""
+        return self._num_won
+
+    def record_latency(self, latency: float) -> None:
+        """Add the latency in seconds of a completed read."""
+        self._latencies.append(latency)
+        self._delay = None
+
+    def delay(self) -> float | None:
+        """Get the seconds to wait for a read before it is duplicated.
+
+        :return: Delay, or None if reads should not be hedged
+        """
+        if len(self._latencies) < self._min_samples:
+            return None
+        if self._delay is None:
+            latencies = sorted(self._latencies)
+            index = min(
+                len(latencies) - 1, math.ceil(self._quantile * len(latencies)) - 1
+            )
+            self._delay = max(self._min_delay, latencies[max(0, index)])
+        return self._delay
+
+    def hedge_delay(self) -> float | None:
+        """Get the delay before a read is duplicated, or None if hedging is disabled."""
+        return self.delay() if self._enabled else None
+
+    def record_hedge(self) -> None:
+        """Record a duplicate read which has been sent."""
+        self._num_hedged += 1
+
+    def record_win(self) -> None:
+        """Record a duplicate read which completed before the original read."""
+        self._num_won += 1
+
+    def __repr__(self) -> str:
+        """Return a short description of the policy."""
+        return f"<HedgePolicy enabled={self._enabled} delay={self.delay()}>"
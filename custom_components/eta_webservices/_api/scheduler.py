@@ -0,0 +1,159 @@
+"""Priority classes for requests to the ETA terminal."""
+
+import asyncio
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+import itertools
+import time
+
+# Seconds a waiting request needs to be treated like a request of the next higher class,
+# so that background work still makes progress while the terminal is busy
+AGING_INTERVAL = 5.0
+
+
+class RequestPriority(IntEnum):
+    """Priority classes of requests, lower values are served first."""
+
+    INTERACTIVE_WRITE = 0
+    WRITE_REFRESH = 1
+    POLLING = 2
+    BACKGROUND = 3
+
+
+_request_priority: ContextVar[RequestPriority | None] = ContextVar(
+    "eta_request_priority", default=None
+)
+
+
+def current_priority() -> RequestPriority:
+    """Get the priority of requests sent from the current context, defaults to polling."""
+    priority = _request_priority.get()
+    return RequestPriority.POLLING if priority is None else priority
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[None]:
+    """Send all requests within the block with the given priority.
+
+    Tasks started within the block, e.g. by asyncio.gather, inherit the priority.
+    """
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+@dataclass
+class QueueWaitStats:
+    """Accumulated time requests of a priority class waited for a permit."""
+
+    num_requests: int = 0
+    num_waited: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def average_wait(self) -> float:
+        """Get the average wait in seconds over all requests of the class."""
+        return self.total_wait / self.num_requests if self.num_requests else 0.0
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    priority: RequestPriority
+    enqueued_at: float
+    sequence: int
+
+
+class PriorityWaitQueue:
+    """Queue of requests waiting for a permit, ordered by priority with aging.
+
+    Requests of the same class are served in FIFO order. Between classes, the
+    request with the best effective priority wins, where the effective priority
+    improves by one class for every `aging_interval` seconds a request has waited.
+    """
+
+    def __init__(self, aging_interval: float = AGING_INTERVAL) -> None:
+        """Initialize the queue.
+
+        :param aging_interval: Seconds of waiting which promote a request by one class
+        """
+        self._aging_interval = max(0.001, float(aging_interval))
+        self._queues: dict[RequestPriority, deque[_Waiter]] = {
+            priority: deque() for priority in RequestPriority
+        }
+        self._stats = {priority: QueueWaitStats() for priority in RequestPriority}
+        self._sequence = itertools.count()
+        self._len = 0
+
+    @property
+    def stats(self) -> dict[RequestPriority, QueueWaitStats]:
+        """Get the queue wait metrics per priority class."""
+        return self._stats
+
+    def queued(self, priority: RequestPriority) -> int:
+        """Get the number of waiting requests of a priority class."""
+        return len(self._queues[priority])
+
+    def __len__(self) -> int:
+        """Return the number of waiting requests."""
+        return self._len
+
+    def push(self, future: asyncio.Future, priority: RequestPriority) -> _Waiter:
+        """Add a waiting request.
+
+        :param future: Future which is resolved when the request gets its permit
+        :param priority: Priority class of the request
+        :return: Handle to remove the request again with `remove`
+        """
+        waiter = _Waiter(future, priority, time.monotonic(), next(self._sequence))
+        self._queues[priority].append(waiter)
+        self._len += 1
+        return waiter
+
+    def remove(self, waiter: _Waiter) -> None:
+        """Remove a request which is no longer waiting, e.g. because it was cancelled."""
+        try:
+            self._queues[waiter.priority].remove(waiter)
+        except ValueError:
+            return
+        self._len -= 1
+
+    def pop(self) -> asyncio.Future | None:
+        """Remove the next request to be served and return its future."""
+        now = time.monotonic()
+        best: _Waiter | None = None
+        best_key: tuple[float, int] | None = None
+        for queue in self._queues.values():
+            if not queue:
+                continue
+            # The head has waited longest within its class, so it is the only candidate
+            head = queue[0]
+            key = (
+                head.priority - (now - head.enqueued_at) / self._aging_interval,
+                head.sequence,
+            )
+            if best_key is None or key < best_key:
+                best, best_key = head, key
+        if best is None:
+            return None
+
+        self._queues[best.priority].popleft()
+        self._len -= 1
+        self.record_wait(best.priority, now - best.enqueued_at)
+        return best.future
+
+    def record_wait(self, priority: RequestPriority, wait: float) -> None:
+        """Add a request which waited `wait` seconds for its permit to the metrics."""
+        stats = self._stats[priority]
+        stats.num_requests += 1
+        if wait > 0:
+            stats.num_waited += 1
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
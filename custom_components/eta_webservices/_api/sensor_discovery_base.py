@@ -1,11 +1,30 @@
 """Abstract base class for sensor discovery implementations."""
 
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from collections.abc import Callable, Collection
+import logging
 
 from ..const import CUSTOM_UNITS  # noqa: TID252
 from .api_client import APIClient
-from .types import FLOAT_SENSOR_UNITS, ETAEndpoint
+from .types import FLOAT_SENSOR_UNITS, ETADiscoveryChanges, ETAEndpoint
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def fub_name(key: str) -> str:
+    """Get the name of the function block (top level menu entry) of a menu key."""
+    return key.split("_")[1]
+
+
+def count_fub_nodes(all_endpoints: dict[str, list[str]]) -> dict[str, int]:
+    """Count the unique URIs below each function block, in menu order.
+
+    :param all_endpoints: Menu of the terminal, maps sensor keys to lists of URIs
+    """
+    uris_per_fub: dict[str, set[str]] = {}
+    for key, uris in all_endpoints.items():
+        uris_per_fub.setdefault(fub_name(key), set()).update(uris)
+    return {fub: len(uris) for fub, uris in uris_per_fub.items()}
 
 
 class SensorDiscoveryBase(ABC):
@@ -15,14 +34,26 @@ class SensorDiscoveryBase(ABC):
         self,
         http_client: APIClient,
         progress_callback: Callable[[str, float | None], None] | None = None,
+        skip_fubs: Collection[str] = (),
     ) -> None:
         """Initialize sensor discovery.
 
         :param http_client: HTTPClient instance for API calls
         :param progress_callback: Optional callback for progress updates
+        :param skip_fubs: Names of function blocks whose endpoints are not discovered
         """
         self._http = http_client
         self._progress_callback = progress_callback
+        self._skip_fubs = frozenset(skip_fubs)
+        # Set by discovery implementations which only rediscover changed menu nodes
+        self.changes: ETADiscoveryChanges | None = None
+        # Fingerprint of the menu the discovery was based on
+        self.menu_fingerprint: str | None = None
+        # Menu entries which have been discovered, the next incremental discovery
+        # only discovers entries which differ from them
+        self.discovered_menu: dict[str, list[str]] | None = None
+        # URIs which have not been discovered before the deadline expired
+        self.unfinished_uris: list[str] = []
 
     def _emit_progress(self, message: str, progress: float | None = None) -> None:
         """Emit discovery progress update if a callback is registered."""
@@ -32,6 +63,19 @@ class SensorDiscoveryBase(ABC):
 
     # Concrete methods (shared by all versions)
 
+    def _without_skipped_fubs(
+        self, all_endpoints: dict[str, list[str]]
+    ) -> dict[str, list[str]]:
+        """Remove all menu entries of skipped function blocks."""
+        if not self._skip_fubs:
+            return all_endpoints
+        _LOGGER.debug("Skipping function blocks %s", sorted(self._skip_fubs))
+        return {
+            key: uris
+            for key, uris in all_endpoints.items()
+            if fub_name(key) not in self._skip_fubs
+        }
+
     def _is_float_sensor(self, endpoint_info: ETAEndpoint) -> bool:
         """Check if endpoint is a float sensor."""
         return endpoint_info["unit"] in FLOAT_SENSOR_UNITS
@@ -84,12 +128,25 @@ class SensorDiscoveryBase(ABC):
         text_dict: dict,
         writable_dict: dict,
         pending_dict: dict,
+        *,
+        incremental: bool = False,
+        deadline: float | None = None,
+        menu: dict[str, list[str]] | None = None,
+        previous_menu: dict[str, list[str]] | None = None,
     ):
         """Discover and enumerate all sensors.
 
+        Implementations which don't support an option accept and ignore it.
+
         :param float_dict: Dictionary to fill with float sensors
         :param switches_dict: Dictionary to fill with switch sensors
         :param text_dict: Dictionary to fill with text sensors
         :param writable_dict: Dictionary to fill with writable sensors
         :param pending_dict: Dictionary to fill with pending sensors (v1.2 only)
+        :param incremental: Set to true if the dicts contain the result of a previous
+            discovery and only changed menu entries should be discovered
+        :param deadline: Optional time.monotonic() timestamp after which the discovery
+            stops with partial results
+        :param menu: Menu of the terminal if it has just been read, it is requested otherwise
+        :param previous_menu: `discovered_menu` of the previous discovery
         """
@@ -10,6 +10,7 @@ from .types import (
     ETAEndpoint,
     ETAValidSwitchValues,
 )
+from .varinfo_cache import menu_fingerprint
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -118,13 +119,33 @@ class SensorDiscoveryV11(SensorDiscoveryBase):
     # runlength w/ optimizations (sem=10): 7s
 
     async def get_all_sensors(
-        self, float_dict, switches_dict, text_dict, writable_dict, pending_dict
+        self,
+        float_dict,
+        switches_dict,
+        text_dict,
+        writable_dict,
+        pending_dict,
+        *,
+        incremental: bool = False,
+        deadline: float | None = None,
+        menu: dict[str, list[str]] | None = None,
+        previous_menu: dict[str, list[str]] | None = None,
     ):
-        """Enumerate all sensors using v1.1 methods."""
+        """Enumerate all sensors using v1.1 methods.
+
+        The v1.1 discovery always discovers all sensors until it is done, so
+        `incremental`, `deadline` and `previous_menu` are ignored.
+
+        :param menu: Menu of the terminal if it has just been read, it is requested otherwise
+        """
         self._emit_progress("Loading endpoint list", 0.05)
         self._http.num_duplicates = 0
-        all_endpoints = await self._http.get_sensors_dict()
+        all_endpoints = (
+            menu if menu is not None else await self._http.get_sensors_dict()
+        )
+        self.menu_fingerprint = menu_fingerprint(all_endpoints)
         _LOGGER.debug("Got list of all endpoints: %s", all_endpoints)
+        all_endpoints = self._without_skipped_fubs(all_endpoints)
 
         # Flatten and deduplicate URIs
         deduplicated_uris = {}
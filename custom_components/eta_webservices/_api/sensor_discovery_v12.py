@@ -1,7 +1,10 @@
 """API v1.2 specific sensor discovery implementation."""
 
 import asyncio
+from collections.abc import Awaitable, Callable, Collection, Iterable, Iterator
+import itertools
 import logging
+import time
 
 import xmltodict
 
@@ -12,8 +15,18 @@ from ..const import (  # noqa: TID252
     CUSTOM_UNIT_UNITLESS,
     CUSTOM_UNITS,
 )
-from .sensor_discovery_base import SensorDiscoveryBase
-from .types import WRITABLE_SENSOR_UNITS, ETAEndpoint, ETAValidWritableValues
+from .api_client import APIClient
+from .checkpoint import DiscoveryCheckpoint
+from .metrics import EndpointClass
+from .sensor_discovery_base import SensorDiscoveryBase, fub_name
+from .types import (
+    WRITABLE_SENSOR_UNITS,
+    ETADiscoveryChanges,
+    ETAEndpoint,
+    ETATerminalUnavailableError,
+    ETAValidWritableValues,
+)
+from .varinfo_cache import VarinfoCache, menu_fingerprint
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,6 +34,31 @@ _LOGGER = logging.getLogger(__name__)
 class SensorDiscoveryV12(SensorDiscoveryBase):
     """ETA API v1.2 specific sensor discovery implementation."""
 
+    def __init__(
+        self,
+        http_client: APIClient,
+        progress_callback: Callable[[str, float | None], None] | None = None,
+        varinfo_cache: VarinfoCache | None = None,
+        checkpoint: DiscoveryCheckpoint | None = None,
+        *,
+        skip_fubs: Collection[str] = (),
+        fub_callback: Callable[[str, int], None] | None = None,
+    ) -> None:
+        """Initialize sensor discovery.
+
+        :param http_client: HTTPClient instance for API calls
+        :param progress_callback: Optional callback for progress updates
+        :param varinfo_cache: Optional cache which is consulted before varinfo is requested
+        :param checkpoint: Optional checkpoint to resume an interrupted discovery from
+        :param skip_fubs: Names of function blocks whose endpoints are not discovered
+        :param fub_callback: Optional callback which is called with the name of a function
+            block and the number of its entities as soon as all of them have been added
+        """
+        super().__init__(http_client, progress_callback, skip_fubs)
+        self._varinfo_cache = varinfo_cache
+        self._checkpoint = checkpoint
+        self._fub_callback = fub_callback
+
     def _is_switch(
         self, endpoint_info: ETAEndpoint, raw_value: str | None = None
     ) -> bool:
@@ -192,127 +230,291 @@ class SensorDiscoveryV12(SensorDiscoveryBase):
 
     async def _get_varinfo(self, fub, uri):
         """Fetch varinfo from API."""
-        data = await self._http.get_request("/user/varinfo/" + str(uri))
-        text = await data.text()
-        data = xmltodict.parse(text)["eta"]["varInfo"]["variable"]
-        return self._parse_varinfo(data, fub, uri)
+        body = await self._http.get_body("/user/varinfo/" + str(uri))
+        with self._http.metrics.time_parse(EndpointClass.VARINFO):
+            data = xmltodict.parse(body)["eta"]["varInfo"]["variable"]
+            return self._parse_varinfo(data, fub, uri)
 
-    async def _sanitize_duplicate_nodes(
+    def _evaluate_duplicate_group(
         self,
-        all_endpoints: dict[str, list[str]],
-        endpoint_infos: dict[str, ETAEndpoint],
-    ) -> int:
-        """Sanitize duplicate nodes by removing URIs that return invalid data.
-
-        For nodes with multiple URIs, this function tests each URI by fetching
-        its data. If exactly one URI returns valid data and all others return
-        'xxx' or raise exceptions, the invalid URIs are removed from endpoint_infos.
-
-        Args:
-            all_endpoints: Maps sensor keys to lists of URIs
-            endpoint_infos: Maps URIs to their endpoint metadata (modified in-place)
-
-        Returns:
-            Number of URIs removed
+        key: str,
+        uri_to_result: dict[str, tuple[float | str, str] | BaseException],
+    ) -> list[str]:
+        """Decide which URIs of a duplicate node return invalid data.
+
+        If exactly one URI returns valid data and all others return 'xxx' or
+        raised exceptions, the invalid URIs are dropped. Otherwise all URIs are
+        kept, because it can't be determined which one is correct.
+
+        :param key: Sensor key of the node
+        :param uri_to_result: Maps the URIs of the node to the result of reading them as string
+        :return: URIs which should be dropped
         """
-        # Phase 1: Identify nodes to process
-        nodes_to_check: list[tuple[str, list[str]]] = []
-        for key, uris in all_endpoints.items():
-            # Skip single-URI nodes
-            if len(uris) <= 1:
-                continue
+        valid_uris = []
+        invalid_uris = []
+        for uri, result in uri_to_result.items():
+            if isinstance(result, BaseException):
+                _LOGGER.debug(
+                    "URI %s raised exception during data fetch: %s",
+                    uri,
+                    str(result),
+                )
+                invalid_uris.append(uri)
+            else:
+                # Result is a tuple (value, unit)
+                value, _ = result
+                if value == "xxx":
+                    invalid_uris.append(uri)
+                else:
+                    valid_uris.append(uri)
+
+        if len(valid_uris) == 1 and len(invalid_uris) > 0:
+            _LOGGER.debug(
+                "Node %s: keeping URI %s, removing %d invalid URIs: %s",
+                key,
+                valid_uris[0],
+                len(invalid_uris),
+                invalid_uris,
+            )
+            return invalid_uris
+        if len(valid_uris) == 0:
+            _LOGGER.debug(
+                "Node %s: all %d URIs invalid, keeping all", key, len(invalid_uris)
+            )
+        elif len(valid_uris) > 1:
+            _LOGGER.debug(
+                "Node %s: multiple valid URIs (%d), keeping all",
+                key,
+                len(valid_uris),
+            )
+        return []
 
-            # Find URIs that exist in endpoint_infos
-            uris_in_infos = [uri for uri in uris if uri in endpoint_infos]
+    async def _resolve_duplicate_group(
+        self,
+        key: str,
+        uris: list[str],
+        varinfo_tasks: dict[str, asyncio.Task],
+        read_value: Callable[[str], Awaitable[dict]],
+    ) -> set[str]:
+        """Find the URIs of a duplicate node which return invalid data.
+
+        Only waits for the varinfo requests of the node itself, so the URIs of all
+        other nodes are processed in the meantime.
+
+        :param key: Sensor key of the node
+        :param uris: URIs listed under the key
+        :param varinfo_tasks: Maps URIs to the tasks reading their varinfo
+        :param read_value: Reads the value of a URI, shared with the classification
+        :return: URIs which should be dropped
+        """
+        varinfo_results = await asyncio.gather(*(varinfo_tasks[uri] for uri in uris))
+        uris_in_infos = [
+            uri
+            for uri, (_, result) in zip(uris, varinfo_results, strict=True)
+            if not isinstance(result, Exception)
+        ]
+        # Nothing to decide if fewer than 2 URIs have metadata
+        if len(uris_in_infos) < 2:
+            return set()
 
-            # Skip if fewer than 2 URIs are in endpoint_infos
-            if len(uris_in_infos) < 2:
+        value_reads = await asyncio.gather(
+            *(read_value(uri) for uri in uris_in_infos), return_exceptions=True
+        )
+        uri_to_result: dict[str, tuple[float | str, str] | BaseException] = {}
+        for uri, value_read in zip(uris_in_infos, value_reads, strict=False):
+            if isinstance(value_read, BaseException):
+                uri_to_result[uri] = value_read
                 continue
+            try:
+                uri_to_result[uri] = self._http.parse_data(
+                    value_read, force_string_handling=True
+                )
+            except Exception as err:  # noqa: BLE001
+                uri_to_result[uri] = err
+        return set(self._evaluate_duplicate_group(key, uri_to_result))
 
-            nodes_to_check.append((key, uris_in_infos))
+    def _needs_data(self, endpoint_info: ETAEndpoint) -> bool:
+        """Check if the value of an endpoint has to be read to classify it."""
+        return (
+            self._is_float_sensor(endpoint_info)
+            or self._is_switch(endpoint_info)
+            or self._is_text_sensor(endpoint_info)
+            or (
+                # the ETA API is not very consistent and some sensors show different units in their `varinfo` and `var` endpoints
+                # all of those sensors have an empty unit in `varinfo` and have `DEFAULT` as their type
+                # i.e. the Volllaststunden sensor shows up with an empty unit in `varinfo`, but with seconds in `var`
+                endpoint_info["unit"] == ""
+                and endpoint_info["endpoint_type"] == "DEFAULT"
+            )
+        )
 
-        # Early return if no nodes to check
-        if not nodes_to_check:
-            return 0
+    def _classify_endpoint(
+        self,
+        uri: str,
+        unique_key: str,
+        endpoint_info: ETAEndpoint,
+        data_result: tuple[float | str, str] | None,
+    ) -> tuple[str | None, bool]:
+        """Determine the entity types of an endpoint.
+
+        :param uri: URI of the endpoint
+        :param unique_key: Unique id of the endpoint, only used for logging
+        :param endpoint_info: Metadata of the endpoint, corrected in place with the read value
+        :param data_result: Value and unit read from the endpoint, None if it wasn't read
+        :return: Category of the endpoint (float, switch, text or pending, None if it
+            is unknown) and True if it is also writable
+        """
+        value = None
+        if data_result is not None:
+            value, unit = data_result
+            endpoint_info["value"] = value
+            if (
+                unit != endpoint_info["unit"]
+                and endpoint_info["unit"] not in CUSTOM_UNITS
+                # update the unit of the sensor if they are different, but only if we didn't assign a custom unit to the sensor
+            ):
+                _LOGGER.debug(
+                    "Correcting unit for sensor %s from '%s' to '%s'",
+                    unique_key,
+                    endpoint_info["unit"],
+                    unit,
+                )
+                endpoint_info["unit"] = unit
+            if (
+                endpoint_info["endpoint_type"] == "DEFAULT"
+                and endpoint_info["unit"] == ""
+                and str(value).isnumeric()
+            ):
+                # some sensors have an empty unit and a type of DEFAULT in the varinfo endpoint, but show a numeric value in the var endpoint
+                # those sensors are most likely unitless float sensors, so we set the unit to unitless and let the normal float sensor detection handle the rest
+                _LOGGER.debug(
+                    "Updating unit for sensor %s to UNITLESS based on its value and type",
+                    unique_key,
+                )
+                endpoint_info["unit"] = CUSTOM_UNIT_UNITLESS
+                endpoint_info["value"] = float(value)
+
+        # this is checked separately because all writable sensors are registered as both a sensor entity and a number entity
+        writable = self._is_writable(endpoint_info)
+
+        if self._is_float_sensor(endpoint_info):
+            return "float", writable
+        if self._is_switch(endpoint_info):
+            return "switch", writable
+        if self._is_text_sensor(endpoint_info):
+            return "text", writable
+        if (
+            endpoint_info["unit"] == ""
+            and (
+                endpoint_info["endpoint_type"] == "DEFAULT"
+                or endpoint_info["endpoint_type"] == "IEEE-754"
+            )
+            # ignore sensors with an empty value or a value of "xxx". Both of these are indicators of invalid sensors.
+            and value not in {"", "xxx"}
+        ):
+            return "pending", writable
+        return None, writable
 
-        _LOGGER.debug(
-            "Sanitizing duplicate nodes: found %d nodes with 2+ URIs in endpoint_infos",
-            len(nodes_to_check),
+    def _unique_key(self, key: str) -> str:
+        """Get the unique id of the entities of a menu entry."""
+        return (
+            "eta_"
+            + self._http.host.replace(".", "_")
+            + "_"
+            + key.lower().replace(" ", "_")
         )
 
-        # Phase 2: Gather data from all duplicate URIs
-        all_uris_to_test = [uri for _, uris in nodes_to_check for uri in uris]
+    def _reuse_known_endpoints(
+        self,
+        all_endpoints: dict[str, list[str]],
+        previous_menu: dict[str, list[str]],
+        catalogs: list[dict],
+    ) -> tuple[dict[str, list[str]], list[dict]]:
+        """Keep the endpoints of a previous discovery whose menu entries are unchanged.
+
+        A menu entry is unchanged if the previous discovery was based on the same
+        entry with the same URIs, no matter whether it resulted in any entities. The
+        entities of all other menu entries are removed from the catalogs, and
+        `self.changes` records which URIs are reused, have to be discovered and have
+        disappeared from the menu.
+
+        :param all_endpoints: Current menu, maps sensor keys to lists of URIs
+        :param previous_menu: Menu entries the previous discovery was based on
+        :param catalogs: Dicts of the previous discovery (modified in place)
+        :return: Menu entries which have to be discovered again, and the removed
+            entities of each catalog, see `_restore_replaced_endpoints`
+        """
+        unchanged_keys: set[str] = set()
+        to_discover: dict[str, list[str]] = {}
+        for key, uris in all_endpoints.items():
+            if key in previous_menu and set(previous_menu[key]) == set(uris):
+                unchanged_keys.add(self._unique_key(key))
+            else:
+                to_discover[key] = uris
+
+        reused_uris: set[str] = set()
+        replaced: list[dict] = []
+        for catalog in catalogs:
+            replaced_entries = {}
+            for unique_key in list(catalog):
+                if unique_key.removesuffix("_writable") in unchanged_keys:
+                    reused_uris.add(catalog[unique_key]["url"])
+                else:
+                    replaced_entries[unique_key] = catalog.pop(unique_key)
+            replaced.append(replaced_entries)
+
+        menu_uris = {uri for uris in all_endpoints.values() for uri in uris}
+        previous_uris = {uri for uris in previous_menu.values() for uri in uris}
+        self.changes = ETADiscoveryChanges(
+            reused=sorted(reused_uris),
+            discovered=sorted(
+                {uri for uris in to_discover.values() for uri in uris} - reused_uris
+            ),
+            removed=sorted(previous_uris - menu_uris),
+        )
         _LOGGER.debug(
-            "Gathering data from %d URIs for validation", len(all_uris_to_test)
+            "Reusing %d known endpoints, discovering %d URIs, %d URIs were removed from the menu: %s",
+            len(self.changes["reused"]),
+            len(self.changes["discovered"]),
+            len(self.changes["removed"]),
+            self.changes["removed"],
         )
+        return to_discover, replaced
 
-        data_tasks = [
-            self._http.get_data(uri, force_string_handling=True)
-            for uri in all_uris_to_test
-        ]
-        data_results_list = await asyncio.gather(*data_tasks, return_exceptions=True)
-
-        # Map results back to URIs
-        uri_to_result = dict(zip(all_uris_to_test, data_results_list, strict=False))
-
-        # Phase 3: Evaluate each node and remove invalid URIs
-        uris_to_remove = []
-        for key, uris in nodes_to_check:
-            valid_uris = []
-            invalid_uris = []
-
-            for uri in uris:
-                result = uri_to_result[uri]
-
-                # Check if result is an exception
-                if isinstance(result, BaseException):
-                    _LOGGER.debug(
-                        "URI %s raised exception during data fetch: %s",
-                        uri,
-                        str(result),
-                    )
-                    invalid_uris.append(uri)
-                elif not isinstance(result, Exception):
-                    # Result is a tuple (value, unit)
-                    value, _ = result
-                    if value == "xxx":
-                        invalid_uris.append(uri)
-                    else:
-                        valid_uris.append(uri)
-
-            # Apply removal logic
-            if len(valid_uris) == 1 and len(invalid_uris) > 0:
-                # If exactly one valid URI and at least one invalid URI, remove the invalid ones
-                uris_to_remove.extend(invalid_uris)
-                _LOGGER.debug(
-                    "Node %s: keeping URI %s, removing %d invalid URIs: %s",
-                    key,
-                    valid_uris[0],
-                    len(invalid_uris),
-                    invalid_uris,
-                )
-            elif len(valid_uris) == 0:
-                # If no valid URIs, keep them all (can't determine which one is correct)
-                _LOGGER.debug(
-                    "Node %s: all %d URIs invalid, keeping all", key, len(invalid_uris)
-                )
-            elif len(valid_uris) > 1:
-                # If multiple valid URIs, keep them all (data inconsistency can't be resolved)
-                _LOGGER.debug(
-                    "Node %s: multiple valid URIs (%d), keeping all",
-                    key,
-                    len(valid_uris),
-                )
+    def _restore_replaced_endpoints(
+        self,
+        all_endpoints: dict[str, list[str]],
+        replaced: list[dict],
+        catalogs: list[dict],
+    ) -> int:
+        """Keep the previous entities of menu entries which weren't discovered again.
 
-        # Remove invalid URIs from endpoint_infos.
-        # A URI can appear in multiple duplicate-node groups, so deduplicate before deletion.
-        removed_count = 0
-        for uri in set(uris_to_remove):
-            if uri in endpoint_infos:
-                del endpoint_infos[uri]
-                removed_count += 1
+        The rediscovery of a changed menu entry may fail or be stopped by the deadline.
+        Its previous entities are kept then, as long as the entry still lists their URIs.
 
-        return removed_count
+        :param all_endpoints: Current menu, maps sensor keys to lists of URIs
+        :param replaced: Removed entities of each catalog, see `_reuse_known_endpoints`
+        :param catalogs: Dicts of the discovery (modified in place)
+        :return: Number of entities which have been kept
+        """
+        menu_uris: dict[str, set[str]] = {}
+        for key, uris in all_endpoints.items():
+            menu_uris.setdefault(self._unique_key(key), set()).update(uris)
+        discovered_keys = {
+            unique_key.removesuffix("_writable")
+            for catalog in catalogs
+            for unique_key in catalog
+        }
+        num_restored = 0
+        for catalog, replaced_entries in zip(catalogs, replaced, strict=True):
+            for unique_key, endpoint_info in replaced_entries.items():
+                base_key = unique_key.removesuffix("_writable")
+                if base_key in discovered_keys:
+                    continue
+                if endpoint_info["url"] in menu_uris.get(base_key, ()):
+                    catalog[unique_key] = endpoint_info
+                    num_restored += 1
+        return num_restored
 
     # runlength w/o optimizations: 326s
     # runlength w/ optimizations (sem=1): 330s
@@ -322,14 +524,132 @@ class SensorDiscoveryV12(SensorDiscoveryBase):
     # runlength w/ optimizations (sem=5): 184s
     # runlength w/ optimizations (sem=10): 177s
 
+    def _add_endpoints(
+        self,
+        uris: Iterable[str],
+        deduplicated_uris: dict[str, str],
+        classified: dict[str, tuple[ETAEndpoint, str | None, bool]],
+        catalogs: list[dict],
+    ) -> int:
+        """Add classified endpoints to the dicts of their categories.
+
+        The endpoints have to be passed in menu order, so that the first of several
+        endpoints with the same unique id wins no matter which response arrived first.
+
+        :param uris: URIs of the endpoints to add
+        :param deduplicated_uris: Maps all discovered URIs to their menu keys
+        :param classified: Maps URIs to their metadata, category and writability
+        :param catalogs: Float, switch, text, writable and pending dicts
+        :return: Number of entities which have been added
+        """
+        float_dict, switches_dict, text_dict, writable_dict, pending_dict = catalogs
+        category_dicts = {
+            "float": (float_dict, "float sensor"),
+            "switch": (switches_dict, "switch"),
+            "text": (text_dict, "text sensor"),
+        }
+        num_added = 0
+        for uri in uris:
+            if uri not in classified:
+                continue
+            endpoint_info, category, writable = classified[uri]
+            unique_key = self._unique_key(deduplicated_uris[uri])
+
+            if writable:
+                _LOGGER.debug("Adding %s as writable sensor", uri)
+                # add a suffix to the unique id to make sure it is still unique in case the sensor is selected in the writable list and in the sensor list
+                writable_key = unique_key + "_writable"
+                if writable_key in writable_dict:
+                    _LOGGER.debug(
+                        "Skipping duplicate writable sensor %s (URI: %s, existing URI: %s)",
+                        writable_key,
+                        uri,
+                        writable_dict[writable_key]["url"],
+                    )
+                else:
+                    writable_dict[writable_key] = endpoint_info
+                    num_added += 1
+
+            if category in category_dicts:
+                target_dict, description = category_dicts[category]
+                _LOGGER.debug("Adding %s as %s", uri, description)
+                if unique_key in target_dict:
+                    _LOGGER.debug(
+                        "Skipping duplicate %s %s (URI: %s, existing URI: %s)",
+                        description,
+                        unique_key,
+                        uri,
+                        target_dict[unique_key]["url"],
+                    )
+                    continue
+                if category == "switch":
+                    self._parse_switch_values(endpoint_info)
+                target_dict[unique_key] = endpoint_info
+                num_added += 1
+            elif category == "pending":
+                _LOGGER.debug("Found pending endpoint %s, adding to pending_dict", uri)
+                pending_dict[unique_key] = endpoint_info
+                num_added += 1
+            else:
+                _LOGGER.debug("Not adding endpoint %s: Unknown type", uri)
+        return num_added
+
     async def get_all_sensors(  # noqa: C901
-        self, float_dict, switches_dict, text_dict, writable_dict, pending_dict
+        self,
+        float_dict,
+        switches_dict,
+        text_dict,
+        writable_dict,
+        pending_dict,
+        *,
+        incremental: bool = False,
+        deadline: float | None = None,
+        menu: dict[str, list[str]] | None = None,
+        previous_menu: dict[str, list[str]] | None = None,
     ):
-        """Enumerate all sensors using v1.2 methods."""
-        self._emit_progress("Loading endpoint list", 0.05)
+        """Enumerate all sensors using v1.2 methods.
+
+        :param incremental: Set to true if the dicts contain the result of a previous
+            discovery. Only menu entries which are new or have different URIs than in
+            `previous_menu` are discovered then, the metadata of all other entries is
+            reused.
+        :param deadline: Optional time.monotonic() timestamp at which all outstanding
+            requests are cancelled. The endpoints which have been classified until then
+            are added to the dicts, all others are listed in `unfinished_uris`.
+        :raises ETATerminalUnavailableError: If the terminal became unreachable during
+            the discovery, instead of treating its endpoints as invalid
+        :param menu: Menu of the terminal if it has just been read, it is requested otherwise
+        :param previous_menu: `discovered_menu` of the previous discovery, all menu
+            entries are discovered again if it is not known
+        """
         self._http.num_duplicates = 0  # Reset counter for this enumeration
-        all_endpoints = await self._http.get_sensors_dict()
+        checkpoint = self._checkpoint
+        if checkpoint is not None and (all_endpoints := checkpoint.menu) is not None:
+            _LOGGER.info(
+                "Resuming discovery started at %s from checkpoint",
+                checkpoint.started_at,
+            )
+            self._emit_progress("Resuming interrupted discovery", 0.05)
+        else:
+            self._emit_progress("Loading endpoint list", 0.05)
+            all_endpoints = (
+                menu if menu is not None else await self._http.get_sensors_dict()
+            )
+            if checkpoint is not None:
+                checkpoint.start(all_endpoints)
+        self.menu_fingerprint = menu_fingerprint(all_endpoints)
         _LOGGER.debug("Got list of all endpoints: %s", all_endpoints)
+        if self._varinfo_cache is not None:
+            self._varinfo_cache.validate(all_endpoints)
+        all_endpoints = self._without_skipped_fubs(all_endpoints)
+        menu_entries = all_endpoints
+        catalogs = [float_dict, switches_dict, text_dict, writable_dict, pending_dict]
+
+        replaced: list[dict] = []
+        if incremental:
+            all_endpoints, replaced = self._reuse_known_endpoints(
+                all_endpoints, previous_menu or {}, catalogs
+            )
 
         # Flatten the multi-URI structure and track duplicates
         # INFO: The key and value fields are flipped to check if a uri is already in the dict
@@ -354,238 +674,254 @@ class SensorDiscoveryV12(SensorDiscoveryBase):
         _LOGGER.debug(
             "Found %d duplicate keys with multiple URIs", self._http.num_duplicates
         )
-        self._emit_progress(f"Loaded {len(deduplicated_uris)} unique endpoints", 0.1)
+        if self.changes is not None:
+            self._emit_progress(
+                f"Reusing {len(self.changes['reused'])} known endpoints, "
+                f"loading {len(deduplicated_uris)} changed endpoints",
+                0.1,
+            )
+        else:
+            self._emit_progress(
+                f"Loaded {len(deduplicated_uris)} unique endpoints", 0.1
+            )
 
         async def fetch_varinfo_limited(uri, key):
+            if checkpoint is not None:
+                resumed = checkpoint.get_varinfo(uri)
+                if resumed is not None:
+                    return uri, resumed
+            if self._varinfo_cache is not None:
+                cached = self._varinfo_cache.get(uri, key)
+                if cached is not None:
+                    return uri, cached
             try:
-                return uri, await self._get_varinfo(key.split("_")[1], uri)
+                endpoint_info = await self._get_varinfo(key.split("_")[1], uri)
             except Exception as err:  # noqa: BLE001
+                if self._varinfo_cache is not None:
+                    self._varinfo_cache.invalidate(uri)
                 return uri, err
-
-        # Fetch all varinfo with concurrency limit
-        varinfo_tasks = [
-            asyncio.create_task(fetch_varinfo_limited(uri, key))
-            for uri, key in deduplicated_uris.items()
-        ]
-
-        # This takes WAY longer than the calls to get_data() below
-        # Runtime for this section: 170s
-        # Runtime for the get_data() section below: 7s
-        endpoint_infos: dict[str, ETAEndpoint] = {}
-        total_varinfo_tasks = len(varinfo_tasks)
-        varinfo_progress_step = (
-            max(1, total_varinfo_tasks // 20) if total_varinfo_tasks else 1
-        )
-
-        for completed_varinfo_tasks, task in enumerate(
-            asyncio.as_completed(varinfo_tasks), start=1
-        ):
-            uri, result = await task
-            if isinstance(result, Exception):
-                _LOGGER.debug("Failed to get varinfo for %s: %s", uri, str(result))
-            else:
-                endpoint_infos[uri] = result
-            if (
-                completed_varinfo_tasks == total_varinfo_tasks
-                or completed_varinfo_tasks % varinfo_progress_step == 0
-            ):
-                progress = 0.1 + (
-                    0.55 * completed_varinfo_tasks / max(total_varinfo_tasks, 1)
-                )
-                self._emit_progress(
-                    f"Reading endpoint metadata {completed_varinfo_tasks}/{total_varinfo_tasks}",
-                    progress,
-                )
-
-        # Sanitize duplicate nodes by testing which URIs return valid data
-        self._emit_progress("Resolving duplicate endpoints", 0.7)
-        removed_count = await self._sanitize_duplicate_nodes(
-            all_endpoints, endpoint_infos
-        )
-        if removed_count > 0:
-            _LOGGER.info("Removed %d invalid URIs from duplicate nodes", removed_count)
-
-        # Determine which endpoints need secondary data fetch
-        needs_data = []
-        for uri, endpoint_info in endpoint_infos.items():
-            if (
-                self._is_float_sensor(endpoint_info)
-                or self._is_switch(endpoint_info)
-                or self._is_text_sensor(endpoint_info)
-                or (
-                    # the ETA API is not very consistent and some sensors show different units in their `varinfo` and `var` endpoints
-                    # all of those sensors have an empty unit in `varinfo` and have `DEFAULT` as their type
-                    # i.e. the Volllaststunden sensor shows up with an empty unit in `varinfo`, but with seconds in `var`
-                    endpoint_info["unit"] == ""
-                    and endpoint_info["endpoint_type"] == "DEFAULT"
-                )
-            ):
-                needs_data.append(uri)
-
-        async def fetch_data_limited(uri, force_string_handling):
-            try:
-                return uri, await self._http.get_data(
-                    uri, force_string_handling=force_string_handling
+            if self._varinfo_cache is not None:
+                self._varinfo_cache.put(uri, key, endpoint_info)
+            if checkpoint is not None:
+                checkpoint.add_varinfo(uri, endpoint_info)
+            return uri, endpoint_info
+
+        # Every endpoint is processed on its own as soon as its varinfo arrives, so
+        # requests for values are sent while other metadata is still being read and
+        # no request slot idles at the end of a phase. Only the endpoints of a
+        # duplicate node wait for the metadata of the other endpoints of their node.
+        # Each function block is discovered as a unit of its own. The requests of all
+        # blocks are queued alternately, so every block gets a fair share of the
+        # request slots instead of waiting until all blocks before it are done.
+        fub_uris: dict[str, list[str]] = {}
+        for uri, key in deduplicated_uris.items():
+            fub_uris.setdefault(fub_name(key), []).append(uri)
+        varinfo_tasks = {
+            uri: asyncio.create_task(fetch_varinfo_limited(uri, deduplicated_uris[uri]))
+            for uri in _interleave(fub_uris.values())
+        }
+
+        # Duplicate nodes and the classification read each value only once
+        value_tasks: dict[str, asyncio.Task] = {}
+
+        async def fetch_value(uri: str) -> dict:
+            if checkpoint is not None:
+                resumed = checkpoint.get_value(uri)
+                if resumed is not None:
+                    return resumed
+            value = await self._http.get_value_dict(uri)
+            if checkpoint is not None:
+                checkpoint.add_value(uri, value)
+            return value
+
+        def read_value(uri: str) -> asyncio.Task:
+            if uri not in value_tasks:
+                value_tasks[uri] = asyncio.create_task(fetch_value(uri))
+            return value_tasks[uri]
+
+        duplicate_groups: dict[str, list[asyncio.Task]] = {}
+        for key, uris in all_endpoints.items():
+            if len(uris) <= 1:
+                continue
+            group_task = asyncio.create_task(
+                self._resolve_duplicate_group(key, uris, varinfo_tasks, read_value)
+            )
+            for uri in uris:
+                duplicate_groups.setdefault(uri, []).append(group_task)
+
+        async def discover_endpoint(uri, key):
+            _, endpoint_info = await varinfo_tasks[uri]
+            if isinstance(endpoint_info, ETATerminalUnavailableError):
+                # Not a broken endpoint, the whole discovery failed
+                raise endpoint_info
+            if isinstance(endpoint_info, Exception):
+                _LOGGER.debug(
+                    "Failed to get varinfo for %s: %s", uri, str(endpoint_info)
                 )
-            except Exception as err:  # noqa: BLE001
-                return uri, err
-
-        # Fetch all needed data concurrently
-        data_results: dict[str, tuple[float | str, str]] = {}
-        if needs_data:
-            data_tasks = [
-                asyncio.create_task(
-                    fetch_data_limited(
-                        uri,
+                return uri, None
+            for group_task in duplicate_groups.get(uri, ()):
+                if uri in await group_task:
+                    return uri, None
+
+            data_result = None
+            if self._needs_data(endpoint_info):
+                try:
+                    data_result = self._http.parse_data(
+                        await read_value(uri),
                         # all custom units should be treated as text sensors
-                        force_string_handling=endpoint_infos[uri]["unit"]
-                        in CUSTOM_UNITS,
+                        force_string_handling=endpoint_info["unit"] in CUSTOM_UNITS,
                     )
-                )
-                for uri in needs_data
-            ]
+                except ETATerminalUnavailableError:
+                    raise
+                except Exception as err:  # noqa: BLE001
+                    _LOGGER.debug("Failed to get data for %s: %s", uri, str(err))
 
-            total_data_tasks = len(data_tasks)
-            data_progress_step = (
-                max(1, total_data_tasks // 20) if total_data_tasks else 1
-            )
-            self._emit_progress("Reading endpoint values", 0.75)
+            try:
+                category, writable = self._classify_endpoint(
+                    uri, self._unique_key(key), endpoint_info, data_result
+                )
+            except Exception:  # noqa: BLE001
+                _LOGGER.debug("Invalid endpoint %s", uri, exc_info=True)
+                return uri, None
+            return uri, (endpoint_info, category, writable)
 
-            for completed_data_tasks, task in enumerate(
-                asyncio.as_completed(data_tasks), start=1
+        endpoint_tasks = [
+            asyncio.create_task(discover_endpoint(uri, deduplicated_uris[uri]))
+            for uri in varinfo_tasks
+        ]
+        classified: dict[str, tuple[ETAEndpoint, str | None, bool]] = {}
+        remaining = {fub: len(uris) for fub, uris in fub_uris.items()}
+        completed_fubs = 0
+        finished_uris: set[str] = set()
+        deadline_expired = False
+        total_tasks = len(endpoint_tasks)
+        progress_step = max(1, total_tasks // 20) if total_tasks else 1
+        try:
+            for completed_tasks, task in enumerate(
+                asyncio.as_completed(
+                    endpoint_tasks,
+                    timeout=None
+                    if deadline is None
+                    else max(0.0, deadline - time.monotonic()),
+                ),
+                start=1,
             ):
                 uri, result = await task
-                if isinstance(result, Exception):
-                    _LOGGER.debug("Failed to get data for %s: %s", uri, str(result))
-                else:
-                    data_results[uri] = result
-                if (
-                    completed_data_tasks == total_data_tasks
-                    or completed_data_tasks % data_progress_step == 0
-                ):
-                    progress = 0.75 + (
-                        0.2 * completed_data_tasks / max(total_data_tasks, 1)
+                finished_uris.add(uri)
+                if result is not None:
+                    classified[uri] = result
+                fub = fub_name(deduplicated_uris[uri])
+                remaining[fub] -= 1
+                if not remaining[fub]:
+                    # The results of a function block don't depend on other blocks
+                    completed_fubs += 1
+                    num_entities = self._add_endpoints(
+                        fub_uris[fub], deduplicated_uris, classified, catalogs
+                    )
+                    _LOGGER.debug(
+                        "Discovered %d entities of function block %s",
+                        num_entities,
+                        fub,
                     )
                     self._emit_progress(
-                        f"Reading endpoint values {completed_data_tasks}/{total_data_tasks}",
-                        progress,
+                        f"Finished {fub} ({completed_fubs}/{len(fub_uris)})",
+                        0.1 + 0.85 * completed_tasks / max(total_tasks, 1),
                     )
-
-        self._emit_progress("Classifying discovered entities", 0.95)
-        for uri, key in deduplicated_uris.items():
-            if uri not in endpoint_infos:
-                continue
-
-            endpoint_info = endpoint_infos[uri]
-
-            try:
-                unique_key = (
-                    "eta_"
-                    + self._http.host.replace(".", "_")
-                    + "_"
-                    + key.lower().replace(" ", "_")
-                )
-
-                if uri in data_results:
-                    data_result = data_results[uri]
-
-                    value, unit = data_result
-                    endpoint_info["value"] = value
-                    if (
-                        unit != endpoint_info["unit"]
-                        and endpoint_info["unit"] not in CUSTOM_UNITS
-                        # update the unit of the sensor if they are different, but only if we didn't assign a custom unit to the sensor
-                    ):
-                        _LOGGER.debug(
-                            "Correcting unit for sensor %s from '%s' to '%s'",
-                            unique_key,
-                            endpoint_info["unit"],
-                            unit,
-                        )
-                        endpoint_info["unit"] = unit
-                    if (
-                        endpoint_info["endpoint_type"] == "DEFAULT"
-                        and endpoint_info["unit"] == ""
-                        and str(value).isnumeric()
-                    ):
-                        # some sensors have an empty unit and a type of DEFAULT in the varinfo endpoint, but show a numeric value in the var endpoint
-                        # those sensors are most likely unitless float sensors, so we set the unit to unitless and let the normal float sensor detection handle the rest
-                        _LOGGER.debug(
-                            "Updating unit for sensor %s to UNITLESS based on its value and type",
-                            unique_key,
-                        )
-                        endpoint_info["unit"] = CUSTOM_UNIT_UNITLESS
-                        endpoint_info["value"] = float(value)
-
-                if self._is_writable(endpoint_info):
-                    _LOGGER.debug("Adding %s as writable sensor", uri)
-                    # this is checked separately because all writable sensors are registered as both a sensor entity and a number entity
-                    # add a suffix to the unique id to make sure it is still unique in case the sensor is selected in the writable list and in the sensor list
-                    writable_key = unique_key + "_writable"
-                    if writable_key in writable_dict:
-                        _LOGGER.debug(
-                            "Skipping duplicate writable sensor %s (URI: %s, existing URI: %s)",
-                            writable_key,
-                            uri,
-                            writable_dict[writable_key]["url"],
-                        )
-                    else:
-                        writable_dict[writable_key] = endpoint_info
-
-                if self._is_float_sensor(endpoint_info):
-                    _LOGGER.debug("Adding %s as float sensor", uri)
-                    if unique_key in float_dict:
-                        _LOGGER.debug(
-                            "Skipping duplicate float sensor %s (URI: %s, existing URI: %s)",
-                            unique_key,
-                            uri,
-                            float_dict[unique_key]["url"],
-                        )
-                    else:
-                        float_dict[unique_key] = endpoint_info
-                elif self._is_switch(endpoint_info):
-                    _LOGGER.debug("Adding %s as switch", uri)
-                    if unique_key in switches_dict:
-                        _LOGGER.debug(
-                            "Skipping duplicate switch %s (URI: %s, existing URI: %s)",
-                            unique_key,
-                            uri,
-                            switches_dict[unique_key]["url"],
-                        )
-                    else:
-                        self._parse_switch_values(endpoint_info)
-                        switches_dict[unique_key] = endpoint_info
-                elif self._is_text_sensor(endpoint_info):
-                    _LOGGER.debug("Adding %s as text sensor", uri)
-                    if unique_key in text_dict:
-                        _LOGGER.debug(
-                            "Skipping duplicate text sensor %s (URI: %s, existing URI: %s)",
-                            unique_key,
-                            uri,
-                            text_dict[unique_key]["url"],
-                        )
-                    else:
-                        text_dict[unique_key] = endpoint_info
+                    if self._fub_callback is not None:
+                        self._fub_callback(fub, num_entities)
                 elif (
-                    endpoint_info["unit"] == ""
-                    and (
-                        endpoint_info["endpoint_type"] == "DEFAULT"
-                        or endpoint_info["endpoint_type"] == "IEEE-754"
-                    )
-                    # ignore sensors with an empty value
-                    and data_results.get(uri, (None,))[0] != ""
-                    # and ignore sensors with a value of "xxx". Both of these are indicators of invalid sensors.
-                    and data_results.get(uri, (None,))[0] != "xxx"
+                    completed_tasks == total_tasks
+                    or completed_tasks % progress_step == 0
                 ):
-                    _LOGGER.debug(
-                        "Found pending endpoint %s, adding to pending_dict", uri
+                    self._emit_progress(
+                        f"Reading {fub}: endpoints {completed_tasks}/{total_tasks}",
+                        0.1 + 0.85 * completed_tasks / max(total_tasks, 1),
                     )
-                    pending_dict[unique_key] = endpoint_info
-                else:
-                    _LOGGER.debug("Not adding endpoint %s: Unknown type", uri)
+        except TimeoutError:
+            # Request timeouts of the terminal are raised as before
+            if deadline is None or time.monotonic() < deadline:
+                raise
+            deadline_expired = True
+        finally:
+            pending_tasks = [
+                task
+                for task in (
+                    *endpoint_tasks,
+                    *varinfo_tasks.values(),
+                    *value_tasks.values(),
+                    *{task for tasks in duplicate_groups.values() for task in tasks},
+                )
+                if not task.done()
+            ]
+            for task in pending_tasks:
+                task.cancel()
+            if pending_tasks:
+                await asyncio.gather(*pending_tasks, return_exceptions=True)
+            if checkpoint is not None:
+                # Keep everything received so far if the discovery was interrupted
+                checkpoint.flush()
+
+        removed_uris = set().union(
+            *(
+                task.result()
+                for tasks in duplicate_groups.values()
+                for task in tasks
+                if not task.cancelled()
+            )
+        )
+        if removed_uris:
+            _LOGGER.info(
+                "Removed %d invalid URIs from duplicate nodes", len(removed_uris)
+            )
 
-            except Exception:  # noqa: BLE001
-                _LOGGER.debug("Invalid endpoint %s", uri, exc_info=True)
+        if deadline_expired:
+            # Keep the endpoints of unfinished function blocks which are complete
+            for fub, uris in fub_uris.items():
+                if remaining[fub]:
+                    self._add_endpoints(uris, deduplicated_uris, classified, catalogs)
+            self.unfinished_uris = [
+                uri for uri in deduplicated_uris if uri not in finished_uris
+            ]
+            _LOGGER.warning(
+                "Discovery deadline expired, %d of %d endpoints have not been discovered",
+                len(self.unfinished_uris),
+                len(deduplicated_uris),
+            )
+            self._emit_progress(
+                f"Time limit reached, {len(self.unfinished_uris)} endpoints left", None
+            )
+
+        if replaced and (
+            num_restored := self._restore_replaced_endpoints(
+                menu_entries, replaced, catalogs
+            )
+        ):
+            _LOGGER.info(
+                "Kept %d entities of changed menu entries which could not be discovered again",
+                num_restored,
+            )
+
+        # Entries with unfinished URIs have to be discovered again by the next discovery
+        unfinished_uris = set(self.unfinished_uris)
+        self.discovered_menu = {
+            key: uris
+            for key, uris in menu_entries.items()
+            if unfinished_uris.isdisjoint(uris)
+        }
+
+        if checkpoint is not None:
+            _LOGGER.debug(
+                "Resumed %d responses from checkpoint", checkpoint.num_resumed
+            )
+            if not deadline_expired:
+                checkpoint.finish()
+        if self._varinfo_cache is not None:
+            _LOGGER.debug(
+                "Varinfo cache: %d hits, %d misses, %d cached URIs",
+                self._varinfo_cache.hits,
+                self._varinfo_cache.misses,
+                len(self._varinfo_cache),
+            )
 
         # Log final statistics
         valid_endpoints = (
@@ -602,3 +938,10 @@ class SensorDiscoveryV12(SensorDiscoveryBase):
             f"Done: {valid_endpoints} entities discovered",
             1.0,
         )
+
+
+def _interleave(groups: Iterable[list[str]]) -> Iterator[str]:
+    """Yield the first item of every group, then the second item of every group, etc."""
+    sentinel = object()
+    for items in itertools.zip_longest(*groups, fillvalue=sentinel):
+        yield from (item for item in items if item is not sentinel)
@@ -0,0 +1,144 @@
+"""Dedicated HTTP transport for a single ETA terminal."""
+
+import logging
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from ..const import (  # noqa: TID252
+    CONNECTION_DNS_CACHE_TTL,
+    CONNECTION_KEEPALIVE_TIMEOUT,
+    DEFAULT_HEDGED_REQUESTS,
+    DEFAULT_MAX_PARALLEL_REQUESTS,
+    DEFAULT_MAX_READS_PER_SECOND,
+    DEFAULT_MAX_WRITES_PER_SECOND,
+    DEFAULT_VALUE_CACHE_TTL,
+    REQUEST_CONNECT_TIMEOUT,
+    REQUEST_READ_TIMEOUT,
+    VALUE_CACHE_MAX_SIZE,
+)
+from .circuit_breaker import CircuitBreaker
+from .coalescer import RequestCoalescer
+from .metrics import RequestMetrics
+from .rate_limiter import RequestRateLimiter
+from .retry import HedgePolicy, RetryPolicy
+from .value_cache import ValueCache
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ETATransport:
+    """Owns a keep-alive connection pool to a single ETA terminal.
+
+    One transport is created per config entry and shared by all coordinators,
+    entities, services and diagnostics, so that sockets to the terminal are reused
+    instead of being reopened for every request. It also holds the request state
+    which has to be shared between all API clients of the entry.
+    """
+
+    def __init__(
+        self,
+        max_parallel_requests: int = DEFAULT_MAX_PARALLEL_REQUESTS,
+        *,
+        keepalive_timeout: float = CONNECTION_KEEPALIVE_TIMEOUT,
+        dns_cache_ttl: int = CONNECTION_DNS_CACHE_TTL,
+        value_cache_ttl: float = DEFAULT_VALUE_CACHE_TTL,
+        max_reads_per_second: float = DEFAULT_MAX_READS_PER_SECOND,
+        max_writes_per_second: float = DEFAULT_MAX_WRITES_PER_SECOND,
+        hedged_requests: bool = DEFAULT_HEDGED_REQUESTS,
+        connect_timeout: float = REQUEST_CONNECT_TIMEOUT,
+        read_timeout: float = REQUEST_READ_TIMEOUT,
+    ) -> None:
+        """Initialize the transport.
+
+        Has to be called from within the event loop.
+
+        :param max_parallel_requests: Maximum number of open connections to the terminal
+        :param keepalive_timeout: Seconds an idle connection is kept open for reuse
+        :param dns_cache_ttl: Seconds a resolved hostname is cached
+        :param value_cache_ttl: Seconds a variable response is served from the cache, 0 disables it
+        :param max_reads_per_second: Sustained number of read requests per second, 0 disables the limit
+        :param max_writes_per_second: Sustained number of write requests per second, 0 disables the limit
+        :param hedged_requests: True if a duplicate of unusually slow variable reads may be sent
+        :param connect_timeout: Seconds to wait for a connection to the terminal
+        :param read_timeout: Seconds to wait for the next chunk of a response
+        """
+        self._max_connections = max(1, int(max_parallel_requests))
+        self._connector = TCPConnector(
+            limit=self._max_connections,
+            limit_per_host=self._max_connections,
+            keepalive_timeout=keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=dns_cache_ttl,
+        )
+        # Applies to every single request, not to the whole update of a coordinator
+        self._session = ClientSession(
+            connector=self._connector,
+            timeout=ClientTimeout(
+                total=None, sock_connect=connect_timeout, sock_read=read_timeout
+            ),
+        )
+        self._coalescer = RequestCoalescer()
+        self._value_cache = ValueCache(value_cache_ttl, VALUE_CACHE_MAX_SIZE)
+        self._circuit_breaker = CircuitBreaker()
+        self._rate_limiter = RequestRateLimiter(
+            max_reads_per_second, max_writes_per_second
+        )
+        self._retry_policy = RetryPolicy()
+        self._hedge_policy = HedgePolicy(hedged_requests)
+        self._metrics = RequestMetrics()
+
+    @property
+    def session(self) -> ClientSession:
+        """Get the ClientSession bound to the connection pool."""
+        return self._session
+
+    @property
+    def coalescer(self) -> RequestCoalescer:
+        """Get the coalescer for identical concurrent GET requests."""
+        return self._coalescer
+
+    @property
+    def value_cache(self) -> ValueCache:
+        """Get the short-lived cache for variable responses."""
+        return self._value_cache
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """Get the circuit breaker which fails requests fast while the terminal is unreachable."""
+        return self._circuit_breaker
+
+    @property
+    def rate_limiter(self) -> RequestRateLimiter:
+        """Get the request rate limiter shared by all API clients of the entry."""
+        return self._rate_limiter
+
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        """Get the retry policy for idempotent GET requests."""
+        return self._retry_policy
+
+    @property
+    def hedge_policy(self) -> HedgePolicy:
+        """Get the policy deciding when a duplicate of a slow variable read is sent."""
+        return self._hedge_policy
+
+    @property
+    def metrics(self) -> RequestMetrics:
+        """Get the request metrics of all API clients of the entry."""
+        return self._metrics
+
+    @property
+    def max_connections(self) -> int:
+        """Get the maximum number of open connections to the terminal."""
+        return self._max_connections
+
+    @property
+    def closed(self) -> bool:
+        """Return True if the transport has been closed."""
+        return self._session.closed
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        if not self._session.closed:
+            _LOGGER.debug("Closing ETA connection pool")
+            await self._session.close()
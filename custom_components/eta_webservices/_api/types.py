@@ -1,7 +1,7 @@
 """Type definitions for ETA API."""
 
 from datetime import datetime
-from typing import TypedDict
+from typing import NotRequired, TypedDict
 
 from ..const import (  # noqa: TID252
     CUSTOM_UNIT_MINUTES_SINCE_MIDNIGHT,
@@ -50,6 +50,39 @@ class ETAError(TypedDict):
     port: int
 
 
+class ETAWriteRequest(TypedDict):
+    """Dict describing a single raw write of a batch."""
+
+    uri: str
+    value: NotRequired[float | str | None]
+    begin: NotRequired[int | None]
+    end: NotRequired[int | None]
+
+
+class ETAWriteResult(TypedDict):
+    """Dict describing the outcome of a single write of a batch."""
+
+    uri: str
+    success: bool
+    error: str | None
+
+
+class ETADiscoveryChanges(TypedDict):
+    """Dict describing which menu URIs changed since the previous discovery."""
+
+    reused: list[str]
+    discovered: list[str]
+    removed: list[str]
+
+
+class ETAVarsetError(Exception):
+    """Raised when the terminal refuses a server-side variable set request."""
+
+
+class ETATerminalUnavailableError(Exception):
+    """Raised instead of sending a request while the terminal is unreachable."""
+
+
 # Sensor unit constants
 FLOAT_SENSOR_UNITS = [
     "%",
@@ -0,0 +1,98 @@
+"""Short-lived cache for variable responses of the ETA terminal."""
+
+from collections import OrderedDict
+import time
+
+
+class ValueCache:
+    """Bounded TTL cache with LRU eviction for /user/var responses.
+
+    The cache stores the raw response body per endpoint, so that readers with
+    different parsing options can share it. A TTL of 0 disables the cache.
+    """
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        """Initialize the cache.
+
+        :param ttl: Seconds a cached response stays valid, 0 disables the cache
+        :param max_size: Maximum number of cached endpoints
+        """
+        self._ttl = max(0.0, float(ttl))
+        self._max_size = max(1, int(max_size))
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if responses are cached."""
+        return self._ttl > 0
+
+    @property
+    def ttl(self) -> float:
+        """Get the TTL in seconds."""
+        return self._ttl
+
+    @property
+    def generation(self) -> int:
+        """Get the invalidation counter.
+
+        Pass it to `put` to discard responses which were requested before an
+        invalidation, e.g. a read which was still in flight while a value was written.
+        """
+        return self._generation
+
+    @property
+    def hits(self) -> int:
+        """Get the number of lookups served from the cache."""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Get the number of lookups which were not cached or expired."""
+        return self._misses
+
+    def __len__(self) -> int:
+        """Return the number of cached endpoints."""
+        return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        """Return the cached response for key if it is younger than the TTL."""
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self._ttl:
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[1]
+
+    def put(self, key: str, value: bytes, generation: int | None = None) -> None:
+        """Store a response, evicting the least recently used entry if full.
+
+        :param key: Normalized endpoint URI
+        :param value: Raw response body
+        :param generation: Value of `generation` before the request was sent
+        """
+        if not self.enabled:
+            return
+        if generation is not None and generation != self._generation:
+            return
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        """Drop the cached response for key."""
+        self._generation += 1
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._generation += 1
+        self._entries.clear()
@@ -0,0 +1,145 @@
+"""Persistent cache for the parsed varinfo metadata of the ETA terminal."""
+
+import copy
+import hashlib
+import json
+from typing import Any
+
+from .types import ETAEndpoint
+
+
+def menu_fingerprint(all_endpoints: dict[str, list[str]]) -> str:
+    """Get a hash of the menu which changes whenever an entry or URI changes.
+
+    :param all_endpoints: Menu of the terminal, maps sensor keys to lists of URIs
+    """
+    menu = json.dumps(sorted(all_endpoints.items()), ensure_ascii=False)
+    return hashlib.sha256(menu.encode()).hexdigest()
+
+
+class VarinfoCache:
+    """Parsed /user/varinfo responses of a single terminal, keyed by URI.
+
+    Reading the varinfo of every menu entry is by far the slowest part of a
+    discovery, but the metadata only changes with the configuration or firmware of
+    the terminal. An entry stays valid as long as the API version of the terminal
+    is the same and its URI is still listed under the same menu entry. The cache
+    only lives in memory, `as_dict` and `from_dict` are used to persist it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._api_version: str | None = None
+        self._menu_fingerprint: str | None = None
+        # URI -> (menu key the URI was listed under, parsed metadata)
+        self._entries: dict[str, tuple[str, ETAEndpoint]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def api_version(self) -> str | None:
+        """Get the API version the cached metadata was read with."""
+        return self._api_version
+
+    @property
+    def menu_fingerprint(self) -> str | None:
+        """Get the fingerprint of the menu the cache was last validated against."""
+        return self._menu_fingerprint
+
+    @property
+    def hits(self) -> int:
+        """Get the number of lookups served from the cache."""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Get the number of lookups which had to be requested from the terminal."""
+        return self._misses
+
+    def __len__(self) -> int:
+        """Return the number of cached URIs."""
+        return len(self._entries)
+
+    def set_api_version(self, api_version: str) -> None:
+        """Set the API version of the terminal, dropping all entries if it changed."""
+        if api_version != self._api_version:
+            self.clear()
+            self._api_version = api_version
+
+    def validate(self, all_endpoints: dict[str, list[str]]) -> None:
+        """Drop all entries which are no longer listed under the same menu entry.
+
+        Nothing has to be checked if the menu is the same as during the last call.
+
+        :param all_endpoints: Current menu, maps sensor keys to lists of URIs
+        """
+        fingerprint = menu_fingerprint(all_endpoints)
+        if fingerprint == self._menu_fingerprint:
+            return
+        menu_keys: dict[str, str] = {}
+        for key, uris in all_endpoints.items():
+            for uri in uris:
+                menu_keys.setdefault(uri, key)
+        for uri in [
+            uri for uri, (key, _) in self._entries.items() if menu_keys.get(uri) != key
+        ]:
+            del self._entries[uri]
+        self._menu_fingerprint = fingerprint
+
+    def get(self, uri: str, key: str) -> ETAEndpoint | None:
+        """Get a copy of the cached metadata of a URI.
+
+        :param uri: URI of the endpoint
+        :param key: Menu key the URI is listed under
+        :return: Metadata, or None if it is not cached for this menu entry
+        """
+        entry = self._entries.get(uri)
+        if entry is None or entry[0] != key:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return copy.deepcopy(entry[1])
+
+    def put(self, uri: str, key: str, endpoint_info: ETAEndpoint) -> None:
+        """Store a copy of freshly parsed metadata.
+
+        :param uri: URI of the endpoint
+        :param key: Menu key the URI is listed under
+        :param endpoint_info: Metadata as parsed from the varinfo response
+        """
+        self._entries[uri] = (key, copy.deepcopy(endpoint_info))
+
+    def invalidate(self, uri: str) -> None:
+        """Drop the cached metadata of a single URI."""
+        self._entries.pop(uri, None)
+
+    def clear(self) -> None:
+        """Drop all cached metadata."""
+        self._entries.clear()
+        self._menu_fingerprint = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the cache contents in a JSON serializable form."""
+        return {
+            "api_version": self._api_version,
+            "menu_fingerprint": self._menu_fingerprint,
+            "entries": {
+                uri: {"key": key, "endpoint": endpoint_info}
+                for uri, (key, endpoint_info) in self._entries.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> "VarinfoCache":
+        """Restore a cache from the output of `as_dict`, invalid data is ignored."""
+        cache = cls()
+        if not isinstance(data, dict):
+            return cache
+        cache._api_version = data.get("api_version")
+        cache._menu_fingerprint = data.get("menu_fingerprint")
+        for uri, entry in (data.get("entries") or {}).items():
+            try:
+                cache._entries[uri] = (entry["key"], entry["endpoint"])
+            except (KeyError, TypeError):
+                continue
+        return cache
@@ -0,0 +1,167 @@
+"""Specialized parsers for the most frequent ETA API responses."""
+
+import logging
+import re
+import sys
+from xml.parsers import expat
+
+import xmltodict
+
+_LOGGER = logging.getLogger(__name__)
+
+# A complete /user/var response with a single value element. Attribute values and
+# text containing entities, quotes or line breaks don't match, so that everything
+# which needs real XML normalization is left to xmltodict.
+_VALUE_DOCUMENT = re.compile(
+    r"\s*(?:<\?xml[^>]*\?>)?\s*"
+    r"<eta(?:\s[^>]*)?>\s*"
+    r'<value((?:\s+[\w:.-]+="[^"<&\t\n\r]*")*)\s*'
+    r"(?:/>|>([^<&\r]*)</value>)"
+    r"\s*</eta>\s*\Z"
+)
+_ATTRIBUTE = re.compile(r'([\w:.-]+)="([^"]*)"')
+# Same document with the attributes in the order the terminal sends them,
+# which allows to build the result without a second scan over the attributes
+_VALUE_ATTRIBUTES = (
+    "uri",
+    "strValue",
+    "unit",
+    "decPlaces",
+    "scaleFactor",
+    "advTextOffset",
+)
+_CANONICAL_VALUE_DOCUMENT = re.compile(
+    r"\s*(?:<\?xml[^>]*\?>)?\s*"
+    r"<eta(?:\s[^>]*)?>\s*"
+    r"<value"
+    + "".join(rf' {name}="([^"<&\t\n\r]*)"' for name in _VALUE_ATTRIBUTES)
+    + r"\s*(?:/>|>([^<&\r]*)</value>)"
+    r"\s*</eta>\s*\Z"
+)
+
+
+def _parse_value_response_fast(data: str) -> dict[str, str] | None:
+    match = _CANONICAL_VALUE_DOCUMENT.match(data)
+    if match is not None:
+        uri, str_value, unit, dec_places, scale_factor, adv_text_offset, text = (
+            match.groups()
+        )
+        value = {
+            "@uri": uri,
+            "@strValue": str_value,
+            "@unit": unit,
+            "@decPlaces": dec_places,
+            "@scaleFactor": scale_factor,
+            "@advTextOffset": adv_text_offset,
+        }
+        if text and (text := text.strip()):
+            value["#text"] = text
+        return value
+
+    match = _VALUE_DOCUMENT.match(data)
+    if match is None:
+        return None
+    attributes, text = match.groups()
+    value = {"@" + key: attr for key, attr in _ATTRIBUTE.findall(attributes)}
+    # Same whitespace handling as xmltodict: strip the text and omit it if empty
+    if text and (text := text.strip()):
+        value["#text"] = text
+    return value
+
+
+def parse_value_response(data: str | bytes) -> dict:
+    """Parse a /user/var response into the attribute dict of its value element.
+
+    The result is identical to `xmltodict.parse(data)["eta"]["value"]`, i.e.
+    attributes are prefixed with "@" and the text is stored as "#text", but it is
+    extracted with a precompiled pattern instead of building the generic document.
+    Documents with an unexpected shape, e.g. error responses, are handed to
+    xmltodict, so that callers see the same results and exceptions as before.
+
+    :param data: Raw response body
+    :return: Dict with the attributes and text of the value element
+    """
+    try:
+        text = data.decode("utf-8") if isinstance(data, bytes) else data
+    except UnicodeDecodeError:
+        text = None
+    if text is not None and (value := _parse_value_response_fast(text)) is not None:
+        return value
+    _LOGGER.debug("Falling back to generic parser for value response")
+    return xmltodict.parse(data)["eta"]["value"]
+
+
+class MenuParser:
+    """Event-based parser which flattens a /user/menu document into (key, uri) pairs.
+
+    Keys are built like in the nested menu: the names of all parent fub and object
+    elements joined by "_", e.g. "_WW_Eingänge_Warmwasserspeicher". Instead of
+    building the whole document as nested dicts and walking it recursively, the
+    keys of the open elements are kept on a stack and every element is emitted as
+    soon as it starts. Keys are interned, as the same prefixes are shared by many
+    nodes.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        self._parser = expat.ParserCreate()
+        self._parser.StartElementHandler = self._start_element
+        self._parser.EndElementHandler = self._end_element
+        self._stack: list[str] = []
+        self._depth = 0
+        self._menu_depth: int | None = None
+        self._ignored_depth: int | None = None
+        self._entries: list[tuple[str, str]] = []
+        self.found_menu = False
+
+    def feed(self, data: str | bytes, final: bool = False) -> list[tuple[str, str]]:
+        """Parse the next chunk of the document.
+
+        :param data: Next chunk of the response body
+        :param final: True if this is the last chunk
+        :return: (key, uri) pairs of all menu nodes which started in this chunk
+        """
+        self._parser.Parse(data, final)
+        entries = self._entries
+        self._entries = []
+        return entries
+
+    def parse(self, data: str | bytes) -> list[tuple[str, str]]:
+        """Parse a complete document.
+
+        :param data: Response body
+        :return: (key, uri) pairs of all menu nodes in document order
+        :raises xml.parsers.expat.ExpatError: If the document is no valid XML
+        """
+        return self.feed(data, final=True)
+
+    def _start_element(self, name: str, attrs: dict[str, str]) -> None:
+        self._depth += 1
+        if self._ignored_depth is not None:
+            return
+        if self._menu_depth is None:
+            if name == "menu" and self._depth == 2 and not self.found_menu:
+                self._menu_depth = self._depth
+                self.found_menu = True
+            return
+
+        # Only fubs directly below the menu and objects below them are nodes,
+        # the subtrees of all other elements are skipped
+        if name != ("fub" if self._depth == self._menu_depth + 1 else "object"):
+            self._ignored_depth = self._depth
+            return
+        parent = self._stack[-1] if self._stack else ""
+        key = sys.intern(f"{parent}_{attrs['name']}")
+        self._stack.append(key)
+        self._entries.append((key, attrs["uri"]))
+
+    def _end_element(self, name: str) -> None:
+        if self._ignored_depth is not None:
+            if self._ignored_depth == self._depth:
+                self._ignored_depth = None
+        elif self._menu_depth is not None:
+            if self._depth == self._menu_depth:
+                self._menu_depth = None
+            else:
+                self._stack.pop()
+        self._depth -= 1
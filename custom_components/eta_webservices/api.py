@@ -5,30 +5,52 @@ version detection and routing to the appropriate sensor discovery implementation
 """
 
 import asyncio
-from collections.abc import Callable
+from collections.abc import Callable, Collection
 import logging
+import time
 
-from aiohttp import ClientSession
+from aiohttp import ClientError, ClientSession
 from packaging import version
 import xmltodict
 
 from ._api.api_client import APIClient
+from ._api.checkpoint import DiscoveryCheckpoint
+from ._api.limiter import AdaptiveConcurrencyLimiter
+from ._api.metrics import EndpointClass
+from ._api.scheduler import RequestPriority, request_priority
+from ._api.sensor_discovery_base import count_fub_nodes
 from ._api.sensor_discovery_v11 import SensorDiscoveryV11
 from ._api.sensor_discovery_v12 import SensorDiscoveryV12
+from ._api.transport import ETATransport
 
 # Re-export types for backward compatibility
 from ._api.types import (  # noqa: F401
     DEFAULT_VALID_WRITABLE_VALUES,
     FLOAT_SENSOR_UNITS,
     WRITABLE_SENSOR_UNITS,
+    ETADiscoveryChanges,
     ETAEndpoint,
     ETAError,
+    ETATerminalUnavailableError,
     ETAValidSwitchValues,
     ETAValidWritableValues,
+    ETAVarsetError,
+    ETAWriteRequest,
+    ETAWriteResult,
+)
+from ._api.varinfo_cache import VarinfoCache, menu_fingerprint
+from ._api.xml_parsers import parse_value_response
+from .const import (
+    API_VERSION_MAX_AGE,
+    VARSET_SYNC_MAX_CONCURRENCY,
+    WRITE_BATCH_MAX_CONCURRENCY,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# Oldest API version which provides the varinfo endpoint used by the v1.2 discovery
+VARINFO_API_VERSION = version.parse("1.2")
+
 
 class EtaAPI:
     """Unified API for ETA communication.
@@ -44,7 +66,9 @@ class EtaAPI:
         host: str,
         port: int,
         max_concurrent_requests: int = 5,
-        request_semaphore: asyncio.Semaphore | None = None,
+        request_semaphore: asyncio.Semaphore | AdaptiveConcurrencyLimiter | None = None,
+        *,
+        transport: ETATransport | None = None,
     ) -> None:
         """Initialize the ETA API.
 
@@ -52,14 +76,78 @@ class EtaAPI:
         :param host: Hostname or IP address of the ETA device
         :param port: Port number of the ETA API
         :param max_concurrent_requests: Maximum number of concurrent API requests
-        :param request_semaphore: asyncio.Semaphore to limit concurrent requests
+        :param request_semaphore: Semaphore or adaptive limiter shared by all requests to the terminal
+        :param transport: Transport of the config entry, shares request state between clients
         """
+        self._transport = transport
+        self._api_version: version.Version | None = None
+        self._api_version_detected_at: float | None = None
+        # URIs which changed during the last incremental discovery
+        self.last_discovery_changes: ETADiscoveryChanges | None = None
+        # Fingerprint of the menu the last discovery was based on
+        self.last_menu_fingerprint: str | None = None
+        # Menu entries discovered by the last discovery, see `previous_menu` of get_all_sensors
+        self.last_discovered_menu: dict[str, list[str]] | None = None
+        # URIs which were left out of the last discovery because its deadline expired
+        self.last_unfinished_uris: list[str] = []
         self._http = APIClient(
             session,
             host,
             port,
             max_concurrent_requests=max_concurrent_requests,
             request_semaphore=request_semaphore,
+            transport=transport,
+        )
+
+    async def close(self) -> None:
+        """Release the connection pool of the transport, if one was given.
+
+        A session passed without a transport is owned by the caller and stays open.
+        """
+        if self._transport is not None:
+            await self._transport.close()
+
+    @property
+    def api_version(self) -> version.Version | None:
+        """Get the detected API version, or None if it hasn't been detected yet."""
+        return self._api_version
+
+    @property
+    def api_version_detected_at(self) -> float | None:
+        """Get the UNIX timestamp of the API version detection."""
+        return self._api_version_detected_at
+
+    def set_api_version(
+        self, api_version: str | None, detected_at: float | None = None
+    ) -> None:
+        """Restore a previously detected API version, e.g. from the config entry.
+
+        :param api_version: Version string as returned by the terminal, None clears the version
+        :param detected_at: UNIX timestamp of the detection, defaults to now
+        """
+        if api_version is None:
+            self.invalidate_api_version()
+            return
+        try:
+            self._api_version = version.parse(str(api_version))
+        except version.InvalidVersion:
+            _LOGGER.debug("Ignoring invalid saved API version %s", api_version)
+            self.invalidate_api_version()
+            return
+        self._api_version_detected_at = (
+            detected_at if detected_at is not None else time.time()
+        )
+
+    def invalidate_api_version(self) -> None:
+        """Forget the detected API version, so that it is requested again when needed."""
+        self._api_version = None
+        self._api_version_detected_at = None
+
+    def _has_recent_api_version(self) -> bool:
+        return (
+            self._api_version is not None
+            and self._api_version_detected_at is not None
+            and time.time() - self._api_version_detected_at < API_VERSION_MAX_AGE
         )
 
     async def get_all_sensors(
@@ -71,11 +159,53 @@ class EtaAPI:
         writable_dict: dict,
         pending_dict: dict,
         progress_callback: Callable[[str, float | None], None] | None = None,
+        *,
+        revalidate_api_version: bool = False,
+        incremental: bool = False,
+        varinfo_cache: VarinfoCache | None = None,
+        checkpoint: DiscoveryCheckpoint | None = None,
+        skip_fubs: Collection[str] = (),
+        fub_callback: Callable[[str, int], None] | None = None,
+        deadline: float | None = None,
+        menu: dict[str, list[str]] | None = None,
+        previous_menu: dict[str, list[str]] | None = None,
     ) -> bool:
         """Enumerate all possible sensors on the ETA API.
 
         Automatically routes to the appropriate version implementation based on
-        the detected API version.
+        the detected API version. A recently detected version is reused without
+        asking the terminal again. It is requested again if `revalidate_api_version`
+        is set, or after the previous discovery failed with a connection error.
+
+        In incremental mode the dicts have to contain the result of the previous
+        discovery and `previous_menu` its `last_discovered_menu`. Only menu entries
+        which changed since then are requested from the terminal, see
+        `last_discovery_changes`. The legacy discovery mode doesn't support this and
+        always discovers all sensors again.
+
+        A `varinfo_cache` is consulted before the metadata of an endpoint is requested
+        from the terminal and is filled with all newly requested metadata.
+
+        A `checkpoint` records the progress of the discovery. If it contains a recent
+        discovery which was interrupted, that discovery is resumed with the same menu
+        and only the missing responses are requested. It is emptied on completion.
+
+        The v1.2 discovery handles every function block (top level menu entry) as a
+        unit of its own. `fub_callback` is called as soon as all entities of a block
+        have been added to the dicts, the blocks in `skip_fubs` are not discovered.
+
+        If the v1.2 discovery takes longer than `deadline`, all outstanding requests
+        are cancelled and the entities found so far are kept. The time is measured
+        from the end of the API version check, reading the menu counts towards it.
+        The URIs which are still missing are listed in `last_unfinished_uris`. Their
+        menu entries are not part of `last_discovered_menu`, so the next incremental
+        discovery discovers them again; a `checkpoint` is kept to avoid requesting
+        anything twice. An incremental discovery keeps the previous entities of
+        changed menu entries which could not be discovered again, e.g. because of
+        the deadline.
+
+        A `menu` which has just been read with `get_menu_endpoints`, e.g. to let the
+        user choose the function blocks, is used instead of requesting it again.
 
         :param force_legacy_mode: Set to true to force the use of the old API mode
         :param float_dict: Dictionary which will be filled with all float sensors
@@ -84,60 +214,137 @@ class EtaAPI:
         :param writable_dict: Dictionary which will be filled with all writable sensors
         :param pending_dict: Dictionary which will be filled with pending sensors (v1.2 only)
         :param progress_callback: Optional callback to report progress, takes a message and a progress value between 0 and 1
+        :param revalidate_api_version: Set to true to request the API version even if it is already known
+        :param incremental: Set to true to only discover menu entries which changed since the previous discovery
+        :param varinfo_cache: Optional cache of the varinfo metadata of this terminal (v1.2 only)
+        :param checkpoint: Optional checkpoint to resume an interrupted discovery from (v1.2 only)
+        :param skip_fubs: Names of function blocks whose endpoints are not discovered, see `get_fub_node_counts`
+        :param fub_callback: Optional callback which gets the name and number of entities of each completed function block (v1.2 only)
+        :param deadline: Optional number of seconds after which the discovery stops with partial results (v1.2 only)
+        :param menu: Optional menu of the terminal, see `get_menu_endpoints`
+        :param previous_menu: Menu entries discovered by the previous discovery, see `last_discovered_menu` (v1.2 only)
         :return: True if the new API version was used, false if the legacy discovery mode was used
         :rtype: boolean
         """
-        if progress_callback is not None:
-            progress_callback("Checking ETA API version", 0.01)
-
-        is_new_api = False
-        if not force_legacy_mode:
-            try:
-                # Avoid long "no progress" stalls before discovery starts.
-                is_new_api = await asyncio.wait_for(
-                    self.is_correct_api_version(), timeout=20
-                )
-            except TimeoutError:
-                _LOGGER.warning(
-                    "ETA API version check timed out after 20s, falling back to legacy discovery mode"
-                )
+        if revalidate_api_version:
+            self.invalidate_api_version()
+
+        # Discovery sends hundreds of requests, don't let it delay polling and writes
+        with request_priority(RequestPriority.BACKGROUND):
+            is_new_api = False
+            if not force_legacy_mode and self._has_recent_api_version():
+                is_new_api = self._api_version >= VARINFO_API_VERSION
+                _LOGGER.debug("Using known ETA API version %s", self._api_version)
+            elif not force_legacy_mode:
                 if progress_callback is not None:
-                    progress_callback(
-                        "API version check timed out, using compatibility discovery",
-                        0.03,
+                    progress_callback("Checking ETA API version", 0.01)
+                self.invalidate_api_version()
+                try:
+                    # Avoid long "no progress" stalls before discovery starts.
+                    is_new_api = await asyncio.wait_for(
+                        self.is_correct_api_version(), timeout=20
+                    )
+                except TimeoutError:
+                    _LOGGER.warning(
+                        "ETA API version check timed out after 20s, falling back to legacy discovery mode"
                     )
-            except Exception:  # noqa: BLE001
-                _LOGGER.warning(
-                    "ETA API version check failed, falling back to legacy discovery mode",
-                    exc_info=True,
+                    if progress_callback is not None:
+                        progress_callback(
+                            "API version check timed out, using compatibility discovery",
+                            0.03,
+                        )
+                except Exception:  # noqa: BLE001
+                    _LOGGER.warning(
+                        "ETA API version check failed, falling back to legacy discovery mode",
+                        exc_info=True,
+                    )
+                    if progress_callback is not None:
+                        progress_callback(
+                            "API version check failed, using compatibility discovery",
+                            0.03,
+                        )
+
+            if is_new_api:
+                # New version with varinfo endpoint detected
+                if progress_callback is not None:
+                    progress_callback("Using ETA API v1.2 discovery mode", 0.05)
+                if varinfo_cache is not None:
+                    varinfo_cache.set_api_version(str(self._api_version))
+                if checkpoint is not None:
+                    checkpoint.set_api_version(str(self._api_version))
+                sensor_discovery = SensorDiscoveryV12(
+                    self._http,
+                    progress_callback=progress_callback,
+                    varinfo_cache=varinfo_cache,
+                    checkpoint=checkpoint,
+                    skip_fubs=skip_fubs,
+                    fub_callback=fub_callback,
                 )
+            else:
+                # varinfo not available -> fall back to compatibility mode
                 if progress_callback is not None:
-                    progress_callback(
-                        "API version check failed, using compatibility discovery",
-                        0.03,
-                    )
+                    progress_callback("Using ETA compatibility discovery mode", 0.05)
+                sensor_discovery = SensorDiscoveryV11(
+                    self._http, progress_callback=progress_callback, skip_fubs=skip_fubs
+                )
+            self.last_discovery_changes = None
+            self.last_menu_fingerprint = None
+            self.last_discovered_menu = None
+            self.last_unfinished_uris = []
+            if not is_new_api:
+                for catalog in (
+                    float_dict,
+                    switches_dict,
+                    text_dict,
+                    writable_dict,
+                    pending_dict,
+                ):
+                    catalog.clear()
+            # The API version check doesn't count towards the deadline
+            deadline_at = time.monotonic() + deadline if deadline else None
+            try:
+                await sensor_discovery.get_all_sensors(
+                    float_dict,
+                    switches_dict,
+                    text_dict,
+                    writable_dict,
+                    pending_dict,
+                    incremental=incremental,
+                    deadline=deadline_at,
+                    menu=menu,
+                    previous_menu=previous_menu,
+                )
+            except (TimeoutError, ClientError, ETATerminalUnavailableError):
+                # The terminal may have been replaced or updated, check the version next time
+                self.invalidate_api_version()
+                raise
+            self.last_discovery_changes = sensor_discovery.changes
+            self.last_menu_fingerprint = sensor_discovery.menu_fingerprint
+            self.last_discovered_menu = sensor_discovery.discovered_menu
+            self.last_unfinished_uris = sensor_discovery.unfinished_uris
+            return is_new_api
+
+    async def get_menu_fingerprint(self) -> str:
+        """Get a fingerprint of the current menu of the terminal.
+
+        The fingerprint only changes if menu entries or their URIs change, compare it
+        with `last_menu_fingerprint` to skip a discovery which wouldn't find anything new.
+        """
+        return menu_fingerprint(await self._http.get_sensors_dict())
 
-        if is_new_api:
-            # New version with varinfo endpoint detected
-            if progress_callback is not None:
-                progress_callback("Using ETA API v1.2 discovery mode", 0.05)
-            sensor_discovery = SensorDiscoveryV12(
-                self._http, progress_callback=progress_callback
-            )
-            await sensor_discovery.get_all_sensors(
-                float_dict, switches_dict, text_dict, writable_dict, pending_dict
-            )
-        else:
-            # varinfo not available -> fall back to compatibility mode
-            if progress_callback is not None:
-                progress_callback("Using ETA compatibility discovery mode", 0.05)
-            sensor_discovery = SensorDiscoveryV11(
-                self._http, progress_callback=progress_callback
-            )
-            await sensor_discovery.get_all_sensors(
-                float_dict, switches_dict, text_dict, writable_dict, pending_dict
-            )
-        return is_new_api
+    async def get_menu_endpoints(self) -> dict[str, list[str]]:
+        """Get the menu of the terminal.
+
+        :return: Maps sensor keys to lists of URIs, see `count_fub_nodes` and the `menu` of `get_all_sensors`
+        """
+        return await self._http.get_sensors_dict()
+
+    async def get_fub_node_counts(self) -> dict[str, int]:
+        """Get the function blocks of the terminal and the number of their endpoints.
+
+        :return: Maps the names of all function blocks to their number of unique URIs, in menu order
+        """
+        return count_fub_nodes(await self.get_menu_endpoints())
 
     async def does_endpoint_exists(self):
         """Returns true if the ETA API is accessible."""
@@ -147,22 +354,29 @@ class EtaAPI:
             return False
         return True
 
-    async def get_api_version(self):
-        """Get the version of the ETA API as a raw string.
+    async def get_api_version(self, refresh: bool = False):
+        """Get the version of the ETA API.
+
+        The version is only requested from the terminal if it isn't known yet.
 
+        :param refresh: Set to true to request the version even if it is already known
         :return: Version of the ETA API
         :rtype: Version
         """
-        data = await self._http.get_request("/user/api")
-        text = await data.text()
-        return version.parse(xmltodict.parse(text)["eta"]["api"]["@version"])
+        if self._api_version is not None and not refresh:
+            return self._api_version
+        body = await self._http.get_body("/user/api")
+        self._api_version = version.parse(
+            xmltodict.parse(body)["eta"]["api"]["@version"]
+        )
+        self._api_version_detected_at = time.time()
+        return self._api_version
 
     async def is_correct_api_version(self):
         """Returns true if the ETA API version is v1.2 or higher."""
         eta_version = await self.get_api_version()
-        required_version = version.parse("1.2")
 
-        return eta_version >= required_version
+        return eta_version >= VARINFO_API_VERSION
 
     async def get_data(
         self,
@@ -193,6 +407,110 @@ class EtaAPI:
         """
         return await self._http.get_all_data(sensor_list)
 
+    async def sync_varset(
+        self, varset: str, uris: set[str], registered_uris: set[str] | None
+    ) -> set[str] | None:
+        """Make sure a server-side variable set contains exactly the given URIs.
+
+        The changes are sent as background requests, at most
+        `VARSET_SYNC_MAX_CONCURRENCY` at the same time, so that registering hundreds
+        of URIs doesn't delay polling and writes.
+
+        :param varset: Name of the variable set
+        :param uris: URIs which should be part of the variable set
+        :param registered_uris: URIs which are already registered, or None if the set has to be (re)created
+        :return: URIs which are registered after the sync, or None if the terminal refused to create the set
+        :rtype: Set[str] | None
+        """
+        semaphore = asyncio.Semaphore(VARSET_SYNC_MAX_CONCURRENCY)
+
+        async def _modify(method: str, uri: str) -> bool:
+            async with semaphore:
+                return await self._http.modify_varset(
+                    method, varset + self._http.normalize_uri(uri)
+                )
+
+        with request_priority(RequestPriority.BACKGROUND):
+            if registered_uris is None:
+                # The terminal may still hold a stale set from a previous run, start from scratch
+                await self._http.modify_varset("DELETE", varset)
+                if not await self._http.modify_varset("PUT", varset):
+                    return None
+                registered_uris = set()
+
+            registered_uris = set(registered_uris)
+            to_remove = sorted(registered_uris - uris)
+            to_add = sorted(uris - registered_uris)
+
+            removed = await asyncio.gather(
+                *[_modify("DELETE", uri) for uri in to_remove],
+                return_exceptions=True,
+            )
+            for uri, result in zip(to_remove, removed, strict=True):
+                if result is True:
+                    registered_uris.discard(uri)
+
+            added = await asyncio.gather(
+                *[_modify("PUT", uri) for uri in to_add],
+                return_exceptions=True,
+            )
+        for uri, result in zip(to_add, added, strict=True):
+            if result is True:
+                registered_uris.add(uri)
+            else:
+                _LOGGER.debug("Could not add %s to variable set %s", uri, varset)
+
+        return registered_uris
+
+    async def get_varset_data(
+        self,
+        varset: str,
+        sensor_list: dict[str, dict[str, bool]],
+        switch_uris: list[str] | None = None,
+    ) -> tuple[dict[str, float | str], dict[str, int]]:
+        """Read the values of all sensors and switches in a variable set with a single request.
+
+        Endpoints which are missing from the variable set are not part of the result.
+
+        :param varset: Name of the variable set
+        :param sensor_list: Dict[url, Dict[str, bool]] of sensors to query the data for
+        :param switch_uris: List of switch endpoint URIs to query the raw state for
+        :return: Tuple of (sensor values by URI, raw switch states by URI)
+        :rtype: Tuple[Dict[str, Any], Dict[str, int]]
+        :raises ETAVarsetError: If the terminal rejects the request
+        """
+        raw_values = await self._http.get_varset(varset)
+
+        data_dict: dict[str, float | str] = {}
+        for uri, force_handlings in sensor_list.items():
+            raw_value = raw_values.get(self._http.normalize_uri(uri))
+            if raw_value is None:
+                continue
+            try:
+                data_dict[uri], _ = self._http.parse_data(
+                    raw_value,
+                    force_number_handling=force_handlings.get(
+                        "force_number_handling", False
+                    ),
+                    force_string_handling=force_handlings.get(
+                        "force_string_handling", False
+                    ),
+                )
+            except Exception as err:  # noqa: BLE001
+                _LOGGER.debug("Failed to parse data for %s: %s", uri, str(err))
+
+        switch_states: dict[str, int] = {}
+        for uri in switch_uris or []:
+            raw_value = raw_values.get(self._http.normalize_uri(uri))
+            if raw_value is None:
+                continue
+            try:
+                switch_states[uri] = int(raw_value["#text"])
+            except (KeyError, TypeError, ValueError) as err:
+                _LOGGER.debug("Failed to parse switch state for %s: %s", uri, str(err))
+
+        return data_dict, switch_states
+
     async def get_menu(self):
         """Request the menu from the ETA API, which includes links to all possible sensors."""
         return await self._http.get_menu()
@@ -203,11 +521,10 @@ class EtaAPI:
         :return: List of active errors
         :rtype: List[ETAError]
         """
-        data = await self._http.get_request("/user/errors")
-        text = await data.text()
-        data = xmltodict.parse(text)["eta"]["errors"]["fub"]
-
-        return self._http.parse_errors(data)
+        body = await self._http.get_body("/user/errors")
+        with self._http.metrics.time_parse(EndpointClass.ERRORS):
+            data = xmltodict.parse(body)["eta"]["errors"]["fub"]
+            return self._http.parse_errors(data)
 
     async def get_switch_state(self, uri: str):
         """Get the raw state of a switch sensor.
@@ -216,10 +533,9 @@ class EtaAPI:
         :return: Raw switch value, like 1802
         :rtype: int
         """
-        data = await self._http.get_request("/user/var/" + str(uri))
-        text = await data.text()
-        data = xmltodict.parse(text)["eta"]["value"]
-        return int(data["#text"])
+        body = await self._http.get_body("/user/var/" + str(uri))
+        with self._http.metrics.time_parse(EndpointClass.VAR):
+            return int(parse_value_response(body)["#text"])
 
     async def get_all_switch_states(self, switch_uris: list[str]):
         """Get switch states from all endpoints.
@@ -227,9 +543,11 @@ class EtaAPI:
         :param switch_uris: List of switch endpoint URIs
         :return: Mapping from URI to raw switch state (or exception)
         :rtype: Dict[str, Any]
+        :raises ETATerminalUnavailableError: If the terminal became unreachable
         """
         tasks = [self.get_switch_state(uri) for uri in switch_uris]
         results = await asyncio.gather(*tasks, return_exceptions=True)
+        self._http.raise_if_unavailable(results)
 
         return dict(zip(switch_uris, results, strict=False))
 
@@ -242,9 +560,9 @@ class EtaAPI:
         :rtype: boolean
         """
         data = {"value": state}
-        response = await self._http.post_request("/user/var/" + str(uri), data)
-        text = await response.text()
-        parsed = xmltodict.parse(text)
+        with request_priority(RequestPriority.INTERACTIVE_WRITE):
+            response = await self._http.post_request("/user/var/" + str(uri), data)
+        parsed = xmltodict.parse(response.body)
 
         # Check if response contains success element
         if "success" in parsed.get("eta", {}):
@@ -252,7 +570,7 @@ class EtaAPI:
 
         _LOGGER.error(
             "ETA Integration - could not set state of switch. Got invalid result: %s",
-            text,
+            response.body.decode(errors="replace"),
         )
 
         return False
@@ -280,9 +598,9 @@ class EtaAPI:
             data["begin"] = begin
         if end is not None:
             data["end"] = end
-        response = await self._http.post_request("/user/var/" + str(uri), data)
-        text = await response.text()
-        parsed = xmltodict.parse(text)
+        with request_priority(RequestPriority.INTERACTIVE_WRITE):
+            response = await self._http.post_request("/user/var/" + str(uri), data)
+        parsed = xmltodict.parse(response.body)
 
         # Check if response contains success element (not error or invalid)
         if "success" in parsed.get("eta", {}):
@@ -297,6 +615,50 @@ class EtaAPI:
 
         _LOGGER.error(
             "ETA Integration - could not set write value to endpoint. Got invalid result: %s",
-            text,
+            response.body.decode(errors="replace"),
         )
         return False
+
+    async def write_endpoints(
+        self,
+        writes: list[ETAWriteRequest],
+        max_concurrent_writes: int = WRITE_BATCH_MAX_CONCURRENCY,
+    ) -> list[ETAWriteResult]:
+        """Write raw values to several writable sensors.
+
+        At most `max_concurrent_writes` writes are sent at the same time, so that a
+        large batch doesn't take all request permits. A failed write doesn't stop
+        the other writes of the batch.
+
+        :param writes: Writes to send, see `write_endpoint` for the meaning of the fields
+        :param max_concurrent_writes: Upper bound for concurrent writes of this batch
+        :return: Result of every write, in the order of `writes`
+        :rtype: List[ETAWriteResult]
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrent_writes))
+
+        async def _write(write: ETAWriteRequest) -> ETAWriteResult:
+            async with semaphore:
+                try:
+                    success = await self.write_endpoint(
+                        write["uri"],
+                        write.get("value"),
+                        write.get("begin"),
+                        write.get("end"),
+                    )
+                except Exception as err:  # noqa: BLE001
+                    _LOGGER.error(
+                        "ETA Integration - could not write value to endpoint %s: %s",
+                        write["uri"],
+                        err,
+                    )
+                    return ETAWriteResult(
+                        uri=write["uri"], success=False, error=str(err) or repr(err)
+                    )
+            return ETAWriteResult(
+                uri=write["uri"],
+                success=success,
+                error=None if success else "Terminal rejected the value",
+            )
+
+        return list(await asyncio.gather(*(_write(write) for write in writes)))
@@ -17,9 +17,20 @@ from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import homeassistant.helpers.config_validation as cv
 import homeassistant.helpers.entity_registry as er
 
-from .api import EtaAPI, ETAEndpoint
+from .api import (
+    AdaptiveConcurrencyLimiter,
+    EtaAPI,
+    ETADiscoveryChanges,
+    ETAEndpoint,
+    ETATransport,
+    RequestPriority,
+    count_fub_nodes,
+    request_priority,
+)
 from .const import (
     ADVANCED_OPTIONS_IGNORE_DECIMAL_PLACES_RESTRICTION,
+    API_VERSION,
+    API_VERSION_DETECTED_AT,
     AUTO_SELECT_ALL_ENTITIES,
     CHOSEN_FLOAT_SENSORS,
     CHOSEN_PENDING_SENSORS,
@@ -27,26 +38,54 @@ from .const import (
     CHOSEN_TEXT_SENSORS,
     CHOSEN_WRITABLE_SENSORS,
     CUSTOM_UNITS,
+    DEFAULT_DISCOVERY_CHECKPOINT_MAX_AGE,
+    DEFAULT_DISCOVERY_DEADLINE,
+    DEFAULT_HEDGED_REQUESTS,
     DEFAULT_MAX_PARALLEL_REQUESTS,
+    DEFAULT_MAX_READS_PER_SECOND,
+    DEFAULT_MAX_WRITES_PER_SECOND,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_VALUE_CACHE_TTL,
+    DISCOVERED_MENU,
+    DISCOVERY_CHECKPOINT_MAX_AGE,
+    DISCOVERY_DEADLINE,
     DOMAIN,
     ENABLE_DEBUG_LOGGING,
     FLOAT_DICT,
     FORCE_LEGACY_MODE,
+    HEDGED_REQUESTS,
+    HTTP_TRANSPORT,
     INVISIBLE_UNITS,
     MAX_PARALLEL_REQUESTS,
+    MAX_READS_PER_SECOND,
+    MAX_WRITES_PER_SECOND,
+    MENU_DISCOVERED_AT,
+    MENU_FINGERPRINT,
+    MENU_FINGERPRINT_MAX_AGE,
+    OPTIONS_ACTION_FULL_RESCAN,
     OPTIONS_ACTION_PARALLEL_ONLY,
     OPTIONS_ACTION_REDISCOVER_AND_UPDATE,
     OPTIONS_ACTION_UPDATE_SELECTED,
+    OPTIONS_KEEP_DISCOVERED_ENTITIES,
     OPTIONS_UPDATE_ACTION,
     PAUSE_COORDINATORS_START_TIMESTAMP,
     PENDING_DICT,
     REQUEST_SEMAPHORE,
+    SELECTED_FUBS,
+    SKIPPED_FUBS,
     SWITCHES_DICT,
     TEXT_DICT,
+    UNFINISHED_URIS,
     UPDATE_INTERVAL,
+    VALUE_CACHE_TTL,
     WRITABLE_DICT,
 )
+from .utils import (
+    async_get_discovery_checkpoint,
+    async_get_varinfo_cache,
+    async_save_varinfo_cache,
+    get_eta_client,
+)
 
 _LOGGER = logging.getLogger(__name__)
 _HOSTNAME_LABEL_RE = re.compile(r"^[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?$")
@@ -331,6 +370,81 @@ def _is_invalid_host_input(host: str) -> bool:
     return False
 
 
+def _discovery_state_data(source: dict) -> dict:
+    """Return the saved API version, menu state and unfinished URIs of a config, to be carried over into new options."""
+    return {
+        key: source[key]
+        for key in (
+            API_VERSION,
+            API_VERSION_DETECTED_AT,
+            MENU_FINGERPRINT,
+            MENU_DISCOVERED_AT,
+            DISCOVERED_MENU,
+            UNFINISHED_URIS,
+        )
+        if source.get(key) is not None
+    }
+
+
+def _remember_discovery_state(data: dict, eta_client: EtaAPI) -> None:
+    """Save the API version and menu of a discovery in the flow data."""
+    if eta_client.api_version is not None:
+        data[API_VERSION] = str(eta_client.api_version)
+        data[API_VERSION_DETECTED_AT] = eta_client.api_version_detected_at
+    if eta_client.last_menu_fingerprint is not None:
+        data[MENU_FINGERPRINT] = eta_client.last_menu_fingerprint
+        data[MENU_DISCOVERED_AT] = time.time()
+    if eta_client.last_discovered_menu is not None:
+        data[DISCOVERED_MENU] = eta_client.last_discovered_menu
+    else:
+        # The legacy discovery doesn't support incremental discoveries
+        data.pop(DISCOVERED_MENU, None)
+    if eta_client.last_unfinished_uris:
+        # The discovery was stopped by its deadline, the next one has to finish it
+        data[UNFINISHED_URIS] = list(eta_client.last_unfinished_uris)
+    else:
+        data.pop(UNFINISHED_URIS, None)
+
+
+def _keep_unfinished_endpoints(
+    unfinished_uris: list[str], previous_dicts: list[dict], new_dicts: list[dict]
+) -> int:
+    """Copy the known entities of all endpoints a stopped discovery didn't get to.
+
+    :param unfinished_uris: URIs which have not been discovered before the deadline expired
+    :param previous_dicts: Float, switch, text, writable and pending dicts before the discovery
+    :param new_dicts: Dicts of the discovery in the same order (modified in place)
+    :return: Number of entities which have been kept
+    """
+    unfinished = set(unfinished_uris)
+    num_kept = 0
+    for previous_dict, new_dict in zip(previous_dicts, new_dicts, strict=True):
+        for key, endpoint_info in previous_dict.items():
+            if endpoint_info["url"] in unfinished and key not in new_dict:
+                new_dict[key] = endpoint_info
+                num_kept += 1
+    return num_kept
+
+
+def _format_completed_fubs(completed_fubs: list[str]) -> str:
+    """Format the function blocks discovered so far for the progress description."""
+    return ", ".join(completed_fubs) if completed_fubs else "-"
+
+
+async def _async_wait_for_progress(
+    task: asyncio.Task, fub_discovered: asyncio.Event
+) -> None:
+    """Wait until the task is done or the next function block has been discovered.
+
+    Used as progress task, so HA shows the progress step again when it finishes.
+    """
+    fub_wait = asyncio.ensure_future(fub_discovered.wait())
+    try:
+        await asyncio.wait({task, fub_wait}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        fub_wait.cancel()
+
+
 class EtaFlowHandler(ConfigFlow, domain=DOMAIN):
     """Config flow for Eta."""
 
@@ -345,6 +459,29 @@ class EtaFlowHandler(ConfigFlow, domain=DOMAIN):
         self._endpoint_discovery_task: asyncio.Task | None = None
         self._endpoint_discovery_error: str | None = None
         self._pending_user_error: str | None = None
+        self._completed_fubs: list[str] = []
+        self._fub_discovered = asyncio.Event()
+        self._progress_task: asyncio.Task | None = None
+        self._fub_node_counts: dict[str, int] = {}
+        # Menu read to count the function blocks, reused by the discovery
+        self._menu: dict[str, list[str]] | None = None
+        # Holds the client shared by all steps of the flow, see get_eta_client
+        self._client_config: dict = {}
+
+    def _get_eta_client(self, host, port) -> EtaAPI:
+        """Return the client shared by all steps of this flow for a terminal."""
+        if (
+            self._client_config.get(CONF_HOST) != host
+            or self._client_config.get(CONF_PORT) != port
+        ):
+            self._client_config = {
+                CONF_HOST: host,
+                CONF_PORT: port,
+                MAX_PARALLEL_REQUESTS: self.data.get(
+                    MAX_PARALLEL_REQUESTS, DEFAULT_MAX_PARALLEL_REQUESTS
+                ),
+            }
+        return get_eta_client(self.hass, self._client_config)
 
     def _on_discovery_progress(self, message: str, progress: float | None) -> None:
         """Forward discovery progress updates to HA's progress tracking."""
@@ -352,6 +489,11 @@ class EtaFlowHandler(ConfigFlow, domain=DOMAIN):
         if progress is not None:
             self.async_update_progress(progress)
 
+    def _on_fub_discovered(self, fub: str, num_entities: int) -> None:
+        """Show a function block on the progress page as soon as it is discovered."""
+        self._completed_fubs.append(f"{fub} ({num_entities})")
+        self._fub_discovered.set()
+
     async def async_step_user(self, user_input=None):
         """Handle a flow initialized by the user."""
         self._errors = {}
@@ -379,6 +521,9 @@ class EtaFlowHandler(ConfigFlow, domain=DOMAIN):
 
             self.data = user_input
             self._endpoint_discovery_error = None
+            self._completed_fubs = []
+            self._fub_node_counts = {}
+            self._menu = None
             self._endpoint_discovery_task = self.hass.async_create_task(
                 self._async_validate_and_discover_endpoints(
                     user_input[CONF_HOST],
@@ -411,10 +556,20 @@ class EtaFlowHandler(ConfigFlow, domain=DOMAIN):
             return await self.async_step_user(self.data)
 
         if not self._endpoint_discovery_task.done():
+            if self._progress_task is None or self._progress_task.done():
+                self._fub_discovered.clear()
+                self._progress_task = self.hass.async_create_task(
+                    _async_wait_for_progress(
+                        self._endpoint_discovery_task, self._fub_discovered
+                    )
+                )
             return self.async_show_progress(
                 step_id="discover_entities",
                 progress_action="discover_entities",
-                progress_task=self._endpoint_discovery_task,
+                description_placeholders={
+                    "completed_fubs": _format_completed_fubs(self._completed_fubs)
+                },
+                progress_task=self._progress_task,
             )
 
         if self._endpoint_discovery_error is not None:
@@ -425,8 +580,53 @@ class EtaFlowHandler(ConfigFlow, domain=DOMAIN):
             return self.async_show_progress_done(next_step_id="user")
 
         self._endpoint_discovery_task = None
+        if self._fub_node_counts and SKIPPED_FUBS not in self.data:
+            return self.async_show_progress_done(next_step_id="select_fubs")
         return self.async_show_progress_done(next_step_id="select_entities")
 
+    async def async_step_select_fubs(self, user_input=None):
+        """Let the user choose the function blocks which are discovered."""
+        self._errors = {}
+        if user_input is not None:
+            selected_fubs = user_input.get(SELECTED_FUBS, [])
+            if selected_fubs:
+                self.data[SKIPPED_FUBS] = [
+                    fub for fub in self._fub_node_counts if fub not in selected_fubs
+                ]
+                self._endpoint_discovery_error = None
+                self._endpoint_discovery_task = self.hass.async_create_task(
+                    self._async_discover_possible_endpoints(
+                        self.data[CONF_HOST],
+                        self.data[CONF_PORT],
+                        self.data[FORCE_LEGACY_MODE],
+                    )
+                )
+                return await self.async_step_discover_entities()
+            self._errors["base"] = "no_fub_selected"
+
+        return self.async_show_form(
+            step_id="select_fubs",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        SELECTED_FUBS, default=list(self._fub_node_counts)
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[
+                                selector.SelectOptionDict(
+                                    value=fub, label=f"{fub} ({num_nodes})"
+                                )
+                                for fub, num_nodes in self._fub_node_counts.items()
+                            ],
+                            mode=selector.SelectSelectorMode.LIST,
+                            multiple=True,
+                        )
+                    ),
+                }
+            ),
+            errors=self._errors,
+        )
+
     async def _async_validate_and_discover_endpoints(
         self, host: str, port: str, force_legacy_mode: bool
     ) -> None:
@@ -455,7 +655,13 @@ class EtaFlowHandler(ConfigFlow, domain=DOMAIN):
                 )
                 return
 
-            await self._async_discover_possible_endpoints(host, port, force_legacy_mode)
+            self._fub_node_counts = await self._get_fub_node_counts(host, port)
+            if len(self._fub_node_counts) <= 1:
+                # There is nothing to choose from, discover everything right away
+                self._fub_node_counts = {}
+                await self._async_discover_possible_endpoints(
+                    host, port, force_legacy_mode
+                )
         except asyncio.CancelledError:
             self._endpoint_discovery_error = None
             raise
@@ -565,6 +771,9 @@ class EtaFlowHandler(ConfigFlow, domain=DOMAIN):
                     ),
                     vol.Required(FORCE_LEGACY_MODE, default=False): cv.boolean,
                     vol.Required(ENABLE_DEBUG_LOGGING, default=False): cv.boolean,
+                    vol.Required(
+                        DISCOVERY_DEADLINE, default=DEFAULT_DISCOVERY_DEADLINE
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
                 }
             ),
             errors=self._errors,
@@ -601,32 +810,41 @@ class EtaFlowHandler(ConfigFlow, domain=DOMAIN):
         force_legacy_mode,
         progress_callback=None,
     ):
-        session = async_get_clientsession(self.hass)
-        eta_client = EtaAPI(
-            session,
-            host,
-            port,
-            max_concurrent_requests=self.data.get(
-                MAX_PARALLEL_REQUESTS, DEFAULT_MAX_PARALLEL_REQUESTS
-            ),
-        )
+        eta_client = self._get_eta_client(host, port)
         float_dict = {}
         switches_dict = {}
         text_dict = {}
         writable_dict = {}
         pending_dict = {}
-        new_api_version = await eta_client.get_all_sensors(
-            force_legacy_mode,
-            float_dict,
-            switches_dict,
-            text_dict,
-            writable_dict,
-            pending_dict,
-            progress_callback=progress_callback,
+        varinfo_cache = await async_get_varinfo_cache(self.hass, host, port)
+        checkpoint = await async_get_discovery_checkpoint(
+            self.hass, host, port, DEFAULT_DISCOVERY_CHECKPOINT_MAX_AGE
         )
+        try:
+            new_api_version = await eta_client.get_all_sensors(
+                force_legacy_mode,
+                float_dict,
+                switches_dict,
+                text_dict,
+                writable_dict,
+                pending_dict,
+                progress_callback=progress_callback,
+                varinfo_cache=varinfo_cache,
+                checkpoint=checkpoint,
+                skip_fubs=self.data.get(SKIPPED_FUBS, ()),
+                fub_callback=self._on_fub_discovered,
+                deadline=self.data.get(DISCOVERY_DEADLINE, DEFAULT_DISCOVERY_DEADLINE)
+                * 60,
+                menu=self._menu,
+            )
+        finally:
+            async_save_varinfo_cache(self.hass, host, port)
+        _remember_discovery_state(self.data, eta_client)
 
         if not new_api_version:
             self._errors["base"] = "legacy_mode_selected"
+        elif self.data.get(UNFINISHED_URIS):
+            self._errors["base"] = "discovery_incomplete"
 
         _LOGGER.debug(
             "Queried sensors: Number of float sensors: %i, Number of switches: %i, Number of text sensors: %i, Number of writable sensors: %i, Number of pending sensors: %i",
@@ -639,10 +857,26 @@ class EtaFlowHandler(ConfigFlow, domain=DOMAIN):
 
         return float_dict, switches_dict, text_dict, writable_dict, pending_dict
 
+    async def _get_fub_node_counts(self, host, port) -> dict[str, int]:
+        """Read the function blocks of the terminal, or nothing if that fails.
+
+        The menu is kept, so that the discovery doesn't have to read it again.
+        """
+        self._on_discovery_progress("Reading function blocks", 0.02)
+        try:
+            self._menu = await self._get_eta_client(host, port).get_menu_endpoints()
+            return count_fub_nodes(self._menu)
+        except Exception:
+            _LOGGER.debug(
+                "Failed to read the function blocks, discovering all of them",
+                exc_info=True,
+            )
+            self._menu = None
+            return {}
+
     async def _test_url(self, host, port):
         """Return true if host port is valid."""
-        session = async_get_clientsession(self.hass)
-        eta_client = EtaAPI(session, host, port)
+        eta_client = self._get_eta_client(host, port)
 
         try:
             does_endpoint_exist = await eta_client.does_endpoint_exists()
@@ -664,10 +898,24 @@ class EtaOptionsFlowHandler(OptionsFlow):
         self._errors = {}
         self.update_sensor_values = False
         self.enumerate_new_endpoints = False
+        self.full_rescan = False
+        self.discovery_changes: ETADiscoveryChanges | None = None
         self.auto_select_all_entities = False
         self.max_parallel_requests = DEFAULT_MAX_PARALLEL_REQUESTS
         self.update_interval = DEFAULT_UPDATE_INTERVAL
-        self.request_semaphore: asyncio.Semaphore | None = None
+        self.value_cache_ttl = DEFAULT_VALUE_CACHE_TTL
+        self.max_reads_per_second = DEFAULT_MAX_READS_PER_SECOND
+        self.max_writes_per_second = DEFAULT_MAX_WRITES_PER_SECOND
+        self.hedged_requests = DEFAULT_HEDGED_REQUESTS
+        self.discovery_checkpoint_max_age = DEFAULT_DISCOVERY_CHECKPOINT_MAX_AGE
+        self.discovery_deadline = DEFAULT_DISCOVERY_DEADLINE
+        self.skipped_fubs: list[str] = []
+        self._fub_node_counts: dict[str, int] = {}
+        self._completed_fubs: list[str] = []
+        self._fub_discovered = asyncio.Event()
+        self._progress_task: asyncio.Task | None = None
+        self.request_semaphore: AdaptiveConcurrencyLimiter | None = None
+        self.http_transport: ETATransport | None = None
         self.unavailable_sensors: dict = {}
         self.advanced_options_writable_sensors = []
         self._options_update_task: asyncio.Task | None = None
@@ -682,43 +930,115 @@ class EtaOptionsFlowHandler(OptionsFlow):
             return None
         return domain_data.get(config_entry.entry_id)
 
-    async def _get_possible_endpoints_with_progress(
-        self, host, port, force_legacy_mode, progress_callback=None
-    ):
-        session = async_get_clientsession(self.hass)
-        eta_client = EtaAPI(
-            session,
+    def _get_transport(self) -> ETATransport | None:
+        """Return the transport of the loaded entry if it is still open."""
+        if self.http_transport is not None and not self.http_transport.closed:
+            return self.http_transport
+        return None
+
+    def _get_session(self):
+        """Return the connection pool of the loaded entry, or the shared session."""
+        transport = self._get_transport()
+        if transport is not None:
+            return transport.session
+        return async_get_clientsession(self.hass)
+
+    def _get_eta_client(self, host, port) -> EtaAPI:
+        """Return the shared client of the loaded entry, or a new one for another terminal."""
+        runtime_config = self._get_runtime_config()
+        if (
+            self._get_transport() is not None
+            and runtime_config is not None
+            and runtime_config.get(CONF_HOST) == host
+            and runtime_config.get(CONF_PORT) == port
+        ):
+            return get_eta_client(self.hass, runtime_config)
+        return EtaAPI(
+            self._get_session(),
             host,
             port,
             max_concurrent_requests=self.data.get(
                 MAX_PARALLEL_REQUESTS, DEFAULT_MAX_PARALLEL_REQUESTS
             ),
             request_semaphore=self.request_semaphore,
+            transport=self._get_transport(),
         )
+
+    async def _get_possible_endpoints_with_progress(
+        self, host, port, force_legacy_mode, progress_callback=None, incremental=False
+    ):
+        eta_client = self._get_eta_client(host, port)
         current_data = self._get_runtime_config()
         if current_data is not None:
             # Set a timestamp in the runtime config to signal coordinators to pause updates during endpoint discovery.
             # Do not use a semaphore here because it is not guaranteed to be released if the task is cancelled.
             current_data[PAUSE_COORDINATORS_START_TIMESTAMP] = time.time()
-        float_dict = {}
-        switches_dict = {}
-        text_dict = {}
-        writable_dict = {}
-        pending_dict = {}
-        new_api_version = await eta_client.get_all_sensors(
-            force_legacy_mode,
-            float_dict,
-            switches_dict,
-            text_dict,
-            writable_dict,
-            pending_dict,
-            progress_callback=progress_callback,
+        if incremental:
+            # Start from the known endpoints, only changed menu entries are discovered again
+            float_dict = copy.deepcopy(self.data[FLOAT_DICT])
+            switches_dict = copy.deepcopy(self.data[SWITCHES_DICT])
+            text_dict = copy.deepcopy(self.data[TEXT_DICT])
+            writable_dict = copy.deepcopy(self.data[WRITABLE_DICT])
+            pending_dict = copy.deepcopy(self.data.get(PENDING_DICT, {}))
+        else:
+            float_dict = {}
+            switches_dict = {}
+            text_dict = {}
+            writable_dict = {}
+            pending_dict = {}
+        varinfo_cache = await async_get_varinfo_cache(self.hass, host, port)
+        checkpoint = await async_get_discovery_checkpoint(
+            self.hass, host, port, self.discovery_checkpoint_max_age
         )
+        if not incremental:
+            # A full rescan reads all metadata from the terminal again
+            varinfo_cache.clear()
+            if checkpoint is not None:
+                checkpoint.discard()
+        try:
+            new_api_version = await eta_client.get_all_sensors(
+                force_legacy_mode,
+                float_dict,
+                switches_dict,
+                text_dict,
+                writable_dict,
+                pending_dict,
+                progress_callback=progress_callback,
+                # A full rescan also checks whether the firmware of the terminal has changed
+                revalidate_api_version=not incremental,
+                incremental=incremental,
+                varinfo_cache=varinfo_cache,
+                checkpoint=checkpoint,
+                skip_fubs=self.data.get(SKIPPED_FUBS, ()),
+                fub_callback=self._on_fub_discovered,
+                deadline=self.discovery_deadline * 60,
+                previous_menu=self.data.get(DISCOVERED_MENU) if incremental else None,
+            )
+        finally:
+            async_save_varinfo_cache(self.hass, host, port)
+        self.discovery_changes = eta_client.last_discovery_changes
+        _remember_discovery_state(self.data, eta_client)
+        if eta_client.last_unfinished_uris:
+            # Don't let the deadline delete entities which simply haven't been checked
+            num_kept = _keep_unfinished_endpoints(
+                eta_client.last_unfinished_uris,
+                [
+                    self.data[FLOAT_DICT],
+                    self.data[SWITCHES_DICT],
+                    self.data[TEXT_DICT],
+                    self.data[WRITABLE_DICT],
+                    self.data.get(PENDING_DICT, {}),
+                ],
+                [float_dict, switches_dict, text_dict, writable_dict, pending_dict],
+            )
+            _LOGGER.debug("Kept %d entities of unfinished endpoints", num_kept)
         if current_data is not None:
             current_data[PAUSE_COORDINATORS_START_TIMESTAMP] = None
 
         if not new_api_version:
             self._errors["base"] = "legacy_mode_selected"
+        elif self.data.get(UNFINISHED_URIS):
+            self._errors["base"] = "discovery_incomplete"
 
         return float_dict, switches_dict, text_dict, writable_dict, pending_dict
 
@@ -728,6 +1048,20 @@ class EtaOptionsFlowHandler(OptionsFlow):
         if progress is not None:
             self.async_update_progress(progress)
 
+    def _on_fub_discovered(self, fub: str, num_entities: int) -> None:
+        """Show a function block on the progress page as soon as it is discovered."""
+        self._completed_fubs.append(f"{fub} ({num_entities})")
+        self._fub_discovered.set()
+
+    @callback
+    def async_remove(self) -> None:
+        """Cancel the entity preparation if the options flow is aborted/removed."""
+        if (
+            self._options_update_task is not None
+            and not self._options_update_task.done()
+        ):
+            self._options_update_task.cancel()
+
     async def async_step_init(self, user_input=None):  # noqa: D102
         self._errors = {}
         if self._pending_init_error is not None:
@@ -740,9 +1074,29 @@ class EtaOptionsFlowHandler(OptionsFlow):
             MAX_PARALLEL_REQUESTS, DEFAULT_MAX_PARALLEL_REQUESTS
         )
         self.request_semaphore = current_data.get(REQUEST_SEMAPHORE)
+        self.http_transport = current_data.get(HTTP_TRANSPORT)
         self.update_interval = current_data.get(
             UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
         )
+        self.value_cache_ttl = current_data.get(
+            VALUE_CACHE_TTL, DEFAULT_VALUE_CACHE_TTL
+        )
+        self.max_reads_per_second = current_data.get(
+            MAX_READS_PER_SECOND, DEFAULT_MAX_READS_PER_SECOND
+        )
+        self.max_writes_per_second = current_data.get(
+            MAX_WRITES_PER_SECOND, DEFAULT_MAX_WRITES_PER_SECOND
+        )
+        self.hedged_requests = current_data.get(
+            HEDGED_REQUESTS, DEFAULT_HEDGED_REQUESTS
+        )
+        self.discovery_checkpoint_max_age = current_data.get(
+            DISCOVERY_CHECKPOINT_MAX_AGE, DEFAULT_DISCOVERY_CHECKPOINT_MAX_AGE
+        )
+        self.discovery_deadline = current_data.get(
+            DISCOVERY_DEADLINE, DEFAULT_DISCOVERY_DEADLINE
+        )
+        self.skipped_fubs = list(current_data.get(SKIPPED_FUBS, []))
 
         if user_input is not None:
             selected_action = user_input[OPTIONS_UPDATE_ACTION]
@@ -750,32 +1104,163 @@ class EtaOptionsFlowHandler(OptionsFlow):
             self.update_sensor_values = selected_action in (
                 OPTIONS_ACTION_UPDATE_SELECTED,
                 OPTIONS_ACTION_REDISCOVER_AND_UPDATE,
+                OPTIONS_ACTION_FULL_RESCAN,
             )
-            self.enumerate_new_endpoints = (
-                selected_action == OPTIONS_ACTION_REDISCOVER_AND_UPDATE
+            self.enumerate_new_endpoints = selected_action in (
+                OPTIONS_ACTION_REDISCOVER_AND_UPDATE,
+                OPTIONS_ACTION_FULL_RESCAN,
             )
+            self.full_rescan = selected_action == OPTIONS_ACTION_FULL_RESCAN
 
             if not self.update_sensor_values and not self.enumerate_new_endpoints:
                 return await self.async_step_parallel_requests()
 
-            self._options_update_error = None
-            self._options_update_task = self.hass.async_create_task(
-                self._async_prepare_entity_selection()
-            )
-            return await self.async_step_prepare_entities()
+            if self.enumerate_new_endpoints:
+                return await self.async_step_select_fubs()
+
+            return await self._start_entity_preparation()
 
         return await self._show_initial_option_screen()
 
+    async def async_step_select_fubs(self, user_input=None):
+        """Let the user choose function blocks which are not discovered."""
+        self._errors = {}
+        current_data = self._get_runtime_config()
+        if current_data is None:
+            return self.async_abort(reason="integration_busy")
+
+        if user_input is None:
+            eta_client = self._get_eta_client(
+                current_data[CONF_HOST], current_data[CONF_PORT]
+            )
+            try:
+                self._fub_node_counts = await eta_client.get_fub_node_counts()
+            except Exception:
+                _LOGGER.debug(
+                    "Failed to read the function blocks, keeping the skipped ones",
+                    exc_info=True,
+                )
+                return await self._start_rediscovery(current_data, False)
+            return self._show_select_fubs_form(self.skipped_fubs)
+
+        skipped_fubs = list(user_input.get(SKIPPED_FUBS, []))
+        if self._fub_node_counts and set(self._fub_node_counts) <= set(skipped_fubs):
+            self._errors["base"] = "no_fub_selected"
+            return self._show_select_fubs_form(skipped_fubs)
+        fubs_changed = set(skipped_fubs) != set(self.skipped_fubs)
+        self.skipped_fubs = skipped_fubs
+        return await self._start_rediscovery(current_data, fubs_changed)
+
+    def _show_select_fubs_form(self, skipped_fubs: list[str]):
+        """Show the form to choose the skipped function blocks."""
+        return self.async_show_form(
+            step_id="select_fubs",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        SKIPPED_FUBS,
+                        default=[
+                            fub for fub in skipped_fubs if fub in self._fub_node_counts
+                        ],
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[
+                                selector.SelectOptionDict(
+                                    value=fub, label=f"{fub} ({num_nodes})"
+                                )
+                                for fub, num_nodes in self._fub_node_counts.items()
+                            ],
+                            mode=selector.SelectSelectorMode.LIST,
+                            multiple=True,
+                        )
+                    ),
+                }
+            ),
+            errors=self._errors,
+        )
+
+    async def _start_rediscovery(self, current_data: dict, fubs_changed: bool):
+        """Start the rediscovery, unless the user wants to keep an unchanged menu."""
+        if (
+            not self.full_rescan
+            and not fubs_changed
+            and await self._is_menu_unchanged(current_data)
+        ):
+            return await self.async_step_menu_unchanged()
+        return await self._start_entity_preparation()
+
+    async def _start_entity_preparation(self):
+        """Prepare the entity data in the background and show the progress."""
+        self._options_update_error = None
+        self._completed_fubs = []
+        self._options_update_task = self.hass.async_create_task(
+            self._async_prepare_entity_selection()
+        )
+        return await self.async_step_prepare_entities()
+
+    async def _is_menu_unchanged(self, current_data: dict) -> bool:
+        """Return True if the menu of the terminal is the same as during a recent discovery."""
+        fingerprint = current_data.get(MENU_FINGERPRINT)
+        discovered_at = current_data.get(MENU_DISCOVERED_AT)
+        if (
+            # An unfinished discovery has to be completed even if the menu is the same
+            current_data.get(UNFINISHED_URIS)
+            or fingerprint is None
+            or discovered_at is None
+            or time.time() - discovered_at > MENU_FINGERPRINT_MAX_AGE
+        ):
+            return False
+        eta_client = self._get_eta_client(
+            current_data[CONF_HOST], current_data[CONF_PORT]
+        )
+        try:
+            current_fingerprint = await eta_client.get_menu_fingerprint()
+        except Exception:
+            _LOGGER.debug("Failed to read the menu, rediscovering", exc_info=True)
+            return False
+        return current_fingerprint == fingerprint
+
+    async def async_step_menu_unchanged(self, user_input=None):
+        """Offer to keep the discovered entities if the menu hasn't changed."""
+        if user_input is None:
+            return self.async_show_form(
+                step_id="menu_unchanged",
+                data_schema=vol.Schema(
+                    {
+                        vol.Required(
+                            OPTIONS_KEEP_DISCOVERED_ENTITIES, default=True
+                        ): cv.boolean,
+                    }
+                ),
+            )
+
+        if user_input[OPTIONS_KEEP_DISCOVERED_ENTITIES]:
+            _LOGGER.info(
+                "Menu is unchanged, only updating the values of known entities"
+            )
+            self.enumerate_new_endpoints = False
+        return await self._start_entity_preparation()
+
     async def async_step_prepare_entities(self, user_input=None):
         """Show progress while preparing entity data in the options flow."""
         if self._options_update_task is None:
             return await self.async_step_init()
 
         if not self._options_update_task.done():
+            if self._progress_task is None or self._progress_task.done():
+                self._fub_discovered.clear()
+                self._progress_task = self.hass.async_create_task(
+                    _async_wait_for_progress(
+                        self._options_update_task, self._fub_discovered
+                    )
+                )
             return self.async_show_progress(
                 step_id="prepare_entities",
                 progress_action="prepare_entities",
-                progress_task=self._options_update_task,
+                description_placeholders={
+                    "completed_fubs": _format_completed_fubs(self._completed_fubs)
+                },
+                progress_task=self._progress_task,
             )
 
         if self._options_update_error is not None:
@@ -822,6 +1307,7 @@ class EtaOptionsFlowHandler(OptionsFlow):
                                 OPTIONS_ACTION_PARALLEL_ONLY,
                                 OPTIONS_ACTION_UPDATE_SELECTED,
                                 OPTIONS_ACTION_REDISCOVER_AND_UPDATE,
+                                OPTIONS_ACTION_FULL_RESCAN,
                             ],
                             mode=selector.SelectSelectorMode.DROPDOWN,
                             multiple=False,
@@ -853,9 +1339,70 @@ class EtaOptionsFlowHandler(OptionsFlow):
         if default_update_interval not in update_interval_options:
             default_update_interval = str(DEFAULT_UPDATE_INTERVAL)
 
+        value_cache_ttl_options = ["0", "2", "5", "10"]
+        default_value_cache_ttl = str(
+            current_data.get(VALUE_CACHE_TTL, DEFAULT_VALUE_CACHE_TTL)
+        )
+        if default_value_cache_ttl not in value_cache_ttl_options:
+            default_value_cache_ttl = str(DEFAULT_VALUE_CACHE_TTL)
+
+        max_reads_per_second_options = ["0", "5", "10", "20", "50"]
+        default_max_reads_per_second = str(
+            current_data.get(MAX_READS_PER_SECOND, DEFAULT_MAX_READS_PER_SECOND)
+        )
+        if default_max_reads_per_second not in max_reads_per_second_options:
+            default_max_reads_per_second = str(DEFAULT_MAX_READS_PER_SECOND)
+
+        max_writes_per_second_options = ["0", "1", "2", "5"]
+        default_max_writes_per_second = str(
+            current_data.get(MAX_WRITES_PER_SECOND, DEFAULT_MAX_WRITES_PER_SECOND)
+        )
+        if default_max_writes_per_second not in max_writes_per_second_options:
+            default_max_writes_per_second = str(DEFAULT_MAX_WRITES_PER_SECOND)
+
+        default_hedged_requests = bool(
+            current_data.get(HEDGED_REQUESTS, DEFAULT_HEDGED_REQUESTS)
+        )
+
+        checkpoint_max_age_options = ["0", "15", "60", "240", "1440"]
+        default_checkpoint_max_age = str(
+            current_data.get(
+                DISCOVERY_CHECKPOINT_MAX_AGE, DEFAULT_DISCOVERY_CHECKPOINT_MAX_AGE
+            )
+        )
+        if default_checkpoint_max_age not in checkpoint_max_age_options:
+            default_checkpoint_max_age = str(DEFAULT_DISCOVERY_CHECKPOINT_MAX_AGE)
+
+        discovery_deadline_options = ["0", "5", "10", "20", "30", "60"]
+        default_discovery_deadline = str(
+            current_data.get(DISCOVERY_DEADLINE, DEFAULT_DISCOVERY_DEADLINE)
+        )
+        if default_discovery_deadline not in discovery_deadline_options:
+            default_discovery_deadline = str(DEFAULT_DISCOVERY_DEADLINE)
+
         if user_input is not None:
             self.max_parallel_requests = int(user_input[MAX_PARALLEL_REQUESTS])
             self.update_interval = int(user_input[UPDATE_INTERVAL])
+            self.value_cache_ttl = int(
+                user_input.get(VALUE_CACHE_TTL, DEFAULT_VALUE_CACHE_TTL)
+            )
+            self.max_reads_per_second = int(
+                user_input.get(MAX_READS_PER_SECOND, DEFAULT_MAX_READS_PER_SECOND)
+            )
+            self.max_writes_per_second = int(
+                user_input.get(MAX_WRITES_PER_SECOND, DEFAULT_MAX_WRITES_PER_SECOND)
+            )
+            self.hedged_requests = bool(
+                user_input.get(HEDGED_REQUESTS, DEFAULT_HEDGED_REQUESTS)
+            )
+            self.discovery_checkpoint_max_age = int(
+                user_input.get(
+                    DISCOVERY_CHECKPOINT_MAX_AGE, DEFAULT_DISCOVERY_CHECKPOINT_MAX_AGE
+                )
+            )
+            self.discovery_deadline = int(
+                user_input.get(DISCOVERY_DEADLINE, DEFAULT_DISCOVERY_DEADLINE)
+            )
             data = {
                 CHOSEN_FLOAT_SENSORS: current_data[CHOSEN_FLOAT_SENSORS],
                 CHOSEN_SWITCHES: current_data[CHOSEN_SWITCHES],
@@ -869,12 +1416,20 @@ class EtaOptionsFlowHandler(OptionsFlow):
                 PENDING_DICT: current_data.get(PENDING_DICT, {}),
                 MAX_PARALLEL_REQUESTS: self.max_parallel_requests,
                 UPDATE_INTERVAL: self.update_interval,
+                VALUE_CACHE_TTL: self.value_cache_ttl,
+                MAX_READS_PER_SECOND: self.max_reads_per_second,
+                MAX_WRITES_PER_SECOND: self.max_writes_per_second,
+                HEDGED_REQUESTS: self.hedged_requests,
+                DISCOVERY_CHECKPOINT_MAX_AGE: self.discovery_checkpoint_max_age,
+                DISCOVERY_DEADLINE: self.discovery_deadline,
+                SKIPPED_FUBS: current_data.get(SKIPPED_FUBS, []),
                 CONF_HOST: current_data[CONF_HOST],
                 CONF_PORT: current_data[CONF_PORT],
                 ADVANCED_OPTIONS_IGNORE_DECIMAL_PLACES_RESTRICTION: current_data.get(
                     ADVANCED_OPTIONS_IGNORE_DECIMAL_PLACES_RESTRICTION, []
                 ),
                 FORCE_LEGACY_MODE: current_data[FORCE_LEGACY_MODE],
+                **_discovery_state_data(current_data),
             }
             return self.async_create_entry(title="", data=data)
 
@@ -906,20 +1461,76 @@ class EtaOptionsFlowHandler(OptionsFlow):
                             multiple=False,
                         )
                     ),
+                    vol.Required(
+                        VALUE_CACHE_TTL, default=default_value_cache_ttl
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[
+                                selector.SelectOptionDict(value=v, label=f"{v}s")
+                                for v in value_cache_ttl_options
+                            ],
+                            mode=selector.SelectSelectorMode.DROPDOWN,
+                            multiple=False,
+                        )
+                    ),
+                    vol.Required(
+                        MAX_READS_PER_SECOND, default=default_max_reads_per_second
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[
+                                selector.SelectOptionDict(value=v, label=v)
+                                for v in max_reads_per_second_options
+                            ],
+                            mode=selector.SelectSelectorMode.DROPDOWN,
+                            multiple=False,
+                        )
+                    ),
+                    vol.Required(
+                        MAX_WRITES_PER_SECOND, default=default_max_writes_per_second
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[
+                                selector.SelectOptionDict(value=v, label=v)
+                                for v in max_writes_per_second_options
+                            ],
+                            mode=selector.SelectSelectorMode.DROPDOWN,
+                            multiple=False,
+                        )
+                    ),
+                    vol.Required(
+                        HEDGED_REQUESTS, default=default_hedged_requests
+                    ): cv.boolean,
+                    vol.Required(
+                        DISCOVERY_CHECKPOINT_MAX_AGE, default=default_checkpoint_max_age
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[
+                                selector.SelectOptionDict(value=v, label=f"{v} min")
+                                for v in checkpoint_max_age_options
+                            ],
+                            mode=selector.SelectSelectorMode.DROPDOWN,
+                            multiple=False,
+                        )
+                    ),
+                    vol.Required(
+                        DISCOVERY_DEADLINE, default=default_discovery_deadline
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[
+                                selector.SelectOptionDict(value=v, label=f"{v} min")
+                                for v in discovery_deadline_options
+                            ],
+                            mode=selector.SelectSelectorMode.DROPDOWN,
+                            multiple=False,
+                        )
+                    ),
                 }
             ),
             errors=self._errors,
         )
 
     async def _update_sensor_values(self):
-        session = async_get_clientsession(self.hass)
-        eta_client = EtaAPI(
-            session,
-            self.data[CONF_HOST],
-            self.data[CONF_PORT],
-            max_concurrent_requests=self.data[MAX_PARALLEL_REQUESTS],
-            request_semaphore=self.request_semaphore,
-        )
+        eta_client = self._get_eta_client(self.data[CONF_HOST], self.data[CONF_PORT])
 
         sensor_list: dict[str, dict[str, bool]] = {
             value["url"]: {} for value in self.data[FLOAT_DICT].values()
@@ -940,7 +1551,8 @@ class EtaOptionsFlowHandler(OptionsFlow):
             }
         )
         # first request the values for all possible sensors
-        all_data = await eta_client.get_all_data(sensor_list)
+        with request_priority(RequestPriority.BACKGROUND):
+            all_data = await eta_client.get_all_data(sensor_list)
 
         # then loop through our lists of sensors and update the values
         for category_key in [FLOAT_DICT, SWITCHES_DICT, TEXT_DICT, WRITABLE_DICT]:
@@ -1100,6 +1712,14 @@ class EtaOptionsFlowHandler(OptionsFlow):
         )
         self.data[MAX_PARALLEL_REQUESTS] = self.max_parallel_requests
         self.data[UPDATE_INTERVAL] = self.update_interval
+        self.data[VALUE_CACHE_TTL] = self.value_cache_ttl
+        self.data[MAX_READS_PER_SECOND] = self.max_reads_per_second
+        self.data[MAX_WRITES_PER_SECOND] = self.max_writes_per_second
+        self.data[HEDGED_REQUESTS] = self.hedged_requests
+        self.data[DISCOVERY_CHECKPOINT_MAX_AGE] = self.discovery_checkpoint_max_age
+        self.data[DISCOVERY_DEADLINE] = self.discovery_deadline
+        self.data[SKIPPED_FUBS] = self.skipped_fubs
+        self.data.update(_discovery_state_data(current_data))
         self._on_options_progress("Loaded current configuration", 0.1)
 
         if self.enumerate_new_endpoints:
@@ -1116,7 +1736,15 @@ class EtaOptionsFlowHandler(OptionsFlow):
                 self.data[CONF_PORT],
                 self.data[FORCE_LEGACY_MODE],
                 progress_callback=self._on_options_progress,
+                incremental=not self.full_rescan,
             )
+            if self.discovery_changes is not None:
+                _LOGGER.info(
+                    "Reused %i known endpoints, discovered %i changed endpoints, %i endpoints were removed from the menu",
+                    len(self.discovery_changes["reused"]),
+                    len(self.discovery_changes["discovered"]),
+                    len(self.discovery_changes["removed"]),
+                )
 
             removed_pending_count = self._verify_pending_sensors(
                 new_pending_sensors, new_float_sensors, self.data[FLOAT_DICT]
@@ -1155,6 +1783,9 @@ class EtaOptionsFlowHandler(OptionsFlow):
             self._handle_sensor_value_updates_from_enumeration(
                 new_float_sensors, new_switches, new_text_sensors, new_writable_sensors
             )
+            if self.discovery_changes is not None and self.discovery_changes["reused"]:
+                # The values of reused endpoints are still the ones from the previous discovery
+                await self._update_sensor_values()
             _LOGGER.info("Updated sensor values")
             self._on_options_progress("Updated values for rediscovered entities", 0.98)
 
@@ -1268,12 +1899,20 @@ class EtaOptionsFlowHandler(OptionsFlow):
                 PENDING_DICT: self.data[PENDING_DICT],
                 MAX_PARALLEL_REQUESTS: self.data[MAX_PARALLEL_REQUESTS],
                 UPDATE_INTERVAL: self.data[UPDATE_INTERVAL],
+                VALUE_CACHE_TTL: self.data[VALUE_CACHE_TTL],
+                MAX_READS_PER_SECOND: self.data[MAX_READS_PER_SECOND],
+                MAX_WRITES_PER_SECOND: self.data[MAX_WRITES_PER_SECOND],
+                HEDGED_REQUESTS: self.data[HEDGED_REQUESTS],
+                DISCOVERY_CHECKPOINT_MAX_AGE: self.data[DISCOVERY_CHECKPOINT_MAX_AGE],
+                DISCOVERY_DEADLINE: self.data[DISCOVERY_DEADLINE],
+                SKIPPED_FUBS: self.data[SKIPPED_FUBS],
                 CONF_HOST: self.data[CONF_HOST],
                 CONF_PORT: self.data[CONF_PORT],
                 ADVANCED_OPTIONS_IGNORE_DECIMAL_PLACES_RESTRICTION: self.data[
                     ADVANCED_OPTIONS_IGNORE_DECIMAL_PLACES_RESTRICTION
                 ],
                 FORCE_LEGACY_MODE: self.data[FORCE_LEGACY_MODE],
+                **_discovery_state_data(self.data),
             }
 
             # only show advanced options for writable sensors that do not have a custom unit like time sensors
@@ -28,6 +28,8 @@ OPTIONS_UPDATE_ACTION = "options_update_action"
 OPTIONS_ACTION_PARALLEL_ONLY = "update_parallel_requests"
 OPTIONS_ACTION_UPDATE_SELECTED = "update_selected_entities"
 OPTIONS_ACTION_REDISCOVER_AND_UPDATE = "rediscover_and_update_entities"
+OPTIONS_ACTION_FULL_RESCAN = "full_rescan_and_update_entities"
+OPTIONS_KEEP_DISCOVERED_ENTITIES = "keep_discovered_entities"
 ADVANCED_OPTIONS_IGNORE_DECIMAL_PLACES_RESTRICTION = (
     "ignore_decimal_places_restriction_for_writable_entities"
 )
@@ -66,7 +68,39 @@ INVISIBLE_UNITS = [
 
 MAX_PARALLEL_REQUESTS = "max_parallel_requests"
 REQUEST_SEMAPHORE = "request_semaphore"
+HTTP_TRANSPORT = "http_transport"
+ETA_CLIENT = "eta_client"
+# Name of the server-side variable set used for batched reads of the sensor coordinator
+VARSET_NAME = "ha_eta_webservices"
+# Number of consecutive failed batched reads before falling back to per-endpoint reads
+VARSET_MAX_FAILURES = 3
+# Number of requests which change the variable set at the same time
+VARSET_SYNC_MAX_CONCURRENCY = 2
 UPDATE_INTERVAL = "update_interval"
+VALUE_CACHE_TTL = "value_cache_ttl"
+MAX_READS_PER_SECOND = "max_reads_per_second"
+MAX_WRITES_PER_SECOND = "max_writes_per_second"
+HEDGED_REQUESTS = "hedged_requests"
+DISCOVERY_CHECKPOINT_MAX_AGE = "discovery_checkpoint_max_age"
+DISCOVERY_DEADLINE = "discovery_deadline"
+# URIs which were not discovered before the discovery deadline expired
+UNFINISHED_URIS = "unfinished_uris"
+# Function blocks (top level menu entries) which are not discovered
+SKIPPED_FUBS = "skipped_fubs"
+SELECTED_FUBS = "selected_fubs"
+# Detected API version of the terminal and the time it was detected, saved with the entry
+API_VERSION = "api_version"
+API_VERSION_DETECTED_AT = "api_version_detected_at"
+# Fingerprint of the menu during the last discovery and the time of that discovery
+MENU_FINGERPRINT = "menu_fingerprint"
+MENU_DISCOVERED_AT = "menu_discovered_at"
+# Menu entries the last discovery was based on, an incremental discovery only
+# discovers the entries which differ from them
+DISCOVERED_MENU = "discovered_menu"
+# Varinfo caches per terminal in hass.data, shared by all entries and config flows
+VARINFO_CACHES = "eta_webservices_varinfo_caches"
+# Checkpoints of running discoveries per terminal in hass.data
+DISCOVERY_CHECKPOINTS = "eta_webservices_discovery_checkpoints"
 PAUSE_COORDINATORS_START_TIMESTAMP = "pause_coordinators_start_timestamp"
 PAUSE_COORDINATORS_MAX_DURATION = 10 * 60  # seconds
 
@@ -74,7 +108,50 @@ PAUSE_COORDINATORS_MAX_DURATION = 10 * 60  # seconds
 DEFAULT_NAME = DOMAIN
 REQUEST_TIMEOUT = 60
 DEFAULT_MAX_PARALLEL_REQUESTS = 5
+# Idle pooled connections are kept long enough to be reused within an update cycle,
+# but closed before the terminal drops them on its own
+CONNECTION_KEEPALIVE_TIMEOUT = 15  # seconds
+CONNECTION_DNS_CACHE_TTL = 5 * 60  # seconds
 DEFAULT_UPDATE_INTERVAL = 60  # seconds
+DEFAULT_VALUE_CACHE_TTL = 0  # seconds, 0 disables the value cache
+VALUE_CACHE_MAX_SIZE = 1024  # endpoints
+# Request rate limits per terminal, 0 disables the limit
+DEFAULT_MAX_READS_PER_SECOND = 0
+DEFAULT_MAX_WRITES_PER_SECOND = 0
+# Consecutive connection failures after which requests to the terminal fail fast
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+CIRCUIT_BREAKER_RESET_TIMEOUT = (
+    30  # seconds until an unreachable terminal is probed again
+)
+CIRCUIT_BREAKER_PROBE_TIMEOUT = 10  # seconds
+# Timeouts of a single request, a hung socket must not stall the whole update
+REQUEST_CONNECT_TIMEOUT = 5  # seconds
+REQUEST_READ_TIMEOUT = 15  # seconds without receiving data
+# Retries of idempotent GET requests after timeouts and connection errors
+REQUEST_MAX_RETRIES = 2
+REQUEST_RETRY_BASE_DELAY = 0.5  # seconds
+REQUEST_RETRY_MAX_DELAY = 4  # seconds
+# Upper bound for all attempts of a request, stays below REQUEST_TIMEOUT so that
+# retries end before the update of a coordinator times out
+REQUEST_RETRY_MAX_TOTAL_TIME = 45  # seconds
+# Age after which a saved API version is checked again before a discovery,
+# e.g. to notice firmware updates which add the varinfo endpoint
+API_VERSION_MAX_AGE = 30 * 24 * 60 * 60  # seconds
+# Age after which a rediscovery runs even if the menu of the terminal is unchanged
+MENU_FINGERPRINT_MAX_AGE = 7 * 24 * 60 * 60  # seconds
+# Varinfo metadata survives restarts and removing the entry, it is saved to disk
+# shortly after a discovery
+VARINFO_CACHE_STORAGE_VERSION = 1
+VARINFO_CACHE_SAVE_DELAY = 10  # seconds
+# An interrupted discovery is resumed if it was started within this time
+DEFAULT_DISCOVERY_CHECKPOINT_MAX_AGE = 60  # minutes, 0 disables checkpoints
+DISCOVERY_CHECKPOINT_STORAGE_VERSION = 1
+# Time after which a discovery stops and keeps the entities found so far
+DEFAULT_DISCOVERY_DEADLINE = 0  # minutes, 0 disables the deadline
+# Number of writes of a batch which are sent to the terminal at the same time
+WRITE_BATCH_MAX_CONCURRENCY = 2
+# Send a duplicate of variable reads which take longer than usual
+DEFAULT_HEDGED_REQUESTS = False
 COORDINATOR_WARNING_INTERVAL = (
     30 * 60
 )  # seconds between coordinator performance warnings
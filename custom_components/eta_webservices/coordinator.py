@@ -10,10 +10,17 @@ import time
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_PORT
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-
-from .api import EtaAPI, ETAEndpoint, ETAError
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .api import (
+    APIClient,
+    EtaAPI,
+    ETAEndpoint,
+    ETAError,
+    ETATerminalUnavailableError,
+    RequestPriority,
+    request_priority,
+)
 from .const import (
     CHOSEN_FLOAT_SENSORS,
     CHOSEN_PENDING_SENSORS,
@@ -29,17 +36,18 @@ from .const import (
     DOMAIN,
     FLOAT_DICT,
     LAST_COORDINATOR_WARNING_TIMESTAMP,
-    MAX_PARALLEL_REQUESTS,
     PAUSE_COORDINATORS_MAX_DURATION,
     PAUSE_COORDINATORS_START_TIMESTAMP,
     PENDING_DICT,
-    REQUEST_SEMAPHORE,
     REQUEST_TIMEOUT,
     SWITCHES_DICT,
     TEXT_DICT,
     UPDATE_INTERVAL,
+    VARSET_MAX_FAILURES,
+    VARSET_NAME,
     WRITABLE_DICT,
 )
+from .utils import get_eta_client
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -52,9 +60,7 @@ class ETAErrorUpdateCoordinator(DataUpdateCoordinator[list[ETAError]]):
         self.config = config
         self.host = config.get(CONF_HOST, "")
         self.port = config.get(CONF_PORT, "")
-        self.session = async_get_clientsession(hass)
-        self.max_parallel_requests = int(config.get(MAX_PARALLEL_REQUESTS, 5))
-        self.request_semaphore = config.get(REQUEST_SEMAPHORE)
+        self.eta_client = get_eta_client(hass, config)
 
         super().__init__(
             hass,
@@ -65,15 +71,6 @@ class ETAErrorUpdateCoordinator(DataUpdateCoordinator[list[ETAError]]):
             ),
         )
 
-    def _create_eta_client(self):
-        return EtaAPI(
-            self.session,
-            self.host,
-            self.port,
-            max_concurrent_requests=self.max_parallel_requests,
-            request_semaphore=self.request_semaphore,
-        )
-
     def _handle_error_events(self, new_errors: list[ETAError]):
         old_errors = self.data
         if old_errors is None:
@@ -106,10 +103,13 @@ class ETAErrorUpdateCoordinator(DataUpdateCoordinator[list[ETAError]]):
             _LOGGER.debug("Skipping error update because coordinators are paused")
             return []
 
-        eta_client = self._create_eta_client()
+        eta_client = self.eta_client
 
         async with timeout(REQUEST_TIMEOUT):
-            errors = await eta_client.get_errors()
+            try:
+                errors = await eta_client.get_errors()
+            except ETATerminalUnavailableError as err:
+                raise UpdateFailed(str(err)) from err
             self._handle_error_events(errors)
             return errors
 
@@ -122,9 +122,7 @@ class ETASensorUpdateCoordinator(DataUpdateCoordinator[dict[str, float | str | b
         self.config = config
         self.host = config.get(CONF_HOST, "")
         self.port = config.get(CONF_PORT, "")
-        self.session = async_get_clientsession(hass)
-        self.max_parallel_requests = int(config.get(MAX_PARALLEL_REQUESTS, 5))
-        self.request_semaphore = config.get(REQUEST_SEMAPHORE)
+        self.eta_client = get_eta_client(hass, config)
 
         self.chosen_float_sensors: list[str] = config[CHOSEN_FLOAT_SENSORS]
         self.chosen_switches: list[str] = config[CHOSEN_SWITCHES]
@@ -140,6 +138,13 @@ class ETASensorUpdateCoordinator(DataUpdateCoordinator[dict[str, float | str | b
         self.switch_queries: dict[str, tuple[str, int, int]] = {}
         self._build_queries()
 
+        # State of the server-side variable set used to read all values with a single request.
+        # None means that the set has to be (re)created on the terminal.
+        self.varset_supported = True
+        self._varset_uris: set[str] | None = None
+        self._varset_rejected_uris: set[str] = set()
+        self._varset_failures = 0
+
         super().__init__(
             hass,
             _LOGGER,
@@ -149,15 +154,6 @@ class ETASensorUpdateCoordinator(DataUpdateCoordinator[dict[str, float | str | b
             ),
         )
 
-    def _create_eta_client(self):
-        return EtaAPI(
-            self.session,
-            self.host,
-            self.port,
-            max_concurrent_requests=self.max_parallel_requests,
-            request_semaphore=self.request_semaphore,
-        )
-
     def _build_queries(self) -> None:
         # Exclude float sensors that are also writable, they are handled by writable coordinator.
         for sensor in self.chosen_float_sensors:
@@ -210,6 +206,65 @@ class ETASensorUpdateCoordinator(DataUpdateCoordinator[dict[str, float | str | b
 
             self.switch_queries[switch] = (endpoint["url"], on_value, off_value)
 
+    def _build_uri_sensor_queries(self) -> dict[str, dict[str, bool]]:
+        uri_sensor_queries: dict[str, dict[str, bool]] = {}
+        # Multiple entities can point to the same URI; query each endpoint only once.
+        for uri, force_string_handling in self.sensor_queries.values():
+            if uri not in uri_sensor_queries:
+                uri_sensor_queries[uri] = {}
+            if force_string_handling:
+                uri_sensor_queries[uri]["force_string_handling"] = True
+        return uri_sensor_queries
+
+    async def async_refresh_uris(self, uris: set[str]) -> None:
+        """Read only the given endpoints and merge their values into the current data.
+
+        Used after a batch of writes, so that the written values show up without a
+        full update. Endpoints which are not handled by this coordinator are ignored.
+
+        :param uris: Endpoint URIs in any form accepted by `normalize_uri`
+        """
+        wanted = {APIClient.normalize_uri(uri) for uri in uris}
+        sensor_queries = {
+            uri: query
+            for uri, query in self._build_uri_sensor_queries().items()
+            if APIClient.normalize_uri(uri) in wanted
+        }
+        switch_queries = [
+            (uri, on_value)
+            for uri, on_value, _ in self.switch_queries.values()
+            if APIClient.normalize_uri(uri) in wanted
+        ]
+        if not sensor_queries and not switch_queries:
+            return
+
+        eta_client = self.eta_client
+        try:
+            with request_priority(RequestPriority.WRITE_REFRESH):
+                async with timeout(REQUEST_TIMEOUT):
+                    data: dict[str, float | str | bool] = (
+                        await eta_client.get_all_data(sensor_queries)
+                        if sensor_queries
+                        else {}
+                    )
+                    switch_states = (
+                        await eta_client.get_all_switch_states(
+                            list(dict.fromkeys(uri for uri, _ in switch_queries))
+                        )
+                        if switch_queries
+                        else {}
+                    )
+        except ETATerminalUnavailableError as err:
+            _LOGGER.debug("Skipping refresh of written endpoints: %s", err)
+            return
+
+        for uri, on_value in switch_queries:
+            result = switch_states.get(uri)
+            if result is None or isinstance(result, BaseException):
+                continue
+            data[uri] = int(result) == on_value
+        self.async_set_updated_data({**(self.data or {}), **data})
+
     async def _async_update_data(self) -> dict[str, float | str | bool]:
         """Update data via library."""
         if (
@@ -226,34 +281,50 @@ class ETASensorUpdateCoordinator(DataUpdateCoordinator[dict[str, float | str | b
             return {}
 
         start_time = time.monotonic()
-        eta_client = self._create_eta_client()
+        eta_client = self.eta_client
         data: dict[str, float | str | bool] = {}
 
-        uri_sensor_queries: dict[str, dict[str, bool]] = {}
-        # Multiple entities can point to the same URI; query each endpoint only once.
-        for uri, force_string_handling in self.sensor_queries.values():
-            if uri not in uri_sensor_queries:
-                uri_sensor_queries[uri] = {}
-            if force_string_handling:
-                uri_sensor_queries[uri]["force_string_handling"] = True
-
-        async with timeout(REQUEST_TIMEOUT):
-            if uri_sensor_queries:
-                data = await eta_client.get_all_data(uri_sensor_queries)
+        uri_sensor_queries = self._build_uri_sensor_queries()
+        unique_switch_uris = list(
+            # Query shared switch URIs only once
+            dict.fromkeys([uri for uri, _, _ in self.switch_queries.values()])
+        )
 
-            if self.switch_queries:
-                unique_switch_uris = list(
-                    # Query shared switch URIs only once
-                    dict.fromkeys([uri for uri, _, _ in self.switch_queries.values()])
-                )
-                all_switch_states = await eta_client.get_all_switch_states(
-                    unique_switch_uris
-                )
-                for uri, on_value, _ in self.switch_queries.values():
-                    result = all_switch_states.get(uri)
-                    if result is None or isinstance(result, BaseException):
-                        continue
-                    data[uri] = int(result) == on_value
+        try:
+            async with timeout(REQUEST_TIMEOUT):
+                all_switch_states: dict = {}
+                if batched := await self._async_read_batched(
+                    eta_client, uri_sensor_queries, unique_switch_uris
+                ):
+                    data, all_switch_states = batched
+
+                # Fall back to per-endpoint reads for every value the variable set did not return,
+                # including URIs which are registered but missing from the response
+                remaining_sensor_queries = {
+                    uri: query
+                    for uri, query in uri_sensor_queries.items()
+                    if uri not in data
+                }
+                remaining_switch_uris = [
+                    uri for uri in unique_switch_uris if uri not in all_switch_states
+                ]
+                if remaining_sensor_queries:
+                    data.update(await eta_client.get_all_data(remaining_sensor_queries))
+
+                if remaining_switch_uris:
+                    all_switch_states.update(
+                        await eta_client.get_all_switch_states(remaining_switch_uris)
+                    )
+
+                if self.switch_queries:
+                    for uri, on_value, _ in self.switch_queries.values():
+                        result = all_switch_states.get(uri)
+                        if result is None or isinstance(result, BaseException):
+                            continue
+                        data[uri] = int(result) == on_value
+        except ETATerminalUnavailableError as err:
+            # Mark all entities unavailable instead of waiting for the terminal
+            raise UpdateFailed(str(err)) from err
 
         elapsed = time.monotonic() - start_time
         if (
@@ -270,6 +341,78 @@ class ETASensorUpdateCoordinator(DataUpdateCoordinator[dict[str, float | str | b
             self.config[LAST_COORDINATOR_WARNING_TIMESTAMP] = time.time()
         return data
 
+    async def _async_read_batched(
+        self,
+        eta_client: EtaAPI,
+        uri_sensor_queries: dict[str, dict[str, bool]],
+        switch_uris: list[str],
+    ) -> tuple[dict[str, float | str | bool], dict] | None:
+        """Read all values through the server-side variable set with a single request.
+
+        Returns a tuple of (sensor values, raw switch states) of all endpoints the
+        variable set returned a valid value for, or None if batched reads are not
+        available for this update.
+        """
+        if not self.varset_supported:
+            return None
+
+        wanted_uris = (
+            set(uri_sensor_queries) | set(switch_uris)
+        ) - self._varset_rejected_uris
+        if not wanted_uris:
+            return None
+
+        try:
+            if self._varset_uris is None:
+                self._varset_rejected_uris = set()
+            self._varset_uris = await eta_client.sync_varset(
+                VARSET_NAME, wanted_uris, self._varset_uris
+            )
+            if self._varset_uris is None:
+                _LOGGER.info(
+                    "ETA terminal refused to create a variable set, falling back to per-endpoint reads"
+                )
+                self.varset_supported = False
+                return None
+            self._varset_rejected_uris |= wanted_uris - self._varset_uris
+
+            data, switch_states = await eta_client.get_varset_data(
+                VARSET_NAME,
+                {
+                    uri: query
+                    for uri, query in uri_sensor_queries.items()
+                    if uri in self._varset_uris
+                },
+                [uri for uri in switch_uris if uri in self._varset_uris],
+            )
+        except ETATerminalUnavailableError:
+            # Not a problem of the variable set, keep it for when the terminal is back
+            raise
+        except Exception:
+            # The terminal may have lost the set (e.g. after a reboot), so recreate it on the next update
+            self._varset_uris = None
+            self._varset_failures += 1
+            if self._varset_failures >= VARSET_MAX_FAILURES:
+                _LOGGER.info(
+                    "Batched read failed %d times in a row, falling back to per-endpoint reads",
+                    self._varset_failures,
+                )
+                self.varset_supported = False
+            else:
+                _LOGGER.debug(
+                    "Batched read failed, falling back to per-endpoint reads for this update",
+                    exc_info=True,
+                )
+            return None
+
+        self._varset_failures = 0
+        if missing := self._varset_uris - set(data) - set(switch_states):
+            _LOGGER.debug(
+                "Variable set did not return valid values for %s, reading them individually",
+                sorted(missing),
+            )
+        return data, switch_states
+
 
 class ETAWritableUpdateCoordinator(DataUpdateCoordinator[dict[str, float | str]]):
     """Class to manage fetching data from the ETA terminal."""
@@ -279,9 +422,7 @@ class ETAWritableUpdateCoordinator(DataUpdateCoordinator[dict[str, float | str]]
         self.config = config
         self.host = config.get(CONF_HOST, "")
         self.port = config.get(CONF_PORT, "")
-        self.session = async_get_clientsession(hass)
-        self.max_parallel_requests = int(config.get(MAX_PARALLEL_REQUESTS, 5))
-        self.request_semaphore = config.get(REQUEST_SEMAPHORE)
+        self.eta_client = get_eta_client(hass, config)
         self.chosen_writable_sensors: list[str] = config[CHOSEN_WRITABLE_SENSORS]
         self.all_writable_sensors: dict[str, ETAEndpoint] = config[WRITABLE_DICT]
 
@@ -294,18 +435,37 @@ class ETAWritableUpdateCoordinator(DataUpdateCoordinator[dict[str, float | str]]
             ),
         )
 
-    def _create_eta_client(self):
-        return EtaAPI(
-            self.session,
-            self.host,
-            self.port,
-            max_concurrent_requests=self.max_parallel_requests,
-            request_semaphore=self.request_semaphore,
-        )
-
     def _should_force_number_handling(self, unit):
         return unit == CUSTOM_UNIT_MINUTES_SINCE_MIDNIGHT
 
+    async def async_refresh_uris(self, uris: set[str]) -> None:
+        """Read only the given endpoints and merge their values into the current data.
+
+        Used after a batch of writes, so that the written values show up without a
+        full update. Endpoints which are not handled by this coordinator are ignored.
+
+        :param uris: Endpoint URIs in any form accepted by `normalize_uri`
+        """
+        wanted = {APIClient.normalize_uri(uri) for uri in uris}
+        sensor_list: dict[str, dict[str, bool]] = {
+            self.all_writable_sensors[sensor]["url"]: {}
+            for sensor in self.chosen_writable_sensors
+            if APIClient.normalize_uri(self.all_writable_sensors[sensor]["url"])
+            in wanted
+        }
+        if not sensor_list:
+            return
+
+        eta_client = self.eta_client
+        try:
+            with request_priority(RequestPriority.WRITE_REFRESH):
+                async with timeout(REQUEST_TIMEOUT):
+                    data = await eta_client.get_all_data(sensor_list)
+        except ETATerminalUnavailableError as err:
+            _LOGGER.debug("Skipping refresh of written endpoints: %s", err)
+            return
+        self.async_set_updated_data({**(self.data or {}), **data})
+
     async def _async_update_data(self) -> dict[str, float | str]:
         """Update data via library."""
         if (
@@ -323,13 +483,16 @@ class ETAWritableUpdateCoordinator(DataUpdateCoordinator[dict[str, float | str]]
 
         start_time = time.monotonic()
 
-        eta_client = self._create_eta_client()
+        eta_client = self.eta_client
         sensor_list = {
             self.all_writable_sensors[sensor]["url"]: {}
             for sensor in self.chosen_writable_sensors
         }
 
-        data = await eta_client.get_all_data(sensor_list)
+        try:
+            data = await eta_client.get_all_data(sensor_list)
+        except ETATerminalUnavailableError as err:
+            raise UpdateFailed(str(err)) from err
         elapsed = time.monotonic() - start_time
         if (
             self.update_interval
@@ -357,9 +520,7 @@ class ETAPendingNodeCoordinator(DataUpdateCoordinator[bool]):
         self.entry = entry
         self.host = config.get(CONF_HOST, "")
         self.port = config.get(CONF_PORT, "")
-        self.session = async_get_clientsession(hass)
-        self.max_parallel_requests = int(config.get(MAX_PARALLEL_REQUESTS, 5))
-        self.request_semaphore = config.get(REQUEST_SEMAPHORE)
+        self.eta_client = get_eta_client(hass, config)
         # Keep a live reference so config_flow rediscoveries update us automatically.
         self.pending_dict: dict[str, ETAEndpoint] = config.get(PENDING_DICT, {})
 
@@ -376,15 +537,6 @@ class ETAPendingNodeCoordinator(DataUpdateCoordinator[bool]):
         # Dummy listener to ensure coordinator doesn't stop when no entities are attached.
         self.async_add_listener(lambda: None)
 
-    def _create_eta_client(self):
-        return EtaAPI(
-            self.session,
-            self.host,
-            self.port,
-            max_concurrent_requests=self.max_parallel_requests,
-            request_semaphore=self.request_semaphore,
-        )
-
     async def _async_update_data(self) -> bool:
         """Check pending nodes and promote any that have become valid."""
         if not self.pending_dict:
@@ -405,12 +557,17 @@ class ETAPendingNodeCoordinator(DataUpdateCoordinator[bool]):
             )
             return False
 
-        eta_client = self._create_eta_client()
+        eta_client = self.eta_client
         pending_uris = {info["url"]: {} for info in self.pending_dict.values()}
 
         # Concurrent var-endpoint fetch — a numeric value means the node is now valid.
-        async with timeout(REQUEST_TIMEOUT):
-            all_values = await eta_client.get_all_data(pending_uris)
+        # Pending nodes are not shown yet, so they must not delay the visible entities.
+        try:
+            with request_priority(RequestPriority.BACKGROUND):
+                async with timeout(REQUEST_TIMEOUT):
+                    all_values = await eta_client.get_all_data(pending_uris)
+        except ETATerminalUnavailableError as err:
+            raise UpdateFailed(str(err)) from err
 
         promoted: dict[str, ETAEndpoint] = {}
         for unique_key, endpoint_info in list(self.pending_dict.items()):
@@ -420,8 +577,9 @@ class ETAPendingNodeCoordinator(DataUpdateCoordinator[bool]):
                 continue
 
             # Fetch (value, unit) so we can fully populate the ETAEndpoint.
-            async with timeout(REQUEST_TIMEOUT):
-                live_value, live_unit = await eta_client.get_data(uri)
+            with request_priority(RequestPriority.BACKGROUND):
+                async with timeout(REQUEST_TIMEOUT):
+                    live_value, live_unit = await eta_client.get_data(uri)
             updated: ETAEndpoint = {
                 **endpoint_info,
                 "value": live_value,
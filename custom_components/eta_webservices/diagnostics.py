@@ -4,18 +4,16 @@ from __future__ import annotations
 
 from typing import Any
 
+from homeassistant.components.diagnostics import async_redact_data
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.const import CONF_HOST
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .api import EtaAPI
-from .const import (
-    DEFAULT_MAX_PARALLEL_REQUESTS,
-    DOMAIN,
-    MAX_PARALLEL_REQUESTS,
-    REQUEST_SEMAPHORE,
-)
+from .api import AdaptiveConcurrencyLimiter
+from .const import DOMAIN, HTTP_TRANSPORT, REQUEST_SEMAPHORE
+from .utils import get_eta_client
+
+TO_REDACT = {CONF_HOST}
 
 
 async def async_get_config_entry_diagnostics(
@@ -24,20 +22,69 @@ async def async_get_config_entry_diagnostics(
     """Return diagnostics for a config entry."""
     config = hass.data[DOMAIN][entry.entry_id]
 
-    host = config.get(CONF_HOST)
-    port = config.get(CONF_PORT)
-    session = async_get_clientsession(hass)
-
-    eta_client = EtaAPI(
-        session,
-        host,
-        port,
-        max_concurrent_requests=config.get(
-            MAX_PARALLEL_REQUESTS, DEFAULT_MAX_PARALLEL_REQUESTS
-        ),
-        request_semaphore=config.get(REQUEST_SEMAPHORE),
-    )
+    eta_client = get_eta_client(hass, config)
     user_menu = await eta_client.get_menu()
     api_version = await eta_client.get_api_version()
 
-    return {"config": config, "api_version": str(api_version), "menu": user_menu}
+    diagnostics = {
+        # The runtime config also holds the client, transport and coordinators
+        "config": async_redact_data(dict(entry.data), TO_REDACT),
+        "api_version": str(api_version),
+        "api_version_detected_at": eta_client.api_version_detected_at,
+        "menu": user_menu,
+    }
+    limiter = config.get(REQUEST_SEMAPHORE)
+    if isinstance(limiter, AdaptiveConcurrencyLimiter):
+        diagnostics["request_limiter"] = {
+            "limit": limiter.limit,
+            "max_limit": limiter.max_limit,
+            "in_flight": limiter.in_flight,
+            "smoothed_latency": limiter.smoothed_latency,
+            "baseline_latency": limiter.baseline_latency,
+            "queue_wait": {
+                priority.name.lower(): {
+                    "queued": limiter.queued(priority),
+                    "num_requests": stats.num_requests,
+                    "num_waited": stats.num_waited,
+                    "average_wait": stats.average_wait,
+                    "max_wait": stats.max_wait,
+                }
+                for priority, stats in limiter.queue_wait_stats.items()
+            },
+        }
+    if HTTP_TRANSPORT in config:
+        breaker = config[HTTP_TRANSPORT].circuit_breaker
+        diagnostics["circuit_breaker"] = {
+            "state": str(breaker.state),
+            "consecutive_failures": breaker.consecutive_failures,
+            "num_rejected": breaker.num_rejected,
+        }
+        diagnostics["rate_limiter"] = {
+            name: {
+                "rate": bucket.rate,
+                "num_acquired": bucket.num_acquired,
+                "num_waited": bucket.num_waited,
+                "total_wait": bucket.total_wait,
+                "max_wait": bucket.max_wait,
+            }
+            for name, bucket in (
+                ("reads", config[HTTP_TRANSPORT].rate_limiter.reads),
+                ("writes", config[HTTP_TRANSPORT].rate_limiter.writes),
+            )
+        }
+        retry_policy = config[HTTP_TRANSPORT].retry_policy
+        diagnostics["retries"] = {
+            "max_retries": retry_policy.max_retries,
+            "max_total_time": retry_policy.max_total_time,
+            "num_retries": retry_policy.num_retries,
+            "num_exhausted": retry_policy.num_exhausted,
+        }
+        hedge_policy = config[HTTP_TRANSPORT].hedge_policy
+        diagnostics["hedging"] = {
+            "enabled": hedge_policy.enabled,
+            "delay": hedge_policy.delay(),
+            "num_hedged": hedge_policy.num_hedged,
+            "num_won": hedge_policy.num_won,
+        }
+        diagnostics["request_metrics"] = config[HTTP_TRANSPORT].metrics.as_dict()
+    return diagnostics
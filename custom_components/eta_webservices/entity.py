@@ -5,21 +5,15 @@ from typing import Any, Generic, TypeVar, cast
 
 from homeassistant.const import CONF_HOST, CONF_PORT
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity import Entity, generate_entity_id
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
 )
 
-from .api import EtaAPI, ETAEndpoint
-from .const import (
-    DEFAULT_MAX_PARALLEL_REQUESTS,
-    MAX_PARALLEL_REQUESTS,
-    REQUEST_SEMAPHORE,
-)
+from .api import ETAEndpoint, RequestPriority, request_priority
 from .coordinator import ETAErrorUpdateCoordinator
-from .utils import create_device_info
+from .utils import create_device_info, get_eta_client
 
 _EntityT = TypeVar("_EntityT")
 
@@ -35,14 +29,10 @@ class EtaEntity(Entity):
         endpoint_info: ETAEndpoint,
         entity_id_format: str,
     ) -> None:
-        self.session = async_get_clientsession(hass)
+        self.eta_client = get_eta_client(hass, config)
         self.host = config.get(CONF_HOST, "")
         self.port = config.get(CONF_PORT, "")
         self.uri = endpoint_info["url"]
-        self.max_parallel_requests = int(
-            config.get(MAX_PARALLEL_REQUESTS, DEFAULT_MAX_PARALLEL_REQUESTS)
-        )
-        self.request_semaphore = config.get(REQUEST_SEMAPHORE)
 
         # Extract the FUB from the friendly name and use it as the device name
         # E.g. "ETA > Living Room Sensor" -> "ETA"
@@ -64,16 +54,6 @@ class EtaEntity(Entity):
         self.entity_id = generate_entity_id(entity_id_format, unique_id, hass=hass)
         self._attr_unique_id = unique_id
 
-    def _create_eta_client(self) -> EtaAPI:
-        # Reuse configured concurrency settings for all entity-level write operations.
-        return EtaAPI(
-            self.session,
-            self.host,
-            self.port,
-            max_concurrent_requests=self.max_parallel_requests,
-            request_semaphore=self.request_semaphore,
-        )
-
 
 class EtaCoordinatedSensorEntity(
     EtaEntity,
@@ -104,6 +84,11 @@ class EtaCoordinatedSensorEntity(
     def handle_data_updates(self, data: _EntityT | None) -> None:  # noqa: D102
         raise NotImplementedError
 
+    async def _async_refresh_after_write(self) -> None:
+        """Refresh the coordinator ahead of regular polling to show a written value."""
+        with request_priority(RequestPriority.WRITE_REFRESH):
+            await self.coordinator.async_refresh()
+
     @callback
     def _handle_coordinator_update(self) -> None:
         """Update attributes when the coordinator updates."""
@@ -146,13 +146,12 @@ class EtaWritableNumberSensor(NumberEntity, EtaCoordinatedSensorEntity[float]):
             if not self.is_float:
                 raw_value = round(raw_value, 0)
 
-        eta_client = self._create_eta_client()
-        success = await eta_client.write_endpoint(self.uri, raw_value)
+        success = await self.eta_client.write_endpoint(self.uri, raw_value)
         if not success:
             raise HomeAssistantError(
                 f"Could not write value for entity {self.entity_id}, see log for details"
             )
-        await self.coordinator.async_refresh()
+        await self._async_refresh_after_write()
 
     @staticmethod
     def determine_device_class(unit):
@@ -24,15 +24,17 @@ from homeassistant.components.sensor import (
     SensorEntity,
     SensorStateClass,
 )
-from homeassistant.const import EntityCategory
+from homeassistant.const import CONF_HOST, CONF_PORT, EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.entity import generate_entity_id
 from homeassistant.helpers.entity_platform import async_get_current_platform
 from homeassistant.helpers.typing import VolDictType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .api import ETAEndpoint, ETAError, ETAValidWritableValues
+from ._api.metrics import EndpointClass, RequestMetrics
+from .api import ETAEndpoint, ETAError, ETATransport, ETAValidWritableValues
 from .const import (
     CHOSEN_FLOAT_SENSORS,
     CHOSEN_TEXT_SENSORS,
@@ -42,6 +44,7 @@ from .const import (
     DOMAIN,
     ERROR_UPDATE_COORDINATOR,
     FLOAT_DICT,
+    HTTP_TRANSPORT,
     SENSOR_UPDATE_COORDINATOR,
     SUPPORT_WRITE_TIMESLOT,
     SUPPORT_WRITE_TIMESLOT_WITH_TEMPERATURE,
@@ -51,7 +54,7 @@ from .const import (
 )
 from .coordinator import ETAErrorUpdateCoordinator, ETASensorUpdateCoordinator
 from .entity import EtaCoordinatedSensorEntity, EtaErrorEntity
-from .utils import get_native_unit
+from .utils import create_device_info, get_native_unit
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -188,6 +191,16 @@ async def async_setup_entry(
             EtaLatestErrorSensor(config, hass, error_coordinator),
         ]  # pyright: ignore[reportArgumentType]
     )
+    # Request latency per endpoint class, disabled by default
+    transport: ETATransport | None = config.get(HTTP_TRANSPORT)
+    if transport is not None:
+        sensors.extend(
+            [
+                EtaRequestLatencySensor(config, hass, transport.metrics, endpoint_class)
+                for endpoint_class in EndpointClass
+                if endpoint_class is not EndpointClass.OTHER
+            ]  # pyright: ignore[reportArgumentType]
+        )
     # Final safety net: avoid HA startup failures if config data still contains
     # the same unique_id in multiple sensor categories.
     sensors = _deduplicate_entities_by_unique_id(sensors)  # pyright: ignore[reportArgumentType]
@@ -426,15 +439,14 @@ class EtaTimeslotSensor(SensorEntity, EtaCoordinatedSensorEntity[str]):
         ):
             raise HomeAssistantError(f"Invalid timeslot for entity {self.entity_id}")
 
-        eta_client = self._create_eta_client()
-        success = await eta_client.write_endpoint(
+        success = await self.eta_client.write_endpoint(
             self.uri, raw_value, raw_begin, raw_end
         )
         if not success:
             raise HomeAssistantError(
                 f"Could not write value for entity {self.entity_id}, see log for details"
             )
-        await self.coordinator.async_refresh()
+        await self._async_refresh_after_write()
 
     def _parse_timeslot_value(self, value: str) -> tuple[str, str, str | None]:
         """Parse a timeslot value string.
@@ -535,3 +547,68 @@ class EtaLatestErrorSensor(SensorEntity, EtaErrorEntity):
 
         sorted_errors = sorted(data, key=lambda d: d["time"])
         self._attr_native_value = sorted_errors[-1]["msg"]
+
+
+class EtaRequestLatencySensor(SensorEntity):
+    """Representation of a sensor showing the request latency of an endpoint class.
+
+    The state is the 95th percentile since startup, the other metrics of the
+    endpoint class are exposed as attributes.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        config: dict,
+        hass: HomeAssistant,
+        metrics: RequestMetrics,
+        endpoint_class: EndpointClass,
+    ) -> None:
+        host = config.get(CONF_HOST, "")
+        port = config.get(CONF_PORT, "")
+        self._metrics = metrics
+        self._endpoint_class = endpoint_class
+
+        self._attr_unique_id = (
+            "eta_"
+            + host.replace(".", "_")
+            + "_"
+            + str(port)
+            + "_request_latency_"
+            + str(endpoint_class)
+        )
+        self.entity_id = generate_entity_id(
+            ENTITY_ID_FORMAT, self._attr_unique_id, hass=hass
+        )
+        self._attr_device_info = create_device_info(host, port, None)
+
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_entity_registry_enabled_default = False
+        self._attr_device_class = SensorDeviceClass.DURATION
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+        self._attr_suggested_display_precision = 0
+
+        self._attr_has_entity_name = True
+        self._attr_translation_key = "request_latency_sensor"
+        self._attr_translation_placeholders = {"endpoint_class": str(endpoint_class)}
+
+        self.update()
+
+    def update(self) -> None:
+        """Read the current metrics, they are kept in memory by the transport."""
+        metrics = self._metrics[self._endpoint_class]
+        p95 = metrics.latency.percentile(0.95)
+        self._attr_native_value = p95 * 1000 if p95 is not None else None
+
+        def _ms(seconds: float | None) -> float | None:
+            return round(seconds * 1000, 1) if seconds is not None else None
+
+        self._attr_extra_state_attributes = {
+            "num_requests": metrics.num_requests,
+            "num_errors": metrics.num_errors,
+            "bytes_received": metrics.bytes_received,
+            "latency_p50_ms": _ms(metrics.latency.percentile(0.5)),
+            "latency_p99_ms": _ms(metrics.latency.percentile(0.99)),
+            "queue_wait_p95_ms": _ms(metrics.queue_wait.percentile(0.95)),
+            "parse_time_p95_ms": _ms(metrics.parse_time.percentile(0.95)),
+        }
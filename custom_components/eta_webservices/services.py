@@ -3,19 +3,18 @@
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, CONF_PORT
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-from .api import EtaAPI
-from .const import (
-    DEFAULT_MAX_PARALLEL_REQUESTS,
-    DOMAIN,
-    MAX_PARALLEL_REQUESTS,
-    REQUEST_SEMAPHORE,
-)
+
+from .api import ETAWriteRequest
+from .const import DOMAIN, SENSOR_UPDATE_COORDINATOR, WRITABLE_UPDATE_COORDINATOR
+from .utils import get_eta_client
 
 WRITE_ENDPOINT_SCHEMA = vol.Schema(
     {
@@ -26,10 +25,17 @@ WRITE_ENDPOINT_SCHEMA = vol.Schema(
     },
 )
 
+WRITE_ENDPOINTS_SCHEMA = vol.Schema(
+    {
+        vol.Required("values"): vol.All(
+            cv.ensure_list, vol.Length(min=1), [WRITE_ENDPOINT_SCHEMA]
+        ),
+    },
+)
+
 
 async def async_setup_services(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
     """Setup low-level services, as defined in the services.yaml file."""
-    session = async_get_clientsession(hass)
     config = hass.data[DOMAIN][config_entry.entry_id]
 
     async def handle_write(call: ServiceCall):
@@ -38,19 +44,53 @@ async def async_setup_services(hass: HomeAssistant, config_entry: ConfigEntry) -
         value = call.data.get("value")
         begin = call.data.get("begin", None)
         end = call.data.get("end", None)
-        eta_client = EtaAPI(
-            session,
-            config.get(CONF_HOST),
-            config.get(CONF_PORT),
-            max_concurrent_requests=config.get(
-                MAX_PARALLEL_REQUESTS, DEFAULT_MAX_PARALLEL_REQUESTS
-            ),
-            request_semaphore=config.get(REQUEST_SEMAPHORE),
+        success = await get_eta_client(hass, config).write_endpoint(
+            url, value, begin, end
         )
-        success = await eta_client.write_endpoint(url, value, begin, end)
         if not success:
             raise HomeAssistantError("Could not write value, see log for details")
 
+    async def handle_write_values(call: ServiceCall) -> ServiceResponse:
+        """Handle the batch service call.
+
+        All values are written before the affected entities are refreshed once,
+        instead of refreshing all entities after every single write.
+        """
+        writes = [
+            ETAWriteRequest(
+                uri=item["endpoint_url"],
+                value=item["value"],
+                begin=item.get("begin"),
+                end=item.get("end"),
+            )
+            for item in call.data["values"]
+        ]
+        results = await get_eta_client(hass, config).write_endpoints(writes)
+
+        written_uris = {result["uri"] for result in results if result["success"]}
+        if written_uris:
+            for coordinator_key in (
+                SENSOR_UPDATE_COORDINATOR,
+                WRITABLE_UPDATE_COORDINATOR,
+            ):
+                if (coordinator := config.get(coordinator_key)) is not None:
+                    await coordinator.async_refresh_uris(written_uris)
+
+        if call.return_response:
+            return {"results": list(results)}
+        if failed := [result["uri"] for result in results if not result["success"]]:
+            raise HomeAssistantError(
+                f"Could not write values of {', '.join(failed)}, see log for details"
+            )
+        return None
+
     hass.services.async_register(
         DOMAIN, "write_value", handle_write, schema=WRITE_ENDPOINT_SCHEMA
     )
+    hass.services.async_register(
+        DOMAIN,
+        "write_values",
+        handle_write_values,
+        schema=WRITE_ENDPOINTS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -70,16 +70,14 @@ class EtaSwitch(EtaEntity, SwitchEntity, CoordinatorEntity[ETASensorUpdateCoordi
 
     async def async_turn_on(self, **kwargs):
         """Turn the switch on."""
-        eta_client = self._create_eta_client()
-        res = await eta_client.set_switch_state(self.uri, self.on_value)
+        res = await self.eta_client.set_switch_state(self.uri, self.on_value)
         if res:
             self._attr_is_on = True
             self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs):
         """Turn the switch off."""
-        eta_client = self._create_eta_client()
-        res = await eta_client.set_switch_state(self.uri, self.off_value)
+        res = await self.eta_client.set_switch_state(self.uri, self.off_value)
         if res:
             self._attr_is_on = False
             self.async_write_ha_state()
@@ -83,8 +83,7 @@ class EtaTime(TimeEntity, EtaCoordinatedSensorEntity[str]):
         total_minutes = value.hour * 60 + value.minute
         if total_minutes >= 60 * 24:
             raise HomeAssistantError("Invalid time: Must be between 00:00 and 23:59")
-        eta_client = self._create_eta_client()
-        success = await eta_client.write_endpoint(self.uri, total_minutes)
+        success = await self.eta_client.write_endpoint(self.uri, total_minutes)
         if not success:
             raise HomeAssistantError("Could not write value, see log for details")
-        await self.coordinator.async_refresh()
+        await self._async_refresh_after_write()
@@ -1,8 +1,29 @@
 """Various utility functions."""
 
+from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
 
-from .const import CUSTOM_UNIT_UNITLESS, DOMAIN
+from .api import DiscoveryCheckpoint, EtaAPI, ETATransport, VarinfoCache
+from .const import (
+    API_VERSION,
+    API_VERSION_DETECTED_AT,
+    CUSTOM_UNIT_UNITLESS,
+    DEFAULT_MAX_PARALLEL_REQUESTS,
+    DISCOVERY_CHECKPOINT_STORAGE_VERSION,
+    DISCOVERY_CHECKPOINTS,
+    DOMAIN,
+    ETA_CLIENT,
+    HTTP_TRANSPORT,
+    MAX_PARALLEL_REQUESTS,
+    REQUEST_SEMAPHORE,
+    VARINFO_CACHE_SAVE_DELAY,
+    VARINFO_CACHE_STORAGE_VERSION,
+    VARINFO_CACHES,
+)
 
 
 def create_device_info(host: str, port: str, device_name: str | None) -> DeviceInfo:
@@ -40,3 +61,93 @@ def get_native_unit(unit):
     if unit == CUSTOM_UNIT_UNITLESS:
         return None
     return unit
+
+
+def get_eta_client(hass: HomeAssistant, config: dict) -> EtaAPI:
+    """Get the EtaAPI instance shared by all users of a config entry.
+
+    The instance is created on first use and stored in the config, so that all
+    coordinators, entities and services of the entry send their requests through
+    the same client, limiter and transport. It is closed when the entry is unloaded.
+    """
+    if (eta_client := config.get(ETA_CLIENT)) is None:
+        transport: ETATransport | None = config.get(HTTP_TRANSPORT)
+        eta_client = EtaAPI(
+            transport.session
+            if transport is not None
+            else async_get_clientsession(hass),
+            config[CONF_HOST],
+            config[CONF_PORT],
+            max_concurrent_requests=int(
+                config.get(MAX_PARALLEL_REQUESTS, DEFAULT_MAX_PARALLEL_REQUESTS)
+            ),
+            request_semaphore=config.get(REQUEST_SEMAPHORE),
+            transport=transport,
+        )
+        eta_client.set_api_version(
+            config.get(API_VERSION), config.get(API_VERSION_DETECTED_AT)
+        )
+        config[ETA_CLIENT] = eta_client
+    return eta_client
+
+
+async def async_get_varinfo_cache(
+    hass: HomeAssistant, host: str, port: int
+) -> VarinfoCache:
+    """Get the varinfo cache of a terminal, loading it from disk on first use.
+
+    The cache is shared by all config flows and entries of the same terminal, so it
+    also speeds up adding an entry again after it has been removed.
+    """
+    caches: dict[str, tuple[VarinfoCache, Store]] = hass.data.setdefault(
+        VARINFO_CACHES, {}
+    )
+    terminal = f"{host}:{port}"
+    if terminal not in caches:
+        store = Store(
+            hass,
+            VARINFO_CACHE_STORAGE_VERSION,
+            f"{DOMAIN}.varinfo_cache.{slugify(terminal)}",
+        )
+        data = await store.async_load()
+        # Another flow may have loaded the cache in the meantime
+        caches.setdefault(terminal, (VarinfoCache.from_dict(data), store))
+    return caches[terminal][0]
+
+
+@callback
+def async_save_varinfo_cache(hass: HomeAssistant, host: str, port: int) -> None:
+    """Schedule writing the varinfo cache of a terminal to disk."""
+    caches: dict[str, tuple[VarinfoCache, Store]] = hass.data.get(VARINFO_CACHES, {})
+    if (entry := caches.get(f"{host}:{port}")) is not None:
+        varinfo_cache, store = entry
+        store.async_delay_save(varinfo_cache.as_dict, VARINFO_CACHE_SAVE_DELAY)
+
+
+async def async_get_discovery_checkpoint(
+    hass: HomeAssistant, host: str, port: int, max_age: float
+) -> DiscoveryCheckpoint | None:
+    """Load the checkpoint of the last discovery of a terminal.
+
+    The checkpoint is written to disk while the discovery makes progress, so a
+    discovery which is interrupted by closing the flow or restarting Home Assistant
+    can be resumed by the next discovery of the same terminal.
+
+    :param max_age: Minutes after its start in which a discovery is resumed
+    :return: Checkpoint, or None if checkpoints are disabled
+    """
+    if max_age <= 0:
+        return None
+    stores: dict[str, Store] = hass.data.setdefault(DISCOVERY_CHECKPOINTS, {})
+    terminal = f"{host}:{port}"
+    if (store := stores.get(terminal)) is None:
+        store = stores[terminal] = Store(
+            hass,
+            DISCOVERY_CHECKPOINT_STORAGE_VERSION,
+            f"{DOMAIN}.discovery_checkpoint.{slugify(terminal)}",
+        )
+    checkpoint = DiscoveryCheckpoint(
+        max_age * 60, save=lambda: store.async_delay_save(checkpoint.as_dict)
+    )
+    checkpoint.restore(await store.async_load())
+    return checkpoint
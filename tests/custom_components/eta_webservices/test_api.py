@@ -1,12 +1,18 @@
 """Tests for the ETA API module."""
 
 import asyncio
+import contextlib
 import pytest
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 from aiohttp import ClientSession, ClientError, ClientResponseError
+from packaging import version
 
-from custom_components.eta_webservices.api import EtaAPI
-from custom_components.eta_webservices._api.api_client import APIClient
+from custom_components.eta_webservices.api import (
+    DiscoveryCheckpoint,
+    EtaAPI,
+    VarinfoCache,
+)
+from custom_components.eta_webservices._api.api_client import APIClient, ETAResponse
 
 
 @pytest.mark.asyncio
@@ -24,11 +30,27 @@ async def test_get_all_sensors_falls_back_to_v11_on_version_check_timeout(
     class FakeDiscoveryV11:
         """Fake v1.1 discovery implementation."""
 
-        def __init__(self, http_client, progress_callback=None) -> None:
+        changes = None
+        menu_fingerprint = None
+        discovered_menu = None
+        unfinished_uris = []
+
+        def __init__(
+            self, http_client, progress_callback=None, skip_fubs=()
+        ) -> None:
             self._progress_callback = progress_callback
 
         async def get_all_sensors(
-            self, float_dict, switches_dict, text_dict, writable_dict, pending_dict
+            self,
+            float_dict,
+            switches_dict,
+            text_dict,
+            writable_dict,
+            pending_dict,
+            incremental=False,
+            deadline=None,
+            menu=None,
+            previous_menu=None,
         ):
             route_calls["v11"] += 1
             if self._progress_callback is not None:
@@ -37,11 +59,33 @@ async def test_get_all_sensors_falls_back_to_v11_on_version_check_timeout(
     class FakeDiscoveryV12:
         """Fake v1.2 discovery implementation."""
 
-        def __init__(self, http_client, progress_callback=None) -> None:
+        changes = None
+        menu_fingerprint = None
+        discovered_menu = None
+        unfinished_uris = []
+
+        def __init__(
+            self,
+            http_client,
+            progress_callback=None,
+            varinfo_cache=None,
+            checkpoint=None,
+            skip_fubs=(),
+            fub_callback=None,
+        ) -> None:
             self._progress_callback = progress_callback
 
         async def get_all_sensors(
-            self, float_dict, switches_dict, text_dict, writable_dict, pending_dict
+            self,
+            float_dict,
+            switches_dict,
+            text_dict,
+            writable_dict,
+            pending_dict,
+            incremental=False,
+            deadline=None,
+            menu=None,
+            previous_menu=None,
         ):
             route_calls["v12"] += 1
             if self._progress_callback is not None:
@@ -86,11 +130,33 @@ async def test_get_all_sensors_reports_progress_for_v12_route(monkeypatch):
     class FakeDiscoveryV12:
         """Fake v1.2 discovery implementation."""
 
-        def __init__(self, http_client, progress_callback=None) -> None:
+        changes = None
+        menu_fingerprint = None
+        discovered_menu = None
+        unfinished_uris = []
+
+        def __init__(
+            self,
+            http_client,
+            progress_callback=None,
+            varinfo_cache=None,
+            checkpoint=None,
+            skip_fubs=(),
+            fub_callback=None,
+        ) -> None:
             self._progress_callback = progress_callback
 
         async def get_all_sensors(
-            self, float_dict, switches_dict, text_dict, writable_dict, pending_dict
+            self,
+            float_dict,
+            switches_dict,
+            text_dict,
+            writable_dict,
+            pending_dict,
+            incremental=False,
+            deadline=None,
+            menu=None,
+            previous_menu=None,
         ):
             route_calls["v12"] += 1
             if self._progress_callback is not None:
@@ -99,11 +165,27 @@ async def test_get_all_sensors_reports_progress_for_v12_route(monkeypatch):
     class FakeDiscoveryV11:
         """Fake v1.1 discovery implementation."""
 
-        def __init__(self, http_client, progress_callback=None) -> None:
+        changes = None
+        menu_fingerprint = None
+        discovered_menu = None
+        unfinished_uris = []
+
+        def __init__(
+            self, http_client, progress_callback=None, skip_fubs=()
+        ) -> None:
             self._progress_callback = progress_callback
 
         async def get_all_sensors(
-            self, float_dict, switches_dict, text_dict, writable_dict, pending_dict
+            self,
+            float_dict,
+            switches_dict,
+            text_dict,
+            writable_dict,
+            pending_dict,
+            incremental=False,
+            deadline=None,
+            menu=None,
+            previous_menu=None,
         ):
             route_calls["v11"] += 1
 
@@ -134,6 +216,84 @@ async def test_get_all_sensors_reports_progress_for_v12_route(monkeypatch):
     assert ("fake-v12-running", 0.4) in progress_updates
 
 
+@pytest.mark.asyncio
+async def test_get_all_sensors_reuses_known_api_version(monkeypatch):
+    """Test a saved API version skips the version probe until a connection error occurs."""
+    import time
+
+    from custom_components.eta_webservices.api import ETATerminalUnavailableError
+
+    api = EtaAPI(AsyncMock(spec=ClientSession), "192.168.0.25", 8080)
+    api.set_api_version("1.2", time.time() - 60)
+    api._http.get_body = AsyncMock(
+        return_value='<eta version="1.0"><api version="1.1"/></eta>'
+    )
+    routes: list[str] = []
+    fail_discovery = False
+
+    def _fake_discovery(route):
+        class FakeDiscovery:
+            changes = None
+            menu_fingerprint = None
+            discovered_menu = None
+            unfinished_uris = []
+
+            def __init__(
+                self,
+                http_client,
+                progress_callback=None,
+                varinfo_cache=None,
+                checkpoint=None,
+                skip_fubs=(),
+                fub_callback=None,
+            ) -> None:
+                pass
+
+            async def get_all_sensors(
+                self,
+                *dicts,
+                incremental=False,
+                deadline=None,
+                menu=None,
+                previous_menu=None,
+            ):
+                routes.append(route)
+                if fail_discovery:
+                    raise ETATerminalUnavailableError("unreachable")
+
+        return FakeDiscovery
+
+    monkeypatch.setattr(
+        "custom_components.eta_webservices.api.SensorDiscoveryV11", _fake_discovery("v11")
+    )
+    monkeypatch.setattr(
+        "custom_components.eta_webservices.api.SensorDiscoveryV12", _fake_discovery("v12")
+    )
+
+    assert await api.get_all_sensors(False, {}, {}, {}, {}, {}) is True
+    assert await api.get_api_version() == version.parse("1.2")
+    api._http.get_body.assert_not_called()
+
+    # A connection error during discovery makes the next discovery check the version again
+    fail_discovery = True
+    with pytest.raises(ETATerminalUnavailableError):
+        await api.get_all_sensors(False, {}, {}, {}, {}, {})
+    assert api.api_version is None
+
+    fail_discovery = False
+    assert await api.get_all_sensors(False, {}, {}, {}, {}, {}) is False
+    api._http.get_body.assert_awaited_once_with("/user/api")
+    assert api.api_version == version.parse("1.1")
+    assert routes == ["v12", "v12", "v11"]
+
+    # An outdated or explicitly revalidated version is requested again
+    api.set_api_version("1.2", time.time() - 365 * 24 * 60 * 60)
+    await api.get_all_sensors(False, {}, {}, {}, {}, {})
+    api.set_api_version("1.2")
+    await api.get_all_sensors(False, {}, {}, {}, {}, {}, revalidate_api_version=True)
+    assert api._http.get_body.await_count == 3
+
+
 @pytest.mark.asyncio
 async def test_get_all_sensors_v12(load_fixture):
     """Test get_all_sensors with API v1.2 using real fixture data.
@@ -163,13 +323,13 @@ async def test_get_all_sensors_v12(load_fixture):
         """Create a mock response for a given URL path."""
         response = AsyncMock()
         if url_path in api_endpoint_data:
-            response.text = AsyncMock(return_value=api_endpoint_data[url_path])
+            response.body = api_endpoint_data[url_path].encode()
         else:
             # Return error for unknown endpoints
-            response.text = AsyncMock(
-                return_value='<?xml version="1.0" encoding="utf-8"?>'
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
                 '<eta version="1.0"><error>Not found</error></eta>'
-            )
+            ).encode()
         return response
 
     # Mock the _get_request method to return fixture data
@@ -395,14 +555,14 @@ async def test_get_all_sensors_v12_handles_exceptions():
     async def mock_get_request(suffix):
         response = AsyncMock()
         if "/user/menu" in suffix:
-            response.text = AsyncMock(return_value=menu_xml)
+            response.body = menu_xml.encode()
         elif "/user/varinfo" in suffix and "12271" in suffix:
-            response.text = AsyncMock(return_value=valid_varinfo_xml)
+            response.body = valid_varinfo_xml.encode()
         elif "/user/var" in suffix and "12271" in suffix:
-            response.text = AsyncMock(return_value=valid_var_xml)
+            response.body = valid_var_xml.encode()
         else:
             # Invalid endpoints return error or cause parsing errors
-            response.text = AsyncMock(return_value=error_xml)
+            response.body = error_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -455,12 +615,12 @@ async def test_get_all_sensors_v12_skips_duplicates(load_fixture):
     def create_mock_response(url_path: str):
         response = AsyncMock()
         if url_path in api_endpoint_data:
-            response.text = AsyncMock(return_value=api_endpoint_data[url_path])
+            response.body = api_endpoint_data[url_path].encode()
         else:
-            response.text = AsyncMock(
-                return_value='<?xml version="1.0" encoding="utf-8"?>'
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
                 '<eta version="1.0"><error>Not found</error></eta>'
-            )
+            ).encode()
         return response
 
     call_count = {}
@@ -469,7 +629,7 @@ async def test_get_all_sensors_v12_skips_duplicates(load_fixture):
         call_count[suffix] = call_count.get(suffix, 0) + 1
         if suffix == "/user/menu":
             response = AsyncMock()
-            response.text = AsyncMock(return_value=menu_xml)
+            response.body = menu_xml.encode()
             return response
         else:
             return create_mock_response(suffix)
@@ -497,6 +657,558 @@ async def test_get_all_sensors_v12_skips_duplicates(load_fixture):
     )
 
 
+@pytest.mark.asyncio
+async def test_get_all_sensors_v12_incremental_only_fetches_changed_nodes(
+    load_fixture,
+):
+    """Test an incremental discovery only requests metadata of new menu entries."""
+    api_endpoint_data = load_fixture("api_endpoint_data.json")
+    api = EtaAPI(AsyncMock(spec=ClientSession), "192.168.0.25", 8080)
+    api.is_correct_api_version = AsyncMock(return_value=True)
+
+    def menu_xml(objects: dict[str, str]) -> str:
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1">'
+            '<menu><fub uri="/120/10111" name="WW">'
+            + "".join(
+                f'<object uri="{uri}" name="{name}"/>' for name, uri in objects.items()
+            )
+            + "</fub></menu></eta>"
+        )
+
+    menu = menu_xml(
+        {"Speicher": "/120/10111/0/0/12271", "Kalibrierwert": "/120/10111/0/11129/2049"}
+    )
+    requested: list[str] = []
+
+    async def mock_get_request(suffix):
+        requested.append(suffix)
+        response = AsyncMock()
+        response.body = (
+            menu if suffix == "/user/menu" else api_endpoint_data.get(suffix, "")
+        ).encode()
+        return response
+
+    api._http.get_request = mock_get_request
+
+    dicts = ({}, {}, {}, {}, {})
+    await api.get_all_sensors(False, *dicts)
+    speicher = "eta_192_168_0_25__ww_speicher"
+    kalibrierwert = "eta_192_168_0_25__ww_kalibrierwert"
+    assert speicher in dicts[0]
+    assert kalibrierwert in dicts[0]
+    assert kalibrierwert + "_writable" in dicts[3]
+
+    # One entry disappears from the menu and another one is added
+    menu = menu_xml(
+        {"Kalibrierwert": "/120/10111/0/11129/2049", "Neu": "/120/10111/0/11129/2002"}
+    )
+    requested.clear()
+    await api.get_all_sensors(
+        False, *dicts, incremental=True, previous_menu=api.last_discovered_menu
+    )
+
+    assert "/user/varinfo//120/10111/0/11129/2002" in requested
+    assert not any("2049" in suffix or "12271" in suffix for suffix in requested)
+    assert speicher not in dicts[0]
+    assert kalibrierwert in dicts[0]
+    assert kalibrierwert + "_writable" in dicts[3]
+    assert "eta_192_168_0_25__ww_neu" in dicts[2]
+    assert api.last_discovery_changes == {
+        "reused": ["/120/10111/0/11129/2049"],
+        "discovered": ["/120/10111/0/11129/2002"],
+        "removed": ["/120/10111/0/0/12271"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_all_sensors_v12_incremental_skips_unchanged_non_sensor_nodes(
+    load_fixture,
+):
+    """Test menu entries without entities are not rediscovered while they are unchanged."""
+    api_endpoint_data = load_fixture("api_endpoint_data.json")
+    api = EtaAPI(AsyncMock(spec=ClientSession), "192.168.0.25", 8080)
+    api.set_api_version("1.2")
+    requested: list[str] = []
+
+    async def mock_get_request(suffix):
+        requested.append(suffix)
+        response = AsyncMock()
+        if suffix == "/user/menu":
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1">'
+                '<menu><fub uri="/120/10111" name="WW">'
+                '<object uri="/120/10111/0/0/12271" name="Speicher"/>'
+                # Neither the fub nor this node have metadata of a sensor
+                '<object uri="/120/10111/0/0/99999" name="Kaputt"/>'
+                "</fub></menu></eta>"
+            ).encode()
+            return response
+        response.body = api_endpoint_data.get(suffix, "").encode()
+        return response
+
+    api._http.get_request = mock_get_request
+    catalogs = ({}, {}, {}, {}, {})
+    await api.get_all_sensors(False, *catalogs)
+    assert "/user/varinfo//120/10111" in requested
+    assert "/user/varinfo//120/10111/0/0/99999" in requested
+    assert sum(len(catalog) for catalog in catalogs) == 1
+
+    requested.clear()
+    await api.get_all_sensors(
+        False, *catalogs, incremental=True, previous_menu=api.last_discovered_menu
+    )
+
+    assert requested == ["/user/menu"]
+    assert "eta_192_168_0_25__ww_speicher" in catalogs[0]
+    assert api.last_discovery_changes == {
+        "reused": ["/120/10111/0/0/12271"],
+        "discovered": [],
+        "removed": [],
+    }
+
+@pytest.mark.asyncio
+async def test_get_all_sensors_v12_incremental_keeps_entities_of_failed_rediscoveries(
+    load_fixture,
+):
+    """Test the previous entities of a changed menu entry are kept if it can't be discovered again."""
+    api_endpoint_data = load_fixture("api_endpoint_data.json")
+    api = EtaAPI(AsyncMock(spec=ClientSession), "192.168.0.25", 8080)
+    api.set_api_version("1.2")
+    kalibrierwert_uris = ["/120/10111/0/11129/2049"]
+    failing = False
+
+    async def mock_get_request(suffix):
+        response = AsyncMock()
+        if suffix == "/user/menu":
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1">'
+                '<menu><fub uri="/120/10111" name="WW">'
+                '<object uri="/120/10111/0/0/12271" name="Speicher"/>'
+                + "".join(
+                    f'<object uri="{uri}" name="Kalibrierwert"/>'
+                    for uri in kalibrierwert_uris
+                )
+                + "</fub></menu></eta>"
+            ).encode()
+            return response
+        if failing and "varinfo" in suffix:
+            raise ClientResponseError(MagicMock(), (), status=500)
+        response.body = api_endpoint_data.get(suffix, "").encode()
+        return response
+
+    api._http.get_request = mock_get_request
+    float_dict = {}
+    writable_dict = {}
+    catalogs = (float_dict, {}, {}, writable_dict, {})
+    await api.get_all_sensors(False, *catalogs)
+    kalibrierwert = "eta_192_168_0_25__ww_kalibrierwert"
+    previous_entity = float_dict[kalibrierwert]
+
+    # The menu entry gets another URI, but its metadata can't be read
+    kalibrierwert_uris.append("/120/10111/0/11129/2002")
+    failing = True
+    await api.get_all_sensors(
+        False, *catalogs, incremental=True, previous_menu=api.last_discovered_menu
+    )
+
+    assert float_dict[kalibrierwert] == previous_entity
+    assert kalibrierwert + "_writable" in writable_dict
+    assert "eta_192_168_0_25__ww_speicher" in float_dict
+
+    # Entities whose URI is no longer listed are not kept
+    kalibrierwert_uris[:] = ["/120/10111/0/11129/2002"]
+    await api.get_all_sensors(
+        False, *catalogs, incremental=True, previous_menu=api.last_discovered_menu
+    )
+
+    assert kalibrierwert not in float_dict
+    assert kalibrierwert + "_writable" not in writable_dict
+
+
+@pytest.mark.asyncio
+async def test_get_all_sensors_v12_reads_varinfo_from_cache(load_fixture):
+    """Test cached varinfo metadata is used until its menu entry changes."""
+    api_endpoint_data = load_fixture("api_endpoint_data.json")
+    api = EtaAPI(AsyncMock(spec=ClientSession), "192.168.0.25", 8080)
+    api.set_api_version("1.2")
+    menu_name = "Speicher"
+    requested: list[str] = []
+
+    async def mock_get_request(suffix):
+        requested.append(suffix)
+        response = AsyncMock()
+        if suffix == "/user/menu":
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1">'
+                '<menu><fub uri="/120/10111" name="WW">'
+                f'<object uri="/120/10111/0/0/12271" name="{menu_name}"/>'
+                "</fub></menu></eta>"
+            ).encode()
+        else:
+            response.body = api_endpoint_data.get(suffix, "").encode()
+        return response
+
+    api._http.get_request = mock_get_request
+    varinfo_cache = VarinfoCache()
+    varinfo = "/user/varinfo//120/10111/0/0/12271"
+
+    float_dict = {}
+    await api.get_all_sensors(
+        False, float_dict, {}, {}, {}, {}, varinfo_cache=varinfo_cache
+    )
+    assert varinfo in requested
+    assert varinfo_cache.api_version == "1.2"
+
+    # Restored from disk, the cache still answers all varinfo requests
+    varinfo_cache = VarinfoCache.from_dict(varinfo_cache.as_dict())
+    requested.clear()
+    cached_float_dict = {}
+    await api.get_all_sensors(
+        False, cached_float_dict, {}, {}, {}, {}, varinfo_cache=varinfo_cache
+    )
+    assert varinfo not in requested
+    assert "/user/var//120/10111/0/0/12271" in requested
+    assert cached_float_dict == float_dict
+
+    # A renamed menu entry invalidates the metadata of its URIs
+    menu_name = "Puffer"
+    requested.clear()
+    await api.get_all_sensors(False, {}, {}, {}, {}, {}, varinfo_cache=varinfo_cache)
+    assert varinfo in requested
+
+@pytest.mark.asyncio
+async def test_get_all_sensors_v12_reads_values_while_metadata_is_pending(
+    load_fixture,
+):
+    """Test a value is read as soon as its own varinfo arrived, not after all varinfo."""
+    api_endpoint_data = load_fixture("api_endpoint_data.json")
+    api = EtaAPI(AsyncMock(spec=ClientSession), "192.168.0.25", 8080)
+    api.set_api_version("1.2")
+    slow_varinfo = "/user/varinfo//120/10111/0/11129/2049"
+    fast_var = "/user/var//120/10111/0/0/12271"
+    fast_value_read = asyncio.Event()
+
+    async def mock_get_request(suffix):
+        response = AsyncMock()
+        if suffix == "/user/menu":
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1">'
+                '<menu><fub uri="/120/10111" name="WW">'
+                '<object uri="/120/10111/0/0/12271" name="Speicher"/>'
+                '<object uri="/120/10111/0/11129/2049" name="Kalibrierwert"/>'
+                "</fub></menu></eta>"
+            ).encode()
+            return response
+        if suffix == slow_varinfo:
+            # The slow metadata only arrives once the other value has been read
+            await asyncio.wait_for(fast_value_read.wait(), timeout=5)
+        elif suffix == fast_var:
+            fast_value_read.set()
+        response.body = api_endpoint_data.get(suffix, "").encode()
+        return response
+
+    api._http.get_request = mock_get_request
+
+    float_dict = {}
+    writable_dict = {}
+    await api.get_all_sensors(False, float_dict, {}, {}, writable_dict, {})
+
+    assert list(float_dict) == [
+        "eta_192_168_0_25__ww_speicher",
+        "eta_192_168_0_25__ww_kalibrierwert",
+    ]
+    assert "eta_192_168_0_25__ww_kalibrierwert_writable" in writable_dict
+
+@pytest.mark.asyncio
+async def test_get_all_sensors_v12_reads_duplicate_nodes_once(load_fixture):
+    """Test resolving a duplicate node shares its value reads with the classification."""
+    api_endpoint_data = load_fixture("api_endpoint_data.json")
+    api = EtaAPI(AsyncMock(spec=ClientSession), "192.168.0.25", 8080)
+    api.set_api_version("1.2")
+    call_count: dict[str, int] = {}
+
+    async def mock_get_request(suffix):
+        call_count[suffix] = call_count.get(suffix, 0) + 1
+        response = AsyncMock()
+        if suffix == "/user/menu":
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1">'
+                '<menu><fub uri="/120/10111" name="WW">'
+                '<object uri="/120/10111/0/0/12271" name="Speicher"/>'
+                '<object uri="/120/10111/0/11129/0" name="Speicher"/>'
+                "</fub></menu></eta>"
+            ).encode()
+        elif suffix == "/user/var//120/10111/0/11129/0":
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1">'
+                '<value uri="/user/var/120/10111/0/11129/0" strValue="xxx" unit="°C"'
+                ' decPlaces="0" scaleFactor="10" advTextOffset="0">0</value></eta>'
+            ).encode()
+        else:
+            response.body = api_endpoint_data.get(suffix, "").encode()
+        return response
+
+    api._http.get_request = mock_get_request
+
+    float_dict = {}
+    await api.get_all_sensors(False, float_dict, {}, {}, {}, {})
+
+    assert float_dict["eta_192_168_0_25__ww_speicher"]["url"] == "/120/10111/0/0/12271"
+    assert call_count["/user/var//120/10111/0/0/12271"] == 1
+    assert call_count["/user/var//120/10111/0/11129/0"] == 1
+
+@pytest.mark.asyncio
+async def test_get_all_sensors_v12_resumes_from_checkpoint(load_fixture):
+    """Test an interrupted discovery only requests the missing endpoints when resumed."""
+    api_endpoint_data = load_fixture("api_endpoint_data.json")
+    api = EtaAPI(AsyncMock(spec=ClientSession), "192.168.0.25", 8080)
+    api.set_api_version("1.2")
+    stalled_varinfo = "/user/varinfo//120/10111/0/11129/2049"
+    stalled = True
+    requested: list[str] = []
+
+    async def mock_get_request(suffix):
+        requested.append(suffix)
+        response = AsyncMock()
+        if suffix == "/user/menu":
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1">'
+                '<menu><fub uri="/120/10111" name="WW">'
+                '<object uri="/120/10111/0/0/12271" name="Speicher"/>'
+                '<object uri="/120/10111/0/11129/2049" name="Kalibrierwert"/>'
+                '<object uri="/120/10111/0/11129/2002" name="Status"/>'
+                "</fub></menu></eta>"
+            ).encode()
+            return response
+        if suffix == stalled_varinfo and stalled:
+            await asyncio.Event().wait()
+        response.body = api_endpoint_data.get(suffix, "").encode()
+        return response
+
+    api._http.get_request = mock_get_request
+    saved: list[dict] = []
+    checkpoint = DiscoveryCheckpoint(
+        60, save=lambda: saved.append(checkpoint.as_dict()), save_interval=0
+    )
+
+    discovery = asyncio.create_task(
+        api.get_all_sensors(False, {}, {}, {}, {}, {}, checkpoint=checkpoint)
+    )
+    for _ in range(100):
+        if saved and "/user/var//120/10111/0/0/12271" in saved[-1]["values"]:
+            break
+        await asyncio.sleep(0)
+    discovery.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await discovery
+
+    # Restored after a restart, the discovery continues with the saved menu
+    stalled = False
+    requested.clear()
+    checkpoint = DiscoveryCheckpoint(60, save=lambda: saved.append(checkpoint.as_dict()))
+    checkpoint.restore(saved[-1])
+    float_dict = {}
+    text_dict = {}
+    writable_dict = {}
+    await api.get_all_sensors(
+        False, float_dict, {}, text_dict, writable_dict, {}, checkpoint=checkpoint
+    )
+
+    assert "/user/menu" not in requested
+    assert "/user/varinfo//120/10111/0/0/12271" not in requested
+    assert "/user/var//120/10111/0/0/12271" not in requested
+    assert stalled_varinfo in requested
+    assert set(float_dict) == {
+        "eta_192_168_0_25__ww_speicher",
+        "eta_192_168_0_25__ww_kalibrierwert",
+    }
+    assert "eta_192_168_0_25__ww_kalibrierwert_writable" in writable_dict
+    assert "eta_192_168_0_25__ww_status" in text_dict
+    # A completed discovery leaves nothing to resume
+    assert saved[-1]["menu"] is None
+    assert checkpoint.menu is None
+
+    # An outdated checkpoint is ignored
+    outdated = DiscoveryCheckpoint(60)
+    outdated.restore({**saved[-2], "started_at": 0})
+    assert outdated.menu is None
+
+
+@pytest.mark.asyncio
+async def test_get_all_sensors_v12_discovers_each_fub_on_its_own(load_fixture):
+    """Test function blocks share the request slots, complete separately and can be skipped."""
+    api_endpoint_data = load_fixture("api_endpoint_data.json")
+    api = EtaAPI(AsyncMock(spec=ClientSession), "192.168.0.25", 8080)
+    api.set_api_version("1.2")
+    requested: list[str] = []
+
+    async def mock_get_request(suffix):
+        requested.append(suffix)
+        response = AsyncMock()
+        if suffix == "/user/menu":
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1">'
+                '<menu><fub uri="/120/10101" name="HK">'
+                '<object uri="/120/10101/0/0/12197" name="Vorlauf"/>'
+                '<object uri="/120/10101/0/0/12476" name="Status"/>'
+                '</fub><fub uri="/120/10111" name="WW">'
+                '<object uri="/120/10111/0/0/12271" name="Speicher"/>'
+                '</fub><fub uri="/120/10112" name="Solar">'
+                '<object uri="/120/10112/0/0/12271" name="Kollektor"/>'
+                "</fub></menu></eta>"
+            ).encode()
+        else:
+            response.body = api_endpoint_data.get(suffix, "").encode()
+        return response
+
+    api._http.get_request = mock_get_request
+    assert await api.get_fub_node_counts() == {"HK": 3, "WW": 2, "Solar": 2}
+
+    menu = await api.get_menu_endpoints()
+    requested.clear()
+    completed_fubs: list[tuple[str, int]] = []
+    float_dict = {}
+    catalogs = [float_dict, {}, {}, {}, {}]
+    await api.get_all_sensors(
+        False,
+        *catalogs,
+        menu=menu,
+        skip_fubs=["Solar"],
+        fub_callback=lambda fub, num_entities: completed_fubs.append(
+            (fub, num_entities)
+        ),
+    )
+
+    # The menu which has just been read is not requested again
+    assert "/user/menu" not in requested
+    # The metadata of both function blocks is requested alternately
+    varinfo_requests = [suffix for suffix in requested if "varinfo" in suffix]
+    assert varinfo_requests[:2] == [
+        "/user/varinfo//120/10101",
+        "/user/varinfo//120/10111",
+    ]
+    assert not [suffix for suffix in requested if "10112" in suffix]
+    assert sorted(fub for fub, _ in completed_fubs) == ["HK", "WW"]
+    assert sum(num_entities for _, num_entities in completed_fubs) == sum(
+        len(catalog) for catalog in catalogs
+    )
+    assert "eta_192_168_0_25__ww_speicher" in float_dict
+    assert "eta_192_168_0_25__solar_kollektor" not in float_dict
+
+
+@pytest.mark.asyncio
+async def test_get_all_sensors_v12_keeps_partial_results_after_deadline(load_fixture):
+    """Test an expired deadline keeps the classified endpoints and records the missing ones."""
+    api_endpoint_data = load_fixture("api_endpoint_data.json")
+    api = EtaAPI(AsyncMock(spec=ClientSession), "192.168.0.25", 8080)
+    api.set_api_version("1.2")
+    stalled_varinfo = "/user/varinfo//120/10111/0/11129/2049"
+    stalled = True
+    requested: list[str] = []
+
+    async def mock_get_request(suffix):
+        requested.append(suffix)
+        response = AsyncMock()
+        if suffix == "/user/menu":
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1">'
+                '<menu><fub uri="/120/10111" name="WW">'
+                '<object uri="/120/10111/0/0/12271" name="Speicher"/>'
+                '<object uri="/120/10111/0/11129/2049" name="Kalibrierwert"/>'
+                '<object uri="/120/10111/0/11129/2002" name="Status"/>'
+                "</fub></menu></eta>"
+            ).encode()
+            return response
+        if suffix == stalled_varinfo and stalled:
+            await asyncio.Event().wait()
+        response.body = api_endpoint_data.get(suffix, "").encode()
+        return response
+
+    api._http.get_request = mock_get_request
+    checkpoint = DiscoveryCheckpoint(60)
+    float_dict = {}
+    text_dict = {}
+    writable_dict = {}
+    catalogs = [float_dict, {}, text_dict, writable_dict, {}]
+
+    assert await api.get_all_sensors(
+        False, *catalogs, checkpoint=checkpoint, deadline=0.2
+    )
+
+    assert set(float_dict) == {"eta_192_168_0_25__ww_speicher"}
+    assert "eta_192_168_0_25__ww_status" in text_dict
+    assert api.last_unfinished_uris == ["/120/10111/0/11129/2049"]
+    # The checkpoint is kept, so that the next discovery can continue
+    assert checkpoint.menu is not None
+
+    # An incremental discovery only requests what is still missing
+    stalled = False
+    requested.clear()
+    await api.get_all_sensors(
+        False,
+        *catalogs,
+        incremental=True,
+        checkpoint=checkpoint,
+        deadline=60,
+        previous_menu=api.last_discovered_menu,
+    )
+
+    assert "/user/varinfo//120/10111/0/0/12271" not in requested
+    assert stalled_varinfo in requested
+    assert "eta_192_168_0_25__ww_kalibrierwert" in float_dict
+    assert "eta_192_168_0_25__ww_kalibrierwert_writable" in writable_dict
+    assert "eta_192_168_0_25__ww_speicher" in float_dict
+    assert api.last_unfinished_uris == []
+    assert checkpoint.menu is None
+
+
+@pytest.mark.asyncio
+async def test_get_all_sensors_v12_fails_if_the_terminal_becomes_unavailable(
+    load_fixture,
+):
+    """Test an open circuit breaker fails the discovery instead of dropping endpoints."""
+    from custom_components.eta_webservices.api import ETATerminalUnavailableError
+
+    api_endpoint_data = load_fixture("api_endpoint_data.json")
+    api = EtaAPI(AsyncMock(spec=ClientSession), "192.168.0.25", 8080)
+    api.set_api_version("1.2")
+
+    async def mock_get_request(suffix):
+        response = AsyncMock()
+        if suffix == "/user/menu":
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1">'
+                '<menu><fub uri="/120/10111" name="WW">'
+                '<object uri="/120/10111/0/0/12271" name="Speicher"/>'
+                '<object uri="/120/10111/0/11129/2002" name="Status"/>'
+                "</fub></menu></eta>"
+            ).encode()
+            return response
+        if suffix.startswith("/user/varinfo/") and suffix.endswith("/2002"):
+            raise ETATerminalUnavailableError("circuit open")
+        response.body = api_endpoint_data.get(suffix, "").encode()
+        return response
+
+    api._http.get_request = mock_get_request
+    float_dict = {}
+
+    with pytest.raises(ETATerminalUnavailableError):
+        await api.get_all_sensors(False, float_dict, {}, {}, {}, {})
+    assert api.last_discovered_menu is None
+
+
 @pytest.mark.asyncio
 async def test_get_all_sensors_v11(load_fixture):
     """Test get_all_sensors with API v1.1 using real fixture data.
@@ -528,13 +1240,13 @@ async def test_get_all_sensors_v11(load_fixture):
         """Create a mock response for a given URL path."""
         response = AsyncMock()
         if url_path in api_endpoint_data:
-            response.text = AsyncMock(return_value=api_endpoint_data[url_path])
+            response.body = api_endpoint_data[url_path].encode()
         else:
             # Return error for unknown endpoints
-            response.text = AsyncMock(
-                return_value='<?xml version="1.0" encoding="utf-8"?>'
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
                 '<eta version="1.0"><error>Not found</error></eta>'
-            )
+            ).encode()
         return response
 
     # Mock the _get_request method to return fixture data
@@ -745,20 +1457,20 @@ async def test_get_all_sensors_v11_distinguishes_sensor_types():
     async def mock_get_request(suffix):
         response = AsyncMock()
         if "/user/menu" in suffix:
-            response.text = AsyncMock(return_value=menu_xml)
+            response.body = menu_xml.encode()
         elif "12197" in suffix:
-            response.text = AsyncMock(return_value=float_var)
+            response.body = float_var.encode()
         elif "12080" in suffix:
-            response.text = AsyncMock(return_value=switch_var)
+            response.body = switch_var.encode()
         elif "12132" in suffix:
-            response.text = AsyncMock(return_value=writable_var)
+            response.body = writable_var.encode()
         elif "12476" in suffix:
-            response.text = AsyncMock(return_value=text_var)
+            response.body = text_var.encode()
         else:
-            response.text = AsyncMock(
-                return_value='<?xml version="1.0" encoding="utf-8"?>'
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
                 '<eta version="1.0"><error>Not found</error></eta>'
-            )
+            ).encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -820,14 +1532,14 @@ async def test_get_all_sensors_v11_skips_duplicates():
         call_count[suffix] = call_count.get(suffix, 0) + 1
         response = AsyncMock()
         if "/user/menu" in suffix:
-            response.text = AsyncMock(return_value=menu_xml)
+            response.body = menu_xml.encode()
         elif "12197" in suffix:
-            response.text = AsyncMock(return_value=sensor_var)
+            response.body = sensor_var.encode()
         else:
-            response.text = AsyncMock(
-                return_value='<?xml version="1.0" encoding="utf-8"?>'
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
                 '<eta version="1.0"><error>Not found</error></eta>'
-            )
+            ).encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -850,6 +1562,55 @@ async def test_get_all_sensors_v11_skips_duplicates():
     )
 
 
+@pytest.mark.asyncio
+async def test_get_all_sensors_v11_ignores_v12_options():
+    """Test the v1.1 discovery accepts the options of the v1.2 discovery and ignores them."""
+    api = EtaAPI(AsyncMock(spec=ClientSession), "192.168.0.1", 8080)
+    api.is_correct_api_version = AsyncMock(return_value=False)
+
+    async def mock_get_request(suffix):
+        response = AsyncMock()
+        if suffix == "/user/menu":
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1">'
+                '<menu><fub uri="/120/10101" name="HK">'
+                '<object uri="/120/10101/0/0/12197" name="Sensor"/>'
+                "</fub></menu></eta>"
+            ).encode()
+        else:
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1">'
+                '<value uri="/user/var/120/10101/0/0/12197" strValue="20" '
+                'unit="°C" decPlaces="0" scaleFactor="10" advTextOffset="0">200</value>'
+                "</eta>"
+            ).encode()
+        return response
+
+    api._http.get_request = mock_get_request
+    float_dict = {"eta_192_168_0_1__hk_stale": {}}
+
+    result = await api.get_all_sensors(
+        False,
+        float_dict,
+        {},
+        {},
+        {},
+        {},
+        incremental=True,
+        deadline=60,
+        previous_menu={"_HK_Sensor": ["/120/10101/0/0/12197"]},
+    )
+
+    assert result is False
+    # Everything is discovered again
+    assert "eta_192_168_0_1__hk_stale" not in float_dict
+    assert "eta_192_168_0_1__hk_sensor" in float_dict
+    assert api.last_discovered_menu is None
+    assert api.last_unfinished_uris == []
+
+
 @pytest.mark.asyncio
 async def test_get_all_sensors_force_legacy_mode(load_fixture):
     """Test that force_legacy_mode forces use of v1.1 even with v1.2 API.
@@ -884,13 +1645,13 @@ async def test_get_all_sensors_force_legacy_mode(load_fixture):
         """Create a mock response for a given URL path."""
         response = AsyncMock()
         if url_path in api_endpoint_data:
-            response.text = AsyncMock(return_value=api_endpoint_data[url_path])
+            response.body = api_endpoint_data[url_path].encode()
         else:
             # Return error for unknown endpoints
-            response.text = AsyncMock(
-                return_value='<?xml version="1.0" encoding="utf-8"?>'
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
                 '<eta version="1.0"><error>Not found</error></eta>'
-            )
+            ).encode()
         return response
 
     # Mock the _get_request method to return fixture data
@@ -962,7 +1723,7 @@ async def test_is_correct_api_version_returns_true_for_v12():
     async def mock_get_request(suffix):
         called_endpoints.append(suffix)
         response = AsyncMock()
-        response.text = AsyncMock(return_value=api_xml)
+        response.body = api_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -998,7 +1759,7 @@ async def test_is_correct_api_version_returns_true_for_higher_version():
     async def mock_get_request(suffix):
         called_endpoints.append(suffix)
         response = AsyncMock()
-        response.text = AsyncMock(return_value=api_xml)
+        response.body = api_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1034,7 +1795,7 @@ async def test_is_correct_api_version_returns_false_for_v11():
     async def mock_get_request(suffix):
         called_endpoints.append(suffix)
         response = AsyncMock()
-        response.text = AsyncMock(return_value=api_xml)
+        response.body = api_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1070,7 +1831,7 @@ async def test_is_correct_api_version_returns_false_for_v10():
     async def mock_get_request(suffix):
         called_endpoints.append(suffix)
         response = AsyncMock()
-        response.text = AsyncMock(return_value=api_xml)
+        response.body = api_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1106,7 +1867,7 @@ async def test_is_correct_api_version_returns_true_for_v20():
     async def mock_get_request(suffix):
         called_endpoints.append(suffix)
         response = AsyncMock()
-        response.text = AsyncMock(return_value=api_xml)
+        response.body = api_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1138,7 +1899,7 @@ async def test_does_endpoint_exists_returns_true_on_success():
 
     async def mock_get_request(suffix):
         response = AsyncMock()
-        response.text = AsyncMock(return_value=menu_xml)
+        response.body = menu_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1281,7 +2042,7 @@ async def test_get_api_version_parses_correctly():
 
     async def mock_get_request(suffix):
         response = AsyncMock()
-        response.text = AsyncMock(return_value=api_xml)
+        response.body = api_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1332,7 +2093,7 @@ async def test_get_data_returns_parsed_data(load_fixture):
 
     async def mock_get_request(suffix):
         response = AsyncMock()
-        response.text = AsyncMock(return_value=expected_xml)
+        response.body = expected_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1388,7 +2149,7 @@ async def test_get_data_with_force_number_handling():
 
     async def mock_get_request(suffix):
         response = AsyncMock()
-        response.text = AsyncMock(return_value=custom_unit_xml)
+        response.body = custom_unit_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1429,7 +2190,7 @@ async def test_get_data_with_force_string_handling():
 
     async def mock_get_request(suffix):
         response = AsyncMock()
-        response.text = AsyncMock(return_value=float_unit_xml)
+        response.body = float_unit_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1469,7 +2230,7 @@ async def test_get_data_float_endpoint_preserves_precision():
 
     async def mock_get_request(suffix):
         response = AsyncMock()
-        response.text = AsyncMock(return_value=float_endpoint_xml)
+        response.body = float_endpoint_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1498,12 +2259,12 @@ async def test_get_all_data_fetches_multiple_sensors(load_fixture):
     async def mock_get_request(suffix):
         response = AsyncMock()
         if suffix in api_endpoint_data:
-            response.text = AsyncMock(return_value=api_endpoint_data[suffix])
+            response.body = api_endpoint_data[suffix].encode()
         else:
-            response.text = AsyncMock(
-                return_value='<?xml version="1.0" encoding="utf-8"?>'
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
                 '<eta version="1.0"><error>Not found</error></eta>'
-            )
+            ).encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1547,13 +2308,13 @@ async def test_get_all_data_handles_exceptions_gracefully():
         response = AsyncMock()
         if "12197" in suffix:
             # First sensor succeeds
-            response.text = AsyncMock(
-                return_value='<?xml version="1.0" encoding="utf-8"?>'
+            response.body = (
+                '<?xml version="1.0" encoding="utf-8"?>'
                 '<eta version="1.0">'
                 '<value uri="/user/var/120/10101/0/0/12197" strValue="20" '
                 'unit="°C" decPlaces="0" scaleFactor="10" advTextOffset="0">200</value>'
                 "</eta>"
-            )
+            ).encode()
         else:
             # Second sensor fails
             raise ClientError("Connection failed")
@@ -1595,7 +2356,7 @@ async def test_get_all_data_with_empty_sensor_list():
         nonlocal call_count
         call_count += 1
         response = AsyncMock()
-        response.text = AsyncMock(return_value="<eta></eta>")
+        response.body = "<eta></eta>".encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1659,7 +2420,7 @@ async def test_get_all_data_passes_force_number_handling():
 
     async def mock_get_request(suffix):
         response = AsyncMock()
-        response.text = AsyncMock(return_value=custom_unit_xml)
+        response.body = custom_unit_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1700,7 +2461,7 @@ async def test_get_all_data_passes_force_string_handling():
 
     async def mock_get_request(suffix):
         response = AsyncMock()
-        response.text = AsyncMock(return_value=float_unit_xml)
+        response.body = float_unit_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1736,7 +2497,7 @@ async def test_get_menu_returns_menu_data(load_fixture):
 
     async def mock_get_request(suffix):
         response = AsyncMock()
-        response.text = AsyncMock(return_value=menu_xml)
+        response.body = menu_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1791,7 +2552,7 @@ async def test_get_errors_returns_empty_list_when_no_errors():
 
     async def mock_get_request(suffix):
         response = AsyncMock()
-        response.text = AsyncMock(return_value=errors_xml)
+        response.body = errors_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1831,7 +2592,7 @@ async def test_get_errors_returns_list_of_errors():
 
     async def mock_get_request(suffix):
         response = AsyncMock()
-        response.text = AsyncMock(return_value=errors_xml)
+        response.body = errors_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1883,7 +2644,7 @@ async def test_get_switch_state_returns_integer():
 
     async def mock_get_request(suffix):
         response = AsyncMock()
-        response.text = AsyncMock(return_value=switch_xml)
+        response.body = switch_xml.encode()
         return response
 
     api._http.get_request = mock_get_request
@@ -1933,9 +2694,7 @@ async def test_set_switch_state_sends_correct_data():
         posted_uri = suffix
         posted_data = data
         response = AsyncMock()
-        response.text = AsyncMock(
-            return_value='<?xml version="1.0" encoding="utf-8"?><eta version="1.0"><success/></eta>'
-        )
+        response.body = '<?xml version="1.0" encoding="utf-8"?><eta version="1.0"><success/></eta>'.encode()
         return response
 
     api._http.post_request = mock_post_request
@@ -1966,9 +2725,7 @@ async def test_write_endpoint_with_value_only():
         posted_uri = suffix
         posted_data = data
         response = AsyncMock()
-        response.text = AsyncMock(
-            return_value='<?xml version="1.0" encoding="utf-8"?><eta version="1.0"><success/></eta>'
-        )
+        response.body = '<?xml version="1.0" encoding="utf-8"?><eta version="1.0"><success/></eta>'.encode()
         return response
 
     api._http.post_request = mock_post_request
@@ -2001,9 +2758,7 @@ async def test_write_endpoint_with_all_parameters():
         posted_uri = suffix
         posted_data = data
         response = AsyncMock()
-        response.text = AsyncMock(
-            return_value='<?xml version="1.0" encoding="utf-8"?><eta version="1.0"><success/></eta>'
-        )
+        response.body = '<?xml version="1.0" encoding="utf-8"?><eta version="1.0"><success/></eta>'.encode()
         return response
 
     api._http.post_request = mock_post_request
@@ -2038,9 +2793,7 @@ async def test_write_endpoint_with_begin_and_end_only():
         posted_uri = suffix
         posted_data = data
         response = AsyncMock()
-        response.text = AsyncMock(
-            return_value='<?xml version="1.0" encoding="utf-8"?><eta version="1.0"><success/></eta>'
-        )
+        response.body = '<?xml version="1.0" encoding="utf-8"?><eta version="1.0"><success/></eta>'.encode()
         return response
 
     api._http.post_request = mock_post_request
@@ -2069,9 +2822,7 @@ async def test_set_switch_state_returns_false_on_failure():
 
     async def mock_post_request(suffix, data):
         response = AsyncMock()
-        response.text = AsyncMock(
-            return_value='<?xml version="1.0" encoding="utf-8"?><eta version="1.0"><value>1802</value></eta>'
-        )
+        response.body = '<?xml version="1.0" encoding="utf-8"?><eta version="1.0"><value>1802</value></eta>'.encode()
         return response
 
     api._http.post_request = mock_post_request
@@ -2118,9 +2869,7 @@ async def test_set_switch_state_with_off_state():
         nonlocal posted_data
         posted_data = data
         response = AsyncMock()
-        response.text = AsyncMock(
-            return_value='<?xml version="1.0" encoding="utf-8"?><eta version="1.0"><success uri="/user/var/120/10101/0/0/12080"/></eta>'
-        )
+        response.body = '<?xml version="1.0" encoding="utf-8"?><eta version="1.0"><success uri="/user/var/120/10101/0/0/12080"/></eta>'.encode()
         return response
 
     api._http.post_request = mock_post_request
@@ -2144,10 +2893,10 @@ async def test_write_endpoint_returns_false_on_error_response():
 
     async def mock_post_request(suffix, data):
         response = AsyncMock()
-        response.text = AsyncMock(
-            return_value='<?xml version="1.0" encoding="utf-8"?>'
+        response.body = (
+            '<?xml version="1.0" encoding="utf-8"?>'
             '<eta version="1.0"><error>Invalid value</error></eta>'
-        )
+        ).encode()
         return response
 
     api._http.post_request = mock_post_request
@@ -2170,10 +2919,10 @@ async def test_write_endpoint_returns_false_on_invalid_response():
 
     async def mock_post_request(suffix, data):
         response = AsyncMock()
-        response.text = AsyncMock(
-            return_value='<?xml version="1.0" encoding="utf-8"?>'
+        response.body = (
+            '<?xml version="1.0" encoding="utf-8"?>'
             '<eta version="1.0"><unknown>response</unknown></eta>'
-        )
+        ).encode()
         return response
 
     api._http.post_request = mock_post_request
@@ -2220,9 +2969,7 @@ async def test_write_endpoint_with_empty_payload():
         nonlocal posted_data
         posted_data = data
         response = AsyncMock()
-        response.text = AsyncMock(
-            return_value='<?xml version="1.0" encoding="utf-8"?><eta version="1.0"><success uri="/user/var/120/10101/0/0/12132"/></eta>'
-        )
+        response.body = '<?xml version="1.0" encoding="utf-8"?><eta version="1.0"><success uri="/user/var/120/10101/0/0/12132"/></eta>'.encode()
         return response
 
     api._http.post_request = mock_post_request
@@ -2252,6 +2999,22 @@ async def test_get_all_switch_states_handles_exceptions():
     assert isinstance(results["/120/1/fail"], RuntimeError)
 
 
+def _make_aiohttp_response(body: bytes = b"", status: int = 200) -> AsyncMock:
+    """Return a mock of an aiohttp response whose body has not been read yet."""
+    response = AsyncMock()
+    response.status = status
+    response.read = AsyncMock(return_value=body)
+    return response
+
+
+def _make_session_response(body: bytes = b"", status: int = 200) -> MagicMock:
+    """Return a mock of the context manager returned by session.get/post."""
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=_make_aiohttp_response(body, status))
+    context.__aexit__ = AsyncMock(return_value=False)
+    return context
+
+
 @pytest.mark.asyncio
 async def test_api_client_get_request_calls_correct_url():
     """Test that get_request builds the correct URL and calls session.get.
@@ -2261,14 +3024,13 @@ async def test_api_client_get_request_calls_correct_url():
     - session.get is called with that URL
     """
     mock_session = AsyncMock(spec=ClientSession)
-    mock_response = AsyncMock()
-    mock_session.get = AsyncMock(return_value=mock_response)
+    mock_session.get = MagicMock(return_value=_make_session_response(b"<eta/>"))
 
     client = APIClient(mock_session, "192.168.0.1", 8080)
     result = await client.get_request("/user/menu")
 
     mock_session.get.assert_called_once_with("http://192.168.0.1:8080/user/menu")
-    assert result is mock_response
+    assert result == ETAResponse(200, b"<eta/>")
 
 
 @pytest.mark.asyncio
@@ -2280,8 +3042,7 @@ async def test_api_client_post_request_calls_correct_url_and_data():
     - session.post is called with that URL and the provided data dict
     """
     mock_session = AsyncMock(spec=ClientSession)
-    mock_response = AsyncMock()
-    mock_session.post = AsyncMock(return_value=mock_response)
+    mock_session.post = MagicMock(return_value=_make_session_response(b"<eta/>"))
 
     client = APIClient(mock_session, "192.168.0.1", 8080)
     payload = {"value": 1803}
@@ -2290,30 +3051,53 @@ async def test_api_client_post_request_calls_correct_url_and_data():
     mock_session.post.assert_called_once_with(
         "http://192.168.0.1:8080/user/var//120/10101/0/0/12080", data=payload
     )
-    assert result is mock_response
+    assert result == ETAResponse(200, b"<eta/>")
 
 
 @pytest.mark.asyncio
-async def test_api_client_get_request_enforces_semaphore_limit():
-    """Test that get_request enforces the semaphore concurrency limit.
+async def test_api_client_releases_connection_if_reading_body_fails():
+    """Test that the response is released even if reading its body raises.
 
     This test verifies:
-    - No more than max_concurrent_requests session.get calls run simultaneously
-    - All requests are eventually completed
+    - The error of the failed read is propagated
+    - The response context is exited, so the connection goes back to the pool
+    - The request permit is released
     """
-    max_concurrent = 3
-    current_concurrent = 0
-    observed_max = 0
-
     mock_session = AsyncMock(spec=ClientSession)
+    context = _make_session_response()
+    context.__aenter__.return_value.read.side_effect = ClientError("connection lost")
+    mock_session.get = MagicMock(return_value=context)
 
+    client = APIClient(mock_session, "192.168.0.1", 8080, max_concurrent_requests=1)
+    with pytest.raises(ClientError):
+        await client.get_request("/user/menu")
+
+    context.__aexit__.assert_awaited_once()
+    assert not client._request_semaphore.locked()
+
+
+@pytest.mark.asyncio
+async def test_api_client_get_request_enforces_semaphore_limit():
+    """Test that get_request enforces the semaphore concurrency limit.
+
+    This test verifies:
+    - No more than max_concurrent_requests session.get calls run simultaneously
+    - All requests are eventually completed
+    """
+    max_concurrent = 3
+    current_concurrent = 0
+    observed_max = 0
+
+    mock_session = AsyncMock(spec=ClientSession)
+
+    @contextlib.asynccontextmanager
     async def slow_get(url, **kwargs):
         nonlocal current_concurrent, observed_max
         current_concurrent += 1
         observed_max = max(observed_max, current_concurrent)
         await asyncio.sleep(0.02)
         current_concurrent -= 1
-        return AsyncMock()
+        yield _make_aiohttp_response()
 
     mock_session.get = slow_get
 
@@ -2342,13 +3126,14 @@ async def test_api_client_post_request_enforces_semaphore_limit():
 
     mock_session = AsyncMock(spec=ClientSession)
 
+    @contextlib.asynccontextmanager
     async def slow_post(url, **kwargs):
         nonlocal current_concurrent, observed_max
         current_concurrent += 1
         observed_max = max(observed_max, current_concurrent)
         await asyncio.sleep(0.02)
         current_concurrent -= 1
-        return AsyncMock()
+        yield _make_aiohttp_response()
 
     mock_session.post = slow_post
 
@@ -2380,21 +3165,23 @@ async def test_api_client_get_and_post_share_semaphore():
 
     mock_session = AsyncMock(spec=ClientSession)
 
+    @contextlib.asynccontextmanager
     async def slow_get(url, **kwargs):
         nonlocal current_concurrent, observed_max
         current_concurrent += 1
         observed_max = max(observed_max, current_concurrent)
         await asyncio.sleep(0.02)
         current_concurrent -= 1
-        return AsyncMock()
+        yield _make_aiohttp_response()
 
+    @contextlib.asynccontextmanager
     async def slow_post(url, **kwargs):
         nonlocal current_concurrent, observed_max
         current_concurrent += 1
         observed_max = max(observed_max, current_concurrent)
         await asyncio.sleep(0.02)
         current_concurrent -= 1
-        return AsyncMock()
+        yield _make_aiohttp_response()
 
     mock_session.get = slow_get
     mock_session.post = slow_post
@@ -2410,3 +3197,1335 @@ async def test_api_client_get_and_post_share_semaphore():
     assert observed_max <= max_concurrent, (
         f"Mixed GET/POST should share the semaphore: expected <= {max_concurrent}, got {observed_max}"
     )
+
+
+VARSET_XML = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1">'
+    '<vars uri="/user/vars/ha_eta_webservices">'
+    '<variable uri="120/10101/0/0/12197" strValue="44,4" unit="°C"'
+    ' decPlaces="1" scaleFactor="10" advTextOffset="0">444</variable>'
+    '<variable uri="120/10101/0/0/12080" strValue="Ein" unit=""'
+    ' decPlaces="0" scaleFactor="1" advTextOffset="1802">1803</variable>'
+    "</vars>"
+    "</eta>"
+)
+
+
+def _make_text_response(text: str, status: int = 200) -> ETAResponse:
+    return ETAResponse(status, text.encode())
+
+
+@pytest.mark.asyncio
+async def test_get_varset_data_parses_sensors_and_switches():
+    """Test that get_varset_data reads all values of a variable set with one request.
+
+    This test verifies:
+    - Only a single GET request to /user/vars/<name> is made
+    - URIs are matched regardless of the leading slash
+    - Sensor values are scaled and switch states are returned as raw integers
+    - Endpoints missing from the set are not part of the result
+    """
+    mock_session = AsyncMock(spec=ClientSession)
+    api = EtaAPI(mock_session, "192.168.0.1", 8080)
+
+    requested = []
+
+    async def mock_get_request(suffix):
+        requested.append(suffix)
+        return _make_text_response(VARSET_XML)
+
+    api._http.get_request = mock_get_request
+
+    data, switch_states = await api.get_varset_data(
+        "ha_eta_webservices",
+        {"/120/10101/0/0/12197": {}, "/120/10101/0/0/99999": {}},
+        ["/120/10101/0/0/12080"],
+    )
+
+    assert requested == ["/user/vars/ha_eta_webservices"]
+    assert data == {"/120/10101/0/0/12197": 44.4}
+    assert switch_states == {"/120/10101/0/0/12080": 1803}
+
+
+@pytest.mark.asyncio
+async def test_get_varset_data_raises_on_error_response():
+    """Test that get_varset_data raises ETAVarsetError if the terminal rejects the set."""
+    mock_session = AsyncMock(spec=ClientSession)
+    api = EtaAPI(mock_session, "192.168.0.1", 8080)
+
+    async def mock_get_request(suffix):
+        return _make_text_response(
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<eta version="1.0"><error>Unknown varset</error></eta>',
+            status=404,
+        )
+
+    api._http.get_request = mock_get_request
+
+    from custom_components.eta_webservices.api import ETAVarsetError
+
+    with pytest.raises(ETAVarsetError):
+        await api.get_varset_data("ha_eta_webservices", {"/120/1/0/0/1": {}})
+
+
+@pytest.mark.asyncio
+async def test_sync_varset_recreates_set_and_adds_uris():
+    """Test that sync_varset recreates the set and registers every URI.
+
+    This test verifies:
+    - An unknown set is deleted and created before URIs are added
+    - Each URI is added with a PUT below the set
+    - URIs rejected by the terminal are not reported as registered
+    """
+    mock_session = AsyncMock(spec=ClientSession)
+    api = EtaAPI(mock_session, "192.168.0.1", 8080)
+
+    calls = []
+
+    async def mock_modify(method, suffix):
+        calls.append((method, suffix))
+        return not suffix.endswith("/bad")
+
+    api._http.modify_varset = mock_modify
+
+    registered = await api.sync_varset("set", {"/120/1/ok", "/120/1/bad"}, None)
+
+    assert registered == {"/120/1/ok"}
+    assert calls[0] == ("DELETE", "set")
+    assert calls[1] == ("PUT", "set")
+    assert ("PUT", "set/120/1/ok") in calls
+    assert ("PUT", "set/120/1/bad") in calls
+
+
+@pytest.mark.asyncio
+async def test_sync_varset_applies_only_the_difference():
+    """Test that sync_varset only adds new and removes stale URIs of an existing set."""
+    mock_session = AsyncMock(spec=ClientSession)
+    api = EtaAPI(mock_session, "192.168.0.1", 8080)
+
+    calls = []
+
+    async def mock_modify(method, suffix):
+        calls.append((method, suffix))
+        return True
+
+    api._http.modify_varset = mock_modify
+
+    registered = await api.sync_varset(
+        "set", {"/120/1/keep", "/120/1/new"}, {"/120/1/keep", "/120/1/old"}
+    )
+
+    assert registered == {"/120/1/keep", "/120/1/new"}
+    assert sorted(calls) == [("DELETE", "set/120/1/old"), ("PUT", "set/120/1/new")]
+
+
+@pytest.mark.asyncio
+async def test_sync_varset_returns_none_when_creation_is_refused():
+    """Test that sync_varset returns None if the terminal refuses to create the set."""
+    mock_session = AsyncMock(spec=ClientSession)
+    api = EtaAPI(mock_session, "192.168.0.1", 8080)
+
+    async def mock_modify(method, suffix):
+        return False
+
+    api._http.modify_varset = mock_modify
+
+    assert await api.sync_varset("set", {"/120/1/ok"}, None) is None
+
+
+@pytest.mark.asyncio
+async def test_sync_varset_sends_bounded_background_requests():
+    """Test that sync_varset sends few concurrent changes with background priority."""
+    from custom_components.eta_webservices._api.scheduler import (
+        RequestPriority,
+        current_priority,
+    )
+    from custom_components.eta_webservices.const import VARSET_SYNC_MAX_CONCURRENCY
+
+    api = EtaAPI(AsyncMock(spec=ClientSession), "192.168.0.1", 8080)
+    priorities = set()
+    in_flight = 0
+    max_in_flight = 0
+
+    async def mock_modify(method, suffix):
+        nonlocal in_flight, max_in_flight
+        priorities.add(current_priority())
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return True
+
+    api._http.modify_varset = mock_modify
+    uris = {f"/120/1/{i}" for i in range(10)}
+
+    assert await api.sync_varset("set", uris, None) == uris
+    assert priorities == {RequestPriority.BACKGROUND}
+    assert max_in_flight == VARSET_SYNC_MAX_CONCURRENCY
+
+
+@pytest.mark.asyncio
+async def test_api_client_modify_varset_uses_the_read_budget():
+    """Test variable set changes don't take tokens from the write budget."""
+    from custom_components.eta_webservices._api.circuit_breaker import CircuitBreaker
+    from custom_components.eta_webservices._api.coalescer import RequestCoalescer
+    from custom_components.eta_webservices._api.metrics import RequestMetrics
+    from custom_components.eta_webservices._api.rate_limiter import (
+        RequestRateLimiter,
+    )
+    from custom_components.eta_webservices._api.retry import HedgePolicy, RetryPolicy
+    from custom_components.eta_webservices._api.value_cache import ValueCache
+
+    transport = MagicMock()
+    transport.coalescer = RequestCoalescer()
+    transport.value_cache = ValueCache(0, 10)
+    transport.circuit_breaker = CircuitBreaker()
+    transport.rate_limiter = RequestRateLimiter(
+        max_reads_per_second=100, max_writes_per_second=100
+    )
+    transport.retry_policy = RetryPolicy()
+    transport.hedge_policy = HedgePolicy()
+    transport.metrics = RequestMetrics()
+    session = AsyncMock(spec=ClientSession)
+    session.put = MagicMock(side_effect=lambda url: _make_session_response(b"<eta/>"))
+    session.delete = MagicMock(
+        side_effect=lambda url: _make_session_response(b"<eta/>")
+    )
+    client = APIClient(session, "192.168.0.25", 8080, transport=transport)
+
+    assert await client.modify_varset("PUT", "set/120/1/ok") is True
+    assert await client.modify_varset("DELETE", "set/120/1/ok") is True
+
+    assert transport.rate_limiter.reads.num_acquired == 2
+    assert transport.rate_limiter.writes.num_acquired == 0
+
+
+@pytest.mark.asyncio
+async def test_api_client_modify_varset_checks_status_and_body():
+    """Test that modify_varset reports HTTP errors and <error> replies as failures."""
+    mock_session = AsyncMock(spec=ClientSession)
+    client = APIClient(mock_session, "192.168.0.1", 8080)
+
+    mock_session.put = MagicMock(
+        return_value=_make_session_response(
+            b'<?xml version="1.0" encoding="utf-8"?><eta version="1.0"><success/></eta>'
+        )
+    )
+    assert await client.modify_varset("PUT", "set/120/1/ok") is True
+    mock_session.put.assert_called_once_with(
+        "http://192.168.0.1:8080/user/vars/set/120/1/ok"
+    )
+
+    mock_session.put = MagicMock(return_value=_make_session_response(status=404))
+    assert await client.modify_varset("PUT", "set/120/1/bad") is False
+
+    mock_session.delete = MagicMock(
+        return_value=_make_session_response(
+            b'<?xml version="1.0" encoding="utf-8"?>'
+            b'<eta version="1.0"><error>Unknown</error></eta>'
+        )
+    )
+    assert await client.modify_varset("DELETE", "set") is False
+
+
+@pytest.mark.asyncio
+async def test_transport_sizes_connection_pool_to_parallel_requests():
+    """Test the dedicated connection pool is bounded by the request limit."""
+    from custom_components.eta_webservices._api.transport import ETATransport
+    from custom_components.eta_webservices.const import (
+        REQUEST_CONNECT_TIMEOUT,
+        REQUEST_READ_TIMEOUT,
+    )
+
+    transport = ETATransport(3, keepalive_timeout=20, dns_cache_ttl=120)
+    try:
+        connector = transport.session.connector
+        assert transport.max_connections == 3
+        assert connector.limit == 3
+        assert connector.limit_per_host == 3
+        assert connector.use_dns_cache is True
+        # Every single request is bounded, not only the whole update
+        assert transport.session.timeout.total is None
+        assert transport.session.timeout.sock_connect == REQUEST_CONNECT_TIMEOUT
+        assert transport.session.timeout.sock_read == REQUEST_READ_TIMEOUT
+        assert transport.closed is False
+    finally:
+        await transport.close()
+
+    assert transport.closed is True
+    # Closing twice must be harmless, e.g. when setup failed before unload
+    await transport.close()
+
+
+class _FakeClock:
+    """Controllable replacement for the time module used by the limiter."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+async def _timed_request(limiter, clock, latency, exc=None):
+    """Run one request through the limiter which takes `latency` fake seconds."""
+    async with limiter:
+        clock.now += latency
+        if exc is not None:
+            raise exc
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_grows_while_latency_is_flat(monkeypatch):
+    """Test the limit grows by one per saturated window up to the maximum."""
+    from custom_components.eta_webservices._api import limiter as limiter_module
+
+    clock = _FakeClock()
+    monkeypatch.setattr(limiter_module, "time", clock)
+    limiter = limiter_module.AdaptiveConcurrencyLimiter(3, initial_limit=1)
+
+    async def _saturating_batch():
+        gate = asyncio.Event()
+
+        async def _request():
+            async with limiter:
+                await gate.wait()
+
+        tasks = [asyncio.create_task(_request()) for _ in range(limiter.limit)]
+        await asyncio.sleep(0)
+        clock.now += 0.1
+        gate.set()
+        await asyncio.gather(*tasks)
+
+    for _ in range(6):
+        await _saturating_batch()
+
+    assert limiter.limit == 3
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_does_not_grow_without_demand(monkeypatch):
+    """Test unused permits do not raise the limit."""
+    from custom_components.eta_webservices._api import limiter as limiter_module
+
+    clock = _FakeClock()
+    monkeypatch.setattr(limiter_module, "time", clock)
+    limiter = limiter_module.AdaptiveConcurrencyLimiter(5, initial_limit=2)
+
+    for _ in range(10):
+        await _timed_request(limiter, clock, 0.1)
+
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_backs_off_on_latency_spike_and_timeout(monkeypatch):
+    """Test the limit shrinks on latency spikes and halves on timeouts."""
+    from custom_components.eta_webservices._api import limiter as limiter_module
+
+    clock = _FakeClock()
+    monkeypatch.setattr(limiter_module, "time", clock)
+    limiter = limiter_module.AdaptiveConcurrencyLimiter(8)
+
+    await _timed_request(limiter, clock, 0.1)
+    await _timed_request(limiter, clock, 2.0)
+    assert limiter.limit == 6
+
+    with pytest.raises(TimeoutError):
+        await _timed_request(limiter, clock, 0.1, TimeoutError())
+    assert limiter.limit == 3
+
+    # Other errors are not a sign of congestion
+    with pytest.raises(ValueError):
+        await _timed_request(limiter, clock, 0.1, ValueError())
+    assert limiter.limit == 3
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_enforces_limit_and_survives_cancellation():
+    """Test waiting requests respect the limit and cancelled waiters free their slot."""
+    from custom_components.eta_webservices._api.limiter import (
+        AdaptiveConcurrencyLimiter,
+    )
+
+    limiter = AdaptiveConcurrencyLimiter(2)
+    release = asyncio.Event()
+    active = 0
+    observed_max = 0
+
+    async def _request():
+        nonlocal active, observed_max
+        async with limiter:
+            active += 1
+            observed_max = max(observed_max, active)
+            await release.wait()
+            active -= 1
+
+    tasks = [asyncio.create_task(_request()) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert limiter.in_flight == 2
+    assert limiter.locked()
+
+    tasks[3].cancel()
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert isinstance(results[3], asyncio.CancelledError)
+    assert observed_max == 2
+    assert limiter.in_flight == 0
+    assert not limiter.locked()
+
+
+COALESCE_VALUE_XML = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1">'
+    '<value uri="/user/var/120/10101/0/0/12197" strValue="20.5" '
+    'unit="°C" decPlaces="1" scaleFactor="10" advTextOffset="0">205</value>'
+    "</eta>"
+)
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_serves_waiters_by_priority_with_aging(monkeypatch):
+    """Test queued requests are served by priority class, and long waits are promoted.
+
+    This test verifies:
+    - A write queued after polling and background reads gets the next permit
+    - Within a class requests keep their FIFO order
+    - A background request which waited long enough overtakes fresh polling requests
+    - Queue waits are recorded per class
+    """
+    from custom_components.eta_webservices._api import scheduler as scheduler_module
+    from custom_components.eta_webservices._api.limiter import (
+        AdaptiveConcurrencyLimiter,
+    )
+    from custom_components.eta_webservices._api.scheduler import (
+        AGING_INTERVAL,
+        RequestPriority,
+        request_priority,
+    )
+
+    clock = _FakeClock()
+    monkeypatch.setattr(scheduler_module, "time", clock)
+    limiter = AdaptiveConcurrencyLimiter(1)
+    await limiter.acquire()
+    served: list[str] = []
+
+    async def _queue(name, priority):
+        with request_priority(priority):
+            await limiter.acquire()
+        served.append(name)
+
+    tasks = [
+        asyncio.create_task(_queue("background", RequestPriority.BACKGROUND)),
+        asyncio.create_task(_queue("poll-1", RequestPriority.POLLING)),
+        asyncio.create_task(_queue("poll-2", RequestPriority.POLLING)),
+        asyncio.create_task(_queue("write", RequestPriority.INTERACTIVE_WRITE)),
+    ]
+    await asyncio.sleep(0)
+    assert limiter.queued(RequestPriority.POLLING) == 2
+
+    for _ in range(2):
+        limiter.release()
+        await asyncio.sleep(0)
+    assert served == ["write", "poll-1"]
+
+    # The background request has now waited long enough to beat a polling request
+    clock.now += 2 * AGING_INTERVAL
+    late_poll = asyncio.create_task(_queue("poll-3", RequestPriority.POLLING))
+    await asyncio.sleep(0)
+    for _ in range(3):
+        limiter.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks, late_poll)
+
+    assert served == ["write", "poll-1", "poll-2", "background", "poll-3"]
+    stats = limiter.queue_wait_stats
+    assert stats[RequestPriority.BACKGROUND].max_wait == 2 * AGING_INTERVAL
+    assert stats[RequestPriority.POLLING].num_requests == 4
+    assert stats[RequestPriority.INTERACTIVE_WRITE].num_waited == 0
+
+
+@pytest.mark.asyncio
+async def test_writes_and_discovery_use_their_priority_class():
+    """Test writes are sent as interactive requests and discovery as background work."""
+    from custom_components.eta_webservices._api.scheduler import (
+        RequestPriority,
+        current_priority,
+    )
+
+    mock_session = AsyncMock(spec=ClientSession)
+    api = EtaAPI(mock_session, "192.168.0.1", 8080)
+    priorities: list[RequestPriority] = []
+
+    async def mock_post_request(suffix, data):
+        priorities.append(current_priority())
+        return ETAResponse(200, b'<eta version="1.0"><success/></eta>')
+
+    async def mock_get_body(suffix):
+        priorities.append(current_priority())
+        raise TimeoutError
+
+    api._http.post_request = mock_post_request
+    api._http.get_body = mock_get_body
+
+    assert await api.write_endpoint("/120/10101/0/0/12132", 200) is True
+    assert await api.set_switch_state("/120/10101/0/0/12080", 1803) is True
+    with pytest.raises(TimeoutError):
+        await api.get_all_sensors(False, {}, {}, {}, {}, {})
+
+    assert priorities[:3] == [
+        RequestPriority.INTERACTIVE_WRITE,
+        RequestPriority.INTERACTIVE_WRITE,
+        RequestPriority.BACKGROUND,
+    ]
+    assert current_priority() is RequestPriority.POLLING
+
+
+@pytest.mark.asyncio
+async def test_api_clients_sharing_a_transport_coalesce_identical_gets():
+    """Test concurrent identical GETs from different clients hit the terminal once."""
+    from unittest.mock import MagicMock
+    from custom_components.eta_webservices._api.circuit_breaker import CircuitBreaker
+    from custom_components.eta_webservices._api.coalescer import RequestCoalescer
+    from custom_components.eta_webservices._api.metrics import RequestMetrics
+    from custom_components.eta_webservices._api.rate_limiter import RequestRateLimiter
+    from custom_components.eta_webservices._api.retry import HedgePolicy, RetryPolicy
+    from custom_components.eta_webservices._api.value_cache import ValueCache
+
+    transport = MagicMock()
+    transport.coalescer = RequestCoalescer()
+    transport.value_cache = ValueCache(0, 10)
+    transport.circuit_breaker = CircuitBreaker()
+    transport.rate_limiter = RequestRateLimiter(0, 0)
+    transport.retry_policy = RetryPolicy()
+    transport.hedge_policy = HedgePolicy()
+    transport.metrics = RequestMetrics()
+    session = AsyncMock(spec=ClientSession)
+    gate = asyncio.Event()
+    requested: list[str] = []
+
+    @contextlib.asynccontextmanager
+    async def _get(url):
+        requested.append(url)
+        await gate.wait()
+        yield _make_aiohttp_response(COALESCE_VALUE_XML.encode())
+
+    session.get = _get
+    first = APIClient(session, "192.168.0.25", 8080, transport=transport)
+    second = APIClient(session, "192.168.0.25", 8080, transport=transport)
+
+    tasks = [
+        asyncio.create_task(first.get_data("/120/10101/0/0/12197")),
+        asyncio.create_task(second.get_data("/120/10101/0/0/12197")),
+        asyncio.create_task(second.get_data("/120/10101/0/0/12080")),
+    ]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*tasks)
+
+    assert results[0] == (20.5, "°C")
+    assert results[1] == (20.5, "°C")
+    assert sorted(requested) == [
+        "http://192.168.0.25:8080/user/var//120/10101/0/0/12080",
+        "http://192.168.0.25:8080/user/var//120/10101/0/0/12197",
+    ]
+    assert transport.coalescer.num_coalesced == 1
+    assert transport.coalescer.num_in_flight == 0
+
+    # Requests which are not in flight anymore are sent again
+    await first.get_data("/120/10101/0/0/12197")
+    assert len(requested) == 3
+
+
+@pytest.mark.asyncio
+async def test_request_coalescer_only_cancels_when_all_callers_are_cancelled():
+    """Test a cancelled caller does not abort the request shared with other callers."""
+    from custom_components.eta_webservices._api.coalescer import RequestCoalescer
+
+    coalescer = RequestCoalescer()
+    gate = asyncio.Event()
+    started = 0
+
+    async def _request():
+        nonlocal started
+        started += 1
+        await gate.wait()
+        return "result"
+
+    first = asyncio.create_task(coalescer.run("key", _request))
+    second = asyncio.create_task(coalescer.run("key", _request))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    gate.set()
+
+    assert await second == "result"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert started == 1
+
+    gate.clear()
+    only = asyncio.create_task(coalescer.run("key", _request))
+    await asyncio.sleep(0)
+    only.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await only
+    assert coalescer.num_in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_request_coalescer_does_not_join_requests_of_lower_priority():
+    """Test a refresh doesn't wait at the priority of a discovery read of the same URI."""
+    from custom_components.eta_webservices._api.coalescer import RequestCoalescer
+    from custom_components.eta_webservices._api.scheduler import (
+        RequestPriority,
+        current_priority,
+        request_priority,
+    )
+
+    coalescer = RequestCoalescer()
+    gate = asyncio.Event()
+    priorities: list[RequestPriority] = []
+
+    async def _request():
+        priorities.append(current_priority())
+        await gate.wait()
+        return "result"
+
+    async def run(priority):
+        with request_priority(priority):
+            return await coalescer.run("key", _request)
+
+    callers = [
+        asyncio.create_task(run(RequestPriority.BACKGROUND)),
+        asyncio.create_task(run(RequestPriority.WRITE_REFRESH)),
+        # Joins the refresh, which is more urgent than its own request
+        asyncio.create_task(run(RequestPriority.BACKGROUND)),
+        asyncio.create_task(run(RequestPriority.WRITE_REFRESH)),
+    ]
+    await asyncio.sleep(0)
+    gate.set()
+
+    assert await asyncio.gather(*callers) == ["result"] * 4
+    assert priorities == [RequestPriority.BACKGROUND, RequestPriority.WRITE_REFRESH]
+    assert coalescer.num_coalesced == 2
+    assert coalescer.num_in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_requests_and_reports_wait_time():
+    """Test requests beyond the burst are spaced out to the configured rate."""
+    from custom_components.eta_webservices._api.rate_limiter import TokenBucket
+
+    bucket = TokenBucket(rate=50, burst=2)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    waits = await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+    elapsed = loop.time() - start
+
+    # Two requests pass immediately, the other four wait 20 ms each
+    assert waits[:2] == [0.0, 0.0]
+    assert all(wait > 0 for wait in waits[2:])
+    assert elapsed >= 0.07
+    assert bucket.num_acquired == 6
+    assert bucket.num_waited == 4
+    assert bucket.max_wait == max(waits)
+    assert bucket.total_wait == pytest.approx(sum(waits))
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_serves_waiting_callers_by_priority():
+    """Test a refresh doesn't wait for the tokens of discovery reads queued before it."""
+    from custom_components.eta_webservices._api.rate_limiter import TokenBucket
+    from custom_components.eta_webservices._api.scheduler import (
+        RequestPriority,
+        request_priority,
+    )
+
+    bucket = TokenBucket(rate=50, burst=1)
+    order: list[str] = []
+
+    async def acquire(name, priority):
+        with request_priority(priority):
+            await bucket.acquire()
+        order.append(name)
+
+    await bucket.acquire()
+    background = [
+        asyncio.create_task(acquire(f"background{i}", RequestPriority.BACKGROUND))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0)
+    refresh = asyncio.create_task(acquire("refresh", RequestPriority.WRITE_REFRESH))
+    await asyncio.gather(*background, refresh)
+
+    # The first discovery read already waits for its token, the refresh is next
+    assert order == ["background0", "refresh", "background1", "background2"]
+
+    # A cancelled waiter doesn't stall the bucket
+    first = asyncio.create_task(bucket.acquire())
+    cancelled = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await first
+    await asyncio.wait_for(bucket.acquire(), timeout=1)
+    assert cancelled.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_api_client_uses_separate_read_and_write_budgets():
+    """Test writes are not throttled by an exhausted read budget."""
+    from custom_components.eta_webservices._api.circuit_breaker import CircuitBreaker
+    from custom_components.eta_webservices._api.coalescer import RequestCoalescer
+    from custom_components.eta_webservices._api.metrics import RequestMetrics
+    from custom_components.eta_webservices._api.rate_limiter import (
+        RequestRateLimiter,
+    )
+    from custom_components.eta_webservices._api.retry import HedgePolicy, RetryPolicy
+    from custom_components.eta_webservices._api.value_cache import ValueCache
+
+    transport = MagicMock()
+    transport.coalescer = RequestCoalescer()
+    transport.value_cache = ValueCache(0, 10)
+    transport.circuit_breaker = CircuitBreaker()
+    transport.rate_limiter = RequestRateLimiter(
+        max_reads_per_second=1, max_writes_per_second=0
+    )
+    transport.retry_policy = RetryPolicy()
+    transport.hedge_policy = HedgePolicy()
+    transport.metrics = RequestMetrics()
+    session = AsyncMock(spec=ClientSession)
+    session.get = MagicMock(side_effect=lambda url: _make_session_response(b"<eta/>"))
+    session.post = MagicMock(
+        side_effect=lambda url, data: _make_session_response(b"<eta/>")
+    )
+    client = APIClient(session, "192.168.0.25", 8080, transport=transport)
+
+    await client.get_request("/user/errors")
+    # The read budget is exhausted for the next second
+    read = asyncio.create_task(client.get_request("/user/errors"))
+    await client.post_request("/user/var/120/10101/0/0/12080", {"value": 1803})
+    assert not read.done()
+    read.cancel()
+
+    assert transport.rate_limiter.reads.num_acquired == 1
+    assert transport.rate_limiter.writes.num_acquired == 0
+
+
+def _make_breaker_client(session, breaker):
+    """Return an APIClient whose transport uses the given circuit breaker."""
+    from custom_components.eta_webservices._api.coalescer import RequestCoalescer
+    from custom_components.eta_webservices._api.metrics import RequestMetrics
+    from custom_components.eta_webservices._api.rate_limiter import RequestRateLimiter
+    from custom_components.eta_webservices._api.retry import HedgePolicy, RetryPolicy
+    from custom_components.eta_webservices._api.value_cache import ValueCache
+
+    transport = MagicMock()
+    transport.coalescer = RequestCoalescer()
+    transport.value_cache = ValueCache(0, 10)
+    transport.circuit_breaker = breaker
+    transport.rate_limiter = RequestRateLimiter(0, 0)
+    transport.retry_policy = RetryPolicy()
+    transport.hedge_policy = HedgePolicy()
+    transport.metrics = RequestMetrics()
+    return APIClient(session, "192.168.0.25", 8080, transport=transport)
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast_and_probes_before_closing(monkeypatch):
+    """Test requests fail fast after repeated connection errors until a probe succeeds.
+
+    This test verifies:
+    - The breaker opens after `failure_threshold` consecutive connection errors
+    - While it is open, requests fail without touching the network
+    - After the reset timeout a single probe to /user/api closes it again
+    """
+    from aiohttp import ClientConnectionError
+
+    from custom_components.eta_webservices._api import circuit_breaker as breaker_module
+    from custom_components.eta_webservices._api.circuit_breaker import (
+        CircuitBreaker,
+        CircuitState,
+    )
+    from custom_components.eta_webservices.api import ETATerminalUnavailableError
+
+    clock = _FakeClock()
+    monkeypatch.setattr(breaker_module, "time", clock)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    session = AsyncMock(spec=ClientSession)
+    unreachable = _make_session_response()
+    unreachable.__aenter__.side_effect = ClientConnectionError("refused")
+    session.get = MagicMock(return_value=unreachable)
+    client = _make_breaker_client(session, breaker)
+
+    for _ in range(2):
+        with pytest.raises(ClientConnectionError):
+            await client.get_request("/user/errors")
+    assert breaker.state is CircuitState.OPEN
+
+    with pytest.raises(ETATerminalUnavailableError):
+        await client.get_request("/user/errors")
+    assert session.get.call_count == 2
+    assert breaker.num_rejected == 1
+
+    clock.now += 30
+    session.get = MagicMock(return_value=_make_session_response(b"<eta/>"))
+    assert await client.get_request("/user/errors") == ETAResponse(200, b"<eta/>")
+    assert [call.args[0] for call in session.get.call_args_list] == [
+        "http://192.168.0.25:8080/user/api",
+        "http://192.168.0.25:8080/user/errors",
+    ]
+    assert breaker.state is CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_sends_a_single_probe_and_reopens_if_it_fails(
+    monkeypatch,
+):
+    """Test only one caller probes the terminal and a failed probe keeps the breaker open."""
+    from custom_components.eta_webservices._api import circuit_breaker as breaker_module
+    from custom_components.eta_webservices._api.circuit_breaker import (
+        CircuitBreaker,
+        CircuitState,
+    )
+    from custom_components.eta_webservices.api import ETATerminalUnavailableError
+
+    clock = _FakeClock()
+    monkeypatch.setattr(breaker_module, "time", clock)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+
+    gate = asyncio.Event()
+    probes = 0
+
+    async def _probe():
+        nonlocal probes
+        probes += 1
+        await gate.wait()
+        raise TimeoutError
+
+    probing = asyncio.create_task(breaker.ensure_closed(_probe))
+    await asyncio.sleep(0)
+    assert breaker.state is CircuitState.HALF_OPEN
+    with pytest.raises(ETATerminalUnavailableError):
+        await breaker.ensure_closed(_probe)
+
+    gate.set()
+    with pytest.raises(ETATerminalUnavailableError):
+        await probing
+    assert probes == 1
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.seconds_until_probe() == 30
+
+
+def _make_retrying_client(session, retry_policy, hedge_policy, semaphore=None):
+    """Return an APIClient whose transport uses the given retry and hedge policies."""
+    from custom_components.eta_webservices._api.circuit_breaker import CircuitBreaker
+    from custom_components.eta_webservices._api.coalescer import RequestCoalescer
+    from custom_components.eta_webservices._api.metrics import RequestMetrics
+    from custom_components.eta_webservices._api.rate_limiter import RequestRateLimiter
+    from custom_components.eta_webservices._api.value_cache import ValueCache
+
+    transport = MagicMock()
+    transport.coalescer = RequestCoalescer()
+    transport.value_cache = ValueCache(0, 10)
+    transport.circuit_breaker = CircuitBreaker()
+    transport.rate_limiter = RequestRateLimiter(0, 0)
+    transport.retry_policy = retry_policy
+    transport.hedge_policy = hedge_policy
+    transport.metrics = RequestMetrics()
+    return APIClient(
+        session, "192.168.0.25", 8080, request_semaphore=semaphore, transport=transport
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_body_retries_transient_errors_with_jitter(monkeypatch):
+    """Test timeouts and connection errors of GETs are retried with randomized backoff.
+
+    This test verifies:
+    - A GET which failed with a connection error or timeout is sent again
+    - The backoff grows exponentially and is drawn with full jitter
+    - The error of the last attempt is raised once the retries are exhausted
+    """
+    from aiohttp import ClientConnectionError
+
+    from custom_components.eta_webservices._api import retry as retry_module
+    from custom_components.eta_webservices._api.retry import HedgePolicy, RetryPolicy
+
+    bounds: list[tuple[float, float]] = []
+    monkeypatch.setattr(
+        retry_module.random,
+        "uniform",
+        lambda low, high: bounds.append((low, high)) or 0.0,
+    )
+    retry_policy = RetryPolicy(max_retries=2, base_delay=0.5, max_delay=4)
+    session = AsyncMock(spec=ClientSession)
+    failing = _make_session_response()
+    failing.__aenter__.side_effect = ClientConnectionError("reset")
+    stalled = _make_session_response()
+    stalled.__aenter__.side_effect = TimeoutError
+    succeeding = _make_session_response(COALESCE_VALUE_XML.encode())
+    session.get = MagicMock(side_effect=[failing, stalled, succeeding])
+    client = _make_retrying_client(session, retry_policy, HedgePolicy())
+
+    assert await client.get_data("/120/10101/0/0/12197") == (20.5, "°C")
+    assert session.get.call_count == 3
+    assert bounds == [(0, 0.5), (0, 1.0)]
+    assert retry_policy.num_retries == 2
+
+    session.get = MagicMock(return_value=failing)
+    with pytest.raises(ClientConnectionError):
+        await client.get_body("/user/errors")
+    assert session.get.call_count == 3
+    assert retry_policy.num_exhausted == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_end_within_the_total_time_of_a_request():
+    """Test all attempts of a request together stay below the coordinator timeout.
+
+    This test verifies:
+    - The default total time of a request is shorter than REQUEST_TIMEOUT
+    - A stalled attempt is cancelled once the total time is used up
+    - No retry is started if its backoff would only end after the total time
+    """
+    from custom_components.eta_webservices._api.retry import RetryPolicy
+    from custom_components.eta_webservices.const import REQUEST_TIMEOUT
+
+    assert RetryPolicy().max_total_time < REQUEST_TIMEOUT
+
+    retry_policy = RetryPolicy(max_retries=5, base_delay=0, max_total_time=0.05)
+    attempts = 0
+
+    async def stalled_request():
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(10)
+
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(retry_policy.run(stalled_request), 1)
+    assert attempts == 1
+    assert retry_policy.num_exhausted == 1
+
+    retry_policy = RetryPolicy(
+        max_retries=5, base_delay=10, max_delay=10, max_total_time=5
+    )
+    retry_policy.backoff = lambda attempt: 10
+
+    async def failing_request():
+        nonlocal attempts
+        attempts += 1
+        raise TimeoutError
+
+    attempts = 0
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(retry_policy.run(failing_request), 1)
+    assert attempts == 1
+    assert retry_policy.num_retries == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_variable_read_is_hedged_only_while_a_permit_is_free():
+    """Test a duplicate of a slow read is sent after the hedge delay and wins the race."""
+    from custom_components.eta_webservices._api.retry import HedgePolicy, RetryPolicy
+
+    hedge_policy = HedgePolicy(enabled=True, min_samples=1, min_delay=0)
+    hedge_policy.record_latency(0.01)
+    stalled = asyncio.Event()
+    cancelled = asyncio.Event()
+    calls = 0
+
+    @contextlib.asynccontextmanager
+    async def _get(url):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            try:
+                stalled.set()
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        yield _make_aiohttp_response(COALESCE_VALUE_XML.encode())
+
+    session = AsyncMock(spec=ClientSession)
+    session.get = _get
+    client = _make_retrying_client(session, RetryPolicy(), hedge_policy)
+
+    assert await client.get_data("/120/10101/0/0/12197") == (20.5, "°C")
+    assert calls == 2
+    assert hedge_policy.num_hedged == 1
+    assert hedge_policy.num_won == 1
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+    # Without a free permit the slow read is awaited instead of duplicated
+    calls = 0
+    stalled.clear()
+    semaphore = asyncio.Semaphore(1)
+    client = _make_retrying_client(session, RetryPolicy(), hedge_policy, semaphore)
+    read = asyncio.create_task(client.get_data("/120/10101/0/0/12197"))
+    await stalled.wait()
+    await asyncio.sleep(0.05)
+    assert calls == 1
+    read.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await read
+    assert hedge_policy.num_hedged == 1
+
+
+def test_latency_histogram_reports_bucketed_percentiles():
+    """Test percentiles are reported as the upper bound of their bucket."""
+    from custom_components.eta_webservices._api.metrics import LatencyHistogram
+
+    histogram = LatencyHistogram()
+    assert histogram.percentile(0.5) is None
+
+    for _ in range(98):
+        histogram.record(0.010)
+    histogram.record(0.5)
+    histogram.record(120)
+
+    # Overestimated by less than one bucket (25%)
+    assert 0.010 <= histogram.percentile(0.5) < 0.0125
+    assert 0.010 <= histogram.percentile(0.95) < 0.0125
+    assert 0.5 <= histogram.percentile(0.99) < 0.625
+    # Beyond the last bucket the maximum is reported
+    assert histogram.percentile(1.0) == 120
+    assert histogram.count == 100
+    assert histogram.max == 120
+
+
+@pytest.mark.asyncio
+async def test_api_client_records_metrics_per_endpoint_class():
+    """Test requests, errors, bytes and parse time are recorded per endpoint class."""
+    from aiohttp import ClientConnectionError
+
+    from custom_components.eta_webservices._api.metrics import EndpointClass
+    from custom_components.eta_webservices._api.retry import HedgePolicy, RetryPolicy
+
+    session = AsyncMock(spec=ClientSession)
+    body = COALESCE_VALUE_XML.encode()
+    session.get = MagicMock(side_effect=lambda url: _make_session_response(body))
+    session.post = MagicMock(
+        side_effect=lambda url, data: _make_session_response(b"<eta/>", status=400)
+    )
+    client = _make_retrying_client(session, RetryPolicy(0), HedgePolicy())
+    metrics = client.metrics
+
+    await client.get_data("/120/10101/0/0/12197")
+    await client.get_data("/120/10101/0/0/12080")
+    await client.post_request("/user/var/120/10101/0/0/12080", {"value": 1803})
+    unreachable = _make_session_response()
+    unreachable.__aenter__.side_effect = ClientConnectionError("refused")
+    session.get = MagicMock(return_value=unreachable)
+    with pytest.raises(ClientConnectionError):
+        await client.get_body("/user/errors")
+
+    var = metrics[EndpointClass.VAR]
+    assert var.num_requests == 2
+    assert var.num_errors == 0
+    assert var.bytes_received == 2 * len(body)
+    assert var.latency.count == 2
+    assert var.queue_wait.count == 2
+    assert var.parse_time.count == 2
+
+    assert metrics[EndpointClass.POST_VAR].num_requests == 1
+    assert metrics[EndpointClass.POST_VAR].num_errors == 1
+    assert metrics[EndpointClass.ERRORS].num_requests == 1
+    assert metrics[EndpointClass.ERRORS].num_errors == 1
+    assert metrics[EndpointClass.ERRORS].latency.count == 0
+    assert metrics[EndpointClass.ERRORS].queue_wait.count == 1
+
+    # Timeouts are the slow tail, they count towards the latency and the hedge delay
+    timed_out = _make_session_response()
+    timed_out.__aenter__.side_effect = TimeoutError()
+    session.get = MagicMock(return_value=timed_out)
+    with pytest.raises(TimeoutError):
+        await client.get_body("/user/var/120/10101/0/0/12111")
+    assert var.num_requests == 3
+    assert var.num_errors == 1
+    assert var.latency.count == 3
+    assert var.queue_wait.count == 3
+    assert len(client._hedge_policy._latencies) == 3
+
+    summary = metrics.as_dict()
+    assert set(summary) == {"var", "post_var", "errors"}
+    assert summary["var"]["latency"]["p95"] is not None
+
+
+def _make_cached_client(ttl=10, max_size=10):
+    """Return an APIClient whose transport caches variable responses."""
+    from unittest.mock import MagicMock
+    from custom_components.eta_webservices._api.circuit_breaker import CircuitBreaker
+    from custom_components.eta_webservices._api.coalescer import RequestCoalescer
+    from custom_components.eta_webservices._api.metrics import RequestMetrics
+    from custom_components.eta_webservices._api.rate_limiter import RequestRateLimiter
+    from custom_components.eta_webservices._api.retry import HedgePolicy, RetryPolicy
+    from custom_components.eta_webservices._api.value_cache import ValueCache
+
+    transport = MagicMock()
+    transport.coalescer = RequestCoalescer()
+    transport.value_cache = ValueCache(ttl, max_size)
+    transport.circuit_breaker = CircuitBreaker()
+    transport.rate_limiter = RequestRateLimiter(0, 0)
+    transport.retry_policy = RetryPolicy()
+    transport.hedge_policy = HedgePolicy()
+    transport.metrics = RequestMetrics()
+    session = AsyncMock(spec=ClientSession)
+    client = APIClient(session, "192.168.0.25", 8080, transport=transport)
+    client.get_request = AsyncMock(
+        side_effect=lambda suffix: _make_text_response(COALESCE_VALUE_XML)
+    )
+    return client, transport.value_cache
+
+
+@pytest.mark.asyncio
+async def test_value_cache_serves_fresh_values_and_is_invalidated_by_writes():
+    """Test cached variable reads skip the terminal until the endpoint is written."""
+    client, cache = _make_cached_client()
+
+    assert await client.get_data("/120/10101/0/0/12197") == (20.5, "°C")
+    # Same endpoint, different spelling and parsing options
+    assert await client.get_data("120/10101/0/0/12197", force_string_handling=True) == (
+        "20.5",
+        "°C",
+    )
+    assert client.get_request.await_count == 1
+    assert cache.hits == 1
+
+    client._session.post = MagicMock(return_value=_make_session_response(b"<eta/>"))
+    await client.post_request("/user/var//120/10101/0/0/12197", {"value": 210})
+
+    await client.get_data("/120/10101/0/0/12197")
+    assert client.get_request.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_value_cache_expires_and_evicts_least_recently_used(monkeypatch):
+    """Test entries expire after the TTL and the cache stays within its size."""
+    from custom_components.eta_webservices._api import value_cache as cache_module
+
+    clock = _FakeClock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    cache = cache_module.ValueCache(ttl=5, max_size=2)
+
+    cache.put("/a", "a")
+    cache.put("/b", "b")
+    assert cache.get("/a") == "a"
+    cache.put("/c", "c")
+    assert len(cache) == 2
+    assert cache.get("/b") is None
+    assert cache.get("/a") == "a"
+
+    clock.now += 5
+    assert cache.get("/a") is None
+
+    # Responses requested before an invalidation are not stored
+    generation = cache.generation
+    cache.invalidate("/c")
+    cache.put("/c", "stale", generation)
+    assert cache.get("/c") is None
+
+
+@pytest.mark.asyncio
+async def test_value_cache_disabled_by_default():
+    """Test a TTL of 0 never serves cached responses."""
+    client, cache = _make_cached_client(ttl=0)
+
+    await client.get_data("/120/10101/0/0/12197")
+    await client.get_data("/120/10101/0/0/12197")
+
+    assert client.get_request.await_count == 2
+    assert len(cache) == 0
+
+
+def test_parse_value_response_matches_xmltodict_for_fixture(load_fixture):
+    """Test the fast value parser returns exactly what xmltodict returns."""
+    import xmltodict
+    from custom_components.eta_webservices._api.xml_parsers import (
+        parse_value_response,
+    )
+
+    fixture = load_fixture("api_endpoint_data.json")
+    responses = [
+        response
+        for suffix, response in fixture.items()
+        if suffix.startswith("/user/var/")
+    ]
+    assert responses
+
+    for response in responses:
+        try:
+            expected = xmltodict.parse(response)["eta"]["value"]
+        except KeyError:
+            # Error responses keep raising like before
+            with pytest.raises(KeyError):
+                parse_value_response(response)
+            continue
+        assert parse_value_response(response) == expected
+        assert parse_value_response(response.encode()) == expected
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        # Entities have to be decoded
+        '<eta><value uri="/user/var/1" strValue="a &amp; b" unit="">1</value></eta>',
+        # Single quoted attributes
+        "<eta><value uri='/user/var/1' strValue='5' unit=''>5</value></eta>",
+        # Attributes in an unusual order and no text
+        '<eta><value unit="°C" uri="/user/var/1" strValue=""/></eta>',
+        # Whitespace around the text
+        '<eta>\n  <value uri="/user/var/1" strValue="5" unit="">\n 5 \n</value>\n</eta>',
+    ],
+)
+def test_parse_value_response_handles_uncommon_documents(document):
+    """Test documents outside of the fast path are parsed like xmltodict does."""
+    import xmltodict
+    from custom_components.eta_webservices._api.xml_parsers import (
+        parse_value_response,
+    )
+
+    assert parse_value_response(document) == xmltodict.parse(document)["eta"]["value"]
+
+
+def _flatten_nested_menu(node, uri_dict: dict, prefix: str = "") -> int:
+    """Flatten a menu parsed by xmltodict like the integration used to, return the duplicates."""
+    num_duplicates = 0
+    if isinstance(node, list):
+        for child in node:
+            num_duplicates += _flatten_nested_menu(child, uri_dict, prefix)
+        return num_duplicates
+    key = f"{prefix}_{node['@name']}"
+    if key in uri_dict:
+        num_duplicates += 1
+    uri_dict.setdefault(key, []).append(node["@uri"])
+    if "object" in node:
+        num_duplicates += _flatten_nested_menu(node["object"], uri_dict, key)
+    return num_duplicates
+
+
+@pytest.mark.asyncio
+async def test_get_sensors_dict_matches_nested_menu_walk(load_fixture):
+    """Test the menu parser yields the same keys, URIs and duplicates as the nested walk."""
+    import xmltodict
+    from custom_components.eta_webservices._api.xml_parsers import MenuParser
+
+    menu_xml = load_fixture("api_endpoint_data.json")["/user/menu"]
+    client = APIClient(AsyncMock(spec=ClientSession), "192.168.0.25", 8080)
+    client.get_request = AsyncMock(return_value=_make_text_response(menu_xml))
+
+    result = await client.get_sensors_dict()
+
+    expected: dict[str, list[str]] = {}
+    num_duplicates = _flatten_nested_menu(
+        xmltodict.parse(menu_xml)["eta"]["menu"]["fub"], expected
+    )
+    assert result == expected
+    assert list(result) == list(expected)
+    assert client.num_duplicates == num_duplicates > 0
+
+    # Chunk boundaries must not change the result
+    body = menu_xml.encode()
+    parser = MenuParser()
+    small_chunks: dict[str, list[str]] = {}
+    for start in range(0, len(body), 7):
+        for key, uri in parser.feed(body[start : start + 7]):
+            small_chunks.setdefault(key, []).append(uri)
+    assert parser.feed(b"", final=True) == []
+    assert small_chunks == expected
+
+
+def test_menu_parser_skips_unknown_elements_and_interns_keys():
+    """Test only fub and object elements become nodes and keys are shared."""
+    from custom_components.eta_webservices._api.xml_parsers import MenuParser
+
+    menu_xml = (
+        '<eta version="1.0" xmlns="http://www.eta.co.at/rest/v1"><menu>'
+        '<fub uri="/120/1" name="Kessel">'
+        '<object uri="/120/1/0/0/1" name="Temp"/>'
+        '<info><object uri="/ignored" name="Ignored"/></info>'
+        '<object uri="/120/1/0/0/2" name="Temp"/>'
+        "</fub>"
+        '<fub uri="/120/2" name="WW"/>'
+        "</menu></eta>"
+    )
+    parser = MenuParser()
+    entries = parser.parse(menu_xml)
+
+    assert parser.found_menu
+    assert entries == [
+        ("_Kessel", "/120/1"),
+        ("_Kessel_Temp", "/120/1/0/0/1"),
+        ("_Kessel_Temp", "/120/1/0/0/2"),
+        ("_WW", "/120/2"),
+    ]
+    assert entries[1][0] is entries[2][0]
+
+
+@pytest.mark.asyncio
+async def test_get_sensors_dict_raises_on_error_response():
+    """Test documents without a menu raise instead of returning an empty menu."""
+    from xml.parsers.expat import ExpatError
+
+    client = APIClient(AsyncMock(spec=ClientSession), "192.168.0.25", 8080)
+    client.get_request = AsyncMock(
+        return_value=_make_text_response("<eta><error>Not allowed</error></eta>")
+    )
+
+    with pytest.raises(ValueError, match="Not allowed"):
+        await client.get_sensors_dict()
+
+    client.get_request = AsyncMock(return_value=_make_text_response("<eta><menu>"))
+    with pytest.raises(ExpatError):
+        await client.get_sensors_dict()
+
+
+@pytest.mark.asyncio
+async def test_write_endpoints_reports_each_write_with_bounded_concurrency():
+    """Test a batch of writes returns a result per write and limits concurrent writes."""
+    api = EtaAPI(AsyncMock(spec=ClientSession), "192.168.0.25", 8080)
+    in_flight = 0
+    max_in_flight = 0
+
+    async def write_endpoint(uri, value=None, begin=None, end=None):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if uri == "/120/1/0/0/2":
+            raise ClientError("connection reset")
+        return uri != "/120/1/0/0/3"
+
+    api.write_endpoint = AsyncMock(side_effect=write_endpoint)
+
+    results = await api.write_endpoints(
+        [
+            {"uri": "/120/1/0/0/1", "value": "1803"},
+            {"uri": "/120/1/0/0/2", "value": "1802"},
+            {"uri": "/120/1/0/0/3", "value": "5"},
+            {"uri": "/120/1/0/0/4", "value": "0", "begin": "24", "end": "36"},
+        ],
+        max_concurrent_writes=2,
+    )
+
+    assert [result["uri"] for result in results] == [
+        "/120/1/0/0/1",
+        "/120/1/0/0/2",
+        "/120/1/0/0/3",
+        "/120/1/0/0/4",
+    ]
+    assert [result["success"] for result in results] == [True, False, False, True]
+    assert results[0]["error"] is None
+    assert results[1]["error"] == "connection reset"
+    assert results[2]["error"] == "Terminal rejected the value"
+    assert max_in_flight == 2
+    api.write_endpoint.assert_any_await("/120/1/0/0/4", "0", "24", "36")
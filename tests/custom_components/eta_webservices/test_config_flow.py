@@ -1,5 +1,8 @@
 """Unit tests for config_flow helper logic."""
 
+import asyncio
+import time
+
 import pytest
 from unittest.mock import AsyncMock, Mock, MagicMock, patch
 from homeassistant.const import CONF_HOST, CONF_PORT
@@ -9,6 +12,7 @@ from custom_components.eta_webservices.config_flow import (
     _format_endpoint_label,
     _is_invalid_host_input,
     _sanitize_selected_entity_ids,
+    EtaFlowHandler,
     EtaOptionsFlowHandler,
 )
 from custom_components.eta_webservices.const import (
@@ -21,14 +25,35 @@ from custom_components.eta_webservices.const import (
     CHOSEN_WRITABLE_SENSORS,
     CUSTOM_UNIT_MINUTES_SINCE_MIDNIGHT,
     CUSTOM_UNIT_UNITLESS,
+    DEFAULT_DISCOVERY_CHECKPOINT_MAX_AGE,
+    DEFAULT_DISCOVERY_DEADLINE,
+    DEFAULT_HEDGED_REQUESTS,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_MAX_READS_PER_SECOND,
+    DEFAULT_MAX_WRITES_PER_SECOND,
+    DEFAULT_VALUE_CACHE_TTL,
     FLOAT_DICT,
     FORCE_LEGACY_MODE,
+    DISCOVERY_CHECKPOINT_MAX_AGE,
+    DISCOVERY_DEADLINE,
+    DISCOVERED_MENU,
+    SELECTED_FUBS,
+    SKIPPED_FUBS,
+    HEDGED_REQUESTS,
     MAX_PARALLEL_REQUESTS,
+    MAX_READS_PER_SECOND,
+    MAX_WRITES_PER_SECOND,
+    MENU_DISCOVERED_AT,
+    MENU_FINGERPRINT,
+    OPTIONS_ACTION_REDISCOVER_AND_UPDATE,
+    OPTIONS_KEEP_DISCOVERED_ENTITIES,
+    OPTIONS_UPDATE_ACTION,
     PENDING_DICT,
     SWITCHES_DICT,
     TEXT_DICT,
+    UNFINISHED_URIS,
     UPDATE_INTERVAL,
+    VALUE_CACHE_TTL,
     WRITABLE_DICT,
 )
 
@@ -60,6 +85,13 @@ def _make_runtime_config(overrides=None):
         FORCE_LEGACY_MODE: False,
         MAX_PARALLEL_REQUESTS: 5,
         UPDATE_INTERVAL: DEFAULT_UPDATE_INTERVAL,
+        VALUE_CACHE_TTL: DEFAULT_VALUE_CACHE_TTL,
+        MAX_READS_PER_SECOND: DEFAULT_MAX_READS_PER_SECOND,
+        MAX_WRITES_PER_SECOND: DEFAULT_MAX_WRITES_PER_SECOND,
+        HEDGED_REQUESTS: DEFAULT_HEDGED_REQUESTS,
+        DISCOVERY_CHECKPOINT_MAX_AGE: DEFAULT_DISCOVERY_CHECKPOINT_MAX_AGE,
+        DISCOVERY_DEADLINE: DEFAULT_DISCOVERY_DEADLINE,
+        SKIPPED_FUBS: [],
         ADVANCED_OPTIONS_IGNORE_DECIMAL_PLACES_RESTRICTION: [],
     }
     if overrides:
@@ -358,6 +390,7 @@ async def test_prepare_data_structures_runs_full_discovery_pipeline():
         config[CONF_PORT],
         config[FORCE_LEGACY_MODE],
         progress_callback=flow._on_options_progress,
+        incremental=True,
     )
     flow._verify_pending_sensors.assert_called_once()
     flow._handle_new_sensors.assert_called_once()
@@ -366,6 +399,266 @@ async def test_prepare_data_structures_runs_full_discovery_pipeline():
     flow._update_sensor_values.assert_not_called()
 
 
+@pytest.mark.asyncio
+async def test_prepare_data_structures_full_rescan_and_reused_values():
+    """A full rescan discovers everything, an incremental one refreshes reused values."""
+    config = _make_runtime_config()
+    flow = _make_flow(config, enumerate_new_endpoints=True)
+    flow.full_rescan = True
+    flow._get_possible_endpoints_with_progress = AsyncMock(
+        return_value=({}, {}, {}, {}, {})
+    )
+    flow._update_sensor_values = AsyncMock()
+
+    await flow._prepare_data_structures()
+
+    assert (
+        flow._get_possible_endpoints_with_progress.await_args.kwargs["incremental"]
+        is False
+    )
+    flow._update_sensor_values.assert_not_called()
+
+    async def incremental_discovery(*args, **kwargs):
+        flow.discovery_changes = {"reused": ["/f1"], "discovered": [], "removed": []}
+        return ({}, {}, {}, {}, {})
+
+    flow.full_rescan = False
+    flow._get_possible_endpoints_with_progress = AsyncMock(
+        side_effect=incremental_discovery
+    )
+
+    await flow._prepare_data_structures()
+
+    assert (
+        flow._get_possible_endpoints_with_progress.await_args.kwargs["incremental"]
+        is True
+    )
+    flow._update_sensor_values.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_rediscovery_offers_to_keep_entities_if_menu_is_unchanged():
+    """An unchanged menu lets the user skip the discovery and only refresh values."""
+    config = _make_runtime_config(
+        {MENU_FINGERPRINT: "abc", MENU_DISCOVERED_AT: time.time() - 60}
+    )
+    flow = _make_flow(config)
+    eta_client = MagicMock()
+    eta_client.get_menu_fingerprint = AsyncMock(return_value="abc")
+    eta_client.get_fub_node_counts = AsyncMock(return_value={"Kessel": 10})
+    flow._get_eta_client = Mock(return_value=eta_client)
+    flow.async_show_form = Mock(return_value="form_result")
+    flow._start_entity_preparation = AsyncMock(return_value="progress_result")
+    rediscover = {OPTIONS_UPDATE_ACTION: OPTIONS_ACTION_REDISCOVER_AND_UPDATE}
+    keep_fubs = {SKIPPED_FUBS: []}
+
+    assert await flow.async_step_init(rediscover) == "form_result"
+    assert flow.async_show_form.call_args.kwargs["step_id"] == "select_fubs"
+    assert await flow.async_step_select_fubs(keep_fubs) == "form_result"
+    assert flow.async_show_form.call_args.kwargs["step_id"] == "menu_unchanged"
+    flow._start_entity_preparation.assert_not_called()
+
+    result = await flow.async_step_menu_unchanged(
+        {OPTIONS_KEEP_DISCOVERED_ENTITIES: True}
+    )
+    assert result == "progress_result"
+    assert flow.enumerate_new_endpoints is False
+    assert flow.update_sensor_values is True
+
+    # A changed menu starts the rediscovery right away
+    eta_client.get_menu_fingerprint.return_value = "def"
+    await flow.async_step_init(rediscover)
+    assert await flow.async_step_select_fubs(keep_fubs) == "progress_result"
+    assert flow.enumerate_new_endpoints is True
+
+    # An old fingerprint is not trusted, the menu isn't even requested
+    config[MENU_DISCOVERED_AT] = time.time() - 365 * 24 * 60 * 60
+    eta_client.get_menu_fingerprint.reset_mock()
+    await flow.async_step_init(rediscover)
+    assert await flow.async_step_select_fubs(keep_fubs) == "progress_result"
+    eta_client.get_menu_fingerprint.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_rediscovery_continues_a_discovery_stopped_by_its_deadline():
+    """Endpoints left out by an expired deadline are discovered even if the menu is unchanged."""
+    config = _make_runtime_config(
+        {
+            MENU_FINGERPRINT: "abc",
+            MENU_DISCOVERED_AT: time.time() - 60,
+            UNFINISHED_URIS: ["/120/10111/0/11129/2049"],
+        }
+    )
+    flow = _make_flow(config)
+    eta_client = MagicMock()
+    eta_client.get_menu_fingerprint = AsyncMock(return_value="abc")
+    eta_client.get_fub_node_counts = AsyncMock(return_value={"Kessel": 10})
+    flow._get_eta_client = Mock(return_value=eta_client)
+    flow.async_show_form = Mock(return_value="form_result")
+    flow._start_entity_preparation = AsyncMock(return_value="progress_result")
+
+    await flow.async_step_init(
+        {OPTIONS_UPDATE_ACTION: OPTIONS_ACTION_REDISCOVER_AND_UPDATE}
+    )
+    assert await flow.async_step_select_fubs({SKIPPED_FUBS: []}) == "progress_result"
+    assert flow.enumerate_new_endpoints is True
+    eta_client.get_menu_fingerprint.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_rediscovery_lets_the_user_skip_function_blocks():
+    """Skipped function blocks are listed with node counts and passed to the discovery."""
+    config = _make_runtime_config(
+        {
+            MENU_FINGERPRINT: "abc",
+            MENU_DISCOVERED_AT: time.time() - 60,
+            SKIPPED_FUBS: ["Solar", "Removed"],
+        }
+    )
+    flow = _make_flow(config)
+    eta_client = MagicMock()
+    eta_client.get_menu_fingerprint = AsyncMock(return_value="abc")
+    eta_client.get_fub_node_counts = AsyncMock(
+        return_value={"Kessel": 10, "Solar": 5, "Puffer": 3}
+    )
+    flow._get_eta_client = Mock(return_value=eta_client)
+    flow.async_show_form = Mock(return_value="form_result")
+    flow._start_entity_preparation = AsyncMock(return_value="progress_result")
+
+    await flow.async_step_init(
+        {OPTIONS_UPDATE_ACTION: OPTIONS_ACTION_REDISCOVER_AND_UPDATE}
+    )
+    schema = flow.async_show_form.call_args.kwargs["data_schema"].schema
+    (key,) = schema
+    assert key.default() == ["Solar"]
+    assert [option["label"] for option in schema[key].config["options"]] == [
+        "Kessel (10)",
+        "Solar (5)",
+        "Puffer (3)",
+    ]
+
+    # Changed function blocks are discovered even though the menu is unchanged
+    result = await flow.async_step_select_fubs({SKIPPED_FUBS: ["Solar", "Puffer"]})
+    assert result == "progress_result"
+    eta_client.get_menu_fingerprint.assert_not_called()
+    assert flow.skipped_fubs == ["Solar", "Puffer"]
+
+@pytest.mark.asyncio
+async def test_rediscovery_rejects_skipping_every_function_block():
+    """Like the setup, the options flow requires at least one function block."""
+    config = _make_runtime_config({SKIPPED_FUBS: ["Solar"]})
+    flow = _make_flow(config)
+    eta_client = MagicMock()
+    eta_client.get_fub_node_counts = AsyncMock(return_value={"Kessel": 10, "Solar": 5})
+    flow._get_eta_client = Mock(return_value=eta_client)
+    flow.async_show_form = Mock(return_value="form_result")
+    flow._start_entity_preparation = AsyncMock(return_value="progress_result")
+
+    await flow.async_step_init(
+        {OPTIONS_UPDATE_ACTION: OPTIONS_ACTION_REDISCOVER_AND_UPDATE}
+    )
+    result = await flow.async_step_select_fubs({SKIPPED_FUBS: ["Kessel", "Solar"]})
+    assert result == "form_result"
+    assert flow.async_show_form.call_args.kwargs["errors"] == {
+        "base": "no_fub_selected"
+    }
+    schema = flow.async_show_form.call_args.kwargs["data_schema"].schema
+    (key,) = schema
+    assert key.default() == ["Kessel", "Solar"]
+    assert flow.skipped_fubs == ["Solar"]
+    flow._start_entity_preparation.assert_not_called()
+
+    result = await flow.async_step_select_fubs({SKIPPED_FUBS: ["Kessel"]})
+    assert result == "progress_result"
+    assert flow.skipped_fubs == ["Kessel"]
+
+
+@pytest.mark.asyncio
+async def test_setup_only_discovers_the_selected_function_blocks():
+    """The setup lists the function blocks and only discovers the selected ones."""
+    flow = EtaFlowHandler()
+    flow.hass = MagicMock()
+    flow.hass.async_create_task = Mock(side_effect=asyncio.ensure_future)
+    flow.data = {CONF_HOST: "192.168.0.25", CONF_PORT: 8080, FORCE_LEGACY_MODE: False}
+    flow._fub_node_counts = {"Kessel": 10, "WW": 4, "Solar": 5}
+    flow.async_show_form = Mock(return_value="form_result")
+    flow.async_show_progress = Mock(return_value="progress_result")
+    flow.async_show_progress_done = Mock(return_value="done_result")
+    flow._async_discover_possible_endpoints = AsyncMock()
+
+    # Validating the connection finished, the user chooses the function blocks next
+    validation = asyncio.get_running_loop().create_future()
+    validation.set_result(None)
+    flow._endpoint_discovery_task = validation
+    assert await flow.async_step_discover_entities() == "done_result"
+    flow.async_show_progress_done.assert_called_once_with(next_step_id="select_fubs")
+
+    assert await flow.async_step_select_fubs() == "form_result"
+    schema = flow.async_show_form.call_args.kwargs["data_schema"].schema
+    (key,) = schema
+    assert key.default() == ["Kessel", "WW", "Solar"]
+
+    assert await flow.async_step_select_fubs({SELECTED_FUBS: []}) == "form_result"
+    assert flow.async_show_form.call_args.kwargs["errors"] == {
+        "base": "no_fub_selected"
+    }
+
+    result = await flow.async_step_select_fubs({SELECTED_FUBS: ["Kessel", "WW"]})
+    assert result == "progress_result"
+    assert flow.data[SKIPPED_FUBS] == ["Solar"]
+    await flow._endpoint_discovery_task
+    flow._async_discover_possible_endpoints.assert_awaited_once_with(
+        "192.168.0.25", 8080, False
+    )
+
+    # After the discovery the entities are selected
+    assert await flow.async_step_discover_entities() == "done_result"
+    flow.async_show_progress_done.assert_called_with(next_step_id="select_entities")
+
+
+@pytest.mark.asyncio
+async def test_setup_reuses_the_client_and_menu_for_the_discovery():
+    """The menu read to count the function blocks is passed on to the discovery."""
+    flow = EtaFlowHandler()
+    flow.hass = MagicMock()
+    flow.data = {CONF_HOST: "192.168.0.25", CONF_PORT: 8080, FORCE_LEGACY_MODE: False}
+    flow._on_discovery_progress = Mock()
+    menu = {"_Kessel_Temperatur": ["/120/10101/0/0/12197"], "_WW_Speicher": ["/a"]}
+    eta_client = MagicMock()
+    eta_client.get_menu_endpoints = AsyncMock(return_value=menu)
+    eta_client.get_all_sensors = AsyncMock(return_value=True)
+    eta_client.last_unfinished_uris = []
+
+    with (
+        patch(
+            "custom_components.eta_webservices.config_flow.get_eta_client",
+            return_value=eta_client,
+        ) as get_client,
+        patch(
+            "custom_components.eta_webservices.config_flow.async_get_varinfo_cache",
+            AsyncMock(return_value=MagicMock()),
+        ),
+        patch(
+            "custom_components.eta_webservices.config_flow.async_get_discovery_checkpoint",
+            AsyncMock(return_value=None),
+        ),
+        patch(
+            "custom_components.eta_webservices.config_flow.async_save_varinfo_cache"
+        ),
+    ):
+        assert await flow._get_fub_node_counts("192.168.0.25", 8080) == {
+            "Kessel": 1,
+            "WW": 1,
+        }
+        await flow._get_possible_endpoints("192.168.0.25", 8080, False)
+
+    assert eta_client.get_all_sensors.await_args.kwargs["menu"] is menu
+    # Both steps use the client shared by the flow, which is not saved with the entry
+    configs = [call.args[1] for call in get_client.call_args_list]
+    assert len(configs) == 2
+    assert configs[0] is configs[1]
+    assert configs[0] is not flow.data
+
+
 @pytest.mark.asyncio
 async def test_prepare_data_structures_discovery_passes_correct_arguments():
     """Each discovery helper receives the exact dicts returned by _get_possible_endpoints_with_progress."""
@@ -402,6 +695,70 @@ async def test_prepare_data_structures_discovery_passes_correct_arguments():
     )
 
 
+@pytest.mark.asyncio
+async def test_rediscovery_stopped_by_its_deadline_keeps_chosen_entities():
+    """Chosen entities of endpoints the discovery didn't get to are neither deleted nor unavailable."""
+    config = _make_runtime_config(
+        {
+            FLOAT_DICT: {
+                "f1": _make_sensor(url="/f1"),
+                "f2": _make_sensor(url="/f2"),
+            },
+            WRITABLE_DICT: {"f2_writable": _make_sensor(url="/f2")},
+            CHOSEN_FLOAT_SENSORS: ["f1", "f2"],
+            CHOSEN_WRITABLE_SENSORS: ["f2_writable"],
+            DISCOVERED_MENU: {"_WW_f1": ["/f1"], "_WW_f2": ["/f2"]},
+        }
+    )
+    flow = _make_flow(config, enumerate_new_endpoints=True)
+    flow.discovery_deadline = 5
+    flow._update_sensor_values = AsyncMock()
+    eta_client = MagicMock()
+    eta_client.api_version = None
+    eta_client.last_menu_fingerprint = None
+    eta_client.last_discovery_changes = None
+    eta_client.last_unfinished_uris = ["/f2"]
+    eta_client.last_discovered_menu = {"_WW_f1": ["/f1"]}
+
+    async def stopped_discovery(force_legacy_mode, float_dict, *dicts, **kwargs):
+        # The incremental discovery removed /f2 and didn't discover it again in time
+        float_dict.pop("f2")
+        dicts[2].pop("f2_writable")
+        return True
+
+    eta_client.get_all_sensors = AsyncMock(side_effect=stopped_discovery)
+    flow._get_eta_client = Mock(return_value=eta_client)
+
+    with (
+        patch(
+            "custom_components.eta_webservices.config_flow.async_get_varinfo_cache",
+            AsyncMock(return_value=MagicMock()),
+        ),
+        patch(
+            "custom_components.eta_webservices.config_flow.async_get_discovery_checkpoint",
+            AsyncMock(return_value=None),
+        ),
+        patch(
+            "custom_components.eta_webservices.config_flow.async_save_varinfo_cache"
+        ),
+    ):
+        await flow._prepare_data_structures()
+
+    assert eta_client.get_all_sensors.await_args.kwargs["deadline"] == 300
+    assert eta_client.get_all_sensors.await_args.kwargs["previous_menu"] == {
+        "_WW_f1": ["/f1"],
+        "_WW_f2": ["/f2"],
+    }
+    # /f2 has to be discovered again by the next rediscovery
+    assert flow.data[DISCOVERED_MENU] == {"_WW_f1": ["/f1"]}
+    assert flow.data[CHOSEN_FLOAT_SENSORS] == ["f1", "f2"]
+    assert flow.data[CHOSEN_WRITABLE_SENSORS] == ["f2_writable"]
+    assert set(flow.data[FLOAT_DICT]) == {"f1", "f2"}
+    assert flow.unavailable_sensors == {}
+    assert flow.data[UNFINISHED_URIS] == ["/f2"]
+    assert flow._errors["base"] == "discovery_incomplete"
+
+
 @pytest.mark.asyncio
 async def test_prepare_data_structures_skips_discovery_when_only_update_values():
     """update_sensor_values=True (without enumerate) must not call _get_possible_endpoints_with_progress."""
@@ -869,6 +1226,128 @@ async def test_parallel_requests_step_saves_update_interval():
     assert saved_data[UPDATE_INTERVAL] == 30
 
 
+@pytest.mark.asyncio
+async def test_parallel_requests_step_saves_value_cache_ttl():
+    """User submits → value cache TTL is offered and stored as integer."""
+    config = _make_runtime_config()
+    flow = _make_flow(config)
+    flow.async_show_form = Mock(return_value="form_result")
+    flow.async_create_entry = Mock(return_value="entry_result")
+
+    await flow.async_step_parallel_requests(user_input=None)
+    schema_keys = {
+        str(k) for k in flow.async_show_form.call_args.kwargs["data_schema"].schema
+    }
+    assert VALUE_CACHE_TTL in schema_keys
+
+    await flow.async_step_parallel_requests(
+        user_input={
+            MAX_PARALLEL_REQUESTS: "5",
+            UPDATE_INTERVAL: "30",
+            VALUE_CACHE_TTL: "5",
+        }
+    )
+    saved_data = flow.async_create_entry.call_args.kwargs["data"]
+    assert saved_data[VALUE_CACHE_TTL] == 5
+
+
+@pytest.mark.asyncio
+async def test_parallel_requests_step_saves_request_rate_limits():
+    """User submits → read and write rate limits are stored as integers."""
+    config = _make_runtime_config({MAX_READS_PER_SECOND: 10})
+    flow = _make_flow(config)
+    flow.async_show_form = Mock(return_value="form_result")
+    flow.async_create_entry = Mock(return_value="entry_result")
+
+    await flow.async_step_parallel_requests(user_input=None)
+    schema = flow.async_show_form.call_args.kwargs["data_schema"].schema
+    defaults = {str(k): k.default() for k in schema}
+    assert defaults[MAX_READS_PER_SECOND] == "10"
+    assert defaults[MAX_WRITES_PER_SECOND] == str(DEFAULT_MAX_WRITES_PER_SECOND)
+
+    await flow.async_step_parallel_requests(
+        user_input={
+            MAX_PARALLEL_REQUESTS: "5",
+            UPDATE_INTERVAL: "30",
+            VALUE_CACHE_TTL: "0",
+            MAX_READS_PER_SECOND: "20",
+            MAX_WRITES_PER_SECOND: "2",
+        }
+    )
+    saved_data = flow.async_create_entry.call_args.kwargs["data"]
+    assert saved_data[MAX_READS_PER_SECOND] == 20
+    assert saved_data[MAX_WRITES_PER_SECOND] == 2
+
+
+@pytest.mark.asyncio
+async def test_parallel_requests_step_saves_hedged_requests():
+    """User enables hedged requests → the flag is stored, defaulting to the current value."""
+    flow = _make_flow(_make_runtime_config())
+    flow.async_show_form = Mock(return_value="form_result")
+    flow.async_create_entry = Mock(return_value="entry_result")
+
+    await flow.async_step_parallel_requests(user_input=None)
+    schema = flow.async_show_form.call_args.kwargs["data_schema"].schema
+    defaults = {str(k): k.default() for k in schema}
+    assert defaults[HEDGED_REQUESTS] is False
+
+    await flow.async_step_parallel_requests(
+        user_input={
+            MAX_PARALLEL_REQUESTS: "5",
+            UPDATE_INTERVAL: "30",
+            HEDGED_REQUESTS: True,
+        }
+    )
+    saved_data = flow.async_create_entry.call_args.kwargs["data"]
+    assert saved_data[HEDGED_REQUESTS] is True
+
+
+@pytest.mark.asyncio
+async def test_parallel_requests_step_saves_discovery_checkpoint_max_age():
+    """User changes how long discoveries can be resumed → the minutes are stored."""
+    flow = _make_flow(_make_runtime_config())
+    flow.async_show_form = Mock(return_value="form_result")
+    flow.async_create_entry = Mock(return_value="entry_result")
+
+    await flow.async_step_parallel_requests(user_input=None)
+    schema = flow.async_show_form.call_args.kwargs["data_schema"].schema
+    defaults = {str(k): k.default() for k in schema}
+    assert defaults[DISCOVERY_CHECKPOINT_MAX_AGE] == "60"
+
+    await flow.async_step_parallel_requests(
+        user_input={
+            MAX_PARALLEL_REQUESTS: "5",
+            UPDATE_INTERVAL: "30",
+            DISCOVERY_CHECKPOINT_MAX_AGE: "0",
+        }
+    )
+    saved_data = flow.async_create_entry.call_args.kwargs["data"]
+    assert saved_data[DISCOVERY_CHECKPOINT_MAX_AGE] == 0
+
+
+@pytest.mark.asyncio
+async def test_parallel_requests_step_saves_discovery_deadline():
+    """User sets a time limit for discoveries → the minutes are stored."""
+    flow = _make_flow(_make_runtime_config())
+    flow.async_show_form = Mock(return_value="form_result")
+    flow.async_create_entry = Mock(return_value="entry_result")
+
+    await flow.async_step_parallel_requests(user_input=None)
+    schema = flow.async_show_form.call_args.kwargs["data_schema"].schema
+    defaults = {str(k): k.default() for k in schema}
+    assert defaults[DISCOVERY_DEADLINE] == "0"
+
+    await flow.async_step_parallel_requests(
+        user_input={
+            MAX_PARALLEL_REQUESTS: "5",
+            UPDATE_INTERVAL: "30",
+            DISCOVERY_DEADLINE: "20",
+        }
+    )
+    saved_data = flow.async_create_entry.call_args.kwargs["data"]
+    assert saved_data[DISCOVERY_DEADLINE] == 20
+
+
 @pytest.mark.asyncio
 async def test_parallel_requests_step_aborts_when_no_runtime_config():
     """_get_runtime_config returns None → step aborts immediately."""
@@ -983,3 +1462,77 @@ def test_build_endpoint_selection_schema_adds_unavailable_sensors_field():
     unavailable = {"gone": _make_sensor(url="/gone")}
     schema = _build_endpoint_selection_schema(data, unavailable_sensors=unavailable)
     assert "unavailable_sensors" in _schema_keys(schema)
+
+
+@pytest.mark.asyncio
+async def test_discovery_progress_shows_discovered_function_blocks():
+    """The progress task finishes for every discovered function block, so HA shows the step again."""
+    flow = EtaFlowHandler()
+    flow.hass = MagicMock()
+    flow.hass.async_create_task = Mock(side_effect=asyncio.ensure_future)
+    flow.async_show_progress = Mock(return_value="progress_result")
+    discovery = asyncio.get_running_loop().create_future()
+    flow._endpoint_discovery_task = discovery
+
+    assert await flow.async_step_discover_entities() == "progress_result"
+    progress_task = flow.async_show_progress.call_args.kwargs["progress_task"]
+    assert progress_task is not discovery
+    assert flow.async_show_progress.call_args.kwargs["description_placeholders"] == {
+        "completed_fubs": "-"
+    }
+    # Showing the step again before anything changed keeps the progress task
+    await flow.async_step_discover_entities()
+    assert flow.async_show_progress.call_args.kwargs["progress_task"] is progress_task
+
+    flow._on_fub_discovered("Kessel", 12)
+    await asyncio.wait_for(progress_task, 1)
+    assert not discovery.done()
+
+    await flow.async_step_discover_entities()
+    assert flow.async_show_progress.call_args.kwargs["description_placeholders"] == {
+        "completed_fubs": "Kessel (12)"
+    }
+    next_progress_task = flow.async_show_progress.call_args.kwargs["progress_task"]
+    assert next_progress_task is not progress_task
+
+    # Removing the flow cancels the discovery, HA only cancels the progress task
+    flow.async_remove()
+    assert discovery.cancelled()
+    await asyncio.wait_for(next_progress_task, 1)
+
+
+@pytest.mark.asyncio
+async def test_options_progress_shows_discovered_function_blocks():
+    """The options flow refreshes its progress step the same way."""
+    flow = EtaOptionsFlowHandler()
+    flow.hass = MagicMock()
+    flow.hass.async_create_task = Mock(side_effect=asyncio.ensure_future)
+    flow.async_show_progress = Mock(return_value="progress_result")
+    flow.async_show_progress_done = Mock(return_value="done_result")
+    preparation = asyncio.get_running_loop().create_future()
+    flow._options_update_task = preparation
+
+    assert await flow.async_step_prepare_entities() == "progress_result"
+    progress_task = flow.async_show_progress.call_args.kwargs["progress_task"]
+    flow._on_fub_discovered("WW", 3)
+    await asyncio.wait_for(progress_task, 1)
+
+    await flow.async_step_prepare_entities()
+    assert flow.async_show_progress.call_args.kwargs["description_placeholders"] == {
+        "completed_fubs": "WW (3)"
+    }
+    progress_task = flow.async_show_progress.call_args.kwargs["progress_task"]
+
+    preparation.set_result(None)
+    await asyncio.wait_for(progress_task, 1)
+    assert await flow.async_step_prepare_entities() == "done_result"
+
+
+@pytest.mark.asyncio
+async def test_options_flow_removal_cancels_entity_preparation():
+    """Removing the options flow cancels the running entity preparation."""
+    flow = EtaOptionsFlowHandler()
+    preparation = asyncio.get_running_loop().create_future()
+    flow._options_update_task = preparation
+    flow.async_remove()
+    assert preparation.cancelled()
@@ -22,7 +22,9 @@ from custom_components.eta_webservices.const import (
     CHOSEN_WRITABLE_SENSORS,
     COORDINATOR_WARNING_INTERVAL,
     DEFAULT_UPDATE_INTERVAL,
+    ETA_CLIENT,
     FLOAT_DICT,
+    HTTP_TRANSPORT,
     LAST_COORDINATOR_WARNING_TIMESTAMP,
     PAUSE_COORDINATORS_MAX_DURATION,
     PAUSE_COORDINATORS_START_TIMESTAMP,
@@ -49,7 +51,7 @@ def mock_hass():
 def mock_client_session():
     """Patch async_get_clientsession so coordinators never create a real session."""
     with patch(
-        "custom_components.eta_webservices.coordinator.async_get_clientsession",
+        "custom_components.eta_webservices.utils.async_get_clientsession",
         return_value=MagicMock(spec=ClientSession),
     ):
         yield
@@ -127,6 +129,31 @@ def test_coordinators_default_to_60s_when_interval_not_set(
     assert coordinator.update_interval == timedelta(seconds=DEFAULT_UPDATE_INTERVAL)
 
 
+def test_coordinators_use_dedicated_connection_pool(mock_hass):
+    """Coordinators share the entry's connection pool instead of the HA session."""
+    transport = MagicMock()
+    config = _interval_config()
+    config[HTTP_TRANSPORT] = transport
+    entry = MagicMock(spec=ConfigEntry)
+    entry.pref_disable_polling = False
+
+    with patch(
+        "custom_components.eta_webservices.utils.async_get_clientsession"
+    ) as get_session:
+        coordinators = [
+            ETAErrorUpdateCoordinator(mock_hass, config),
+            ETASensorUpdateCoordinator(mock_hass, config),
+            ETAWritableUpdateCoordinator(mock_hass, config),
+            ETAPendingNodeCoordinator(mock_hass, config, entry),
+        ]
+
+    get_session.assert_not_called()
+    # All coordinators share one long-lived client which uses the entry's pool
+    assert all(c.eta_client is coordinators[0].eta_client for c in coordinators)
+    assert config[ETA_CLIENT] is coordinators[0].eta_client
+    assert coordinators[0].eta_client._http._session is transport.session
+
+
 def test_all_coordinators_respect_120s_interval(mock_hass, mock_client_session):
     """Verify multiplier chain at the upper bound (120 s)."""
     entry = MagicMock(spec=ConfigEntry)
@@ -249,7 +276,7 @@ def _make_writable_coordinator(mock_hass, update_interval=_INTERVAL):
     coordinator = ETAWritableUpdateCoordinator(mock_hass, config)
     mock_client = MagicMock()
     mock_client.get_all_data = AsyncMock(return_value={})
-    coordinator._create_eta_client = MagicMock(return_value=mock_client)
+    coordinator.eta_client = mock_client
     return coordinator
 
 
@@ -340,7 +367,7 @@ async def test_sensor_coordinator_skips_update_when_paused(mock_hass, mock_clien
     """Returns {} immediately when PAUSE_COORDINATORS_START_TIMESTAMP is set and within window."""
     config = _interval_config()
     coordinator = ETASensorUpdateCoordinator(mock_hass, config)
-    coordinator._create_eta_client = MagicMock()
+    coordinator.eta_client = MagicMock()
 
     start_ts = 1000.0
     config[PAUSE_COORDINATORS_START_TIMESTAMP] = start_ts
@@ -350,14 +377,14 @@ async def test_sensor_coordinator_skips_update_when_paused(mock_hass, mock_clien
         result = await coordinator._async_update_data()
 
     assert result == {}
-    coordinator._create_eta_client.assert_not_called()
+    assert not coordinator.eta_client.method_calls
 
 
 async def test_sensor_coordinator_resumes_when_pause_expires(mock_hass, mock_client_session):
     """Proceeds normally once PAUSE_COORDINATORS_MAX_DURATION has elapsed."""
     config = _interval_config()
     coordinator = ETASensorUpdateCoordinator(mock_hass, config)
-    coordinator._create_eta_client = MagicMock(return_value=MagicMock())
+    coordinator.eta_client = MagicMock()
 
     start_ts = 1000.0
     config[PAUSE_COORDINATORS_START_TIMESTAMP] = start_ts
@@ -367,20 +394,22 @@ async def test_sensor_coordinator_resumes_when_pause_expires(mock_hass, mock_cli
         mock_time.monotonic.side_effect = [0.0, 1.0]  # elapsed < interval → no warning
         await coordinator._async_update_data()
 
-    coordinator._create_eta_client.assert_called_once()
+    # Without chosen sensors there is nothing to read, but the update was timed
+    assert mock_time.monotonic.call_count == 2
 
 
 async def test_sensor_coordinator_proceeds_when_no_pause_set(mock_hass, mock_client_session):
     """Proceeds normally when PAUSE_COORDINATORS_START_TIMESTAMP is absent from config."""
     config = _interval_config()  # no pause key
     coordinator = ETASensorUpdateCoordinator(mock_hass, config)
-    coordinator._create_eta_client = MagicMock(return_value=MagicMock())
+    coordinator.eta_client = MagicMock()
 
     with patch(_TIME_MODULE) as mock_time:
         mock_time.monotonic.side_effect = [0.0, 1.0]
         await coordinator._async_update_data()
 
-    coordinator._create_eta_client.assert_called_once()
+    # Without chosen sensors there is nothing to read, but the update was timed
+    assert mock_time.monotonic.call_count == 2
 
 
 # -- ETAWritableUpdateCoordinator -------------------------------------------
@@ -398,7 +427,7 @@ async def test_writable_coordinator_skips_update_when_paused(mock_hass, mock_cli
         result = await coordinator._async_update_data()
 
     assert result == {}
-    coordinator._create_eta_client.assert_not_called()
+    assert not coordinator.eta_client.method_calls
 
 
 async def test_writable_coordinator_resumes_when_pause_expires(mock_hass, mock_client_session):
@@ -413,7 +442,7 @@ async def test_writable_coordinator_resumes_when_pause_expires(mock_hass, mock_c
         mock_time.monotonic.side_effect = [0.0, 1.0]
         await coordinator._async_update_data()
 
-    coordinator._create_eta_client.assert_called_once()
+    assert coordinator.eta_client.method_calls
 
 
 async def test_writable_coordinator_proceeds_when_no_pause_set(mock_hass, mock_client_session):
@@ -424,7 +453,7 @@ async def test_writable_coordinator_proceeds_when_no_pause_set(mock_hass, mock_c
         mock_time.monotonic.side_effect = [0.0, 1.0]
         await coordinator._async_update_data()
 
-    coordinator._create_eta_client.assert_called_once()
+    assert coordinator.eta_client.method_calls
 
 
 # -- ETAPendingNodeCoordinator ----------------------------------------------
@@ -439,7 +468,7 @@ def _make_pending_coordinator_with_sensors(mock_hass):
     coordinator = ETAPendingNodeCoordinator(mock_hass, config, entry)
     mock_client = MagicMock()
     mock_client.get_all_data = AsyncMock(return_value={})
-    coordinator._create_eta_client = MagicMock(return_value=mock_client)
+    coordinator.eta_client = mock_client
     return coordinator
 
 
@@ -455,7 +484,7 @@ async def test_pending_coordinator_skips_update_when_paused(mock_hass, mock_clie
         result = await coordinator._async_update_data()
 
     assert result is False
-    coordinator._create_eta_client.assert_not_called()
+    assert not coordinator.eta_client.method_calls
 
 
 async def test_pending_coordinator_resumes_when_pause_expires(mock_hass, mock_client_session):
@@ -469,7 +498,7 @@ async def test_pending_coordinator_resumes_when_pause_expires(mock_hass, mock_cl
         mock_time.time.return_value = start_ts + PAUSE_COORDINATORS_MAX_DURATION + 1
         await coordinator._async_update_data()
 
-    coordinator._create_eta_client.assert_called_once()
+    assert coordinator.eta_client.method_calls
 
 
 async def test_pending_coordinator_proceeds_when_no_pause_set(mock_hass, mock_client_session):
@@ -478,7 +507,7 @@ async def test_pending_coordinator_proceeds_when_no_pause_set(mock_hass, mock_cl
 
     await coordinator._async_update_data()
 
-    coordinator._create_eta_client.assert_called_once()
+    assert coordinator.eta_client.method_calls
 
 
 # -- ETAErrorUpdateCoordinator ----------------------------------------------
@@ -489,7 +518,7 @@ def _make_error_coordinator(mock_hass):
     coordinator = ETAErrorUpdateCoordinator(mock_hass, _interval_config())
     mock_client = MagicMock()
     mock_client.get_errors = AsyncMock(return_value=[])
-    coordinator._create_eta_client = MagicMock(return_value=mock_client)
+    coordinator.eta_client = mock_client
     return coordinator
 
 
@@ -505,7 +534,7 @@ async def test_error_coordinator_skips_update_when_paused(mock_hass, mock_client
         result = await coordinator._async_update_data()
 
     assert result == []
-    coordinator._create_eta_client.assert_not_called()
+    assert not coordinator.eta_client.method_calls
 
 
 async def test_error_coordinator_resumes_when_pause_expires(mock_hass, mock_client_session):
@@ -519,7 +548,7 @@ async def test_error_coordinator_resumes_when_pause_expires(mock_hass, mock_clie
         mock_time.time.return_value = start_ts + PAUSE_COORDINATORS_MAX_DURATION + 1
         await coordinator._async_update_data()
 
-    coordinator._create_eta_client.assert_called_once()
+    assert coordinator.eta_client.method_calls
 
 
 async def test_error_coordinator_proceeds_when_no_pause_set(mock_hass, mock_client_session):
@@ -528,4 +557,187 @@ async def test_error_coordinator_proceeds_when_no_pause_set(mock_hass, mock_clie
 
     await coordinator._async_update_data()
 
-    coordinator._create_eta_client.assert_called_once()
+    assert coordinator.eta_client.method_calls
+
+
+# ---------------------------------------------------------------------------
+# Batched reads through the server-side variable set
+# ---------------------------------------------------------------------------
+
+
+def _make_batched_sensor_coordinator(mock_hass):
+    """Return an ETASensorUpdateCoordinator with one float sensor and one switch."""
+    config = _interval_config()
+    config[FLOAT_DICT] = {"f1": {"url": "/120/1/0/0/1", "unit": "°C"}}
+    config[CHOSEN_FLOAT_SENSORS] = ["f1"]
+    config[SWITCHES_DICT] = {
+        "s1": {
+            "url": "/120/1/0/0/2",
+            "unit": "",
+            "valid_values": {"on_value": 1803, "off_value": 1802},
+        }
+    }
+    config[CHOSEN_SWITCHES] = ["s1"]
+    coordinator = ETASensorUpdateCoordinator(mock_hass, config)
+    mock_client = MagicMock()
+    mock_client.get_all_data = AsyncMock(return_value={})
+    mock_client.get_all_switch_states = AsyncMock(return_value={})
+    coordinator.eta_client = mock_client
+    return coordinator, mock_client
+
+
+async def test_sensor_coordinator_reads_values_through_varset(
+    mock_hass, mock_client_session
+):
+    """All values are read with a single variable set request when the terminal supports it."""
+    coordinator, mock_client = _make_batched_sensor_coordinator(mock_hass)
+    mock_client.sync_varset = AsyncMock(side_effect=lambda name, uris, reg: set(uris))
+    mock_client.get_varset_data = AsyncMock(
+        return_value=({"/120/1/0/0/1": 44.4}, {"/120/1/0/0/2": 1803})
+    )
+
+    data = await coordinator._async_update_data()
+
+    assert data == {"/120/1/0/0/1": 44.4, "/120/1/0/0/2": True}
+    mock_client.get_all_data.assert_not_called()
+    mock_client.get_all_switch_states.assert_not_called()
+
+    # The already registered set is passed on for the next sync
+    await coordinator._async_update_data()
+    assert mock_client.sync_varset.call_args.args[2] == {
+        "/120/1/0/0/1",
+        "/120/1/0/0/2",
+    }
+
+
+async def test_sensor_coordinator_reads_rejected_uris_per_endpoint(
+    mock_hass, mock_client_session
+):
+    """URIs the terminal refused to add to the variable set are read individually."""
+    coordinator, mock_client = _make_batched_sensor_coordinator(mock_hass)
+    mock_client.sync_varset = AsyncMock(return_value={"/120/1/0/0/2"})
+    mock_client.get_varset_data = AsyncMock(return_value=({}, {"/120/1/0/0/2": 1802}))
+    mock_client.get_all_data = AsyncMock(return_value={"/120/1/0/0/1": 12.0})
+
+    data = await coordinator._async_update_data()
+
+    assert data == {"/120/1/0/0/1": 12.0, "/120/1/0/0/2": False}
+    mock_client.get_all_data.assert_called_once_with({"/120/1/0/0/1": {}})
+
+    # Rejected URIs are not offered to the terminal again
+    await coordinator._async_update_data()
+    assert mock_client.sync_varset.call_args.args[1] == {"/120/1/0/0/2"}
+
+
+async def test_sensor_coordinator_reads_uris_missing_from_varset_response_per_endpoint(
+    mock_hass, mock_client_session
+):
+    """Registered URIs without a valid value in the variable set response are read individually."""
+    coordinator, mock_client = _make_batched_sensor_coordinator(mock_hass)
+    mock_client.sync_varset = AsyncMock(side_effect=lambda name, uris, reg: set(uris))
+    mock_client.get_varset_data = AsyncMock(return_value=({}, {}))
+    mock_client.get_all_data = AsyncMock(return_value={"/120/1/0/0/1": 12.0})
+    mock_client.get_all_switch_states = AsyncMock(return_value={"/120/1/0/0/2": 1803})
+
+    data = await coordinator._async_update_data()
+
+    assert data == {"/120/1/0/0/1": 12.0, "/120/1/0/0/2": True}
+    mock_client.get_all_data.assert_called_once_with({"/120/1/0/0/1": {}})
+    mock_client.get_all_switch_states.assert_called_once_with(["/120/1/0/0/2"])
+
+
+async def test_sensor_coordinator_falls_back_when_varset_is_refused(
+    mock_hass, mock_client_session
+):
+    """Per-endpoint reads are used permanently if the terminal refuses to create the set."""
+    coordinator, mock_client = _make_batched_sensor_coordinator(mock_hass)
+    mock_client.sync_varset = AsyncMock(return_value=None)
+    mock_client.get_all_data = AsyncMock(return_value={"/120/1/0/0/1": 12.0})
+    mock_client.get_all_switch_states = AsyncMock(return_value={"/120/1/0/0/2": 1803})
+
+    data = await coordinator._async_update_data()
+    await coordinator._async_update_data()
+
+    assert data == {"/120/1/0/0/1": 12.0, "/120/1/0/0/2": True}
+    assert coordinator.varset_supported is False
+    mock_client.sync_varset.assert_called_once()
+
+
+async def test_sensor_coordinator_recreates_varset_after_failed_read(
+    mock_hass, mock_client_session
+):
+    """A failed batched read falls back for this update and recreates the set next time."""
+    coordinator, mock_client = _make_batched_sensor_coordinator(mock_hass)
+    mock_client.sync_varset = AsyncMock(side_effect=lambda name, uris, reg: set(uris))
+    mock_client.get_varset_data = AsyncMock(side_effect=RuntimeError("lost set"))
+    mock_client.get_all_data = AsyncMock(return_value={"/120/1/0/0/1": 12.0})
+
+    data = await coordinator._async_update_data()
+    assert data["/120/1/0/0/1"] == 12.0
+    assert coordinator.varset_supported is True
+
+    await coordinator._async_update_data()
+    assert mock_client.sync_varset.call_args.args[2] is None
+
+    await coordinator._async_update_data()
+    assert coordinator.varset_supported is False
+
+
+async def test_sensor_coordinator_fails_update_while_terminal_is_unreachable(
+    mock_hass, mock_client_session
+):
+    """An open circuit breaker fails the update and keeps the variable set."""
+    from homeassistant.helpers.update_coordinator import UpdateFailed
+
+    from custom_components.eta_webservices.api import ETATerminalUnavailableError
+
+    coordinator, mock_client = _make_batched_sensor_coordinator(mock_hass)
+    mock_client.sync_varset = AsyncMock(
+        side_effect=ETATerminalUnavailableError("unreachable")
+    )
+
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+
+    assert coordinator.varset_supported is True
+    assert coordinator._varset_failures == 0
+    mock_client.get_all_data.assert_not_called()
+
+
+async def test_writable_coordinator_fails_update_while_terminal_is_unreachable(
+    mock_hass, mock_client_session
+):
+    """Writable entities become unavailable as soon as the terminal is unreachable."""
+    from homeassistant.helpers.update_coordinator import UpdateFailed
+
+    from custom_components.eta_webservices.api import ETATerminalUnavailableError
+
+    coordinator = _make_writable_coordinator(mock_hass)
+    coordinator.eta_client.get_all_data = AsyncMock(
+        side_effect=ETATerminalUnavailableError("unreachable")
+    )
+
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+
+
+async def test_sensor_coordinator_refreshes_only_written_uris(
+    mock_hass, mock_client_session
+):
+    """Refreshing after a batch of writes reads only the affected endpoints and keeps the rest."""
+    coordinator, mock_client = _make_batched_sensor_coordinator(mock_hass)
+    coordinator.data = {"/120/1/0/0/1": 44.4, "/120/1/0/0/2": False}
+    coordinator.async_set_updated_data = MagicMock()
+    mock_client.get_all_switch_states = AsyncMock(return_value={"/120/1/0/0/2": 1803})
+
+    await coordinator.async_refresh_uris({"/user/var/120/1/0/0/2", "/120/9/0/0/9"})
+
+    mock_client.get_all_data.assert_not_called()
+    mock_client.get_all_switch_states.assert_awaited_once_with(["/120/1/0/0/2"])
+    coordinator.async_set_updated_data.assert_called_once_with(
+        {"/120/1/0/0/1": 44.4, "/120/1/0/0/2": True}
+    )
+
+    # Endpoints without entities of this coordinator don't cause a request
+    await coordinator.async_refresh_uris({"/120/9/0/0/9"})
+    mock_client.get_all_switch_states.assert_awaited_once()
@@ -1,7 +1,7 @@
 """Tests that verify every entity is fed by exactly one coordinator."""
 
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from homeassistant.const import CONF_HOST, CONF_PORT
 from homeassistant.core import HomeAssistant
@@ -79,6 +79,9 @@ def _make_api_mock(float_dict, text_dict, writable_dict, switch_dict):
         side_effect=lambda uris: {uri: uri_to_switch.get(uri, 1802) for uri in uris}
     )
     mock_api.get_errors = AsyncMock(return_value=[])
+    # Terminal without variable set support: all reads go through get_all_data
+    mock_api.sync_varset = AsyncMock(return_value=None)
+    mock_api.set_api_version = MagicMock()
     return mock_api
 
 
@@ -139,12 +142,11 @@ async def _run_test(
     }
 
     with (
-        patch("custom_components.eta_webservices.coordinator.async_get_clientsession"),
+        patch("custom_components.eta_webservices.utils.async_get_clientsession"),
         patch(
-            "custom_components.eta_webservices.coordinator.EtaAPI",
+            "custom_components.eta_webservices.utils.EtaAPI",
             return_value=mock_api,
         ),
-        patch("custom_components.eta_webservices.entity.async_get_clientsession"),
         patch("custom_components.eta_webservices.number.async_get_current_platform"),
         patch("custom_components.eta_webservices.sensor.async_get_current_platform"),
     ):
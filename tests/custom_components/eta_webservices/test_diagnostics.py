@@ -0,0 +1,69 @@
+"""Tests for eta_webservices/diagnostics.py."""
+
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from homeassistant.components.diagnostics import REDACTED
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_PORT
+
+from custom_components.eta_webservices._api.transport import ETATransport
+from custom_components.eta_webservices.api import AdaptiveConcurrencyLimiter
+from custom_components.eta_webservices.const import (
+    DOMAIN,
+    ETA_CLIENT,
+    FLOAT_DICT,
+    HTTP_TRANSPORT,
+    REQUEST_SEMAPHORE,
+    SENSOR_UPDATE_COORDINATOR,
+)
+from custom_components.eta_webservices.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_only_contain_serializable_entry_data():
+    """The runtime objects of the entry are summarized instead of being dumped."""
+    entry = MagicMock(spec=ConfigEntry)
+    entry.entry_id = "test_entry_id"
+    entry.data = {CONF_HOST: "192.168.0.25", CONF_PORT: 8080, FLOAT_DICT: {}}
+    eta_client = MagicMock()
+    eta_client.get_menu = AsyncMock(return_value={"menu": "content"})
+    eta_client.get_api_version = AsyncMock(return_value="1.2")
+    eta_client.api_version_detected_at = 1700000000.0
+    transport = ETATransport(5)
+    hass = MagicMock()
+    hass.data = {
+        DOMAIN: {
+            entry.entry_id: {
+                **entry.data,
+                ETA_CLIENT: eta_client,
+                HTTP_TRANSPORT: transport,
+                REQUEST_SEMAPHORE: AdaptiveConcurrencyLimiter(5),
+                SENSOR_UPDATE_COORDINATOR: MagicMock(),
+            }
+        }
+    }
+
+    try:
+        with patch(
+            "custom_components.eta_webservices.diagnostics.get_eta_client",
+            return_value=eta_client,
+        ):
+            diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    finally:
+        await transport.close()
+
+    json.dumps(diagnostics)
+    assert diagnostics["config"] == {
+        CONF_HOST: REDACTED,
+        CONF_PORT: 8080,
+        FLOAT_DICT: {},
+    }
+    assert diagnostics["api_version"] == "1.2"
+    assert diagnostics["request_limiter"]["limit"] <= 5
+    assert set(diagnostics["rate_limiter"]) == {"reads", "writes"}
+    assert "circuit_breaker" in diagnostics
+    assert "request_metrics" in diagnostics
@@ -127,7 +127,7 @@ def _assert_clears_native_value(entity, coordinator, dummy_data):
 def test_eta_float_sensor_clears_value_when_key_missing(hass: HomeAssistant):
     """EtaFloatSensor._attr_native_value is None when its URI is absent from data."""
     coordinator = _make_sensor_coordinator(42.0)
-    with patch("custom_components.eta_webservices.entity.async_get_clientsession"):
+    with patch("custom_components.eta_webservices.utils.async_get_clientsession"):
         entity = EtaFloatSensor(
             _make_config(), hass, _UNIQUE_ID, _make_float_endpoint(), coordinator
         )
@@ -145,7 +145,7 @@ def test_eta_float_sensor_clears_value_when_key_missing(hass: HomeAssistant):
 def test_eta_text_sensor_clears_value_when_key_missing(hass: HomeAssistant):
     """EtaTextSensor._attr_native_value is None when its URI is absent from data."""
     coordinator = _make_sensor_coordinator("Ein")
-    with patch("custom_components.eta_webservices.entity.async_get_clientsession"):
+    with patch("custom_components.eta_webservices.utils.async_get_clientsession"):
         entity = EtaTextSensor(
             _make_config(), hass, _UNIQUE_ID, _make_float_endpoint(unit=""), coordinator
         )
@@ -163,7 +163,7 @@ def test_eta_text_sensor_clears_value_when_key_missing(hass: HomeAssistant):
 def test_eta_timeslot_sensor_clears_value_when_key_missing(hass: HomeAssistant):
     """EtaTimeslotSensor._attr_native_value is None when its URI is absent from data."""
     coordinator = _make_sensor_coordinator("15:00 - 16:00")
-    with patch("custom_components.eta_webservices.entity.async_get_clientsession"):
+    with patch("custom_components.eta_webservices.utils.async_get_clientsession"):
         entity = EtaTimeslotSensor(
             _make_config(),
             hass,
@@ -186,7 +186,7 @@ def test_eta_timeslot_sensor_clears_value_when_key_missing(hass: HomeAssistant):
 def test_eta_writable_number_sensor_clears_value_when_key_missing(hass: HomeAssistant):
     """EtaWritableNumberSensor._attr_native_value is None when its URI is absent from data."""
     coordinator = _make_writable_coordinator(42.0)
-    with patch("custom_components.eta_webservices.entity.async_get_clientsession"):
+    with patch("custom_components.eta_webservices.utils.async_get_clientsession"):
         entity = EtaWritableNumberSensor(
             _make_config(), hass, _UNIQUE_ID, _make_writable_endpoint(), coordinator
         )
@@ -208,7 +208,7 @@ def test_eta_time_clears_value_when_key_missing(hass: HomeAssistant):
     so the entity starts with a non-None value regardless of coordinator data.
     """
     coordinator = _make_writable_coordinator("19:00")
-    with patch("custom_components.eta_webservices.entity.async_get_clientsession"):
+    with patch("custom_components.eta_webservices.utils.async_get_clientsession"):
         entity = EtaTime(
             _make_config(),
             hass,
@@ -234,7 +234,7 @@ def test_eta_switch_clears_is_on_when_key_missing(hass: HomeAssistant):
     directly in its own _handle_coordinator_update override.
     """
     coordinator = _make_sensor_coordinator(True)
-    with patch("custom_components.eta_webservices.entity.async_get_clientsession"):
+    with patch("custom_components.eta_webservices.utils.async_get_clientsession"):
         entity = EtaSwitch(
             _make_config(), hass, _UNIQUE_ID, _make_switch_endpoint(), coordinator
         )
@@ -1,7 +1,7 @@
 """Tests for eta_webservices/__init__.py migrations."""
 
 import pytest
-from unittest.mock import Mock, MagicMock, patch
+from unittest.mock import AsyncMock, Mock, MagicMock, patch
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 from copy import deepcopy
@@ -582,3 +582,100 @@ async def test_migration_v7_to_v8_timeslot_without_writable_not_disabled():
 
     assert result is True
     mock_registry.async_update_entity.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_unload_entry_closes_connection_pool():
+    """Test unloading a config entry releases its dedicated connection pool."""
+    from custom_components.eta_webservices import async_unload_entry
+    from custom_components.eta_webservices.const import DOMAIN, HTTP_TRANSPORT
+
+    transport = MagicMock()
+    transport.close = AsyncMock()
+    hass = MagicMock(spec=HomeAssistant)
+    hass.config_entries = MagicMock()
+    hass.config_entries.async_unload_platforms = AsyncMock(return_value=True)
+    hass.data = {DOMAIN: {"entry_1": {HTTP_TRANSPORT: transport}}}
+    entry = MagicMock(spec=ConfigEntry)
+    entry.entry_id = "entry_1"
+
+    assert await async_unload_entry(hass, entry) is True
+
+    transport.close.assert_awaited_once()
+    assert "entry_1" not in hass.data[DOMAIN]
+
+
+@pytest.mark.asyncio
+async def test_unload_entry_closes_shared_eta_client():
+    """Test unloading a config entry closes the client shared by all its coordinators and entities."""
+    from homeassistant.const import CONF_HOST, CONF_PORT
+
+    from custom_components.eta_webservices import async_unload_entry
+    from custom_components.eta_webservices.const import DOMAIN, ETA_CLIENT, HTTP_TRANSPORT
+    from custom_components.eta_webservices.utils import get_eta_client
+
+    transport = MagicMock()
+    transport.close = AsyncMock()
+    config = {CONF_HOST: "192.168.0.25", CONF_PORT: 8080, HTTP_TRANSPORT: transport}
+    hass = MagicMock(spec=HomeAssistant)
+    hass.config_entries = MagicMock()
+    hass.config_entries.async_unload_platforms = AsyncMock(return_value=True)
+    hass.data = {DOMAIN: {"entry_1": config}}
+    entry = MagicMock(spec=ConfigEntry)
+    entry.entry_id = "entry_1"
+
+    eta_client = get_eta_client(hass, config)
+    assert get_eta_client(hass, config) is eta_client
+
+    assert await async_unload_entry(hass, entry) is True
+
+    transport.close.assert_awaited_once()
+    assert ETA_CLIENT not in config
+
+
+@pytest.mark.asyncio
+async def test_setup_entry_closes_connection_pool_on_shutdown():
+    """Test the dedicated connection pool is closed when Home Assistant shuts down."""
+    from homeassistant.const import CONF_HOST, CONF_PORT, EVENT_HOMEASSISTANT_CLOSE
+
+    from custom_components.eta_webservices import async_setup_entry
+
+    transport = MagicMock()
+    transport.close = AsyncMock()
+    hass = MagicMock(spec=HomeAssistant)
+    hass.data = {}
+    hass.bus = MagicMock()
+    unsubscribe = Mock()
+    hass.bus.async_listen_once = Mock(return_value=unsubscribe)
+    entry = MagicMock(spec=ConfigEntry)
+    entry.entry_id = "entry_1"
+    entry.data = {CONF_HOST: "192.168.0.25", CONF_PORT: 8080}
+    entry.options = {}
+    coordinator = MagicMock()
+    coordinator.async_config_entry_first_refresh = AsyncMock(
+        side_effect=RuntimeError("unreachable")
+    )
+
+    with (
+        patch(
+            "custom_components.eta_webservices.ETATransport", return_value=transport
+        ),
+        patch(
+            "custom_components.eta_webservices.ETAErrorUpdateCoordinator",
+            return_value=coordinator,
+        ),
+        patch("custom_components.eta_webservices.ETASensorUpdateCoordinator"),
+        patch("custom_components.eta_webservices.ETAWritableUpdateCoordinator"),
+        patch("custom_components.eta_webservices.ETAPendingNodeCoordinator"),
+        pytest.raises(RuntimeError),
+    ):
+        await async_setup_entry(hass, entry)
+
+    event_type, close_transport = hass.bus.async_listen_once.call_args.args
+    assert event_type == EVENT_HOMEASSISTANT_CLOSE
+    # The listener is removed when the entry is unloaded
+    entry.async_on_unload.assert_any_call(unsubscribe)
+
+    transport.close.reset_mock()
+    await close_transport(Mock())
+    transport.close.assert_awaited_once()
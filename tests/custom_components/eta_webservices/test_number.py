@@ -62,10 +62,10 @@ def _make_coordinator(url=_URL, value=20.0):
 
 @contextmanager
 def _mock_write(sensor, *, returns=True):
-    """Patch _create_eta_client so write_endpoint returns `returns`."""
+    """Patch the shared ETA client so write_endpoint returns `returns`."""
     mock_client = MagicMock()
     mock_client.write_endpoint = AsyncMock(return_value=returns)
-    with patch.object(sensor, "_create_eta_client", return_value=mock_client):
+    with patch.object(sensor, "eta_client", mock_client):
         yield mock_client
 
 
@@ -84,7 +84,7 @@ def make_sensor(hass: HomeAssistant):
         endpoint_info = endpoint_info or _make_endpoint_info()
         config = config or _make_config()
         coordinator = coordinator or _make_coordinator(endpoint_info["url"])
-        with patch("custom_components.eta_webservices.entity.async_get_clientsession"):
+        with patch("custom_components.eta_webservices.utils.async_get_clientsession"):
             return EtaWritableNumberSensor(
                 config, hass, unique_id, endpoint_info, coordinator
             )
@@ -83,9 +83,9 @@ VALID_VAR_XML = (
 
 
 def _make_response(xml_text: str):
-    """Return an async mock whose .text() coroutine returns xml_text."""
+    """Return a response mock whose body is xml_text."""
     resp = AsyncMock()
-    resp.text = AsyncMock(return_value=xml_text)
+    resp.body = xml_text.encode()
     return resp
 
 
@@ -223,7 +223,7 @@ def mock_hass():
 def mock_client_session():
     """Patch async_get_clientsession so coordinator.__init__ never creates a real session."""
     with patch(
-        "custom_components.eta_webservices.coordinator.async_get_clientsession",
+        "custom_components.eta_webservices.utils.async_get_clientsession",
         return_value=MagicMock(spec=ClientSession),
     ):
         yield
@@ -269,7 +269,7 @@ async def test_coordinator_promotes_valid_pending_node(mock_hass, mock_client_se
     mock_eta_client = MagicMock()
     mock_eta_client.get_all_data = AsyncMock(return_value={PENDING_URI: 20.64})
     mock_eta_client.get_data = AsyncMock(return_value=(20.64, "%"))
-    coordinator._create_eta_client = MagicMock(return_value=mock_eta_client)
+    coordinator.eta_client = mock_eta_client
 
     result = await coordinator._async_update_data()
 
@@ -338,7 +338,7 @@ async def test_coordinator_promotes_preselected_pending_node_to_chosen_float(
     mock_eta_client = MagicMock()
     mock_eta_client.get_all_data = AsyncMock(return_value={PENDING_URI: 20.64})
     mock_eta_client.get_data = AsyncMock(return_value=(20.64, "%"))
-    coordinator._create_eta_client = MagicMock(return_value=mock_eta_client)
+    coordinator.eta_client = mock_eta_client
 
     await coordinator._async_update_data()
 
@@ -387,7 +387,7 @@ async def test_coordinator_no_promotion_when_still_invalid(
     mock_eta_client = MagicMock()
     # Still "---" — not a numeric value
     mock_eta_client.get_all_data = AsyncMock(return_value={PENDING_URI: "---"})
-    coordinator._create_eta_client = MagicMock(return_value=mock_eta_client)
+    coordinator.eta_client = mock_eta_client
 
     result = await coordinator._async_update_data()
 
@@ -410,12 +410,12 @@ async def test_coordinator_returns_false_with_empty_pending_dict(
     entry.pref_disable_polling = False
 
     coordinator = ETAPendingNodeCoordinator(mock_hass, config, entry)
-    coordinator._create_eta_client = MagicMock()  # must not be called
+    coordinator.eta_client = MagicMock()  # must not be called
 
     result = await coordinator._async_update_data()
 
     assert result is False
-    coordinator._create_eta_client.assert_not_called()
+    assert not coordinator.eta_client.method_calls
 
 
 @pytest.mark.asyncio
@@ -125,7 +125,7 @@ async def test_all_writable_sensors_handled(hass: HomeAssistant, load_fixture):
     with (
         patch("custom_components.eta_webservices.number.async_get_current_platform"),
         patch("custom_components.eta_webservices.sensor.async_get_current_platform"),
-        patch("custom_components.eta_webservices.entity.async_get_clientsession"),
+        patch("custom_components.eta_webservices.utils.async_get_clientsession"),
     ):
         await number_async_setup_entry(hass, config_entry, add_entities)
         await sensor_async_setup_entry(hass, config_entry, add_entities)
@@ -195,7 +195,7 @@ async def test_all_non_writable_sensors_handled(hass: HomeAssistant, load_fixtur
     with (
         patch("custom_components.eta_webservices.number.async_get_current_platform"),
         patch("custom_components.eta_webservices.sensor.async_get_current_platform"),
-        patch("custom_components.eta_webservices.entity.async_get_clientsession"),
+        patch("custom_components.eta_webservices.utils.async_get_clientsession"),
     ):
         await number_async_setup_entry(hass, config_entry, add_entities)
         await sensor_async_setup_entry(hass, config_entry, add_entities)
@@ -284,7 +284,7 @@ async def test_all_writable_and_non_writable_sensors_handled(
     with (
         patch("custom_components.eta_webservices.number.async_get_current_platform"),
         patch("custom_components.eta_webservices.sensor.async_get_current_platform"),
-        patch("custom_components.eta_webservices.entity.async_get_clientsession"),
+        patch("custom_components.eta_webservices.utils.async_get_clientsession"),
     ):
         await number_async_setup_entry(hass, config_entry, add_entities)
         await sensor_async_setup_entry(hass, config_entry, add_entities)
@@ -345,7 +345,7 @@ async def test_sensor_platform_skips_duplicate_unique_ids(
 
     with (
         patch("custom_components.eta_webservices.sensor.async_get_current_platform"),
-        patch("custom_components.eta_webservices.entity.async_get_clientsession"),
+        patch("custom_components.eta_webservices.utils.async_get_clientsession"),
     ):
         await sensor_async_setup_entry(hass, config_entry, add_entities)
 
@@ -353,3 +353,74 @@ async def test_sensor_platform_skips_duplicate_unique_ids(
     assert len(unique_ids) == len(set(unique_ids))
     # 1 deduplicated regular sensor + 2 always-present error sensors
     assert len(all_entities) == 3
+
+
+@pytest.mark.asyncio
+async def test_request_latency_sensors_are_disabled_diagnostics(hass: HomeAssistant):
+    """Test one disabled diagnostic latency sensor is added per endpoint class."""
+    from homeassistant.const import EntityCategory
+
+    from custom_components.eta_webservices._api.metrics import (
+        EndpointClass,
+        RequestMetrics,
+    )
+    from custom_components.eta_webservices.const import HTTP_TRANSPORT
+    from custom_components.eta_webservices.sensor import EtaRequestLatencySensor
+
+    error_coordinator = MagicMock()
+    error_coordinator.data = []
+    transport = MagicMock()
+    transport.metrics = RequestMetrics()
+    config = {
+        CONF_HOST: "192.168.0.25",
+        CONF_PORT: 8080,
+        WRITABLE_DICT: {},
+        FLOAT_DICT: {},
+        SWITCHES_DICT: {},
+        TEXT_DICT: {},
+        CHOSEN_FLOAT_SENSORS: [],
+        CHOSEN_SWITCHES: [],
+        CHOSEN_TEXT_SENSORS: [],
+        CHOSEN_WRITABLE_SENSORS: [],
+        SENSOR_UPDATE_COORDINATOR: MagicMock(),
+        WRITABLE_UPDATE_COORDINATOR: MagicMock(),
+        ERROR_UPDATE_COORDINATOR: error_coordinator,
+        HTTP_TRANSPORT: transport,
+    }
+    entry_id = "test_entry_id_request_metrics"
+    config_entry = MockConfigEntry(domain=DOMAIN, entry_id=entry_id)
+    hass.data.setdefault(DOMAIN, {})[entry_id] = config
+
+    all_entities = []
+
+    def add_entities(entities, **_):
+        all_entities.extend(entities)
+
+    with patch("custom_components.eta_webservices.sensor.async_get_current_platform"):
+        await sensor_async_setup_entry(hass, config_entry, add_entities)
+
+    latency_sensors = {
+        entity.translation_placeholders["endpoint_class"]: entity
+        for entity in all_entities
+        if isinstance(entity, EtaRequestLatencySensor)
+    }
+    assert set(latency_sensors) == {
+        "menu",
+        "varinfo",
+        "var",
+        "vars",
+        "errors",
+        "post_var",
+    }
+    var_sensor = latency_sensors["var"]
+    assert var_sensor.entity_category is EntityCategory.DIAGNOSTIC
+    assert var_sensor.entity_registry_enabled_default is False
+    assert var_sensor.native_value is None
+
+    transport.metrics.record_request(
+        EndpointClass.VAR, queue_wait=0.0, latency=0.2, num_bytes=100
+    )
+    var_sensor.update()
+    assert 200 <= var_sensor.native_value < 250
+    assert var_sensor.extra_state_attributes["num_requests"] == 1
+    assert var_sensor.extra_state_attributes["bytes_received"] == 100
@@ -2,8 +2,17 @@
 
 # pyright: reportTypedDictNotRequiredAccess=false
 
+from datetime import timedelta
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
 from custom_components.eta_webservices.const import DOMAIN
-from custom_components.eta_webservices.utils import create_device_info
+from custom_components.eta_webservices.utils import (
+    async_get_varinfo_cache,
+    async_save_varinfo_cache,
+    create_device_info,
+)
 
 
 def test_create_device_info_with_device_name():
@@ -22,3 +31,26 @@ def test_create_device_info_without_device_name():
     assert (DOMAIN, "eta_192_168_1_10_8080") in info["identifiers"]
     assert info["manufacturer"] == "ETA"
     assert info["configuration_url"] == "https://www.meineta.at"
+
+
+async def test_varinfo_cache_is_loaded_once_and_saved(hass, hass_storage):
+    """The varinfo cache of a terminal is restored from disk and shared by all callers."""
+    storage_key = f"{DOMAIN}.varinfo_cache.192_168_1_10_8080"
+    hass_storage[storage_key] = {
+        "version": 1,
+        "data": {
+            "api_version": "1.2",
+            "menu_fingerprint": "abc",
+            "entries": {"/120/1": {"key": "_WW_Temp", "endpoint": {"url": "/120/1"}}},
+        },
+    }
+
+    cache = await async_get_varinfo_cache(hass, "192.168.1.10", 8080)
+    assert cache.get("/120/1", "_WW_Temp") == {"url": "/120/1"}
+    assert await async_get_varinfo_cache(hass, "192.168.1.10", 8080) is cache
+
+    cache.invalidate("/120/1")
+    async_save_varinfo_cache(hass, "192.168.1.10", 8080)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=60))
+    await hass.async_block_till_done()
+    assert hass_storage[storage_key]["data"]["entries"] == {}
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Micro-benchmark the specialized response parsers against the generic xmltodict path.
+
+All responses are taken from the api_endpoint_data.json fixture, so the benchmark
+reflects the documents a real ETA terminal sends.
+"""
+
+import argparse
+import json
+from pathlib import Path
+import sys
+import timeit
+import tracemalloc
+
+# Add parent's parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import xmltodict
+
+from custom_components.eta_webservices._api.xml_parsers import (
+    MenuParser,
+    parse_value_response,
+)
+
+FIXTURE_PATH = Path(__file__).parent.parent / "fixtures" / "api_endpoint_data.json"
+
+
+def _load_fixture() -> dict[str, str]:
+    with FIXTURE_PATH.open(encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _load_value_responses() -> list[str]:
+    fixture = _load_fixture()
+    return [
+        response
+        for suffix, response in fixture.items()
+        if suffix.startswith("/user/var/") and "<value" in response
+    ]
+
+
+def _report(name: str, baseline: float, optimized: float, count: int) -> None:
+    print(
+        f"{name}: xmltodict {baseline / count * 1e6:.1f} us/doc, "
+        f"fast parser {optimized / count * 1e6:.1f} us/doc, "
+        f"speedup {baseline / optimized:.1f}x"
+    )
+
+
+def benchmark_value_parser(rounds: int) -> None:
+    """Compare parsing all /user/var responses of the fixture."""
+    responses = _load_value_responses()
+    for response in responses:
+        assert (
+            parse_value_response(response) == xmltodict.parse(response)["eta"]["value"]
+        )
+
+    baseline = min(
+        timeit.repeat(
+            lambda: [xmltodict.parse(r)["eta"]["value"] for r in responses],
+            number=1,
+            repeat=rounds,
+        )
+    )
+    optimized = min(
+        timeit.repeat(
+            lambda: [parse_value_response(r) for r in responses],
+            number=1,
+            repeat=rounds,
+        )
+    )
+    _report(f"/user/var ({len(responses)} docs)", baseline, optimized, len(responses))
+
+
+def _evaluate_xml_dict(xml_dict, uri_dict: dict, prefix: str = "") -> None:
+    """Recursively walk the nested menu, like the integration did before MenuParser."""
+    if isinstance(xml_dict, list):
+        for child in xml_dict:
+            _evaluate_xml_dict(child, uri_dict, prefix)
+        return
+    key = f"{prefix}_{xml_dict['@name']}"
+    uri_dict.setdefault(key, []).append(xml_dict["@uri"])
+    if "object" in xml_dict:
+        _evaluate_xml_dict(xml_dict["object"], uri_dict, key)
+
+
+def _flatten_menu_generic(menu: str) -> dict[str, list[str]]:
+    uri_dict: dict[str, list[str]] = {}
+    _evaluate_xml_dict(xmltodict.parse(menu)["eta"]["menu"]["fub"], uri_dict)
+    return uri_dict
+
+
+def _flatten_menu_parser(menu: str) -> dict[str, list[str]]:
+    uri_dict: dict[str, list[str]] = {}
+    for key, uri in MenuParser().parse(menu):
+        uri_dict.setdefault(key, []).append(uri)
+    return uri_dict
+
+
+def _peak_memory(func, *args) -> int:
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_menu_parser(rounds: int) -> None:
+    """Compare flattening the /user/menu response of the fixture."""
+    menu = _load_fixture()["/user/menu"]
+    assert _flatten_menu_parser(menu) == _flatten_menu_generic(menu)
+
+    baseline = min(
+        timeit.repeat(lambda: _flatten_menu_generic(menu), number=1, repeat=rounds)
+    )
+    optimized = min(
+        timeit.repeat(lambda: _flatten_menu_parser(menu), number=1, repeat=rounds)
+    )
+    _report("/user/menu", baseline, optimized, 1)
+    print(
+        f"/user/menu peak memory: xmltodict {_peak_memory(_flatten_menu_generic, menu) / 1024:.0f} KiB, "
+        f"MenuParser {_peak_memory(_flatten_menu_parser, menu) / 1024:.0f} KiB"
+    )
+
+
+def main():
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=20,
+        help="Number of timed rounds, the best is reported",
+    )
+    args = parser.parse_args()
+
+    benchmark_value_parser(args.rounds)
+    benchmark_menu_parser(args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -99,7 +99,7 @@ class FixtureUpdater:
             response = await self.api._http.get_request("/user/menu")  # type: ignore
             if response.status != 200:
                 raise RuntimeError(f"Menu fetch failed with status {response.status}")
-            menu_xml = await response.text()
+            menu_xml = response.body.decode()
             logging.debug(f"Menu XML length: {len(menu_xml)} bytes")
             return menu_xml
         except Exception as e:
@@ -242,7 +242,7 @@ class FixtureUpdater:
             varinfo_key = f"/user/varinfo/{uri}"
             try:
                 response = await self.api._http.get_request(varinfo_key)  # type: ignore
-                xml = await response.text()
+                xml = response.body.decode()
                 result[varinfo_key] = xml
                 self.stats["varinfo_success"] += 1
                 logging.debug(f"✓ Fetched varinfo: {uri}")
@@ -255,7 +255,7 @@ class FixtureUpdater:
             var_key = f"/user/var/{uri}"
             try:
                 response = await self.api._http.get_request(var_key)  # type: ignore
-                xml = await response.text()
+                xml = response.body.decode()
                 result[var_key] = xml
                 self.stats["var_success"] += 1
                 logging.debug(f"✓ Fetched var: {uri}")
@@ -68,7 +68,7 @@ class MockedETAAPI:
 
         response = AsyncMock()
         if suffix in self.fixture_data:
-            response.text = AsyncMock(return_value=self.fixture_data[suffix])
+            response.body = self.fixture_data[suffix].encode()
             _LOGGER.debug("Mocked request for %s: found in fixture", suffix)
         else:
             # Return error XML for missing endpoints
@@ -76,7 +76,7 @@ class MockedETAAPI:
                 '<?xml version="1.0" encoding="utf-8"?>'
                 '<eta version="1.0"><error>Not found</error></eta>'
             )
-            response.text = AsyncMock(return_value=error_xml)
+            response.body = error_xml.encode()
             _LOGGER.debug("Mocked request for %s: not found, returning error", suffix)
 
         return response